@@ -9,7 +9,7 @@ import numpy as np
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
 from vcp_logic import (
-    find_volatility_contraction_pattern,
+    find_volatility_contraction_pattern_vectorized,
     run_vcp_screening,
     _calculate_volume_trend,
     check_pivot_freshness,      
@@ -18,14 +18,21 @@ from vcp_logic import (
     check_pullback_setup, 
     PIVOT_PRICE_PERC,              
 )
-from pydantic import ValidationError, TypeAdapter
+from pydantic import ValidationError
 from typing import List
-from shared.contracts import PriceDataItem
+from shared.contracts import (
+    get_type_adapter, unpack_price_batch, PriceDataItem, PriceColumns, PriceBatchStreamRecord, PRICE_BATCH_STREAM_MIMETYPE,
+)
+from shared.metrics import instrument_app, track_executor
+from chart_payload import CHART_MODES, CHART_MAX_POINTS, PRICE_DECIMALS, lttb_indices, delta_encode, encode_dates
 
 app = Flask(__name__)
+instrument_app(app)
 
 DATA_SERVICE_URL = os.getenv("DATA_SERVICE_URL", "http://data-service:3001")
 PORT = int(os.getenv("PORT", 3003))
+# Moving averages drawn on every VCP chart
+MA_PERIODS = (20, 50, 150, 200)
 
 
 # --- Flask App Initialization and Custom JSON Encoding ---
@@ -55,7 +62,7 @@ app.json = CustomJSONProvider(app)
 
 # --- Centralized Executor ---
 # Using a ThreadPoolExecutor for concurrent VCP analysis in the batch endpoint
-executor = ThreadPoolExecutor(max_workers=10)
+executor = track_executor("analysis_batch", ThreadPoolExecutor(max_workers=10))
 
 # --- Data Preparation and Utility Functions ---
 
@@ -67,7 +74,7 @@ def _validate_and_parse_price_data(response, ticker_for_log):
     """
     try:
         # Pydantic's TypeAdapter is efficient for validating lists of models
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
         # .validate_json is faster as it works directly on bytes
         validated_data = PriceDataValidator.validate_json(response.content)
         # Pydantic models are returned, convert them back to dicts for the existing logic
@@ -86,15 +93,63 @@ def _validate_and_parse_price_data(response, ticker_for_log):
         }
         return None, (jsonify(error_payload), 502)
 
+def _unpack_price_batch(raw_batch):
+    """
+    shared.contracts.unpack_price_batch, logging the columnar tickers dropped for a
+    contract violation so one bad series does not fail the batch.
+    Returns (series_by_ticker, prevalidated).
+    """
+    series_by_ticker, prevalidated, invalid = unpack_price_batch(raw_batch)
+    for ticker, e in invalid.items():
+        app.logger.warning(f"Contract violation for {ticker} in columnar batch, skipping. Details: {e}")
+    return series_by_ticker, prevalidated
+
+def _iter_price_batch_stream(response):
+    """
+    Yields (ticker, rows or PriceColumns) from a streamed (NDJSON) /price/batch response as each
+    record arrives, so analysis can start on early tickers while slow ones are
+    still being fetched. Records are validated one by one; failed or malformed
+    tickers are logged and skipped. A broken connection ends the stream with
+    whatever already arrived.
+    """
+    PriceDataValidator = get_type_adapter(List[PriceDataItem])
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                record = PriceBatchStreamRecord.model_validate_json(line)
+                if record.status != "success":
+                    continue
+                if record.format == "columnar":
+                    rows = PriceColumns.model_validate(record.data)
+                else:
+                    PriceDataValidator.validate_python(record.data)
+                    rows = record.data
+            except ValidationError as e:
+                app.logger.warning(f"Contract violation in streamed price batch, skipping record. Details: {e}")
+                continue
+            yield record.ticker, rows
+    except requests.exceptions.RequestException as e:
+        app.logger.error(f"Price batch stream from data-service ended early: {e}")
+
+def _is_price_batch_stream(response):
+    return response.headers.get('Content-Type') == PRICE_BATCH_STREAM_MIMETYPE
+
 def prepare_historical_data(historical_data):
     """
     Transforms data-service response into sorted lists of close prices and dates.
     Filters out any data points where 'close' price is null or missing.
-    Expected input format: [{'formatted_date': 'YYYY-MM-DD', 'close': X.X, ...}]
+    Expected input format: [{'formatted_date': 'YYYY-MM-DD', 'close': X.X, ...}], or
+    PriceColumns, whose arrays are used as they are (the third value is then PriceColumns too).
     """
     if not historical_data:
         return [], [], []
 
+    if isinstance(historical_data, PriceColumns):
+        series = historical_data.sessions()
+        return series.close, series.dates, series
+
     # Filter out entries with no 'close' price and then sort chronologically
     valid_data = [item for item in historical_data if item.get('close') is not None]
     if not valid_data:
@@ -105,41 +160,48 @@ def prepare_historical_data(historical_data):
     dates = [item['formatted_date'] for item in sorted_data]
     return prices, dates, sorted_data
 
+def _series_column(series, field):
+    """One field of a prepare_historical_data series (rows or PriceColumns), session by session."""
+    if isinstance(series, PriceColumns):
+        return getattr(series, field)
+    return [item.get(field) for item in series]
+
+def _series_volumes(series):
+    if isinstance(series, PriceColumns):
+        return series.volume
+    return [item.get('volume', 0) for item in series]
+
+def _series_rows(series, indices=None):
+    """PriceDataItem-shaped rows of a series, for chart payloads (only `indices` when given)."""
+    if isinstance(series, PriceColumns):
+        return series.to_rows(indices)
+    return series if indices is None else [series[i] for i in indices]
+
+def _rolling_sma(prices, period):
+    """SMA for every session once the window is full (index 0 is session period-1); empty if too short."""
+    if len(prices) < period:
+        return np.array([])
+    return np.convolve(prices, np.ones(period), 'valid') / period
+
 def calculate_sma_series(prices, dates, period):
     """
     Calculates a continuous Simple Moving Average series.
     Returns a list of dictionaries formatted for lightweight-charts.
     """
-    if len(prices) < period:
-        return []
-    
-    sma_values = []
-    # Use a rolling window to calculate SMA for each point where possible
-    rolling_sma = np.convolve(prices, np.ones(period), 'valid') / period
-    
+    rolling_sma = _rolling_sma(prices, period)
     # The result of 'valid' convolution is shorter, so we align it with the original dates
     # SMA values start from the 'period-1'-th index of the original data
-    for i in range(len(rolling_sma)):
-        date_index = period - 1 + i
-        sma_values.append({
-            "time": dates[date_index],
-            "value": rolling_sma[i]
-        })
-        
-    return sma_values
+    return [{"time": dates[period - 1 + i], "value": value} for i, value in enumerate(rolling_sma)]
 
-def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_results, vcp_pass_status, vcp_details):
+def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_results, vcp_pass_status, vcp_details,
+                      chart_mode='full', max_points=None):
     """
     Helper to construct the full VCPChartData object.
     Used by both single and batch endpoints to ensure consistent chart visualization.
+    chart_mode selects how the price/MA series are shipped (see chart_payload); the
+    VCP fields are identical in every mode.
     """
-    # 1. Calculate Moving Averages
-    ma_20_series = calculate_sma_series(prices, dates, 20)
-    ma_50_series = calculate_sma_series(prices, dates, 50)
-    ma_150_series = calculate_sma_series(prices, dates, 150)
-    ma_200_series = calculate_sma_series(prices, dates, 200)
-
-    # 2. Derive Rejection Reason if failed
+    # 1. Derive Rejection Reason if failed
     rejection_reason = None
     if not vcp_pass_status and vcp_results and isinstance(vcp_details, dict):
         reasons = []
@@ -151,7 +213,7 @@ def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_result
         
         rejection_reason = ", ".join(reasons) if reasons else "Structure Invalid"
 
-    # 3. Assemble base chart data
+    # 2. Assemble base chart data
     chart_data = {
         "detected": bool(vcp_results),
         "message": "VCP analysis complete." if vcp_results else "No VCP detected.",
@@ -164,15 +226,13 @@ def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_result
         "sellPoints": [],
         "lowVolumePivotDate": None,
         "volumeTrendLine": [],
-        "ma20": ma_20_series,
-        "ma50": ma_50_series,
-        "ma150": ma_150_series,
-        "ma200": ma_200_series,
-        "historicalData": historical_data_sorted
     }
+    # Sessions a downsampled chart must keep exactly
+    anchors = set()
 
-    # 4. Populate VCP-specifics (Contractions, Pivot, etc.)
+    # 3. Populate VCP-specifics (Contractions, Pivot, etc.)
     if vcp_results:
+        anchors.update(idx for high_idx, _, low_idx, _ in vcp_results for idx in (high_idx, low_idx))
         # Determine which set of contractions to use for visualization logic
         # We prioritize the 'filtered_contractions' (sanitized SEPA base) if available.
         target_contractions = vcp_results
@@ -187,6 +247,7 @@ def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_result
             else:
                 depth = 0.0
                 
+            anchors.update((high_idx, low_idx))
             contraction_items.append({
                 "start_date": dates[high_idx],
                 "start_price": float(high_price),
@@ -214,6 +275,7 @@ def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_result
                 min_vol_local_idx = np.argmin(contraction_volumes)
                 min_vol_global_idx = last_high_idx + min_vol_local_idx
                 chart_data["lowVolumePivotDate"] = dates[min_vol_global_idx]
+                anchors.add(int(min_vol_global_idx))
             
             # Calculate the volume trend line for the last contraction for charting
             if len(contraction_volumes) > 1:
@@ -222,10 +284,31 @@ def _build_chart_data(prices, dates, volumes, historical_data_sorted, vcp_result
                 end_point_val = slope * (len(contraction_volumes) - 1) + intercept
                 end_point = {"time": dates[last_low_idx], "value": end_point_val}
                 chart_data["volumeTrendLine"] = [start_point, end_point]
-    
+
+    # 4. Price and Moving Average series in the requested shape
+    smas = {period: _rolling_sma(prices, period) for period in MA_PERIODS}
+    if chart_mode == 'columnar':
+        chart_data.update({f"ma{period}": [] for period in MA_PERIODS}, historicalData=[])
+        chart_data["columns"] = {
+            **encode_dates(dates),
+            **{field: delta_encode(_series_column(historical_data_sorted, field), PRICE_DECIMALS)
+               for field in ("open", "high", "low", "close")},
+            "volume": delta_encode(volumes, 0),
+            **{f"ma{period}": delta_encode(sma, PRICE_DECIMALS, offset=period - 1) for period, sma in smas.items()},
+        }
+    elif chart_mode == 'downsampled':
+        kept = lttb_indices(prices, max_points or CHART_MAX_POINTS, keep=anchors)
+        chart_data["historicalData"] = _series_rows(historical_data_sorted, kept)
+        for period, sma in smas.items():
+            chart_data[f"ma{period}"] = [{"time": dates[i], "value": sma[i - period + 1]} for i in kept if i >= period - 1]
+    else:
+        chart_data["historicalData"] = _series_rows(historical_data_sorted)
+        for period, sma in smas.items():
+            chart_data[f"ma{period}"] = [{"time": dates[period - 1 + i], "value": value} for i, value in enumerate(sma)]
+
     return chart_data
 
-def _process_ticker_analysis(ticker, historical_data, mode):
+def _process_ticker_analysis(ticker, historical_data, mode, chart_mode='full', max_points=None):
     """
     Helper function to run VCP analysis for a single ticker with its data.
     Designed for parallel execution in the batch endpoint.
@@ -249,10 +332,10 @@ def _process_ticker_analysis(ticker, historical_data, mode):
         if not prices:
             return None
 
-        volumes = [item.get("volume", 0) for item in historical_data_sorted]
+        volumes = _series_volumes(historical_data_sorted)
 
         # Core VCP detection
-        vcp_results = find_volatility_contraction_pattern(prices)
+        vcp_results = find_volatility_contraction_pattern_vectorized(prices)
         vcp_pass_status, vcp_footprint_string, details = run_vcp_screening(
             vcp_results, prices, volumes, mode
         )
@@ -273,7 +356,8 @@ def _process_ticker_analysis(ticker, historical_data, mode):
         if mode == 'full':
             result["chart_data"] = _build_chart_data(
                 prices, dates, volumes, historical_data_sorted, 
-                vcp_results, vcp_pass_status, details
+                vcp_results, vcp_pass_status, details,
+                chart_mode=chart_mode, max_points=max_points
             )
             # Map details if present
             if isinstance(details, dict):
@@ -350,8 +434,8 @@ def _process_ticker_freshness_analysis(ticker: str, historical_data: list[dict])
         if not prices:
             return None
 
-        vcp_results = find_volatility_contraction_pattern(prices)
-        volumes = [item.get('volume', 0) for item in sorted_data]
+        vcp_results = find_volatility_contraction_pattern_vectorized(prices)
+        volumes = _series_volumes(sorted_data)
 
         # Gate on VCP fast screen to ensure valid VCP candidate first
         vcp_pass, footprint_str, _ = run_vcp_screening(vcp_results, prices, volumes, mode='fast')
@@ -432,6 +516,25 @@ def index():
     """Health check endpoint."""
     return "Analysis Service is running."
 
+def _parse_chart_options(chart, max_points):
+    """
+    Reads the 'chart' payload mode (full | downsampled | columnar, default full) and
+    the optional 'max_points' budget of a downsampled chart.
+    Returns (chart_mode, max_points, None) or (None, None, error_response).
+    """
+    chart_mode = chart or 'full'
+    if chart_mode not in CHART_MODES:
+        return None, None, (jsonify({"error": f"Invalid chart mode '{chart_mode}'. Valid modes are: {list(CHART_MODES)}"}), 400)
+    if max_points is None:
+        return chart_mode, None, None
+    try:
+        max_points = int(max_points)
+    except (TypeError, ValueError):
+        max_points = 0
+    if max_points < 2:
+        return None, None, (jsonify({"error": "'max_points' must be an integer of at least 2."}), 400)
+    return chart_mode, max_points, None
+
 @app.route('/analyze/<ticker>')
 def analyze_ticker_endpoint(ticker):
     """
@@ -441,7 +544,10 @@ def analyze_ticker_endpoint(ticker):
     - 'fast': Halts on the first failure and returns a lean response.
     """
     mode = request.args.get('mode', 'full') # Read the mode parameter
-    print(f"Received analysis request for ticker: {ticker}, mode: {mode}")
+    chart_mode, max_points, chart_error = _parse_chart_options(request.args.get('chart'), request.args.get('max_points'))
+    if chart_error:
+        return chart_error
+    print(f"Received analysis request for ticker: {ticker}, mode: {mode}, chart: {chart_mode}")
     try:
         ticker = ticker.upper()
         # 1. Fetch historical data from the data-service
@@ -477,13 +583,14 @@ def analyze_ticker_endpoint(ticker):
         volumes = [item.get('volume', 0) for item in historical_data_sorted]
 
         # 3. Run VCP analysis
-        vcp_results = find_volatility_contraction_pattern(prices)
+        vcp_results = find_volatility_contraction_pattern_vectorized(prices)
         vcp_pass_status, vcp_footprint_string, vcp_details = run_vcp_screening(vcp_results, prices, volumes, mode)
 
         # 4. Use helper to build complete chart data (DRY)
         chart_data = _build_chart_data(
             prices, dates, volumes, historical_data_sorted, 
-            vcp_results, vcp_pass_status, vcp_details
+            vcp_results, vcp_pass_status, vcp_details,
+            chart_mode=chart_mode, max_points=max_points
         )
 
         # 5. Return the final JSON response
@@ -511,7 +618,7 @@ def analyze_ticker_endpoint(ticker):
 def analyze_batch_endpoint():
     """
     Analyzes a batch of tickers for VCP.
-    Fetches all price data in a single batch call and then processes in parallel.
+    Fetches all price data in a single streamed batch call and processes tickers in parallel as they arrive.
     'mode' can be passed in the JSON payload. Defaults to 'fast'.
     """
     try:
@@ -520,6 +627,11 @@ def analyze_batch_endpoint():
             return jsonify({"error": "Invalid request. 'tickers' array is required."}), 400
 
         mode = payload.get('mode', 'fast')
+        chart_mode, max_points, chart_error = _parse_chart_options(payload.get('chart'), payload.get('max_points'))
+        if chart_error:
+            return chart_error
+        # The default full chart needs no extra arguments
+        chart_options = {"chart_mode": chart_mode, "max_points": max_points} if chart_mode != 'full' else {}
         tickers = payload['tickers']
         if not tickers:
             return jsonify([]), 200
@@ -528,8 +640,9 @@ def analyze_batch_endpoint():
         try:
             data_resp = requests.post(
                 f"{DATA_SERVICE_URL}/price/batch",
-                json={"tickers": tickers, "source": "yfinance"},
-                timeout=120
+                json={"tickers": tickers, "source": "yfinance", "format": "columnar", "stream": True},
+                timeout=120,
+                stream=True,
             )
             if data_resp.status_code != 200:
                 return jsonify({
@@ -537,11 +650,16 @@ def analyze_batch_endpoint():
                     "details": data_resp.text
                 }), 502
             
-            try:
-                raw_batch_data = data_resp.json()
-                successful_data = raw_batch_data.get('success', {})
-            except json.JSONDecodeError:
-                return jsonify({"error": "Invalid JSON response from data-service", "details": data_resp.text}), 502
+            if _is_price_batch_stream(data_resp):
+                # Tickers are submitted for analysis as their records arrive
+                price_items, prevalidated = _iter_price_batch_stream(data_resp), True
+            else:
+                try:
+                    raw_batch_data = data_resp.json()
+                    successful_data, prevalidated = _unpack_price_batch(raw_batch_data)
+                    price_items = successful_data.items()
+                except json.JSONDecodeError:
+                    return jsonify({"error": "Invalid JSON response from data-service", "details": data_resp.text}), 502
             
         except requests.exceptions.RequestException as e:
             return jsonify({"error": "Error connecting to data-service.", "details": str(e)}), 503
@@ -550,23 +668,23 @@ def analyze_batch_endpoint():
         passing_candidates = []
 
         # Pydantic validator for validating the price data list for each ticker
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
 
         # Use the executor to submit analysis tasks
         future_to_ticker = {}
-        for ticker, data in successful_data.items():
+        for ticker, data in price_items:
             try:
                 # Exception for market indices to bypass strict validation
                 # Matches pattern in helper_functions.py requested by user
                 if ticker.startswith('^') or ticker in ['SPY', 'QQQ', 'DIA']:
-                     if not isinstance(data, list):
+                     if not isinstance(data, (list, PriceColumns)):
                          app.logger.warning(f"Index data for {ticker} is not a list: {type(data)}")
                          continue
-                else:
+                elif not prevalidated:
                     # Validate the data for each ticker against the contract before processing
                     PriceDataValidator.validate_python(data)
                 
-                future = executor.submit(_process_ticker_analysis, ticker, data, mode)
+                future = executor.submit(_process_ticker_analysis, ticker, data, mode, **chart_options)
                 future_to_ticker[future] = ticker
             except ValidationError as e:
                 # Log the contract violation and skip this ticker to maintain batch resilience
@@ -594,7 +712,7 @@ def analyze_freshness_batch_endpoint():
     """
     Screens a batch of tickers and returns only those with fresh, actionable VCP setups.
     - Validates input payload.
-    - Fetches raw price data in a single call to data-service.
+    - Fetches raw price data in a single streamed call to data-service.
     - Processes each ticker concurrently.
     - Returns only passers (those that pass both VCP fast screen and freshness).
     """
@@ -611,15 +729,21 @@ def analyze_freshness_batch_endpoint():
         try:
             data_resp = requests.post(
                 f"{DATA_SERVICE_URL}/price/batch",
-                json={"tickers": tickers, "source": "yfinance"},
-                timeout=120
+                json={"tickers": tickers, "source": "yfinance", "format": "columnar", "stream": True},
+                timeout=120,
+                stream=True,
             )
             if data_resp.status_code != 200:
                 return jsonify({"error": "Failed to retrieve batch data"}), 502
 
-            # Parse upstream JSON safely
-            raw_batch = data_resp.json()
-            success_map = raw_batch.get('success', {})
+            if _is_price_batch_stream(data_resp):
+                # Tickers are submitted for analysis as their records arrive
+                price_items, prevalidated = _iter_price_batch_stream(data_resp), True
+            else:
+                # Parse upstream JSON safely
+                raw_batch = data_resp.json()
+                success_map, prevalidated = _unpack_price_batch(raw_batch)
+                price_items = success_map.items()
         except requests.exceptions.RequestException as e:
             return jsonify({"error": "Error connecting to data-service.", "details": str(e)}), 503
         except ValueError:
@@ -629,12 +753,13 @@ def analyze_freshness_batch_endpoint():
         # Validate each ticker’s data against contract, then process concurrently
         passing = []
         future_to_ticker = {}
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
 
-        for tkr, raw_list in success_map.items():
+        for tkr, raw_list in price_items:
             try:
                 # Validate before submitting for processing
-                PriceDataValidator.validate_python(raw_list)
+                if not prevalidated:
+                    PriceDataValidator.validate_python(raw_list)
                 fut = executor.submit(_process_ticker_freshness_analysis, tkr, raw_list)
                 future_to_ticker[fut] = tkr
             except ValidationError as ve:
@@ -0,0 +1,113 @@
+# backend-services/analysis-service/chart_payload.py
+"""
+Compact chart payloads for VCPChartData.
+
+- "downsampled": at most max_points sessions picked with Largest-Triangle-Three-
+  Buckets on the close, in the usual row shape. Anchor sessions (VCP contraction
+  highs/lows, the low-volume pivot, first and last session) split the series into
+  segments that are downsampled separately, so anchors are always kept exactly.
+- "columnar": every session as fixed-point, delta-encoded integer columns
+  (shared.contracts.ChartColumns) instead of one dict per session and per MA point.
+"""
+import os
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, get_args
+
+import numpy as np
+
+from shared.contracts import ChartPayloadMode
+
+CHART_MODES = get_args(ChartPayloadMode)
+# Default session budget of a downsampled chart (~15 months of daily bars)
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "320"))
+PRICE_DECIMALS = 4
+
+
+def _lttb_segment(y: np.ndarray, start: int, end: int, picks: int) -> List[int]:
+    """`picks` interior indices of (start, end), chosen by LTTB between the two fixed endpoints."""
+    buckets = np.array_split(np.arange(start + 1, end), picks)
+    selected = []
+    prev = start
+    for k, bucket in enumerate(buckets):
+        if k + 1 < len(buckets):
+            next_x, next_y = buckets[k + 1].mean(), y[buckets[k + 1]].mean()
+        else:
+            next_x, next_y = float(end), y[end]
+        # Twice the area of the triangle (prev, candidate, next-bucket average)
+        areas = np.abs((prev - next_x) * (y[bucket] - y[prev]) - (prev - bucket) * (next_y - y[prev]))
+        prev = int(bucket[int(np.argmax(areas))])
+        selected.append(prev)
+    return selected
+
+
+def lttb_indices(values: Sequence[float], max_points: int, keep: Iterable[int] = ()) -> List[int]:
+    """
+    Sorted indices of a shape-preserving subset of `values`.
+    Indices in `keep` (plus the first and last) are always included; the
+    result holds max(max_points, number of anchors) indices at most.
+    """
+    n = len(values)
+    if n <= max_points:
+        return list(range(n))
+
+    y = np.asarray(values, dtype=np.float64)
+    anchors = sorted({0, n - 1, *(int(i) for i in keep if 0 <= i < n)})
+    budget = max(0, max_points - len(anchors))
+    interior_total = sum(b - a - 1 for a, b in zip(anchors, anchors[1:]))
+
+    selected = []
+    for a, b in zip(anchors, anchors[1:]):
+        selected.append(a)
+        interior = b - a - 1
+        # Floor keeps the total within the budget; segments get points in proportion to their length
+        picks = min(interior, budget * interior // interior_total) if interior_total else 0
+        if picks >= interior:
+            selected.extend(range(a + 1, b))
+        elif picks > 0:
+            selected.extend(_lttb_segment(y, a, b, picks))
+    selected.append(n - 1)
+    return selected
+
+
+def delta_encode(values: Sequence[Optional[float]], decimals: int, offset: int = 0) -> dict:
+    """
+    DeltaColumn dict for `values`: scaled to integers, first value absolute,
+    then differences. None entries stay None and do not move the running value.
+    """
+    scale = 10 ** decimals
+    encoded = []
+    previous = 0
+    for value in values:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            encoded.append(None)
+            continue
+        scaled = int(round(float(value) * scale))
+        encoded.append(scaled - previous)
+        previous = scaled
+    return {"decimals": decimals, "offset": offset, "values": encoded}
+
+
+def delta_decode(column: dict) -> List[Optional[float]]:
+    """Inverse of delta_encode (values rounded to the column's decimals)."""
+    scale = 10 ** column["decimals"]
+    decoded = []
+    running = 0
+    for delta in column["values"]:
+        if delta is None:
+            decoded.append(None)
+            continue
+        running += delta
+        decoded.append(running / scale if column["decimals"] else running)
+    return decoded
+
+
+def encode_dates(dates: Sequence[str]) -> dict:
+    """start_date plus day gaps between consecutive sessions."""
+    days = np.array([d[:10] for d in dates], dtype="datetime64[D]")
+    return {"start_date": str(days[0]), "day_deltas": np.diff(days).astype(int).tolist()}
+
+
+def decode_dates(columns: dict) -> List[str]:
+    """Session dates (YYYY-MM-DD) of an encode_dates dict."""
+    ordinals = np.concatenate([[date.fromisoformat(columns["start_date"]).toordinal()], columns["day_deltas"]]).cumsum()
+    return [date.fromordinal(int(o)).isoformat() for o in ordinals]
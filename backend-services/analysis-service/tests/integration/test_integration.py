@@ -9,6 +9,7 @@ from unittest.mock import patch, MagicMock
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from app import app
+from shared.contracts import PriceColumns
 
 # --- Test Data Helpers ---
 def get_vcp_test_data():
@@ -148,7 +149,7 @@ class TestAnalysisEndpoint(unittest.TestCase):
             json=lambda: mock_data,
             content=json.dumps(mock_data).encode('utf-8')
         )
-        with patch('app.find_volatility_contraction_pattern') as mock_vcp:
+        with patch('app.find_volatility_contraction_pattern_vectorized') as mock_vcp:
             mock_vcp.return_value = [(3, np.float64(103.0), 0, np.float64(100.0))]
             response = self.app.get('/analyze/TESTTICKER')
             self.assertEqual(response.status_code, 200)
@@ -339,7 +340,7 @@ class TestVCPEvaluationModes(unittest.TestCase):
 
     # Ensure that ?mode=fast stops processing on the first failure and returns a lean response.
     @patch('app.requests.get')
-    @patch('app.find_volatility_contraction_pattern')
+    @patch('app.find_volatility_contraction_pattern_vectorized')
     @patch('vcp_logic.is_pivot_good')
     @patch('vcp_logic.is_correction_deep')
     @patch('vcp_logic.is_demand_dry')
@@ -433,6 +434,64 @@ class TestBatchAnalysisEndpoint(unittest.TestCase):
         # Optional: ensure helper was invoked twice, once per ticker
         self.assertEqual(mock_process.call_count, 2)
 
+    @patch('app._process_ticker_analysis')
+    @patch('app.requests.post')
+    def test_batch_analysis_columnar_payload(self, mock_post, mock_process):
+        """Contract: Columnar /price/batch payloads reach analysis as PriceColumns; malformed columns are skipped."""
+        rows = generate_pivot_test_data(vcp_present=True)
+        columns = {
+            "dates": [r["formatted_date"] for r in rows],
+            **{f: [r[f] for r in rows] for f in ("open", "high", "low", "close", "volume", "adjclose")},
+        }
+        misaligned = dict(columns, close=columns["close"][:-1])
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            json=lambda: {"format": "columnar", "success": {"VCP_PASS": columns, "BROKEN": misaligned}, "failed": []}
+        )
+        mock_process.return_value = {"ticker": "VCP_PASS", "vcp_pass": True, "vcpFootprint": "10W..."}
+
+        response = self.app.post('/analyze/batch', data=json.dumps({"tickers": ["VCP_PASS", "BROKEN"]}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['ticker'] for r in response.get_json()], ["VCP_PASS"])
+        self.assertEqual(mock_post.call_args.kwargs['json']['format'], 'columnar')
+        # Only the well-formed series reaches analysis, still columnar (no per-session dicts)
+        mock_process.assert_called_once_with("VCP_PASS", PriceColumns.model_validate(columns), 'fast')
+
+    @patch('app._process_ticker_analysis')
+    @patch('app.requests.post')
+    def test_batch_analysis_streamed_payload(self, mock_post, mock_process):
+        """Streaming: NDJSON records are analysed as they arrive; failed and malformed records are skipped."""
+        rows = generate_pivot_test_data(vcp_present=True)
+        columns = {
+            "dates": [r["formatted_date"] for r in rows],
+            **{f: [r[f] for r in rows] for f in ("open", "high", "low", "close", "volume", "adjclose")},
+        }
+        records = [
+            {"ticker": "VCP_PASS", "status": "success", "format": "columnar", "data": columns},
+            {"ticker": "MISSING", "status": "failed", "format": "columnar", "data": None},
+            {"ticker": "BROKEN", "status": "success", "format": "columnar", "data": dict(columns, close=[1.0])},
+        ]
+
+        def iter_lines():
+            for record in records:
+                yield json.dumps(record).encode('utf-8')
+            # Connection drops before the rest of the batch arrives
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+        mock_post.return_value = MagicMock(
+            status_code=200, headers={'Content-Type': 'application/x-ndjson'}, iter_lines=iter_lines
+        )
+        mock_process.return_value = {"ticker": "VCP_PASS", "vcp_pass": True, "vcpFootprint": "10W..."}
+
+        response = self.app.post('/analyze/batch', data=json.dumps({"tickers": ["VCP_PASS", "MISSING", "BROKEN", "LATE"]}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['ticker'] for r in response.get_json()], ["VCP_PASS"])
+        self.assertTrue(mock_post.call_args.kwargs['stream'])
+        self.assertTrue(mock_post.call_args.kwargs['json']['stream'])
+        mock_process.assert_called_once_with("VCP_PASS", PriceColumns.model_validate(columns), 'fast')
+
     def test_batch_analysis_empty_ticker_list(self):
         """Edge Case: Verifies an empty ticker list returns a 200 OK with an empty list."""
         payload = {"tickers": []}
@@ -556,6 +615,29 @@ class TestFreshnessBatchEndpoint(unittest.TestCase):
         # Ensure _process_ticker_freshness_analysis was invoked for success tickers only
         self.assertEqual(mock_process.call_count, 3)
 
+    @patch('app.requests.post')
+    @patch('app._process_ticker_freshness_analysis')
+    def test_freshness_batch_streamed_row_records(self, mock_process, mock_post):
+        """Streaming: row-shaped NDJSON records are contract-checked one by one before analysis."""
+        good_rows = [{"formatted_date": "2025-01-01", "close": 100, "open": 99, "high": 101, "low": 99, "volume": 1000, "adjclose": 100}]
+        bad_rows = [{"formatted_date": "2025-01-01", "close": "n/a"}]
+        lines = [
+            json.dumps({"ticker": "FRESH", "status": "success", "format": "rows", "data": good_rows}).encode('utf-8'),
+            b"",
+            b"not json",
+            json.dumps({"ticker": "BAD", "status": "success", "format": "rows", "data": bad_rows}).encode('utf-8'),
+        ]
+        mock_post.return_value = MagicMock(
+            status_code=200, headers={'Content-Type': 'application/x-ndjson'}, iter_lines=MagicMock(return_value=iter(lines))
+        )
+        mock_process.return_value = {"ticker": "FRESH", "passes_freshness_check": True}
+
+        resp = self.app.post('/analyze/freshness/batch', data=json.dumps({"tickers": ["FRESH", "BAD"]}), content_type='application/json')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), [{"ticker": "FRESH", "passes_freshness_check": True}])
+        mock_process.assert_called_once_with("FRESH", good_rows)
+
     def test_freshness_batch_empty_ticker_list(self):
         """
         2. Edge Case: Empty tickers array should return 200 with empty list.
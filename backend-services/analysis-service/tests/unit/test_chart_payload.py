@@ -0,0 +1,163 @@
+# backend-services/analysis-service/tests/unit/test_chart_payload.py
+import json
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from app import app, _build_chart_data, _process_ticker_analysis, calculate_sma_series, prepare_historical_data
+from chart_payload import CHART_MODES, lttb_indices, delta_encode, delta_decode, decode_dates
+from shared.contracts import PriceColumns, VCPChartData
+from vcp_logic import find_volatility_contraction_pattern_vectorized, run_vcp_screening
+
+
+def _history(length=1250, seed=7):
+    """~5 years of weekday bars with a choppy random walk, so VCP detection finds contractions."""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, length)))
+    rows, day = [], date(2020, 1, 6)
+    for close in closes:
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        rows.append({
+            "formatted_date": day.isoformat(),
+            "open": float(close * 0.995), "high": float(close * 1.01), "low": float(close * 0.99),
+            "close": float(close), "volume": int(rng.integers(100_000, 5_000_000)), "adjclose": float(close),
+        })
+        day += timedelta(days=1)
+    return rows
+
+
+def _chart(rows, chart_mode, max_points=None):
+    prices, dates, sorted_rows = prepare_historical_data(rows)
+    volumes = [row["volume"] for row in sorted_rows]
+    vcp_results = find_volatility_contraction_pattern_vectorized(prices)
+    vcp_pass, _, details = run_vcp_screening(vcp_results, prices, volumes, 'full')
+    return _build_chart_data(prices, dates, volumes, sorted_rows, vcp_results, vcp_pass, details,
+                             chart_mode=chart_mode, max_points=max_points), vcp_results, dates
+
+
+def _size(chart):
+    return len(app.json.dumps(chart, separators=(",", ":")))
+
+
+class TestLttb(unittest.TestCase):
+    def test_short_series_untouched(self):
+        self.assertEqual(lttb_indices([1.0, 2.0, 3.0], 10), [0, 1, 2])
+
+    def test_budget_anchors_and_extremes(self):
+        values = list(np.sin(np.arange(1000) / 25.0) * 10 + np.arange(1000) * 0.01)
+        # One-session spike and dip that a uniform stride would likely skip
+        values[555], values[222] = 40.0, -30.0
+        keep = [3, 417, 418, 901]
+        indices = lttb_indices(values, 100, keep=keep)
+        self.assertLessEqual(len(indices), 100)
+        self.assertEqual(indices, sorted(set(indices)))
+        self.assertTrue(set(keep) | {0, 999} <= set(indices))
+        # Shape: the outliers survive
+        self.assertIn(555, indices)
+        self.assertIn(222, indices)
+
+
+class TestDeltaEncoding(unittest.TestCase):
+    def test_round_trip_within_precision(self):
+        values = [101.23456, 101.2, None, 99.87651, float("nan"), 100.0]
+        column = delta_encode(values, 4)
+        decoded = delta_decode(column)
+        self.assertIsNone(decoded[2])
+        self.assertIsNone(decoded[4])
+        for original, restored in zip(values, decoded):
+            if restored is not None:
+                self.assertAlmostEqual(original, restored, delta=0.5e-4)
+        self.assertEqual(delta_decode(delta_encode([1200, 1500, 900], 0)), [1200, 1500, 900])
+
+
+class TestChartPayloadModes(unittest.TestCase):
+    def setUp(self):
+        self.rows = _history()
+        self.full, self.vcp_results, self.dates = _chart(self.rows, 'full')
+        self.assertTrue(self.vcp_results)
+
+    def test_full_mode_is_unchanged(self):
+        prices, dates, sorted_rows = prepare_historical_data(self.rows)
+        self.assertEqual(self.full["historicalData"], sorted_rows)
+        self.assertEqual(self.full["ma50"], calculate_sma_series(prices, dates, 50))
+        self.assertNotIn("columns", self.full)
+
+    def test_downsampled_keeps_contraction_points_and_shrinks_payload(self):
+        chart, _, _ = _chart(self.rows, 'downsampled', max_points=250)
+        VCPChartData.model_validate(chart)
+
+        kept_dates = [row["formatted_date"] for row in chart["historicalData"]]
+        self.assertLessEqual(len(kept_dates), 250)
+        self.assertEqual(kept_dates, sorted(kept_dates))
+        by_date = {row["formatted_date"]: row for row in chart["historicalData"]}
+        for high_idx, high_price, low_idx, low_price in self.vcp_results:
+            self.assertEqual(by_date[self.dates[high_idx]]["close"], high_price)
+            self.assertEqual(by_date[self.dates[low_idx]]["close"], low_price)
+        for item in chart["vcpContractions"]:
+            self.assertIn(item["start_date"], by_date)
+            self.assertIn(item["end_date"], by_date)
+        if chart["lowVolumePivotDate"]:
+            self.assertIn(chart["lowVolumePivotDate"], by_date)
+
+        # VCP fields are identical to the full chart; MA points are exact values at kept sessions
+        for field in ("vcpContractions", "pivotPrice", "buyPoints", "sellPoints", "lowVolumePivotDate", "volumeTrendLine"):
+            self.assertEqual(chart[field], self.full[field])
+        full_ma200 = {p["time"]: p["value"] for p in self.full["ma200"]}
+        self.assertTrue(all(full_ma200[p["time"]] == p["value"] for p in chart["ma200"]))
+        self.assertLess(_size(chart), _size(self.full) / 4)
+
+    def test_columnar_round_trips_every_session(self):
+        chart, _, _ = _chart(self.rows, 'columnar')
+        VCPChartData.model_validate(chart)
+        self.assertEqual(chart["historicalData"], [])
+        self.assertEqual(chart["ma20"], [])
+        columns = chart["columns"]
+
+        self.assertEqual(decode_dates(columns), self.dates)
+        for field in ("open", "high", "low", "close"):
+            decoded = delta_decode(columns[field])
+            self.assertEqual(len(decoded), len(self.rows))
+            self.assertTrue(all(abs(row[field] - value) <= 0.5e-4 for row, value in zip(self.full["historicalData"], decoded)))
+        self.assertEqual(delta_decode(columns["volume"]), [row["volume"] for row in self.full["historicalData"]])
+        for period in (20, 50, 150, 200):
+            column = columns[f"ma{period}"]
+            self.assertEqual(column["offset"], period - 1)
+            expected = [p["value"] for p in self.full[f"ma{period}"]]
+            self.assertTrue(np.allclose(delta_decode(column), expected, atol=0.5e-4, rtol=0))
+
+        self.assertEqual(chart["vcpContractions"], self.full["vcpContractions"])
+        self.assertLess(_size(chart), _size(self.full) / 3)
+
+
+class TestColumnarInput(unittest.TestCase):
+    def test_columns_analyse_like_rows(self):
+        rows = _history()
+        rows[40]["close"] = None
+        # Out-of-order input is sorted the same way on both paths
+        rows[100], rows[101] = rows[101], rows[100]
+        columns = PriceColumns.from_rows(rows)
+        for mode in ('fast', 'full'):
+            for chart_mode in CHART_MODES:
+                with self.subTest(mode=mode, chart_mode=chart_mode):
+                    expected = _process_ticker_analysis("T", rows, mode, chart_mode=chart_mode)
+                    if mode == 'full':
+                        self.assertIn("chart_data", expected)
+                    self.assertEqual(_process_ticker_analysis("T", columns, mode, chart_mode=chart_mode), expected)
+
+
+class TestChartModeRouting(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_invalid_chart_options_rejected(self):
+        resp = self.client.post('/analyze/batch', json={"tickers": ["AAPL"], "mode": "full", "chart": "svg"})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.get('/analyze/AAPL?chart=downsampled&max_points=1')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("max_points", json.loads(resp.data)["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,8 @@ from vcp_logic import (
     get_vcp_footprint,
     run_vcp_screening,
     _calculate_volume_trend,
+    find_volatility_contraction_pattern,
+    find_volatility_contraction_pattern_vectorized,
 )
 
 class TestVcpHelperFunctions(unittest.TestCase):
@@ -290,5 +292,67 @@ class TestPivotFreshnessLogic(unittest.TestCase):
         self.assertIn('days_since_pivot', out)
         self.assertIsInstance(out['message'], str)
 
+class TestVectorizedContractionParity(unittest.TestCase):
+    """
+    Parity tests: the NumPy contraction engine must return exactly what the
+    reference windowed scan returns (indices, prices and tie-breaking).
+    """
+
+    def _synthetic_series(self, rng, length, kind):
+        if kind == "random_walk":
+            return list(100 + np.cumsum(rng.normal(0, 1, length)))
+        if kind == "rounded_walk":
+            # Rounding produces many equal prices, exercising first-occurrence tie-breaks
+            return [float(x) for x in np.round(100 + np.cumsum(rng.normal(0, 1, length)))]
+        if kind == "choppy":
+            period = rng.uniform(1, 6)
+            wave = 50 + 10 * np.sin(np.arange(length) / period) + rng.normal(0, 2, length)
+            return [float(x) for x in np.round(wave, 1)]
+        # Integer prices from a tiny range: plateaus and flat stretches everywhere
+        return [int(x) for x in rng.integers(0, 4, length)]
+
+    def assert_parity(self, prices):
+        expected = find_volatility_contraction_pattern(prices)
+        actual = find_volatility_contraction_pattern_vectorized(prices)
+        self.assertEqual(actual, expected, f"Mismatch for prices={prices}")
+
+    def test_parity_on_synthetic_series(self):
+        """Random walks, tied prices and choppy series of many lengths (incl. 0-10 bars)."""
+        rng = np.random.default_rng(42)
+        for kind in ("random_walk", "rounded_walk", "choppy", "small_ints"):
+            for length in list(range(0, 12)) + [30, 61, 130, 252]:
+                with self.subTest(kind=kind, length=length):
+                    self.assert_parity(self._synthetic_series(rng, length, kind))
+
+    def test_parity_on_two_year_series(self):
+        """A ~2 year daily series, the typical /analyze/batch input."""
+        rng = np.random.default_rng(7)
+        for _ in range(5):
+            self.assert_parity(self._synthetic_series(rng, 504, "random_walk"))
+
+    def test_parity_on_degenerate_series(self):
+        """Monotonic and flat series, where the reference scan restarts at every bar."""
+        self.assert_parity([float(100 + i) for i in range(300)])
+        self.assert_parity([float(400 - i) for i in range(300)])
+        self.assert_parity([100.0] * 50)
+        self.assert_parity([100, 105, 102, 108, 104, 100, 103, 101, 98])
+
+    def test_parity_with_tuned_counter_threshold(self):
+        """Threshold tuning must not break parity."""
+        rng = np.random.default_rng(3)
+        for threshold in (1, 2, 3, 8):
+            with patch('vcp_logic.COUNTER_THRESHOLD', threshold):
+                for kind in ("rounded_walk", "choppy"):
+                    with self.subTest(threshold=threshold, kind=kind):
+                        self.assert_parity(self._synthetic_series(rng, 200, kind))
+
+    def test_returns_original_price_objects(self):
+        """Prices in the result come from the input list, not from float64 copies."""
+        prices = [100, 105, 102, 108, 104, 100, 103, 101, 98, 99, 100, 101, 102, 103]
+        with patch('vcp_logic.COUNTER_THRESHOLD', 2):
+            result = find_volatility_contraction_pattern_vectorized(prices)
+        self.assertEqual(result, [(3, 108, 8, 98)])
+        self.assertIsInstance(result[0][1], int)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
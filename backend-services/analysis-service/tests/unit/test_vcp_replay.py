@@ -0,0 +1,105 @@
+# backend-services/analysis-service/tests/unit/test_vcp_replay.py
+import unittest
+import numpy as np
+
+import vcp_logic
+from vcp_logic import (
+    find_volatility_contraction_pattern_vectorized,
+    run_vcp_screening,
+    check_pivot_freshness,
+)
+from vcp_replay import VcpReplay, overridden_thresholds
+
+
+def _single_date_verdict(prices, volumes, mode='fast'):
+    """What the analysis-service computes for one request."""
+    vcp_results = find_volatility_contraction_pattern_vectorized(prices)
+    vcp_pass, footprint, details = run_vcp_screening(vcp_results, prices, volumes, mode)
+    return vcp_results, {
+        "vcp_pass": vcp_pass,
+        "vcpFootprint": footprint,
+        "details": details,
+        "freshness": check_pivot_freshness(vcp_results, prices),
+    }
+
+
+class TestVcpReplayParity(unittest.TestCase):
+    """Replayed verdicts must equal the single-date pipeline run on the series as of each session."""
+
+    def _series(self, rng, length, kind):
+        if kind == "random_walk":
+            prices = list(100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, length))))
+        elif kind == "rounded_walk":
+            # Many equal prices exercise first-occurrence tie-breaks
+            prices = [float(x) for x in np.round(100 + np.cumsum(rng.normal(0.05, 1, length)))]
+        elif kind == "choppy":
+            wave = 50 + 10 * np.sin(np.arange(length) / 3) + rng.normal(0, 2, length)
+            prices = [float(x) for x in np.round(wave, 1)]
+        else:
+            prices = [float(100 + i) for i in range(length)]
+        volumes = [float(v) for v in rng.integers(100_000, 1_000_000, length)]
+        return prices, volumes
+
+    def assert_replay_parity(self, prices, volumes, lookback, mode='fast'):
+        replay = VcpReplay(prices, volumes, lookback=lookback)
+        verdicts = replay.replay(mode=mode)
+        self.assertEqual(len(verdicts), len(prices))
+        for session, verdict in enumerate(verdicts):
+            origin = 0 if lookback is None else max(0, session - lookback + 1)
+            expected_results, expected = _single_date_verdict(
+                prices[origin:session + 1], volumes[origin:session + 1], mode
+            )
+            with self.subTest(lookback=lookback, session=session):
+                self.assertEqual(replay.contractions_as_of(session), expected_results)
+                self.assertEqual(verdict, expected)
+
+    def test_parity_expanding_and_rolling_windows(self):
+        rng = np.random.default_rng(21)
+        for kind in ("random_walk", "rounded_walk", "choppy", "uptrend"):
+            prices, volumes = self._series(rng, 320, kind)
+            for lookback in (None, 252):
+                self.assert_replay_parity(prices, volumes, lookback)
+
+    def test_parity_in_full_mode(self):
+        rng = np.random.default_rng(5)
+        prices, volumes = self._series(rng, 200, "random_walk")
+        self.assert_replay_parity(prices, volumes, 150, mode='full')
+
+    def test_parity_with_overridden_thresholds(self):
+        """Tuned detection and freshness thresholds apply to the replay and to the single-date functions alike."""
+        rng = np.random.default_rng(8)
+        prices, volumes = self._series(rng, 260, "rounded_walk")
+        for overrides in ({"COUNTER_THRESHOLD": 3}, {"COUNTER_THRESHOLD": 8, "PIVOT_FRESHNESS_DAYS": 10},
+                          {"MAX_CONTRACTION": 3}):
+            with overridden_thresholds(**overrides):
+                self.assert_replay_parity(prices, volumes, 200)
+
+    def test_replay_reuses_scans_across_threshold_changes(self):
+        rng = np.random.default_rng(2)
+        prices, volumes = self._series(rng, 200, "random_walk")
+        replay = VcpReplay(prices, volumes)
+        default = replay.replay()
+        with overridden_thresholds(COUNTER_THRESHOLD=3):
+            tuned = replay.replay()
+            self.assertEqual(tuned[-1]["vcpFootprint"], _single_date_verdict(prices, volumes)[1]["vcpFootprint"])
+        self.assertEqual(replay.replay(), default)
+
+
+class TestOverriddenThresholds(unittest.TestCase):
+    def test_restores_constants(self):
+        original = vcp_logic.PIVOT_FRESHNESS_DAYS
+        with overridden_thresholds(PIVOT_FRESHNESS_DAYS=original + 5):
+            self.assertEqual(vcp_logic.PIVOT_FRESHNESS_DAYS, original + 5)
+        self.assertEqual(vcp_logic.PIVOT_FRESHNESS_DAYS, original)
+
+    def test_rejects_unknown_names(self):
+        with self.assertRaises(KeyError):
+            with overridden_thresholds(NOT_A_THRESHOLD=1):
+                pass
+        with self.assertRaises(KeyError):
+            with overridden_thresholds(run_vcp_screening=None):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
 # backend-services/analysis-service/vcp_logic.py
 import numpy as np
-from typing import List, Any
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Any, Sequence
 
 # --- Constants ---
 # For VCP detection: number of consecutive windows without a new high/low to define a peak/trough.
 COUNTER_THRESHOLD = 5
+# For VCP detection: length (in trading days) of the rolling window scanned for highs/lows.
+SWING_WINDOW_DAYS = 5
 # For VCP screening: the maximum allowable percentage for a pivot's contraction depth.
 PIVOT_PRICE_PERC = 0.2
 # Max trading days since the pivot low for it to be considered "fresh".
@@ -53,7 +56,7 @@ def find_one_contraction(prices, start_index):
 
     # Iterate from start_index to find a peak
     for i in range(start_index, len(prices)):
-        window_end = min(i + 5, len(prices))
+        window_end = min(i + SWING_WINDOW_DAYS, len(prices))
         if i >= window_end: break
 
         window_prices = prices[i : window_end]
@@ -83,7 +86,7 @@ def find_one_contraction(prices, start_index):
 
     # Iterate from the local_highest_idx to find a trough
     for j in range(local_highest_idx, len(prices)):
-        window_end = min(j + 5, len(prices))
+        window_end = min(j + SWING_WINDOW_DAYS, len(prices))
         if j >= window_end: break
 
         window_prices = prices[j : window_end]
@@ -129,6 +132,116 @@ def find_volatility_contraction_pattern(prices):
             start_index += 1
     return contractions
 
+def _first_exceeding(values: np.ndarray, thresholds: np.ndarray, offsets: np.ndarray, width: int) -> np.ndarray:
+    """
+    For each row k, returns the first index in [offsets[k], offsets[k] + width) whose
+    value is strictly greater than thresholds[k], or len(values) when there is none.
+    """
+    n = len(values)
+    if width <= 0 or len(offsets) == 0:
+        return np.full(len(offsets), n, dtype=np.intp)
+
+    padded = np.concatenate([values, np.full(width, -np.inf)])
+    # Clamp offsets past the end onto the padding so the window lookup stays in bounds
+    rows = sliding_window_view(padded, width)[np.minimum(offsets, n)]
+    mask = rows > thresholds[:, None]
+    first = offsets + mask.argmax(axis=1)
+    return np.where(mask.any(axis=1), first, n)
+
+def _resolve_swing_points(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of the swing-high scan in find_one_contraction.
+
+    For every start index, returns the index of the local high that the windowed
+    scan would settle on, or len(values) if the scan runs off the end of the series.
+    Swing lows are resolved by passing the negated series.
+
+    The windowed scan only registers a new high when the newest bar of a window
+    beats the running maximum, so after the first window the candidates form a
+    "next strictly greater value" chain. A candidate is final once COUNTER_THRESHOLD
+    following bars fail to exceed it and the scan still has enough steps left to
+    count them. Chains are collapsed with pointer doubling so every start is
+    resolved in O(log n) array operations instead of a Python loop.
+    """
+    n = len(values)
+    window = SWING_WINDOW_DAYS
+    threshold = COUNTER_THRESHOLD
+    positions = np.arange(n)
+
+    # Each bar either settles as the swing point, hands off to the next higher bar, or fails (n)
+    next_higher = _first_exceeding(values, values, positions + 1, threshold)
+    has_room = positions - window + 1 + threshold <= n - 1
+    pointer = np.where(next_higher < n, next_higher, np.where(has_room, positions, n))
+    pointer = np.append(pointer, n)
+    while True:
+        jumped = pointer[pointer]
+        if np.array_equal(jumped, pointer):
+            break
+        pointer = jumped
+
+    # The first window of each scan is special: its high is taken as-is (first occurrence)
+    padded = np.concatenate([values, np.full(window, -np.inf)])
+    first_window = sliding_window_view(padded, window)[starts]
+    first_high_idx = starts + first_window.argmax(axis=1)
+    first_high = values[first_high_idx]
+
+    breakout_idx = _first_exceeding(values, first_high, starts + window, threshold)
+    settled = np.where(starts + threshold <= n - 1, first_high_idx, n)
+    return np.where(breakout_idx < n, pointer[breakout_idx], settled)
+
+def find_volatility_contraction_pattern_vectorized(prices: Sequence[float]) -> list[tuple]:
+    """
+    NumPy implementation of find_volatility_contraction_pattern.
+
+    Resolves the swing high, swing low and validity of a contraction for every
+    possible start index at once, then hops from one valid contraction to the next
+    instead of restarting the windowed scan one bar at a time. Results are
+    identical to find_volatility_contraction_pattern for finite prices, including
+    tie-breaking on the first occurrence of a window high/low.
+
+    Args:
+        prices: Chronologically sorted closing prices.
+
+    Returns:
+        A list of (high_idx, high_price, low_idx, low_price) tuples, where the prices
+        are taken from the input sequence unchanged.
+    """
+    n = len(prices)
+    if n == 0:
+        return []
+
+    values = np.asarray(prices, dtype=float)
+    starts = np.arange(n)
+
+    high_idx = _resolve_swing_points(values, starts)
+    has_high = high_idx < n
+
+    low_idx = np.full(n, n, dtype=np.intp)
+    low_idx[has_high] = _resolve_swing_points(-values, high_idx[has_high])
+
+    padded = np.append(values, np.nan)
+    is_valid = (
+        has_high
+        & (low_idx < n)
+        & (high_idx < low_idx)
+        & (padded[high_idx] != padded[low_idx])
+    )
+
+    # next_valid[s] is the first start >= s that yields a contraction (n if none)
+    candidates = np.where(is_valid, starts, n)
+    next_valid = np.minimum.accumulate(candidates[::-1])[::-1]
+
+    contractions = []
+    start_index = 0
+    while start_index < n:
+        start_index = int(next_valid[start_index])
+        if start_index >= n:
+            break
+        high, low = int(high_idx[start_index]), int(low_idx[start_index])
+        contractions.append((high, prices[high], low, prices[low]))
+        start_index = low + 1
+    return contractions
+
 def _filter_vcp_contractions(vcp_results: List[tuple]) -> List[tuple]:
     """
     Filters the raw detected contractions to isolate the valid VCP sequence.
@@ -0,0 +1,167 @@
+# backend-services/analysis-service/vcp_replay.py
+"""
+Historical replay of the VCP pipeline (detection, run_vcp_screening and
+check_pivot_freshness) as of every session of one ticker's price history.
+
+Detection is the expensive step and is what the replay reuses across sessions.
+A scan from a given start bar (find_one_contraction) only ever reads the bars
+from that start up to the point where it settles, so once the as-of session is
+past that point the scan's outcome is final for every later session. Each start
+is scanned once against the full history; for a given session the contraction
+chain is assembled from those settled scans and only the unsettled tail near
+the as-of session is detected again. The result is exactly what
+find_volatility_contraction_pattern_vectorized returns on the truncated series.
+"""
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence
+
+import vcp_logic
+from vcp_logic import (
+    find_one_contraction,
+    find_volatility_contraction_pattern,
+    find_volatility_contraction_pattern_vectorized,
+    run_vcp_screening,
+    check_pivot_freshness,
+)
+
+# Longest unsettled tail re-detected with the windowed scan rather than the NumPy engine
+_SCALAR_TAIL_MAX = 40
+
+
+@contextmanager
+def overridden_thresholds(**overrides: Any) -> Iterator[None]:
+    """
+    Temporarily replaces vcp_logic module constants (COUNTER_THRESHOLD,
+    PIVOT_FRESHNESS_DAYS, MAX_CONTRACTION, ...) for a replay run.
+    Raises KeyError for names that are not vcp_logic constants.
+    """
+    unknown = [name for name in overrides if not name.isupper() or not hasattr(vcp_logic, name)]
+    if unknown:
+        raise KeyError(f"Unknown vcp_logic threshold(s): {', '.join(sorted(unknown))}")
+    saved = {name: getattr(vcp_logic, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(vcp_logic, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(vcp_logic, name, value)
+
+
+class _ReadProbe(list):
+    """List that records how far a scan reads and whether any window was cut short by the series end."""
+
+    def __init__(self, values):
+        super().__init__(values)
+        self.reset()
+
+    def reset(self) -> None:
+        self.max_stop = 0
+        self.truncated = False
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            stop = len(self) if key.stop is None else key.stop
+            self.max_stop = max(self.max_stop, stop)
+            if stop - (key.start or 0) < vcp_logic.SWING_WINDOW_DAYS:
+                self.truncated = True
+            return list.__getitem__(self, key)
+        return list.__getitem__(self, key)
+
+
+class VcpReplay:
+    """
+    Replays VCP verdicts for one ticker across its history.
+
+    Args:
+        prices: Chronologically sorted closing prices.
+        volumes: Volumes aligned with prices.
+        lookback: Number of trailing sessions the services would have seen as of
+            each day (the data-service serves ~1y by default). None replays on
+            the whole history up to each session.
+    """
+
+    def __init__(self, prices: Sequence[float], volumes: Sequence[float], lookback: Optional[int] = None):
+        self.prices = list(prices)
+        self.volumes = list(volumes)
+        self.lookback = lookback
+        self._scans_key = None
+        self._scans: dict[int, tuple] = {}
+
+    def _origin(self, session: int) -> int:
+        return 0 if self.lookback is None else max(0, session - self.lookback + 1)
+
+    def _settled_scan(self, start: int) -> tuple:
+        """
+        (contraction, settled_at) for a scan from `start` over the full history.
+        settled_at is the last bar the scan reads, or None when the scan runs into
+        the end of the history (its outcome then depends on where the series stops).
+        """
+        # Detection parameters may be overridden between replays; scans depend on them
+        key = (vcp_logic.COUNTER_THRESHOLD, vcp_logic.SWING_WINDOW_DAYS)
+        if key != self._scans_key:
+            self._scans_key, self._scans = key, {}
+            self._probe = _ReadProbe(self.prices)
+        cached = self._scans.get(start)
+        if cached is None:
+            self._probe.reset()
+            contraction = find_one_contraction(self._probe, start)
+            settled_at = None if self._probe.truncated else self._probe.max_stop - 1
+            cached = self._scans[start] = (contraction, settled_at)
+        return cached
+
+    def contractions_as_of(self, session: int) -> List[tuple]:
+        """
+        Contractions detected on the series the services would have seen on `session`,
+        with indices relative to that series (as find_volatility_contraction_pattern_vectorized
+        returns them).
+        """
+        origin = self._origin(session)
+        contractions = []
+        start = origin
+        while start <= session:
+            contraction, settled_at = self._settled_scan(start)
+            if settled_at is None or settled_at > session:
+                break
+            if contraction is None:
+                start += 1
+                continue
+            high_idx, high_price, low_idx, low_price = contraction
+            contractions.append((high_idx - origin, high_price, low_idx - origin, low_price))
+            start = low_idx + 1
+
+        if start <= session:
+            # Unsettled tail: the chain from `start` only depends on the bars after it
+            offset = start - origin
+            contractions.extend(
+                (high_idx + offset, high_price, low_idx + offset, low_price)
+                for high_idx, high_price, low_idx, low_price
+                in self._detect_tail(self.prices[start:session + 1])
+            )
+        return contractions
+
+    @staticmethod
+    def _detect_tail(tail: List[float]) -> List[tuple]:
+        # The NumPy engine has a fixed per-call cost; the windowed scan is cheaper on a few weeks of bars
+        if len(tail) > _SCALAR_TAIL_MAX:
+            return find_volatility_contraction_pattern_vectorized(tail)
+        return find_volatility_contraction_pattern(tail)
+
+    def verdict_as_of(self, session: int, mode: str = 'fast') -> dict:
+        """run_vcp_screening and check_pivot_freshness as the analysis-service would have run them on `session`."""
+        origin = self._origin(session)
+        prices = self.prices[origin:session + 1]
+        volumes = self.volumes[origin:session + 1]
+        vcp_results = self.contractions_as_of(session)
+        vcp_pass, footprint, details = run_vcp_screening(vcp_results, prices, volumes, mode)
+        return {
+            "vcp_pass": vcp_pass,
+            "vcpFootprint": footprint,
+            "details": details,
+            "freshness": check_pivot_freshness(vcp_results, prices),
+        }
+
+    def replay(self, start: int = 0, stop: Optional[int] = None, mode: str = 'fast') -> List[dict]:
+        """Verdicts for every session in [start, stop) (to the end of the history by default)."""
+        stop = len(self.prices) if stop is None else min(stop, len(self.prices))
+        return [self.verdict_as_of(session, mode) for session in range(start, stop)]
@@ -5,8 +5,12 @@ import time
 from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS 
 import requests
+from urllib.parse import urlencode
+from shared.metrics import instrument_app
+from response_cache import ResponseCache, RESPONSE_CACHE_REQUESTS, etag_matches, route_ttl
 
 app = Flask(__name__)
+instrument_app(app)
 PORT = int(os.getenv("PORT", 3000))
 
 # Secure CORS Configuration
@@ -27,6 +31,22 @@ SERVICES = {
     "monitor": os.getenv("MONITORING_SERVICE_URL", "http://monitoring-service:3006")
 }
 
+# Serialized responses of polled GET routes (see response_cache.CACHED_ROUTES)
+response_cache = ResponseCache()
+
+def _cache_key() -> str:
+    # Query parameters in a canonical order so ?a=1&b=2 and ?b=2&a=1 share an entry
+    return f"{request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+def _cached_json_response(entry, result: str) -> Response:
+    """Serves a cache entry, or a bodyless 304 when the client already holds it."""
+    headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('If-None-Match'), entry.etag):
+        RESPONSE_CACHE_REQUESTS.labels('not_modified').inc()
+        return Response(status=304, headers=headers)
+    RESPONSE_CACHE_REQUESTS.labels(result).inc()
+    return Response(entry.body, status=200, mimetype='application/json', headers=headers)
+
 @app.route('/<service>/<path:path>', methods=['GET', 'POST', 'DELETE', 'PUT'])
 @app.route('/<service>', methods=['GET', 'POST', 'DELETE', 'PUT'])
 def gateway(service, path=""):
@@ -48,9 +68,18 @@ def gateway(service, path=""):
     else:
         target_url = f"{base_url.rstrip('/')}{request.path}"
 
+    # --- 1. Identify Streaming Requests ---
+    is_streaming_request = '/stream/' in request.path
+
+    # --- Serve polled GET routes from the response cache ---
+    cache_ttl = route_ttl(request.path) if request.method == 'GET' and not is_streaming_request else None
+    if cache_ttl:
+        cache_key = _cache_key()
+        entry = response_cache.get(cache_key)
+        if entry is not None:
+            return _cached_json_response(entry, 'hit')
+
     try:
-        # --- 1. Identify Streaming Requests ---
-        is_streaming_request = '/stream/' in request.path
 
         if request.method == 'POST':
             post_data = request.get_json() if request.is_json else None
@@ -121,7 +150,15 @@ def gateway(service, path=""):
             json_data = resp.json()
         except requests.exceptions.JSONDecodeError:
             json_data = {"error": f"Non-JSON or empty response from {service}", "details": resp.text}
-        
+            cache_ttl = None
+
+        if request.method != 'GET' and resp.status_code < 400:
+            # A write may change what this service's cached views return
+            response_cache.invalidate(f"/{service}")
+        elif cache_ttl and resp.status_code == 200:
+            entry = response_cache.put(cache_key, jsonify(json_data).get_data(), cache_ttl)
+            return _cached_json_response(entry, 'miss')
+
         return jsonify(json_data), resp.status_code
 
     except requests.exceptions.Timeout:
@@ -0,0 +1,100 @@
+# backend-services/api-gateway/response_cache.py
+"""
+In-process cache of upstream JSON responses for idempotent GET routes.
+
+The frontend polls a handful of views (market health, screening history, price
+charts) much faster than their data changes. A cached entry keeps the
+serialized body and a strong ETag for a per-route TTL: repeat polls are served
+without calling the backend or re-serializing, and a client that sends a
+matching If-None-Match gets a bodyless 304.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from prometheus_client import Counter
+
+# GET routes served through the cache: (path prefix, TTL seconds). First match wins.
+CACHED_ROUTES = (
+    ("/monitor/market-health", int(os.getenv("GATEWAY_CACHE_TTL_MARKET_HEALTH", "60"))),
+    ("/jobs/screening/history", int(os.getenv("GATEWAY_CACHE_TTL_SCREENING_HISTORY", "30"))),
+    ("/price/", int(os.getenv("GATEWAY_CACHE_TTL_PRICE", "300"))),
+)
+MAX_ENTRIES = int(os.getenv("GATEWAY_CACHE_MAX_ENTRIES", "512"))
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "gateway_response_cache_requests_total",
+    "GET requests on cached gateway routes by outcome (hit, miss, not_modified).",
+    ["result"],
+)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag (quoted) derived from the response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header value ('*', one tag or a comma-separated list) covers `etag`."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def route_ttl(path: str) -> Optional[int]:
+    """TTL for a cached GET route, or None when the path is not cached."""
+    for prefix, ttl in CACHED_ROUTES:
+        if path.startswith(prefix) and ttl > 0:
+            return ttl
+    return None
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU map from request key (path and query) to a serialized 200 response."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, body: bytes, ttl: int) -> CachedResponse:
+        entry = CachedResponse(body, compute_etag(body), self._clock() + ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, path_prefix: str) -> None:
+        """Drops every entry whose path starts with `path_prefix` (after a write through the gateway)."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(path_prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -13,7 +13,7 @@ os.environ['TICKER_SERVICE_URL'] = 'http://ticker-service:5001'
 os.environ['DATA_SERVICE_URL'] = 'http://data-service:3001'
 os.environ['SCHEDULER_SERVICE_URL'] = 'http://scheduler-service:3004'
 
-from app import app
+from app import app, response_cache
 
 def _fake_response(status_code: int, payload: dict):
     """Helper to construct a fake requests.Response-like object."""
@@ -215,5 +215,105 @@ class TestGateway(unittest.TestCase):
         self.assertEqual(resp.status_code, 503)
         self.assertIn("Service unavailable", resp.json.get("error", ""))
 
+    @patch('requests.get')
+    def test_metrics_served_by_gateway_not_proxied(self, mock_get):
+        """/metrics is the gateway's own exposition, with proxied calls timed per route template."""
+        from prometheus_client.parser import text_string_to_metric_families
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"ticker": "AAPL", "passes": True}
+        self.app.get('/screen/AAPL')
+        mock_get.reset_mock()
+
+        resp = self.app.get('/metrics')
+
+        self.assertEqual(resp.status_code, 200)
+        mock_get.assert_not_called()
+        families = {f.name: f for f in text_string_to_metric_families(resp.get_data(as_text=True))}
+        routes = {s.labels["route"] for s in families["http_request_duration_seconds"].samples}
+        self.assertIn("/<service>/<path:path>", routes)
+
+
+class TestGatewayResponseCache(unittest.TestCase):
+    """Polled GET routes are answered from the gateway cache with ETag / If-None-Match support."""
+
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+        response_cache.clear()
+
+    def tearDown(self):
+        response_cache.clear()
+
+    @patch('requests.get')
+    def test_repeat_poll_served_from_cache(self, mock_get):
+        mock_get.return_value = _fake_response(200, {"market_overview": {"stage": 2}})
+
+        first = self.app.get('/monitor/market-health')
+        second = self.app.get('/monitor/market-health')
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first.json, {"market_overview": {"stage": 2}})
+        self.assertEqual(second.get_data(), first.get_data())
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(second.headers['Cache-Control'], 'no-cache')
+
+    @patch('requests.get')
+    def test_matching_if_none_match_returns_304(self, mock_get):
+        mock_get.return_value = _fake_response(200, {"jobs": []})
+        etag = self.app.get('/jobs/screening/history?limit=5').headers['ETag']
+
+        resp = self.app.get('/jobs/screening/history?limit=5', headers={'If-None-Match': f'"stale", W/{etag}'})
+
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.get_data(), b'')
+        self.assertEqual(resp.headers['ETag'], etag)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.get')
+    def test_query_string_is_part_of_the_key(self, mock_get):
+        mock_get.side_effect = [_fake_response(200, {"period": "1y"}), _fake_response(200, {"period": "3mo"})]
+
+        self.assertEqual(self.app.get('/price/AAPL?period=1y&source=yfinance').json, {"period": "1y"})
+        self.assertEqual(self.app.get('/price/AAPL?period=3mo').json, {"period": "3mo"})
+        # Same parameters in another order hit the first entry
+        self.assertEqual(self.app.get('/price/AAPL?source=yfinance&period=1y').json, {"period": "1y"})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.get')
+    def test_entry_expires_after_route_ttl(self, mock_get):
+        mock_get.side_effect = [_fake_response(200, {"v": 1}), _fake_response(200, {"v": 2})]
+        now = [1000.0]
+        with patch.object(response_cache, '_clock', lambda: now[0]):
+            self.app.get('/monitor/market-health')
+            now[0] += 61
+            resp = self.app.get('/monitor/market-health')
+
+        self.assertEqual(resp.json, {"v": 2})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.get')
+    def test_errors_and_uncached_routes_go_upstream(self, mock_get):
+        mock_get.return_value = _fake_response(503, {"error": "busy"})
+        self.app.get('/monitor/market-health')
+        self.app.get('/monitor/market-health')
+        mock_get.return_value = _fake_response(200, {"ticker": "AAPL"})
+        self.app.get('/screen/AAPL')
+        resp = self.app.get('/screen/AAPL')
+
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertNotIn('ETag', resp.headers)
+
+    @patch('requests.post')
+    @patch('requests.get')
+    def test_write_invalidates_the_service_entries(self, mock_get, mock_post):
+        mock_get.return_value = _fake_response(200, {"jobs": []})
+        mock_post.return_value = _fake_response(202, {"job_id": "j1"})
+        self.app.get('/jobs/screening/history')
+
+        self.app.post('/jobs/screening/start', json={})
+        self.app.get('/jobs/screening/history')
+
+        self.assertEqual(mock_get.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,10 @@
+# backend-services/backtest/__init__.py
+"""
+Offline replay of the screening funnel over locally stored price history.
+
+Re-runs apply_screening_criteria, run_vcp_screening and check_pivot_freshness
+as of every session in a date range, with optional overrides of the vcp_logic
+thresholds, without any service, cache or network. Run from backend-services:
+
+    python -m backtest --help
+"""
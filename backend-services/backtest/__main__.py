@@ -0,0 +1,84 @@
+# backend-services/backtest/__main__.py
+"""
+Replays the screening funnel over a date range and prints per-stage pass counts.
+
+    cd backend-services
+    python -m backtest --start 2021-01-01 --end 2021-12-31
+    python -m backtest --history /data/prices --set COUNTER_THRESHOLD=4 --set PIVOT_FRESHNESS_DAYS=15 \
+        --workers 8 --output verdicts.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest.engine import (
+    DEFAULT_HISTORY_DIR,
+    DEFAULT_LOOKBACK,
+    iter_history_files,
+    parse_threshold_overrides,
+    replay_file,
+)
+
+# Funnel order of the scheduler pipeline: each stage only sees what passed the previous ones
+STAGES = [("trend_template", "trend template"), ("vcp_pass", "+ VCP (fast)"), ("fresh_pivot", "+ fresh pivot")]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backtest", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--history", default=DEFAULT_HISTORY_DIR, help="directory of <TICKER>.json price histories")
+    parser.add_argument("--start", default="0000-00-00", help="first as-of date (YYYY-MM-DD)")
+    parser.add_argument("--end", default="9999-99-99", help="last as-of date (YYYY-MM-DD)")
+    parser.add_argument("--ticker", action="append", help="restrict to these tickers (repeatable)")
+    parser.add_argument("--lookback", type=int, default=DEFAULT_LOOKBACK,
+                        help="trailing sessions seen as of each day; 0 for the whole history")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a vcp_logic threshold, e.g. COUNTER_THRESHOLD=4 (repeatable)")
+    parser.add_argument("--workers", type=int, default=1, help="replay tickers in this many processes")
+    parser.add_argument("--output", help="write one JSON line per ticker and session")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = parse_threshold_overrides(args.set)
+    except ValueError as e:
+        parser.error(str(e))
+    lookback = args.lookback or None
+    jobs = [
+        (ticker, path, args.start, args.end, lookback, overrides)
+        for ticker, path in iter_history_files(args.history, args.ticker)
+    ]
+    if not jobs:
+        parser.error(f"no price histories found in {args.history}")
+
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            per_ticker = list(pool.map(replay_file, jobs))
+    else:
+        per_ticker = [replay_file(job) for job in jobs]
+    elapsed = time.perf_counter() - started
+
+    rows = [row for ticker_rows in per_ticker for row in ticker_rows]
+    if args.output:
+        with open(args.output, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    counts = Counter()
+    for row in rows:
+        for stage, _ in STAGES:
+            if not row[stage]:
+                break
+            counts[stage] += 1
+    print(f"{len(jobs)} tickers, {len(rows)} ticker-sessions replayed in {elapsed:.2f}s"
+          + (f" with {overrides}" if overrides else ""))
+    for stage, label in STAGES:
+        print(f"  {label:<16}{counts[stage]:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# backend-services/backtest/engine.py
+"""
+Per-ticker replay of the scheduler's funnel: trend template (screening-service)
+-> VCP fast screen -> pivot freshness (analysis-service), as of every session.
+
+Price history is read from a directory of JSON files named after the ticker,
+either in data-service's row format ([{"formatted_date", "close", "volume"}, ...])
+or as raw Yahoo chart responses (the benchmark fixtures).
+"""
+
+import datetime as dt
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.backends import BACKEND_DIR, use_service
+
+use_service("screening-service")
+use_service("analysis-service")
+
+import vcp_logic  # noqa: E402
+from screening_logic import replay_screening_criteria  # noqa: E402
+from vcp_replay import VcpReplay, overridden_thresholds  # noqa: E402
+
+DEFAULT_HISTORY_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "chart")
+# Sessions in the data-service's default "1y" price range
+DEFAULT_LOOKBACK = 252
+
+History = Tuple[List[str], List[float], List[float]]
+
+
+def _rows_from_chart(payload: dict) -> List[dict]:
+    result = payload["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    return [
+        {
+            "formatted_date": dt.datetime.fromtimestamp(ts, dt.timezone.utc).strftime("%Y-%m-%d"),
+            "close": close,
+            "volume": volume,
+        }
+        for ts, close, volume in zip(result["timestamp"], quote["close"], quote["volume"])
+    ]
+
+
+def load_history(path: str) -> History:
+    """(dates, closes, volumes) sorted by date, skipping bars without a close (as prepare_historical_data does)."""
+    with open(path) as f:
+        payload = json.load(f)
+    rows = _rows_from_chart(payload) if isinstance(payload, dict) and "chart" in payload else payload
+    rows = sorted((r for r in rows if r.get("close") is not None), key=lambda r: r["formatted_date"])
+    return (
+        [r["formatted_date"] for r in rows],
+        [r["close"] for r in rows],
+        [r.get("volume") or 0 for r in rows],
+    )
+
+
+def iter_history_files(directory: str, tickers: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+    """(ticker, path) for every *.json file in `directory`, optionally restricted to `tickers`."""
+    wanted = {t.upper() for t in tickers} if tickers else None
+    for filename in sorted(os.listdir(directory)):
+        ticker, ext = os.path.splitext(filename)
+        if ext == ".json" and (wanted is None or ticker.upper() in wanted):
+            yield ticker, os.path.join(directory, filename)
+
+
+def parse_threshold_overrides(assignments: List[str]) -> Dict[str, object]:
+    """NAME=VALUE pairs, each cast to the type of the vcp_logic constant it replaces."""
+    overrides = {}
+    for assignment in assignments:
+        name, sep, raw = assignment.partition("=")
+        name = name.strip()
+        if not sep or not name.isupper() or not hasattr(vcp_logic, name):
+            raise ValueError(f"Expected NAME=VALUE with a vcp_logic constant name, got {assignment!r}")
+        overrides[name] = type(getattr(vcp_logic, name))(raw.strip())
+    return overrides
+
+
+def replay_ticker(
+    ticker: str,
+    history: History,
+    start_date: str,
+    end_date: str,
+    lookback: Optional[int] = DEFAULT_LOOKBACK,
+) -> List[dict]:
+    """One verdict row per session of `history` dated within [start_date, end_date]."""
+    dates, closes, volumes = history
+    sessions = [i for i, date in enumerate(dates) if start_date <= date <= end_date]
+    if not sessions:
+        return []
+    first, stop = sessions[0], sessions[-1] + 1
+
+    trend = replay_screening_criteria(closes[:stop], lookback=lookback, start=first)
+    vcp = VcpReplay(closes[:stop], volumes[:stop], lookback=lookback)
+
+    rows = []
+    for session, screen in zip(range(first, stop), trend):
+        verdict = vcp.verdict_as_of(session, mode="fast")
+        freshness = verdict["freshness"]
+        rows.append({
+            "ticker": ticker,
+            "date": dates[session],
+            "trend_template": screen["passes"],
+            "vcp_pass": verdict["vcp_pass"],
+            "vcpFootprint": verdict["vcpFootprint"],
+            "fresh_pivot": verdict["vcp_pass"] and freshness["passes"],
+            "days_since_pivot": freshness["days_since_pivot"],
+        })
+    return rows
+
+
+def replay_file(args: Tuple[str, str, str, str, Optional[int], Dict[str, object]]) -> List[dict]:
+    """Process-pool entry point: loads one history file and replays it under the given overrides."""
+    ticker, path, start_date, end_date, lookback, overrides = args
+    with overridden_thresholds(**overrides):
+        return replay_ticker(ticker, load_history(path), start_date, end_date, lookback)
@@ -0,0 +1,11 @@
+# backend-services/benchmarks/__init__.py
+"""
+Offline benchmark suite for the backend services.
+
+Drives data-service /price/batch (cold and warm cache), /screen/batch,
+/analyze/batch, /leadership/batch and the VCP engine against recorded Yahoo
+fixtures served by a local stub, with fakeredis and mongomock standing in for
+Redis and MongoDB. No network access is needed. Run from backend-services:
+
+    python -m benchmarks --help
+"""
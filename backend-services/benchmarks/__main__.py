@@ -0,0 +1,130 @@
+# backend-services/benchmarks/__main__.py
+"""
+Runs the offline benchmark suite and prints one row per scenario.
+
+    cd backend-services
+    python -m benchmarks                                  # every scenario
+    python -m benchmarks -s price_batch_cold -s screen_batch --tickers 500 --iterations 20
+    python -m benchmarks --yahoo-latency-ms 40 --json results.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.backends import BACKEND_DIR
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stub_server import start_stub_server
+
+COLUMNS = [
+    ("scenario", "scenario", "{:<24}"),
+    ("units_per_iteration", "tickers", "{:>8}"),
+    ("throughput_units_per_sec", "tickers/s", "{:>11}"),
+    ("p50_ms", "p50 ms", "{:>10}"),
+    ("p95_ms", "p95 ms", "{:>10}"),
+    ("peak_rss_mb", "peak RSS MB", "{:>12}"),
+    ("errors", "errors", "{:>7}"),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_data_service(stub_url: str, timeout_sec: float = 60.0):
+    """Serves data-service on in-memory backends in a child process and waits for /health."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.backends", "--stub-url", stub_url, "--port", str(port)],
+        cwd=BACKEND_DIR,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"benchmark data-service exited with code {proc.returncode}")
+        try:
+            requests.get(f"{url}/health", timeout=2)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("benchmark data-service did not become ready")
+
+
+def _run_scenario(name: str, args, stub_url: str, data_service_url: str) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as out:
+        cmd = [
+            sys.executable, "-m", "benchmarks.scenarios", name,
+            "--stub-url", stub_url,
+            "--data-service-url", data_service_url,
+            "--tickers", str(args.tickers),
+            "--iterations", str(args.iterations),
+            "--warmup", str(args.warmup),
+            "--output", out.name,
+        ]
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL if not args.verbose else None)
+        if proc.returncode != 0:
+            return {"scenario": name, "error": f"worker exited with code {proc.returncode}"}
+        with open(out.name) as f:
+            return json.load(f)
+
+
+def _print_table(results):
+    print(" ".join(fmt.format(title) for _, title, fmt in COLUMNS))
+    for row in results:
+        if "error" in row:
+            print(f"{row['scenario']:<24} {row['error']}")
+            continue
+        print(" ".join(fmt.format(row[key]) for key, _, fmt in COLUMNS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the backend services.")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--tickers", type=int, default=100, help="tickers per batch request")
+    parser.add_argument("--iterations", type=int, default=10, help="measured iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed iterations before measuring")
+    parser.add_argument("--yahoo-latency-ms", type=float, default=0.0, help="simulated provider round trip")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show worker stdout")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or list(SCENARIOS)
+    stub = start_stub_server(latency_ms=args.yahoo_latency_ms)
+    stub_url = "http://%s:%d" % stub.server_address[:2]
+
+    data_service = None
+    data_service_url = ""
+    try:
+        if any(SCENARIOS[name].needs_data_service for name in names):
+            data_service, data_service_url = _start_data_service(stub_url)
+        results = []
+        for name in names:
+            print(f"running {name}: {SCENARIOS[name].description}", file=sys.stderr)
+            results.append(_run_scenario(name, args, stub_url, data_service_url))
+    finally:
+        if data_service is not None:
+            data_service.terminate()
+            data_service.wait(timeout=10)
+        stub.shutdown()
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": results}, f, indent=2)
+    return 1 if any("error" in r or r.get("errors") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# backend-services/benchmarks/backends.py
+"""
+Boots data-service against in-memory backends for the benchmark suite.
+
+Redis is replaced by fakeredis and MongoDB by mongomock; Yahoo and Finnhub are
+pointed at the stub server. The yfinance-library path of the financials provider
+is disabled so core financials come from the direct quoteSummary call (the
+library talks to hard-coded Yahoo hosts and would need the network).
+
+Run standalone as the data-service the other benchmarked services call:
+
+    python -m benchmarks.backends --stub-url http://127.0.0.1:PORT --port 3901
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIRS = {
+    name: os.path.join(BACKEND_DIR, name)
+    for name in ("data-service", "screening-service", "analysis-service", "leadership-service")
+}
+
+# Pacing defaults for the stub: the Yahoo rate governor would otherwise dominate every cold scenario
+BENCH_ENV_DEFAULTS = {
+    "YF_POOL_SIZE": "4",
+    "YF_GLOBAL_RPS": "1000",
+    "YF_GLOBAL_BURST": "1000",
+    "YF_IDENTITY_RPS": "1000",
+    "YF_IDENTITY_BURST": "1000",
+    "FINNHUB_API_KEY": "bench",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def use_service(name: str) -> None:
+    """Puts one service's modules (app, helper_functions, ...) first on sys.path, ahead of `shared`."""
+    for path in (BACKEND_DIR, SERVICE_DIRS[name]):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+
+
+def load_data_service(stub_url: str):
+    """
+    Imports data-service's Flask app wired to fakeredis, mongomock and the stub.
+    Returns (app module, fakeredis client). Must run before anything imports `app`.
+    """
+    os.environ["YF_BASE_URL"] = stub_url
+    for key, value in BENCH_ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    use_service("data-service")
+
+    import fakeredis
+    import finnhub
+    import mongomock
+    import pymongo
+
+    pymongo.MongoClient = mongomock.MongoClient
+    finnhub.Client.API_URL = f"{stub_url}/api/v1"
+
+    import app as data_service
+    from providers.yfin import financials_provider, yahoo_client
+
+    redis_client = fakeredis.FakeStrictRedis()
+    data_service.cache.cache._read_client = data_service.cache.cache._write_client = redis_client
+    financials_provider._fetch_financials_with_yfinance = lambda ticker: None
+    # The app builds the identity pool on a background thread; have it ready before the first timed call
+    yahoo_client.init_pool(size=int(os.environ["YF_POOL_SIZE"]))
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    return data_service, redis_client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve data-service on in-memory backends for benchmarks.")
+    parser.add_argument("--stub-url", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args(argv)
+
+    from werkzeug.serving import make_server
+
+    data_service, _ = load_data_service(args.stub_url)
+    make_server(args.host, args.port, data_service.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# backend-services/benchmarks/harness.py
+"""Timing and memory measurement for one benchmark scenario."""
+
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    iterations: int
+    units_per_iteration: int
+    throughput_units_per_sec: float
+    requests_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    peak_rss_mb: float
+    errors: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(
+    name: str,
+    operation: Callable[[], bool],
+    units: int,
+    iterations: int,
+    warmup: int,
+    reset: Optional[Callable[[], None]] = None,
+) -> ScenarioResult:
+    """
+    Runs `operation` warmup + iterations times and times only the measured runs.
+    `operation` returns False for a failed call (counted, still timed); `reset`
+    runs untimed before every call (e.g. to flush caches for cold scenarios).
+    """
+    for _ in range(warmup):
+        if reset:
+            reset()
+        operation()
+
+    latencies = []
+    errors = 0
+    for _ in range(iterations):
+        if reset:
+            reset()
+        started = time.perf_counter()
+        ok = operation()
+        latencies.append(time.perf_counter() - started)
+        errors += 0 if ok else 1
+
+    total = sum(latencies) or float("inf")
+    ordered = sorted(latencies)
+    return ScenarioResult(
+        scenario=name,
+        iterations=iterations,
+        units_per_iteration=units,
+        throughput_units_per_sec=round(units * iterations / total, 2),
+        requests_per_sec=round(iterations / total, 2),
+        p50_ms=round(percentile(ordered, 50) * 1000, 2),
+        p95_ms=round(percentile(ordered, 95) * 1000, 2),
+        max_ms=round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        errors=errors,
+    )
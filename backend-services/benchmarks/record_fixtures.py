@@ -0,0 +1,177 @@
+# backend-services/benchmarks/record_fixtures.py
+"""
+Refreshes the Yahoo fixtures served by the benchmark stub.
+
+    python -m benchmarks.record_fixtures record AAPL NVDA ^GSPC   # needs network
+    python -m benchmarks.record_fixtures synthesize               # offline, deterministic
+
+`record` saves raw v8 chart (2y, daily) and v10 quoteSummary responses exactly as
+Yahoo returns them. `synthesize` rebuilds the committed chart fixtures: seeded
+price paths in the v8 chart response shape, one per market regime the screeners
+branch on (VCP leader, plain uptrend, downtrend, range, index). The stub re-dates
+every fixture onto the NYSE sessions ending yesterday, so stored timestamps only
+fix the bar order.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, time as dt_time, timedelta
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHART_DIR = os.path.join(FIXTURES_DIR, "chart")
+QUOTE_SUMMARY_DIR = os.path.join(FIXTURES_DIR, "quote_summary")
+
+QUOTE_SUMMARY_MODULES = (
+    "summaryDetail,assetProfile,financialData,defaultKeyStatistics,incomeStatementHistory,"
+    "incomeStatementHistoryQuarterly,balanceSheetHistory,cashflowStatementHistory"
+)
+SYNTHETIC_BARS = 520  # a little over 2y of sessions
+
+
+def _fixture_name(symbol: str) -> str:
+    return symbol.replace("^", "IDX_").replace("/", "_")
+
+
+def _write(directory: str, name: str, payload: dict) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    return path
+
+
+# --- Live recording ---
+
+def record(symbols):
+    from curl_cffi import requests as cffi_requests
+
+    session = cffi_requests.Session(impersonate="chrome120")
+    session.get("https://fc.yahoo.com", timeout=15)  # sets the consent cookie the crumb is bound to
+    crumb = session.get("https://query1.finance.yahoo.com/v1/test/getcrumb", timeout=15).text.strip()
+
+    for symbol in symbols:
+        chart = session.get(
+            f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}",
+            params={"range": "2y", "interval": "1d", "includeAdjustedClose": "true"},
+            timeout=15,
+        )
+        chart.raise_for_status()
+        print(_write(CHART_DIR, _fixture_name(symbol), chart.json()))
+
+        if symbol.startswith("^"):
+            continue
+        summary = session.get(
+            f"https://query1.finance.yahoo.com/v10/finance/quoteSummary/{symbol}",
+            params={"modules": QUOTE_SUMMARY_MODULES, "crumb": crumb},
+            timeout=15,
+        )
+        summary.raise_for_status()
+        print(_write(QUOTE_SUMMARY_DIR, _fixture_name(symbol), summary.json()))
+
+
+# --- Offline synthesis ---
+
+def _regime_path(regime: str, n: int):
+    """Daily log-return drift/volatility per bar for each regime."""
+    if regime == "leader_vcp":
+        # Two strong advances, then three progressively tighter pullbacks into a pivot
+        plan = [(200, 0.0025, 0.012), (60, -0.0045, 0.015), (70, 0.0040, 0.012),
+                (40, -0.0035, 0.010), (45, 0.0030, 0.008), (30, -0.0020, 0.006),
+                (30, 0.0018, 0.005), (20, -0.0010, 0.004), (25, 0.0008, 0.003)]
+    elif regime == "uptrend":
+        plan = [(n, 0.0012, 0.015)]
+    elif regime == "downtrend":
+        plan = [(n, -0.0010, 0.018)]
+    elif regime == "range_bound":
+        plan = [(n, 0.0, 0.012)]
+    else:  # index
+        plan = [(n, 0.0004, 0.008)]
+
+    steps = []
+    for length, drift, vol in plan:
+        steps.extend([(drift, vol)] * length)
+    steps = (steps + [steps[-1]] * n)[:n]
+    return steps
+
+
+def _synthetic_chart(symbol: str, regime: str, seed: int, start_price: float, base_volume: int) -> dict:
+    rng = random.Random(seed)
+    steps = _regime_path(regime, SYNTHETIC_BARS)
+
+    opens, highs, lows, closes, volumes = [], [], [], [], []
+    close = start_price
+    for drift, vol in steps:
+        open_ = close * math.exp(rng.gauss(0, vol / 3))
+        close = open_ * math.exp(drift + rng.gauss(0, vol))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, vol / 2)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, vol / 2)))
+        # Volume shrinks with volatility (dry-up in tight ranges) and spikes on big up days
+        volume = base_volume * (0.5 + vol / 0.015) * (1.8 if close > open_ * (1 + vol) else 1.0)
+        volume *= math.exp(rng.gauss(0, 0.25))
+        opens.append(round(open_, 4))
+        highs.append(round(high, 4))
+        lows.append(round(low, 4))
+        closes.append(round(close, 4))
+        volumes.append(int(volume))
+
+    # Placeholder timestamps (consecutive weekdays); the stub re-dates bars onto NYSE sessions
+    day = datetime(2020, 1, 1)
+    timestamps = []
+    while len(timestamps) < SYNTHETIC_BARS:
+        if day.weekday() < 5:
+            timestamps.append(int(datetime.combine(day.date(), dt_time(14, 30)).timestamp()))
+        day += timedelta(days=1)
+
+    return {
+        "chart": {
+            "result": [{
+                "meta": {"currency": "USD", "symbol": symbol, "instrumentType": "INDEX" if regime == "index" else "EQUITY",
+                         "dataGranularity": "1d", "range": "2y"},
+                "timestamp": timestamps,
+                "indicators": {
+                    "quote": [{"open": opens, "high": highs, "low": lows, "close": closes, "volume": volumes}],
+                    "adjclose": [{"adjclose": list(closes)}],
+                },
+            }],
+            "error": None,
+        }
+    }
+
+
+SYNTHETIC_CHARTS = [
+    # (fixture name, regime, seed, start price, base volume)
+    ("leader_vcp", "leader_vcp", 11, 42.0, 2_500_000),
+    ("leader_vcp_2", "leader_vcp", 29, 118.0, 900_000),
+    ("uptrend", "uptrend", 7, 65.0, 3_000_000),
+    ("downtrend", "downtrend", 3, 210.0, 4_000_000),
+    ("range_bound", "range_bound", 5, 33.0, 1_500_000),
+    ("IDX_index", "index", 1, 4100.0, 3_500_000_000),
+]
+
+
+def synthesize():
+    for name, regime, seed, price, volume in SYNTHETIC_CHARTS:
+        print(_write(CHART_DIR, name, _synthetic_chart(name, regime, seed, price, volume)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="record live Yahoo responses (needs network)")
+    rec.add_argument("symbols", nargs="+")
+    sub.add_parser("synthesize", help="regenerate the deterministic offline chart fixtures")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record(args.symbols)
+    else:
+        synthesize()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# backend-services/benchmarks/scenarios.py
+"""
+Benchmark scenarios. Each one runs in its own worker process (every service ships
+an `app` module, and peak RSS must be per scenario), invoked by the runner as:
+
+    python -m benchmarks.scenarios <name> --stub-url URL [--data-service-url URL] --output FILE
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.backends import load_data_service, use_service
+from benchmarks.harness import measure
+from benchmarks.stub_server import FIXTURES_DIR
+
+# setup(context) -> (operation, units per call, optional untimed reset)
+Setup = Callable[[dict], Tuple[Callable[[], bool], int, Optional[Callable[[], None]]]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    needs_data_service: bool
+    setup: Setup
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, description: str, needs_data_service: bool = False):
+    def register(setup: Setup) -> Setup:
+        SCENARIOS[name] = Scenario(name, description, needs_data_service, setup)
+        return setup
+    return register
+
+
+def bench_tickers(count: int) -> List[str]:
+    """Synthetic symbols; the stub maps each one onto a chart fixture by hash."""
+    return [f"B{i:04d}" for i in range(count)]
+
+
+def _import_service_app(service: str, data_service_url: str):
+    os.environ["DATA_SERVICE_URL"] = data_service_url
+    use_service(service)
+    import app as service_app
+    service_app.app.testing = True
+    return service_app.app.test_client()
+
+
+def _post_ok(client, path: str, payload: dict) -> Callable[[], bool]:
+    def operation() -> bool:
+        resp = client.post(path, json=payload)
+        resp.get_data()  # drain streamed bodies so the whole response is timed
+        return resp.status_code == 200
+    return operation
+
+
+# --- data-service ---
+
+def _price_batch(context: dict, cold: bool):
+    data_service, redis_client = load_data_service(context["stub_url"])
+    client = data_service.app.test_client()
+    tickers = bench_tickers(context["tickers"])
+    reset = redis_client.flushall if cold else None
+    return _post_ok(client, "/price/batch", {"tickers": tickers, "source": "yfinance"}), len(tickers), reset
+
+
+@scenario("price_batch_cold", "data-service /price/batch, empty cache: every ticker fetched from the Yahoo stub")
+def price_batch_cold(context):
+    return _price_batch(context, cold=True)
+
+
+@scenario("price_batch_warm", "data-service /price/batch served from the Redis price cache")
+def price_batch_warm(context):
+    return _price_batch(context, cold=False)
+
+
+# --- Downstream services (call a live benchmark data-service over HTTP) ---
+
+@scenario("screen_batch", "screening-service /screen/batch (trend template)", needs_data_service=True)
+def screen_batch(context):
+    client = _import_service_app("screening-service", context["data_service_url"])
+    tickers = bench_tickers(context["tickers"])
+    return _post_ok(client, "/screen/batch", {"tickers": tickers}), len(tickers), None
+
+
+@scenario("analyze_batch", "analysis-service /analyze/batch (VCP, fast mode)", needs_data_service=True)
+def analyze_batch(context):
+    client = _import_service_app("analysis-service", context["data_service_url"])
+    tickers = bench_tickers(context["tickers"])
+    return _post_ok(client, "/analyze/batch", {"tickers": tickers, "mode": "fast"}), len(tickers), None
+
+
+@scenario("leadership_batch", "leadership-service /leadership/batch (peers, financials, market context)", needs_data_service=True)
+def leadership_batch(context):
+    client = _import_service_app("leadership-service", context["data_service_url"])
+    tickers = bench_tickers(context["tickers"])
+    return _post_ok(client, "/leadership/batch", {"tickers": tickers}), len(tickers), None
+
+
+# --- VCP engine (pure CPU) ---
+
+def _fixture_closes(count: int) -> List[List[float]]:
+    chart_dir = os.path.join(FIXTURES_DIR, "chart")
+    series = []
+    for filename in sorted(os.listdir(chart_dir)):
+        if filename.endswith(".json") and not filename.startswith("IDX_"):
+            with open(os.path.join(chart_dir, filename)) as f:
+                quote = json.load(f)["chart"]["result"][0]["indicators"]["quote"][0]
+            series.append([c for c in quote["close"] if c is not None])
+    return [series[i % len(series)] for i in range(count)]
+
+
+def _vcp_engine(context: dict, function_name: str):
+    use_service("analysis-service")
+    import vcp_logic
+
+    engine = getattr(vcp_logic, function_name)
+    closes = _fixture_closes(context["tickers"])
+
+    def operation() -> bool:
+        for prices in closes:
+            engine(prices)
+        return True
+    return operation, len(closes), None
+
+
+@scenario("vcp_engine", "find_volatility_contraction_pattern (reference loop) over the chart fixtures")
+def vcp_engine(context):
+    return _vcp_engine(context, "find_volatility_contraction_pattern")
+
+
+@scenario("vcp_engine_vectorized", "find_volatility_contraction_pattern_vectorized over the chart fixtures")
+def vcp_engine_vectorized(context):
+    return _vcp_engine(context, "find_volatility_contraction_pattern_vectorized")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one benchmark scenario and write its result as JSON.")
+    parser.add_argument("name", choices=sorted(SCENARIOS))
+    parser.add_argument("--stub-url", required=True)
+    parser.add_argument("--data-service-url", default="")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args(argv)
+
+    context = {"stub_url": args.stub_url, "data_service_url": args.data_service_url, "tickers": args.tickers}
+    operation, units, reset = SCENARIOS[args.name].setup(context)
+    result = measure(args.name, operation, units, args.iterations, args.warmup, reset)
+    with open(args.output, "w") as f:
+        json.dump(result.to_dict(), f)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# backend-services/benchmarks/stub_server.py
+"""
+Local stand-in for the external market-data APIs the services call.
+
+Yahoo:   GET /v1/test/getcrumb
+         GET /v8/finance/chart/{symbol}?range=... | period1=..&period2=..
+         GET /v10/finance/quoteSummary/{symbol}
+Finnhub: GET /api/v1/stock/peers?symbol=...
+         GET /api/v1/stock/profile2?symbol=...
+
+Any symbol is served: a fixture named after the symbol is used when one was
+recorded, otherwise a stable hash picks one (indices only map to index fixtures).
+Chart bars are re-dated onto the NYSE sessions ending at the last completed
+session, so cache freshness and incremental top-ups behave as on a live day.
+An optional per-request latency emulates the provider round trip.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import date, datetime, time as dt_time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from shared.trading_calendar import get_trading_calendar
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RANGE_SESSIONS = {"1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "max": 10 ** 6}
+PEER_SYMBOLS = ["AAPL", "MSFT", "NVDA", "AVGO", "ORCL"]
+
+
+def _load_dir(name: str) -> Dict[str, dict]:
+    directory = os.path.join(FIXTURES_DIR, name)
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename)) as f:
+                fixtures[filename[:-5]] = json.load(f)
+    return fixtures
+
+
+def _bar_timestamp(session: date) -> int:
+    # Mid-session local time, so the data-service's fromtimestamp() lands on the session date
+    return int(datetime.combine(session, dt_time(14, 30)).timestamp())
+
+
+class FixtureStore:
+    """Fixtures loaded once, with chart bars pre-dated onto the current session window."""
+
+    def __init__(self, today: Optional[date] = None):
+        self.charts = _load_dir("chart")
+        self.quote_summaries = _load_dir("quote_summary")
+        self.index_charts = sorted(k for k in self.charts if k.startswith("IDX_"))
+        self.stock_charts = sorted(k for k in self.charts if not k.startswith("IDX_"))
+
+        calendar = get_trading_calendar()
+        last_session = calendar.previous_session(today or date.today())
+        self._timestamps = {}
+        for name, payload in self.charts.items():
+            n = len(payload["chart"]["result"][0]["timestamp"])
+            self._timestamps[name] = [_bar_timestamp(d) for d in calendar.last_n_sessions(last_session, n)]
+
+    @staticmethod
+    def _pick(symbol: str, names: List[str]) -> str:
+        return names[zlib.crc32(symbol.encode()) % len(names)]
+
+    def chart_name(self, symbol: str) -> str:
+        own = symbol.replace("^", "IDX_")
+        if own in self.charts:
+            return own
+        return self._pick(symbol, self.index_charts if symbol.startswith("^") else self.stock_charts)
+
+    def chart(self, symbol: str, params: Dict[str, str]) -> dict:
+        name = self.chart_name(symbol)
+        result = self.charts[name]["chart"]["result"][0]
+        timestamps = self._timestamps[name]
+        n = len(timestamps)
+
+        if "period1" in params:
+            lo, hi = int(params["period1"]), int(params.get("period2", 2 ** 62))
+            keep = [i for i, ts in enumerate(timestamps) if lo <= ts <= hi]
+            first, last = (keep[0], keep[-1] + 1) if keep else (n, n)
+        else:
+            first, last = max(0, n - RANGE_SESSIONS.get(params.get("range", "1y"), 252)), n
+
+        quote = result["indicators"]["quote"][0]
+        return {
+            "chart": {
+                "result": [{
+                    "meta": {**result.get("meta", {}), "symbol": symbol},
+                    "timestamp": timestamps[first:last],
+                    "indicators": {
+                        "quote": [{field: quote[field][first:last] for field in ("open", "high", "low", "close", "volume")}],
+                        "adjclose": [{"adjclose": result["indicators"]["adjclose"][0]["adjclose"][first:last]}],
+                    },
+                }],
+                "error": None,
+            }
+        }
+
+    def quote_summary(self, symbol: str) -> dict:
+        name = symbol if symbol in self.quote_summaries else self._pick(symbol, sorted(self.quote_summaries))
+        return self.quote_summaries[name]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    store: FixtureStore = None
+    latency_sec: float = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        path = "/" + "/".join(parts)  # clients may join base URL and path with a doubled slash
+
+        if path == "/v1/test/getcrumb":
+            return self._send(200, "benchcrumb", "text/plain")
+        if parts[:3] == ["v8", "finance", "chart"] and len(parts) == 4:
+            return self._send(200, self.store.chart(parts[3], params))
+        if parts[:3] == ["v10", "finance", "quoteSummary"] and len(parts) == 4:
+            return self._send(200, self.store.quote_summary(parts[3]))
+        if path == "/api/v1/stock/peers":
+            symbol = params.get("symbol", "")
+            return self._send(200, [symbol] + [p for p in PEER_SYMBOLS if p != symbol])
+        if path == "/api/v1/stock/profile2":
+            return self._send(200, {"ticker": params.get("symbol"), "finnhubIndustry": "Technology"})
+        return self._send(404, {"error": f"no stub for {path}"})
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Starts the stub on a daemon thread; `server.server_address` holds the bound port."""
+    handler = type("StubHandler", (_Handler,), {"store": FixtureStore(), "latency_sec": latency_ms / 1000.0})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="bench-stub", daemon=True).start()
+    return server
@@ -1,20 +1,19 @@
 # data-service/app.py
 import os
 import pandas as pd
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from datetime import date, datetime, timedelta, timezone
 import datetime as dt
 from flask_caching import Cache
-import pandas_market_calendars as mcal
 import re
-from concurrent.futures import ThreadPoolExecutor
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from logging.handlers import RotatingFileHandler
 from pymongo import MongoClient
 from pymongo.errors import OperationFailure
 from typing import List, Dict
 import threading
-from pydantic import TypeAdapter
 
 # --- 1. Initialize Flask App and Basic Config ---
 app = Flask(__name__)
@@ -98,14 +97,20 @@ from providers.yfin import price_provider as yf_price_provider
 from providers.yfin import financials_provider as yf_financials_provider
 from providers.yfin.market_data_provider import DayGainersSource, YahooSectorIndustrySource, NewHighsScreenerSource, MarketBreadthFetcher
 # Import the logic
-from helper_functions import check_market_trend_context, validate_and_prepare_financials, compute_watchlist_metrics_from_prices, plan_incremental_price_fetch, finalize_price_response, compute_returns_for_period, validate_and_prepare_price_data
+from helper_functions import check_market_trend_context, validate_and_prepare_financials, compute_watchlist_metrics_from_prices, plan_incremental_price_fetch, finalize_price_response, compute_returns_for_period, validate_and_prepare_price_data, cache_get_many, load_delisted_tickers, previous_trading_day, CACHE_MGET_CHUNK_SIZE
+from breadth_engine import series_signals, aggregate_breadth
 
-from shared.contracts import ScreenerQuote, WatchlistMetricsBatchResponse, WatchlistMetricsItem
+from shared.trading_calendar import get_trading_calendar as get_shared_trading_calendar
+from shared.contracts import get_type_adapter, ScreenerQuote, WatchlistMetricsBatchResponse, WatchlistMetricsItem, PriceColumns, ColumnarPriceBatchResponse, PriceBatchStreamRecord, PRICE_BATCH_STREAM_MIMETYPE
+from shared.metrics import instrument_app, track_executor
+
+instrument_app(app)
 
 # --- Flask-Caching Setup ---
 # Configuration for Redis Cache. The URL is provided by the environment.
 config = {
-    "CACHE_TYPE": "flask_caching.backends.rediscache.RedisCache",
+    # RedisCache that also counts hits/misses per key family for /metrics
+    "CACHE_TYPE": "cache_metrics.InstrumentedRedisCache",
     "CACHE_REDIS_URL": os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
     "CACHE_DEFAULT_TIMEOUT": 300, # Default 5 minutes for routes without explicit timeout
     "CACHE_KEY_PREFIX": os.environ.get("CACHE_KEY_PREFIX", "datasvc:")
@@ -150,6 +155,9 @@ def _init_yf_pool_bg():
         app.logger.warning(f"Yahoo Finance pool initialization failed (background): {e}")
 threading.Thread(target=_init_yf_pool_bg, daemon=True).start()
 
+# --- Load delisted tickers into memory at startup ---
+threading.Thread(target=load_delisted_tickers, daemon=True).start()
+
 # --- Custom Exceptions ---
 class ProviderNoDataError(Exception):
     """Custom exception raised when a data provider returns no data."""
@@ -157,7 +165,7 @@ class ProviderNoDataError(Exception):
 
 # --- Centralized Executor ---
 # Using a ThreadPoolExecutor for concurrent requests in batch endpoints
-executor = ThreadPoolExecutor(max_workers=20)
+executor = track_executor("data_service_batch", ThreadPoolExecutor(max_workers=20))
 
 @app.route('/financials/core/batch', methods=['POST'])
 def get_batch_core_financials_route():
@@ -177,11 +185,14 @@ def get_batch_core_financials_route():
 
     processed_data = {}
     tickers_to_fetch = []
-    
+
+    # Resolve every ticker's cache entry in a single MGET round trip
+    cached_by_key = cache_get_many(cache, [f"financials_{ticker}" for ticker in tickers])
+
     for ticker in tickers:
         # The 'financials_' prefix + the ticker is what the key_prefix='financials_%s' creates.
         cache_key = f"financials_{ticker}"
-        cached_data = cache.get(cache_key)
+        cached_data = cached_by_key.get(cache_key)
         if cached_data:
             app.logger.info(f"Cache HIT for financials: {ticker}")
             # Validate cached data against the contract
@@ -264,6 +275,10 @@ def get_batch_data():
     - For cache miss, performs full fetch
     - Combines cached and newly fetched data.
     - Returns successful and failed tickers.
+    - Optional "format": "columnar" returns one array per field per ticker (PriceColumns)
+      instead of a list of PriceDataItem rows.
+    - Optional "stream": true returns NDJSON, one PriceBatchStreamRecord per ticker
+      written as soon as that ticker resolves (cache hit, incremental or full fetch).
     """
     payload = request.get_json()
     if not payload or 'tickers' not in payload or 'source' not in payload:
@@ -271,53 +286,45 @@ def get_batch_data():
 
     tickers = payload['tickers']
     source = payload['source'].lower()
+    response_format = (payload.get('format') or 'rows').lower()
     
     if source not in ('yfinance', 'finnhub'):
         return jsonify({"error": "Invalid data source. Use 'finnhub' or 'yfinance'."}), 400
 
+    if response_format not in ('rows', 'columnar'):
+        return jsonify({"error": "Invalid format. Use 'rows' or 'columnar'."}), 400
+
     if not isinstance(tickers, list):
         return jsonify({"error": "'tickers' must be a list of strings."}), 400
 
-    # --- Handle Empty Ticker List ---
-    if not tickers:
-        return jsonify({"success": {}, "failed": []}), 200
-
-    # --- Cache Access ---
-    plans = {}
-    cached_results = {}
-    missed_tickers = {}   # key: (period, start_date) -> [tickers]
-    tickers_for_incremental_fetch = []  # list of (ticker, start_date, cached)
-    failed_tickers = set() # avoid duplicates
-
     # Extract requested period/start for coverage checks
     req_period = (payload.get('period') or "").lower()
     req_start = payload.get('start_date')
 
-    # Find all documents where the ticker is in the requested list and source matches
-    for ticker in tickers:
-        cache_key = f"price_{source}_{ticker}"
-        raw_cached = cache.get(cache_key)
-        plan = plan_incremental_price_fetch(raw_cached, req_period, req_start)
-        plans[ticker] = (cache_key, plan)
+    if payload.get('stream'):
+        records = _stream_price_batch(tickers, source, response_format, req_period, req_start)
+        return Response(stream_with_context(records), mimetype=PRICE_BATCH_STREAM_MIMETYPE)
 
-        if plan['action'] == 'return_cache':
-            cached_results[ticker] = plan['cached']
-        elif plan['action'] == 'fetch_full':
-            key = (plan['period'], plan['start_date'])
-            missed_tickers.setdefault(key, []).append(ticker)
-        elif plan['action'] == 'fetch_incremental':
-            tickers_for_incremental_fetch.append((ticker, plan['start_date'], plan['cached']))
-        elif plan['action'] == 'error':
-            failed_tickers.append(ticker)
-        else:
-            # Defensive fallback to avoid dropping any ticker
-            failed_tickers.append(ticker)
-        total_miss_tickers = sum(len(v) for v in missed_tickers.values())
-    app.logger.info(f"Batch request. Cache hits: {len(cached_results)}, Cache misses: {len(missed_tickers)}, Cache miss tickers: {total_miss_tickers}")
+    # --- Handle Empty Ticker List ---
+    if not tickers:
+        return _price_batch_response({}, [], response_format)
+
+    results, failed_tickers = _resolve_price_batch(tickers, source, req_period, req_start)
+    return _price_batch_response(results, failed_tickers, response_format)
+
+def _resolve_price_batch(tickers: list, source: str, req_period: str, req_start):
+    """
+    Serves a batch of price series from the cache, topping up stale entries incrementally
+    and fetching misses in full. Fetched series are merged and written back to the cache.
+    Returns (results, failed): ticker -> validated rows, and the sorted failed tickers.
+    """
+    # --- Cache Access ---
+    plans, cached_results, missed_tickers, tickers_for_incremental_fetch, failed_tickers = _plan_price_batch(
+        tickers, source, req_period, req_start
+    )
 
     # --- Execute full fetches for Cache Misses ---
     results = cached_results
-    failed_tickers = []
 
     if source == 'yfinance':
         for (period, start), group in missed_tickers.items():
@@ -375,7 +382,118 @@ def get_batch_data():
                 results[t] = final_json
             else:
                 failed_tickers.append(t)
-    return jsonify({"success": results, "failed": sorted(list(failed_tickers))}), 200
+    return results, sorted(set(failed_tickers))
+
+def _plan_price_batch(tickers: list, source: str, req_period: str, req_start):
+    """
+    Resolves every ticker's cache entry (one MGET round trip) and plans its fetch.
+    Returns (plans, cached_results, missed_tickers, tickers_for_incremental_fetch, failed_tickers):
+    - plans: ticker -> (cache_key, plan)
+    - missed_tickers: (period, start_date) -> [tickers] needing a full fetch
+    - tickers_for_incremental_fetch: list of (ticker, start_date, cached)
+    """
+    plans = {}
+    cached_results = {}
+    missed_tickers = {}
+    tickers_for_incremental_fetch = []
+    failed_tickers = []
+
+    cached_by_key = cache_get_many(cache, [f"price_{source}_{ticker}" for ticker in tickers])
+
+    for ticker in tickers:
+        cache_key = f"price_{source}_{ticker}"
+        raw_cached = cached_by_key.get(cache_key)
+        plan = plan_incremental_price_fetch(raw_cached, req_period, req_start)
+        plans[ticker] = (cache_key, plan)
+
+        if plan['action'] == 'return_cache':
+            cached_results[ticker] = plan['cached']
+        elif plan['action'] == 'fetch_full':
+            key = (plan['period'], plan['start_date'])
+            missed_tickers.setdefault(key, []).append(ticker)
+        elif plan['action'] == 'fetch_incremental':
+            tickers_for_incremental_fetch.append((ticker, plan['start_date'], plan['cached']))
+        elif plan['action'] == 'error':
+            failed_tickers.append(ticker)
+        else:
+            # Defensive fallback to avoid dropping any ticker
+            failed_tickers.append(ticker)
+    total_miss_tickers = sum(len(v) for v in missed_tickers.values())
+    app.logger.info(f"Batch request. Cache hits: {len(cached_results)}, Cache misses: {len(missed_tickers)}, Cache miss tickers: {total_miss_tickers}")
+    return plans, cached_results, missed_tickers, tickers_for_incremental_fetch, failed_tickers
+
+def _stream_price_batch(tickers: list, source: str, response_format: str, req_period: str, req_start):
+    """
+    Generator behind /price/batch "stream": true. Yields one NDJSON line per ticker
+    as soon as it resolves: cache hits and planning failures first, then every
+    provider fetch (full or incremental) in completion order, so one slow
+    Yahoo retry no longer holds back the rest of the batch.
+    """
+    def record(ticker, data):
+        if data is None:
+            line = PriceBatchStreamRecord.model_construct(ticker=ticker, status="failed", format=response_format, data=None)
+        else:
+            if response_format == 'columnar':
+                data = PriceColumns.from_rows(data).model_dump()
+            line = PriceBatchStreamRecord.model_construct(ticker=ticker, status="success", format=response_format, data=data)
+        return json.dumps(line.model_dump(), separators=(',', ':')) + "\n"
+
+    unique_tickers = list(dict.fromkeys(tickers))
+    if not unique_tickers:
+        return
+    plans, cached_results, missed_tickers, tickers_for_incremental_fetch, failed_tickers = _plan_price_batch(
+        unique_tickers, source, req_period, req_start
+    )
+    for ticker, rows in cached_results.items():
+        yield record(ticker, rows)
+    for ticker in failed_tickers:
+        yield record(ticker, None)
+
+    def finalize(ticker, data):
+        cache_key, plan = plans[ticker]
+        error_context = {
+            "ticker": ticker,
+            "message_500": f"Could not retrieve valid price data for {ticker}.",
+            "message_404": f"Could not retrieve price data for {ticker} from {source}.",
+        }
+        final_json, status = finalize_price_response(
+            cache_key, plan, data, cache=cache, ttl_seconds=PRICE_CACHE_TTL, error_context=error_context
+        )
+        return final_json if status == 200 else None
+
+    if source == 'yfinance':
+        # One single-ticker provider call per future, so each ticker surfaces when its own fetch finishes
+        future_to_ticker = {}
+        for (period, start), group in missed_tickers.items():
+            for ticker in group:
+                future_to_ticker[executor.submit(yf_price_provider.get_stock_data, ticker, executor, start_date=start, period=period)] = ticker
+        for ticker, start, _cached in tickers_for_incremental_fetch:
+            future_to_ticker[executor.submit(yf_price_provider.get_stock_data, ticker, executor, start_date=start, period=None)] = ticker
+
+        for future in as_completed(future_to_ticker):
+            ticker = future_to_ticker[future]
+            try:
+                data = future.result()
+            except Exception as exc:
+                app.logger.error(f"Streamed price fetch for {ticker} raised: {exc}")
+                data = None
+            yield record(ticker, finalize(ticker, data))
+    else:
+        # finnhub: per-ticker fetch path (no batch API)
+        for group in missed_tickers.values():
+            for ticker in group:
+                yield record(ticker, finalize(ticker, finnhub_provider.get_stock_data(ticker)))
+
+def _price_batch_response(results: dict, failed: list, response_format: str):
+    """Serializes a /price/batch result in the requested row or columnar shape."""
+    if response_format == 'columnar':
+        # Rows are already validated by finalize_price_response, so build columns without re-validation
+        columnar = ColumnarPriceBatchResponse.model_construct(
+            success={ticker: PriceColumns.from_rows(rows) for ticker, rows in results.items()},
+            failed=failed,
+        )
+        return jsonify(columnar.model_dump()), 200
+    return jsonify({"success": results, "failed": failed}), 200
 
 @app.route('/price/<path:ticker>', methods=['GET'])
 def get_data(ticker: str):
@@ -623,14 +741,18 @@ def calculate_market_trend():
     if not raw_dates:
         return jsonify({"trends": [], "failed_dates": []}), 200
 
-    # Use a market calendar to get only valid trading days
-    nyse = mcal.get_calendar('NYSE')
-    start_date_for_calendar = raw_dates[0]
-    end_date_for_calendar = raw_dates[-1]
-    schedule = nyse.schedule(start_date=start_date_for_calendar, end_date=end_date_for_calendar)
-    
+    # Use the precomputed session index to get only valid trading days
+    try:
+        start_date_for_calendar = date.fromisoformat(raw_dates[0])
+        end_date_for_calendar = date.fromisoformat(raw_dates[-1])
+    except ValueError:
+        return jsonify({"error": "Invalid date format in 'dates'. Use YYYY-MM-DD."}), 400
+    sessions = get_shared_trading_calendar(start_date_for_calendar, end_date_for_calendar).sessions_between(
+        start_date_for_calendar, end_date_for_calendar
+    )
+
     # Filter the requested dates to only include valid market open days
-    valid_trading_dates_set = set(schedule.index.strftime('%Y-%m-%d'))
+    valid_trading_dates_set = {s.isoformat() for s in sessions}
     dates_to_process = [d for d in raw_dates if d in valid_trading_dates_set]
     
     # Identify non-trading days to report back as "failed" upfront
@@ -864,13 +986,48 @@ def get_52w_highs_quotes():
         quotes = highs_src.get_all_quotes() 
         # returns a wrapper object like {"finance":{"result":[{"total": N, "quotes":[{...}, ...], "offset": 0, ...}], "error": null}}
         # include symbol, region, quoteType, industry, sector (sometimes), regularMarketPrice, marketCap, and 52-week fields
-        validator = TypeAdapter(List[ScreenerQuote])
+        validator = get_type_adapter(List[ScreenerQuote])
         items = validator.validate_python(quotes)
         return jsonify([it.model_dump(mode="json") for it in items]), 200
     except Exception as e:
         app.logger.error(f"/market/screener/52w_highs failed: {e}", exc_info=True)
         return jsonify({"error": "Failed to fetch 52w highs"}), 500
 
+def _cached_price_keys(source: str) -> list:
+    """Keys (without the cache key prefix) of every cached price series for `source`, via non-blocking SCAN."""
+    prefix = cache.cache.key_prefix  # type: ignore[attr-defined]
+    redis_client = cache.cache._write_client  # type: ignore[attr-defined]
+    keys = set()
+    cursor = 0
+    while True:
+        cursor, batch = redis_client.scan(cursor=cursor, match=f"{prefix}price_{source}_*", count=1000)
+        for key in batch:
+            key = key.decode() if isinstance(key, bytes) else key
+            keys.add(key[len(prefix):])
+        if cursor == 0:
+            break
+    return sorted(keys)
+
+def _local_breadth(region: str):
+    """
+    Breadth from the price series the screening pipeline cached (price_yfinance_*),
+    or None when they are not usable (other region, stale or thin coverage, cache error).
+    Series are read chunk by chunk and reduced to a few dates each, so the universe is never held in memory.
+    """
+    # The screening universe only holds US listings
+    if region != "US":
+        return None
+    try:
+        keys = _cached_price_keys("yfinance")
+        signals = []
+        for i in range(0, len(keys), CACHE_MGET_CHUNK_SIZE):
+            chunk = cache_get_many(cache, keys[i:i + CACHE_MGET_CHUNK_SIZE])
+            signals.extend(series_signals(rows) for rows in chunk.values() if isinstance(rows, list))
+        return aggregate_breadth(signals, min_as_of=previous_trading_day(date.today()))
+    except Exception as e:
+        app.logger.warning(f"Local breadth unavailable for region={region}; using the screener: {e}")
+        return None
+
 @app.route('/market/breadth', methods=['GET'])
 def get_market_breadth():
     """
@@ -888,10 +1045,15 @@ def get_market_breadth():
             app.logger.info(f"breadth cache HIT for region={region}")
             return jsonify(cached), 200
 
-        # Compute on miss
-        mbf = MarketBreadthFetcher(region=region)
-        data = mbf.get_breadth()  # {'new_highs': int, 'new_lows': int, 'high_low_ratio': float}
-        app.logger.info(f"breadth computed for region={region}")
+        # Compute on miss: from the cached screening universe when it covers enough of the market,
+        # otherwise from the remote screener totals
+        data = _local_breadth(region)
+        if data is not None:
+            app.logger.info(f"breadth computed locally for region={region}: {data['covered_tickers']} tickers as of {data['as_of']}")
+        else:
+            mbf = MarketBreadthFetcher(region=region)
+            data = mbf.get_breadth()  # {'new_highs': int, 'new_lows': int, 'high_low_ratio': float}
+            app.logger.info(f"breadth computed for region={region}")
 
         # Normalize response keys that tests assert on
         response = {
@@ -949,24 +1111,17 @@ def get_watchlist_metrics_batch():
         if not norm_tickers:
             return jsonify({"metrics": {}}), 200
 
-        # For simplicity and DRY, reuse the existing /price/batch planning and provider logic.
-        # Here we fetch recent history for all tickers via the yahoo price provider.
-        # You can tune period if needed (e.g., "3mo" or "6mo").
+        # Reuse the /price/batch cache path: series warmed by the screening pipeline are served
+        # from price_yfinance_{ticker}, stale ones are topped up from the last cached session,
+        # and only misses pay for a full 3-month provider fetch (written back to the cache).
         period = "3mo"
         source = "yfinance"
 
-        # Use the same batch provider used by /price/batch
-        # Expected shape: { "success": { "HG": [ {formatted_date, close, volume,...}, ... ], ... }, "failed": [...] }
-        fetched = yf_price_provider.get_stock_data(norm_tickers, executor, start_date=None, period=period)
+        series, _failed = _resolve_price_batch(list(dict.fromkeys(norm_tickers)), source, period, None)
         metrics: Dict[str, Dict[str, float | None]] = {}
 
         for ticker in norm_tickers:
-            raw_list = fetched.get(ticker) if isinstance(fetched, dict) else None
-            if not isinstance(raw_list, list):
-                metrics[ticker] = WatchlistMetricsItem().model_dump()
-                continue
-
-            validated = validate_and_prepare_price_data(raw_list, ticker)
+            validated = series.get(ticker)
             if not validated:
                 metrics[ticker] = WatchlistMetricsItem().model_dump()
                 continue
@@ -0,0 +1,149 @@
+# backend-services/data-service/breadth_engine.py
+"""
+Market breadth (new 52-week highs / lows) computed from price series the
+data-service already holds, instead of the remote Yahoo screener totals.
+
+The definition mirrors the screener query MarketBreadthFetcher sends
+(price_signal_fifty_two_wk_high.datetime >= now-1w/d): a ticker counts as a new
+high when one of its sessions in the last week traded above every high of the
+preceding 52 weeks, and likewise for lows. Everything here is a pure function of
+the series, so the counts are reproducible offline from fixture data.
+"""
+import logging
+import os
+from datetime import date, timedelta
+from typing import Iterable, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Fewer usable tickers than this is too thin to stand in for the whole market
+BREADTH_LOCAL_MIN_TICKERS = int(os.getenv("BREADTH_LOCAL_MIN_TICKERS", "1500"))
+# A series may start this many days short of a full 52-week window (a 1y fetch starts a year before its first session)
+BREADTH_HISTORY_SLACK_DAYS = int(os.getenv("BREADTH_HISTORY_SLACK_DAYS", "10"))
+
+FIFTY_TWO_WEEKS = timedelta(weeks=52)
+# Same window as the screener's "now-1w/d"
+SIGNAL_WINDOW = timedelta(weeks=1)
+
+
+class SeriesSignals(NamedTuple):
+    """Per-ticker summary: the series' date range and its latest 52-week high/low signal dates."""
+    first_date: date
+    last_date: date
+    last_high_signal: Optional[date]
+    last_low_signal: Optional[date]
+
+
+def high_low_ratio(highs: int, lows: int) -> float:
+    """new_highs / new_lows with the edge cases /market/breadth has always returned."""
+    if highs > 0 and lows == 0:
+        return float("inf")
+    if highs == 0:
+        return 0.0
+    return round(highs / lows, 3)
+
+
+def _column(rows: list, field: str) -> np.ndarray:
+    # Sessions without an intraday extreme fall back to the close
+    return np.array(
+        [row.get(field) if row.get(field) is not None else row.get("close") for row in rows],
+        dtype=np.float64,
+    )
+
+
+def _last_signal(values: np.ndarray, window_starts: np.ndarray, candidates: range, sign: float) -> Optional[int]:
+    """Index of the latest candidate session that beats every prior session of its 52-week window."""
+    for i in reversed(candidates):
+        prior = values[window_starts[i]:i]
+        if np.isnan(values[i]) or not np.any(~np.isnan(prior)):
+            continue
+        if sign * values[i] > np.nanmax(sign * prior):
+            return i
+    return None
+
+
+def series_signals(rows: list) -> Optional[SeriesSignals]:
+    """
+    Summarizes one ticker's price rows (PriceDataItem dicts, any order).
+    Only sessions within SIGNAL_WINDOW of the series' last session are checked
+    for a signal. Returns None when the series holds no dated prices.
+    """
+    rows = sorted(
+        (row for row in rows or () if row.get("formatted_date") and row.get("close") is not None),
+        key=lambda row: row["formatted_date"],
+    )
+    if not rows:
+        return None
+
+    dates = np.array([row["formatted_date"][:10] for row in rows], dtype="datetime64[D]")
+    day_numbers = dates.astype(np.int64)
+    # Each session's 52-week window covers the sessions after (date - 52 weeks), up to itself
+    window_starts = np.searchsorted(day_numbers, day_numbers - FIFTY_TWO_WEEKS.days, side="right")
+    first_candidate = int(np.searchsorted(day_numbers, day_numbers[-1] - SIGNAL_WINDOW.days, side="right"))
+    candidates = range(first_candidate, len(rows))
+
+    high_idx = _last_signal(_column(rows, "high"), window_starts, candidates, 1.0)
+    low_idx = _last_signal(_column(rows, "low"), window_starts, candidates, -1.0)
+    return SeriesSignals(
+        dates[0].item(),
+        dates[-1].item(),
+        None if high_idx is None else dates[high_idx].item(),
+        None if low_idx is None else dates[low_idx].item(),
+    )
+
+
+def aggregate_breadth(
+    signals: Iterable[Optional[SeriesSignals]],
+    min_as_of: Optional[date] = None,
+    min_tickers: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Counts new highs and lows across the universe as of its latest session.
+
+    A ticker is covered when its series reaches that session and spans a full
+    52-week window (less BREADTH_HISTORY_SLACK_DAYS). Returns None when the
+    latest session is older than `min_as_of` or fewer than `min_tickers`
+    (default BREADTH_LOCAL_MIN_TICKERS) tickers are covered, so the caller can
+    fall back to the remote screener.
+    """
+    min_tickers = BREADTH_LOCAL_MIN_TICKERS if min_tickers is None else min_tickers
+    signals = [s for s in signals if s is not None]
+    if not signals:
+        return None
+
+    as_of = max(s.last_date for s in signals)
+    if min_as_of is not None and as_of < min_as_of:
+        logger.info(f"Local breadth skipped: cached series end on {as_of}, before {min_as_of}")
+        return None
+
+    history_start = as_of - FIFTY_TWO_WEEKS + timedelta(days=BREADTH_HISTORY_SLACK_DAYS)
+    signal_start = as_of - SIGNAL_WINDOW
+    covered = [s for s in signals if s.last_date == as_of and s.first_date <= history_start]
+    if len(covered) < min_tickers:
+        logger.info(f"Local breadth skipped: {len(covered)} covered tickers as of {as_of}, need {min_tickers}")
+        return None
+
+    highs = sum(1 for s in covered if s.last_high_signal is not None and s.last_high_signal > signal_start)
+    lows = sum(1 for s in covered if s.last_low_signal is not None and s.last_low_signal > signal_start)
+    return {
+        "new_highs": highs,
+        "new_lows": lows,
+        "high_low_ratio": high_low_ratio(highs, lows),
+        "as_of": as_of.isoformat(),
+        "covered_tickers": len(covered),
+    }
+
+
+def compute_breadth(
+    series_by_ticker: Mapping[str, list],
+    min_as_of: Optional[date] = None,
+    min_tickers: Optional[int] = None,
+) -> Optional[dict]:
+    """Breadth for {ticker: price rows}; see aggregate_breadth for the coverage rules."""
+    return aggregate_breadth(
+        (series_signals(rows) for rows in series_by_ticker.values()),
+        min_as_of=min_as_of,
+        min_tickers=min_tickers,
+    )
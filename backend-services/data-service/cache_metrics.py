@@ -0,0 +1,38 @@
+# backend-services/data-service/cache_metrics.py
+# Flask-Caching Redis backend that counts hits and misses per key family
+from flask_caching.backends.rediscache import RedisCache
+from prometheus_client import Counter
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Data-service cache lookups by key family (e.g. price_yfinance, financials) and result.",
+    ["keyspace", "result"],
+)
+
+
+def keyspace_of(key: str) -> str:
+    """
+    Strips the ticker/region suffix so labels stay bounded:
+    'price_yfinance_AAPL' -> 'price_yfinance', 'peers_/industry/peers/AAPL' -> 'peers'.
+    """
+    family = key.split("/", 1)[0].rsplit("_", 1)[0].rstrip("_")
+    return family or "other"
+
+
+def _record(key: str, value) -> None:
+    CACHE_REQUESTS.labels(keyspace_of(key), "miss" if value is None else "hit").inc()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache whose reads (cache.get, get_many and @cache.cached) feed CACHE_REQUESTS."""
+
+    def get(self, key: str):
+        value = super().get(key)
+        _record(key, value)
+        return value
+
+    def get_many(self, *keys: str) -> list:
+        values = super().get_many(*keys)
+        for key, value in zip(keys, values):
+            _record(key, value)
+        return values
@@ -0,0 +1,139 @@
+# backend-services/data-service/financials_store.py
+"""
+Durable per-ticker snapshots of core financials (MongoDB `financials_snapshots`).
+
+Income statements only change when a company reports, so a ticker that already
+has a snapshot is refreshed with one light quoteSummary call (quote fields, most
+recent fiscal quarter, next earnings date). The quarterly and annual statements
+are refetched only when statements_due() says a new reporting period is likely.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from pydantic import ValidationError
+from pymongo import errors
+from prometheus_client import Counter
+
+from helper_functions import _get_mongo_client
+from shared.contracts import CoreFinancials
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLLECTION = "financials_snapshots"
+# Safety net: statements are refetched at least this often even without a reporting signal
+STATEMENTS_MAX_AGE_DAYS = int(os.getenv("FINANCIALS_STATEMENTS_MAX_AGE_DAYS", "100"))
+# After a MongoDB error the store is bypassed for this long instead of stalling every fetch
+STORE_RETRY_SECONDS = int(os.getenv("FINANCIALS_STORE_RETRY_SECONDS", "60"))
+
+# Quote fields that move between reports and are taken from the light status call
+QUOTE_FIELDS = ("marketCap", "sharesOutstanding", "floatShares")
+
+FINANCIALS_REFRESHES = Counter(
+    "financials_refresh_total",
+    "Core financials refreshes by kind (full statement fetch, quote-only delta, snapshot served as-is).",
+    ["kind"],
+)
+
+
+def statements_due(snapshot: Optional[dict], status: Optional[dict], today: date) -> bool:
+    """
+    True when the stored statements are likely out of date:
+    - there is no snapshot,
+    - Yahoo reports a more recent fiscal quarter than the one stored,
+    - the next earnings date recorded with the snapshot has passed since the statements were fetched,
+    - or the statements are older than STATEMENTS_MAX_AGE_DAYS.
+    """
+    if not snapshot:
+        return True
+
+    stored_quarter = snapshot.get("last_fiscal_quarter")
+    reported_quarter = (status or {}).get("mostRecentQuarter")
+    if reported_quarter and (not stored_quarter or reported_quarter > stored_quarter):
+        return True
+
+    fetched_on = snapshot["statements_fetched_at"].date()
+    next_earnings = snapshot.get("next_earnings_date")
+    if next_earnings and fetched_on.isoformat() <= next_earnings < today.isoformat():
+        return True
+
+    return (today - fetched_on).days > STATEMENTS_MAX_AGE_DAYS
+
+
+class FinancialsSnapshotStore:
+    """Reads and writes snapshots; every MongoDB failure degrades to "no snapshot"."""
+
+    def __init__(self, collection_getter=None, clock=time.monotonic):
+        self._collection_getter = collection_getter or (lambda: _get_mongo_client().stock_analysis[SNAPSHOT_COLLECTION])
+        self._clock = clock
+        self._unavailable_until = 0.0
+        self._index_ready = False
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        if self._clock() < self._unavailable_until:
+            return None
+        collection = self._collection_getter()
+        if not self._index_ready:
+            with self._lock:
+                if not self._index_ready:
+                    collection.create_index([("ticker", 1)], unique=True, name="ticker_unique_idx")
+                    self._index_ready = True
+        return collection
+
+    def _failed(self, action: str, ticker: str, error: Exception) -> None:
+        self._unavailable_until = self._clock() + STORE_RETRY_SECONDS
+        logger.warning(f"Financials snapshot {action} failed for {ticker}; bypassing the store for {STORE_RETRY_SECONDS}s: {error}")
+
+    def get(self, ticker: str) -> Optional[dict]:
+        try:
+            collection = self._collection()
+            return collection.find_one({"ticker": ticker}, {"_id": 0}) if collection is not None else None
+        except errors.PyMongoError as e:
+            self._failed("read", ticker, e)
+            return None
+
+    def _upsert(self, ticker: str, fields: dict) -> None:
+        try:
+            collection = self._collection()
+            if collection is not None:
+                collection.update_one({"ticker": ticker}, {"$set": {"ticker": ticker, **fields}}, upsert=True)
+        except errors.PyMongoError as e:
+            self._failed("write", ticker, e)
+
+    def save_statements(self, ticker: str, data: dict, status: Optional[dict]) -> None:
+        """Stores a full fetch. Data that does not satisfy the CoreFinancials contract is not stored."""
+        try:
+            clean = CoreFinancials.model_validate(data).model_dump(by_alias=True)
+        except ValidationError:
+            return
+        now = datetime.now(timezone.utc)
+        status = status or {}
+        self._upsert(ticker, {
+            "data": clean,
+            # Quarter of the statements actually fetched; Yahoo's status can run ahead of them
+            "last_fiscal_quarter": data.get("lastFiscalQuarter") or status.get("mostRecentQuarter"),
+            "next_earnings_date": status.get("nextEarningsDate"),
+            "statements_fetched_at": now,
+            "refreshed_at": now,
+        })
+
+    def save_quote(self, ticker: str, snapshot: dict, status: Optional[dict]) -> dict:
+        """Merges the quote fields of a status call into the snapshot and returns the refreshed data."""
+        data = dict(snapshot["data"])
+        if not status:
+            return data
+        data.update({field: status[field] for field in QUOTE_FIELDS if status.get(field) is not None})
+        self._upsert(ticker, {
+            "data": data,
+            "next_earnings_date": status.get("nextEarningsDate") or snapshot.get("next_earnings_date"),
+            "refreshed_at": datetime.now(timezone.utc),
+        })
+        return data
+
+
+# Process-wide store used by the financials provider
+snapshot_store = FinancialsSnapshotStore()
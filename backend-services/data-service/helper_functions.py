@@ -3,15 +3,19 @@ import logging
 from pymongo import MongoClient, errors
 from datetime import datetime, timezone, date, timedelta
 import os
+import threading
+import time
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from pydantic import ValidationError, TypeAdapter
+from pydantic import ValidationError
 from shared.contracts import (
+    get_type_adapter,
+    validate_trusted,
     PriceDataItem, 
     CoreFinancials,
 )
 from providers.yfin.market_data_provider import ReturnCalculator
-import pandas_market_calendars as mcal
+from shared.trading_calendar import TradingCalendar, get_trading_calendar as get_shared_trading_calendar
 import statistics
 
 # Use logger
@@ -37,7 +41,7 @@ def validate_and_prepare_price_data(data: list, ticker: str) -> list | None:
     if not data:
         return None
     try:
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
         validated_items = PriceDataValidator.validate_python(data)
         # Convert back to a list of dicts for JSON serialization
         return [item.model_dump() for item in validated_items]
@@ -45,6 +49,20 @@ def validate_and_prepare_price_data(data: list, ticker: str) -> list | None:
         logger.error(f"Price data for {ticker} failed contract validation: {e}")
         return None
 
+def validate_cached_price_data(data: list, ticker: str) -> list | None:
+    """
+    Cheap check of price data read back from our own cache. Entries are only
+    written after validate_and_prepare_price_data, so the rows are spot-checked
+    (first and last) and returned as-is instead of being re-validated row by row.
+    """
+    if not data:
+        return None
+    try:
+        return validate_trusted(List[PriceDataItem], data)
+    except ValidationError as e:
+        logger.error(f"Cached price data for {ticker} failed contract validation: {e}")
+        return None
+
 
 def validate_and_prepare_financials(data: dict, ticker: str):
     """
@@ -168,44 +186,96 @@ def check_market_trend_context(index_data, details):
         # Handle any errors gracefully
         details.update(failed_check(metric_key, f"An unexpected error occurred: {str(e)}", trend='Unknown'))
 
+# --- Delisted ticker status ---
+# One pooled MongoClient is shared by all status reads/writes, and reads are answered
+# from an in-memory set that is loaded once and refreshed periodically, so the hot
+# per-ticker pre-flight check never touches the network.
+DELISTED_REFRESH_SECONDS = int(os.getenv("DELISTED_REFRESH_SECONDS", "300"))
+
+_MONGO_CLIENT = None
+_MONGO_CLIENT_LOCK = threading.Lock()
+
+def _get_mongo_client() -> MongoClient:
+    """Returns the process-wide pooled MongoClient, creating it on first use."""
+    global _MONGO_CLIENT
+    if _MONGO_CLIENT is None:
+        with _MONGO_CLIENT_LOCK:
+            if _MONGO_CLIENT is None:
+                mongo_uri = os.getenv("MONGO_URI", "mongodb://mongodb:27017/")
+                # Short server selection timeout so a DB outage never blocks a request for long
+                _MONGO_CLIENT = MongoClient(mongo_uri, serverSelectionTimeoutMS=2000)
+    return _MONGO_CLIENT
+
+def _ticker_status_collection():
+    return _get_mongo_client().stock_analysis.ticker_status
+
+class _DelistedTickerSet:
+    """In-memory view of the ticker_status collection, refreshed every DELISTED_REFRESH_SECONDS."""
+    def __init__(self, refresh_seconds: int = DELISTED_REFRESH_SECONDS, clock=time.monotonic):
+        self._tickers: set = set()
+        self._marked_here: dict = {}  # ticker -> mark time; kept for one interval even if the DB write failed
+        self._refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._next_refresh = 0.0  # forces a load on first use
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Reloads the set from MongoDB. On failure keeps the current set and retries after the next interval."""
+        self._next_refresh = self._clock() + self._refresh_seconds
+        try:
+            docs = _ticker_status_collection().find({}, {"ticker": 1, "_id": 0})
+            loaded = {doc["ticker"] for doc in docs if doc.get("ticker")}
+            # Local marks are dropped by the first successful reload after they have aged one
+            # interval, so failed writes are not remembered forever and re-listings are picked up
+            cutoff = self._clock() - self._refresh_seconds
+            self._marked_here = {t: at for t, at in self._marked_here.items() if at > cutoff}
+            self._tickers = loaded | set(self._marked_here)
+            logger.info(f"Loaded {len(self._tickers)} delisted tickers into memory.")
+            return True
+        except errors.PyMongoError as e:
+            # Better to attempt API calls than to fail because of a transient DB issue
+            logger.warning(f"Could not load delisted tickers from MongoDB: {e}")
+            return False
+
+    def _refresh_if_stale(self):
+        if self._clock() < self._next_refresh:
+            return
+        # Only one thread reloads; the others keep answering from the current set
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                if self._clock() >= self._next_refresh:
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def __contains__(self, ticker: str) -> bool:
+        self._refresh_if_stale()
+        return ticker in self._tickers
+
+    def add(self, ticker: str):
+        # Copy-on-write so concurrent readers never see a set mid-update
+        self._marked_here = {**self._marked_here, ticker: self._clock()}
+        self._tickers = self._tickers | {ticker}
+
+_DELISTED_TICKERS = _DelistedTickerSet()
+
+def load_delisted_tickers() -> bool:
+    """Loads the delisted ticker set at startup so the first requests do not pay for it."""
+    return _DELISTED_TICKERS.refresh()
+
 def is_ticker_delisted(ticker: str) -> bool:
     """
-    Checks the ticker_status collection to see if a ticker has been marked as delisted.
-    Returns True if the ticker is found in the collection, False otherwise.
+    Checks whether a ticker has been marked as delisted in the ticker_status collection.
+    Answered from the in-memory set; returns False if the status could never be loaded.
     """
-    client = None  # Initialize client to None
-    try:
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://mongodb:27017/")
-        # Use a short timeout to avoid blocking the request for too long
-        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=2000)
-        db = client.stock_analysis
-        ticker_status_coll = db.ticker_status
-        
-        # Check if a document with the ticker exists. count_documents is efficient.
-        count = ticker_status_coll.count_documents({"ticker": ticker}, limit=1)
-        
-        if count > 0:
-            logger.debug(f"Pre-flight check: Ticker {ticker} is known to be delisted. Skipping API call.")
-            return True
-        return False
-        
-    except errors.PyMongoError as e:
-        # If the DB check fails, log it but don't block the request.
-        # It's better to attempt the API call than to fail because of a transient DB issue.
-        logger.warning(f"Could not check delisted status for {ticker} from MongoDB: {e}")
-        return False
-    finally:
-        if client:
-            client.close()
+    if ticker in _DELISTED_TICKERS:
+        logger.debug(f"Pre-flight check: Ticker {ticker} is known to be delisted. Skipping API call.")
+        return True
+    return False
 
 def mark_ticker_as_delisted(ticker: str, reason: str):
     """Writes a ticker's status as 'delisted' to the ticker_status collection."""
     try:
-        mongo_uri = os.getenv("MONGO_URI", "mongodb://mongodb:27017/")
-        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-        db = client.stock_analysis
-        ticker_status_coll = db.ticker_status
-        
         update_doc = {
             "$set": {
                 "ticker": ticker,
@@ -214,13 +284,13 @@ def mark_ticker_as_delisted(ticker: str, reason: str):
                 "last_updated": datetime.now(timezone.utc)
             }
         }
-        ticker_status_coll.update_one({"ticker": ticker}, update_doc, upsert=True)
+        _ticker_status_collection().update_one({"ticker": ticker}, update_doc, upsert=True)
         logger.info(f"Marked ticker {ticker} as delisted in the database. Reason: {reason}")
     except errors.PyMongoError as e:
         logger.error(f"Failed to write delisted status for {ticker} to MongoDB: {e}")
     finally:
-        if 'client' in locals() and client:
-            client.close()
+        # Skip the ticker in this process right away, even if the write failed
+        _DELISTED_TICKERS.add(ticker)
 
 # helper to check if cached data covers the requested period/date range
 # trading-day-aware cache coverage validation using pandas_market_calendars
@@ -233,9 +303,6 @@ def cache_covers_request(cached_data: list, req_period: str | None, req_start: s
         return False
 
     try:
-        import pandas_market_calendars as mcal
-        from datetime import datetime, date, timedelta
-
         # Extract cache bounds from valid date entries only
         dates = [d for d in (item.get("formatted_date") for item in cached_data) if d]
         if not dates:
@@ -268,37 +335,15 @@ def cache_covers_request(cached_data: list, req_period: str | None, req_start: s
             # use the previous completed trading day instead of calendar yesterday
             last_completed_session = previous_trading_day(date.today())
             anchor_end = min(last_completed_session, cache_end_dt)
-            nyse = mcal.get_calendar("NYSE")
-            approx_back = max(365, int(count * 3))
-            approx_start = anchor_end - timedelta(days=approx_back)
-
-            # Build schedule
-            schedule = nyse.schedule(start_date=approx_start, end_date=anchor_end)
-            logger.info(
-                f"coverage:calendar schedule: len={len(schedule.index)}, "
-                f"first={(schedule.index[0].date() if not schedule.empty else None)}, "
-                f"last={(schedule.index[-1].date() if not schedule.empty else None)}"
-            )
-            # treat a DataFrame with only an index as valid if the index has length
-            idx = getattr(schedule, "index", None)
-            idx_len = (len(idx) if idx is not None else 0)
-            logger.info(
-                f"coverage:calendar schedule: len={idx_len}, "
-                f"first={(idx[0].date() if idx_len > 0 else None)}, "
-                f"last={(idx[-1].date() if idx_len > 0 else None)}"
-            )
-
-            if idx is None or idx_len == 0:
-                logger.info("coverage:calendar index empty → decision=False")
-                return False
-
-            # compute required_start directly from the last `count` sessions
-            if idx_len >= count:
-                required_start_dt = idx[-count].date()
-                logger.info(f"coverage:required_start(length-based)={required_start_dt} (count={count})")
-            else:
-                required_start_dt = idx[0].date()
+            # O(log n) lookup in the precomputed session index instead of building a schedule per check
+            cal = get_trading_calendar()
+            required_start_dt = cal.sessions_back(anchor_end, count)
+            if required_start_dt is None:
+                # Index does not reach back `count` sessions; require coverage from its first session
+                required_start_dt = cal.first_session
                 logger.info(f"coverage:required_start(fallback first)={required_start_dt} (len<{count})")
+            else:
+                logger.info(f"coverage:required_start(length-based)={required_start_dt} (count={count})")
 
             decision = (cache_start_dt <= required_start_dt)
             logger.info(f"coverage:decision start={cache_start_dt} required_start={required_start_dt} -> {decision}")
@@ -314,47 +359,21 @@ def cache_covers_request(cached_data: list, req_period: str | None, req_start: s
 # Allowed yfinance periods (kept consistent with original route logic)
 ALLOWED_YF_PERIODS = {"1mo","3mo","6mo","1y","2y","5y","10y","ytd","max"}
 
-# Trading calendar cache
-_TRADING_CAL = None
-
-# Get (and cache) NYSE calendar
-def get_trading_calendar():
-    global _TRADING_CAL
-    if _TRADING_CAL is None:
-        # NYSE symbol stays consistent with existing codebase imports
-        _TRADING_CAL = mcal.get_calendar('NYSE')
-    return _TRADING_CAL
+# Get the shared, precomputed NYSE session index
+def get_trading_calendar() -> TradingCalendar:
+    return get_shared_trading_calendar()
 
 # Compute previous trading day before d (skip weekends/holidays)
 def previous_trading_day(d: date) -> date:
-    cal = get_trading_calendar()
-
-    # Look back a small window for the most recent session strictly before d
-    start = d - timedelta(days=10)
-    end = d
-
-    sched = cal.schedule(start_date=start, end_date=end)
-    if not sched.empty:
-        sessions = [ts.date() for ts in sched.index]
-        prior = [s for s in sessions if s < d]
-        if prior:
-            return prior[-1]
-
-    # Fallback: if calendar returns nothing, move 1 day backward
-    return d - timedelta(days=1)
+    prior = get_trading_calendar().previous_session(d)
+    # Fallback: if the index does not reach d, move 1 day backward
+    return prior or d - timedelta(days=1)
 
 # Compute next trading day after d (skip weekends/holidays)
 def next_trading_day(d: date) -> date:
-    cal = get_trading_calendar()
-    # Search a small forward window for the next session
-    start = d + timedelta(days=1)
-    end = d + timedelta(days=10)
-    sched = cal.schedule(start_date=start, end_date=end)
-    if not sched.empty:
-        # The first index is the next trading session date (tz-naive date from Timestamp)
-        return sched.index[0].date()
-    # Fallback: if calendar returns nothing, move 1 day forward
-    return d + timedelta(days=1)
+    following = get_trading_calendar().next_session(d)
+    # Fallback: if the index does not reach d, move 1 day forward
+    return following or d + timedelta(days=1)
 
 def plan_incremental_price_fetch(
     cached_data: list | None,
@@ -362,7 +381,7 @@ def plan_incremental_price_fetch(
     req_start: str | None,
     *,
     today: date | None = None,
-    validate_fn=validate_and_prepare_price_data,
+    validate_fn=validate_cached_price_data,
     covers_fn=cache_covers_request,
 ):
     """
@@ -492,6 +511,24 @@ def _dedup_merge_by_date(old_list: list, new_list: list) -> list:
         return k or ''
     return sorted(by_key.values(), key=_key)
 
+# Upper bound on keys per MGET so one reply never has to carry an entire universe of price series
+CACHE_MGET_CHUNK_SIZE = int(os.getenv("CACHE_MGET_CHUNK_SIZE", "200"))
+
+# batched cache reader for the batch endpoints
+def cache_get_many(cache, keys: List[str], chunk_size: int = CACHE_MGET_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Resolves many cache keys with one MGET per chunk instead of one GET per key.
+    Goes through Flask-Caching's get_many, so the configured CACHE_KEY_PREFIX
+    (e.g. "datasvc:") and serializer are applied exactly as for cache.get.
+    Returns {key: value}, with None for misses; duplicate keys are read once.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    values: Dict[str, Any] = {}
+    for i in range(0, len(unique_keys), max(1, chunk_size)):
+        chunk = unique_keys[i:i + chunk_size]
+        values.update(zip(chunk, cache.get_many(*chunk)))
+    return values
+
 # shared merger + cache writer
 def finalize_price_response(
     cache_key: str,
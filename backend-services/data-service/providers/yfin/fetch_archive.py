@@ -0,0 +1,167 @@
+# backend-services/data-service/providers/yfin/fetch_archive.py
+"""
+Sampled, size-capped archive of raw financials fetches.
+
+Fetch threads make a sampling decision, serialize the sampled record to a JSON
+line and enqueue it without blocking, so later changes to the caller's payload
+cannot leak into the archive; a single background thread appends the lines to
+an active segment. When
+the segment reaches FINANCIALS_ARCHIVE_MAX_BYTES it is gzip-compressed into a
+timestamped file and the oldest compressed segments beyond
+FINANCIALS_ARCHIVE_BACKUP_COUNT are deleted. When the queue is full the record
+is dropped (and counted) rather than slowing the fetch down.
+"""
+
+import datetime as dt
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import shutil
+import threading
+from typing import Callable, Optional
+
+import pandas as pd
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("FINANCIALS_ARCHIVE_DIR", "/app/logs/finance_fetches")
+ARCHIVE_SAMPLE_RATE = float(os.getenv("FINANCIALS_ARCHIVE_SAMPLE_RATE", "0.05"))
+ARCHIVE_MAX_BYTES = int(os.getenv("FINANCIALS_ARCHIVE_MAX_BYTES", str(16 * 1024 * 1024)))
+ARCHIVE_BACKUP_COUNT = int(os.getenv("FINANCIALS_ARCHIVE_BACKUP_COUNT", "10"))
+ARCHIVE_QUEUE_SIZE = int(os.getenv("FINANCIALS_ARCHIVE_QUEUE_SIZE", "256"))
+
+ARCHIVE_RECORDS = Counter(
+    "financials_archive_records_total",
+    "Financials fetch dumps by outcome (written, dropped on a full queue, failed to write).",
+    ["result"],
+)
+
+ACTIVE_SEGMENT = "financials.jsonl"
+_STOP = object()
+
+
+def _json_default(obj):
+    if isinstance(obj, (pd.Timestamp, dt.datetime, dt.date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+class FetchArchiveWriter:
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = ARCHIVE_SAMPLE_RATE,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+        backup_count: int = ARCHIVE_BACKUP_COUNT,
+        queue_size: int = ARCHIVE_QUEUE_SIZE,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._rng = rng
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._rotations = 0
+
+    # --- Producer side (fetch threads) ---
+
+    def submit(self, ticker: str, payload: dict) -> bool:
+        """Samples and enqueues one fetch dump without blocking. Returns True if it was queued."""
+        if self.sample_rate <= 0 or self._rng() >= self.sample_rate:
+            return False
+        self._ensure_started()
+        record = {"ticker": ticker, "fetched_at": dt.datetime.now(dt.timezone.utc).isoformat(), "data": payload}
+        try:
+            line = json.dumps(record, default=_json_default, separators=(",", ":"))
+        except Exception as e:
+            ARCHIVE_RECORDS.labels("failed").inc()
+            logger.error(f"Failed to serialize financials fetch for {ticker}: {e}")
+            return False
+        try:
+            self._queue.put_nowait((ticker, line))
+            return True
+        except queue.Full:
+            ARCHIVE_RECORDS.labels("dropped").inc()
+            return False
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Drains queued records, closes the active segment and stops the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="financials-archive", daemon=True)
+                self._thread.start()
+
+    # --- Writer thread ---
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                self._close_segment()
+                return
+            ticker, line = record
+            try:
+                self._write(line)
+                ARCHIVE_RECORDS.labels("written").inc()
+            except Exception as e:
+                ARCHIVE_RECORDS.labels("failed").inc()
+                logger.error(f"Failed to archive financials fetch for {ticker}: {e}")
+            # Flush when caught up, so a crash loses at most the burst in flight
+            if self._queue.empty() and self._file is not None:
+                self._file.flush()
+
+    def _active_path(self) -> str:
+        return os.path.join(self.directory, ACTIVE_SEGMENT)
+
+    def _write(self, line: str) -> None:
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self._active_path(), "a", encoding="utf-8")
+        self._file.write(line + "\n")
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._close_segment()
+        self._rotations += 1
+        stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%dT%H%M%S")
+        target = os.path.join(self.directory, f"financials-{stamp}-{self._rotations:04d}.jsonl.gz")
+        with open(self._active_path(), "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self._active_path())
+        self._prune()
+
+    def _prune(self) -> None:
+        # Names sort chronologically: UTC timestamp, then rotation sequence
+        segments = sorted(
+            name for name in os.listdir(self.directory) if name.startswith("financials-") and name.endswith(".jsonl.gz")
+        )
+        for name in segments[:max(0, len(segments) - self.backup_count)]:
+            os.remove(os.path.join(self.directory, name))
+
+
+# Process-wide writer used by the financials provider
+archive = FetchArchiveWriter(ARCHIVE_DIR)
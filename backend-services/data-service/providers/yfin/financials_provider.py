@@ -4,13 +4,13 @@ import datetime as dt
 import pandas as pd
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from . import yahoo_client, price_provider # Use relative import
+from . import yahoo_client, price_provider, fetch_archive # Use relative import
 from helper_functions import is_ticker_delisted, mark_ticker_as_delisted
+from financials_store import snapshot_store, statements_due, FINANCIALS_REFRESHES
 from curl_cffi import requests as cffi_requests
 
 #DEBUG
 import logging
-import json
 
 # Proxies are now loaded from an environment variable for better configuration management.
 import os # Add os import for environment variable access
@@ -78,14 +78,7 @@ def _fetch_financials_with_yfinance(ticker):
             logger.debug(f"yfinance info missing key fields for {ticker}.")
             return None
 
-        # --- DEBUGGING BLOCK ---
-    # Print the exact data received to the container's logs
-        print("--- LEADERSHIP-SERVICE DEBUG ---", flush=True)
-        print(f"Data received from data-service for {ticker}:", flush=True)
-        # # Use json.dumps for pretty-printing the dictionary
-        print(json.dumps(info, indent=2), flush=True)
-        print("--- END DEBUG ---", flush=True)
-        # --- END DEBUGGING BLOCK ---
+        logger.debug(f"yfinance info received for {ticker} ({len(info)} fields).")
 
         # --- IPO Date Handling ---
         # Yahoo Finance provides the 'firstTradeDateEpoch', which is the timestamp
@@ -160,6 +153,14 @@ def _fetch_financials_with_yfinance(ticker):
                         record[key] = None
             return records
 
+        # Period end of the newest quarterly statement, used to detect the next report
+        last_fiscal_quarter = None
+        if q_income_stmt is not None and not q_income_stmt.empty:
+            try:
+                last_fiscal_quarter = max(pd.to_datetime(q_income_stmt.columns)).strftime('%Y-%m-%d')
+            except (ValueError, TypeError):
+                logger.debug(f"Quarterly statement periods for {ticker} are not dates.")
+
         quarterly_financials = format_income_statement(q_income_stmt)
         annual_financials = format_income_statement(a_income_stmt)
 
@@ -175,35 +176,15 @@ def _fetch_financials_with_yfinance(ticker):
             'annual_earnings': annual_financials,
             'quarterly_earnings': quarterly_financials,
             'quarterly_financials': quarterly_financials, # Retained for compatibility
+            'lastFiscalQuarter': last_fiscal_quarter,
             # Also include the raw info object for complete debugging if needed
             'raw_info': info 
         }
 
-        # --- LOGGING/SAVING BLOCK ---
-        # Save the *final constructed data object* to a structured log file.
-        try:
-            log_dir = os.path.join('/app/logs', 'finance_fetches')
-            date_str = dt.datetime.now().strftime('%Y-%m-%d')
-            ticker_log_dir = os.path.join(log_dir, date_str)
-            os.makedirs(ticker_log_dir, exist_ok=True)
-            
-            # 1. Save the clean, structured JSON file
-            json_file_path = os.path.join(ticker_log_dir, f"{ticker}.json")
-            with open(json_file_path, 'w') as f:
-                # Use a custom encoder to handle potential non-serializable data like NaN
-                class CustomEncoder(json.JSONEncoder):
-                    def default(self, obj):
-                        if isinstance(obj, float) and (obj != obj):  # NaN
-                            return None
-                        if isinstance(obj, (pd.Timestamp, dt.datetime, dt.date)):
-                            return obj.isoformat()  # Or str(obj) for a simple string representation
-                        return json.JSONEncoder.default(self, obj)
-                json.dump(final_data_object, f, indent=4, cls=CustomEncoder)
-            logger.debug(f"Successfully saved structured financial data for {ticker} to {json_file_path}")
-        
-        except Exception as log_e:
-            logger.error(f"Failed to save financial fetch logs for {ticker}: {log_e}")
-        # --- END LOGGING/SAVING BLOCK ---
+        # --- ARCHIVE ---
+        # A sample of fetches is archived by a background writer (see fetch_archive); never blocks this thread.
+        # Sampled records are serialized inside submit(), so deleting raw_info below cannot race the writer.
+        fetch_archive.archive.submit(ticker, final_data_object)
 
         # Return the final data object
         del final_data_object['raw_info']
@@ -218,7 +199,7 @@ def _fetch_financials_with_fallback(ticker_symbol, start_time):
     logger.debug(f"Primary yfinance fetch failed for {ticker_symbol} (likely delisted or no summary data). Falling back to direct API.")
     try:
         modules = "summaryDetail,assetProfile,financialData,defaultKeyStatistics,incomeStatementHistory,incomeStatementHistoryQuarterly,balanceSheetHistory,cashflowStatementHistory"
-        url = f"https://query1.finance.yahoo.com/v10/finance/quoteSummary/{ticker_symbol}"
+        url = f"{yahoo_client.YAHOO_BASE_URL}/v10/finance/quoteSummary/{ticker_symbol}"
         params = {"modules": modules}
         response = yahoo_client.execute_request(url, params=params)
 
@@ -262,7 +243,8 @@ def _fetch_financials_with_fallback(ticker_symbol, start_time):
             'ipoDate': (default_key_stats.get('ipoDate') or {}).get('fmt'), 
             'annual_earnings': annual_earnings_list,
             'quarterly_earnings': quarterly_earnings_list,
-            'quarterly_financials': quarterly_earnings_list
+            'quarterly_financials': quarterly_earnings_list,
+            'lastFiscalQuarter': (default_key_stats.get('mostRecentQuarter') or {}).get('fmt'),
         }
         
         duration = time.time() - start_time
@@ -283,12 +265,60 @@ def _fetch_financials_with_fallback(ticker_symbol, start_time):
         return None
 
 
+def get_reporting_status(ticker_symbol: str) -> dict | None:
+    """
+    One light quoteSummary call (no statements) returning the quote fields that move
+    between reports plus the reporting signals used by the snapshot store:
+    {'marketCap', 'sharesOutstanding', 'floatShares', 'mostRecentQuarter', 'nextEarningsDate'}.
+    Returns None if the call fails.
+    """
+    try:
+        url = f"{yahoo_client.YAHOO_BASE_URL}/v10/finance/quoteSummary/{ticker_symbol}"
+        response = yahoo_client.execute_request(url, params={"modules": "summaryDetail,defaultKeyStatistics,calendarEvents"})
+        result = ((response or {}).get("quoteSummary") or {}).get("result") or []
+        if not result:
+            return None
+        info = result[0]
+        summary_detail = info.get('summaryDetail') or {}
+        default_key_stats = info.get('defaultKeyStatistics') or {}
+        earnings_dates = ((info.get('calendarEvents') or {}).get('earnings') or {}).get('earningsDate') or []
+        upcoming = sorted(d.get('fmt') for d in earnings_dates if isinstance(d, dict) and d.get('fmt'))
+        return {
+            'marketCap': (summary_detail.get('marketCap') or {}).get('raw'),
+            'sharesOutstanding': (default_key_stats.get('sharesOutstanding') or {}).get('raw'),
+            'floatShares': (default_key_stats.get('floatShares') or {}).get('raw'),
+            'mostRecentQuarter': (default_key_stats.get('mostRecentQuarter') or {}).get('fmt'),
+            'nextEarningsDate': upcoming[0] if upcoming else None,
+        }
+    except Exception as e:
+        logger.warning(f"Reporting status call failed for {ticker_symbol}: {e}")
+        return None
+
+def _fetch_core_financials(ticker_symbol: str, start_time: float) -> dict | None:
+    """Full fetch including statements: yfinance library first, direct API call as the fallback."""
+    try:
+        # --- Primary Fetching Strategy (yfinance library) ---
+        # Prioritize fetching with the yfinance helper function.
+        extended_financials_data = _fetch_financials_with_yfinance(ticker_symbol)
+        if extended_financials_data:
+            duration = time.time() - start_time
+            logger.debug(f"yfinance library call for {ticker_symbol} took {duration:.2f} seconds.")
+            return extended_financials_data
+    except Exception as e:
+        logger.warning(f"Primary yfinance fetch for {ticker_symbol} failed with error: {e}. Attempting fallback.")
+
+    # --- Fallback Fetching Strategy (Direct API Call) ---
+    logger.debug(f"Primary yfinance fetch failed for {ticker_symbol} (likely delisted or no summary data). Falling back to direct API.")
+    return _fetch_financials_with_fallback(ticker_symbol, start_time)
+
 def get_core_financials(ticker_symbol: str) -> dict | None:
     """
     Fetches core financial data points required for Leadership Profile screening.
     For S&P 500 (^GSPC), returns market data including current price, SMAs, and 52-week highs/lows.
     For other tickers, returns standard financial data.
     This function now prioritizes the yfinance library and uses the direct API call as a fallback.
+    Tickers with a stored snapshot only get a light status call; their statements are
+    refetched when financials_store.statements_due() expects a new reporting period.
     """
     start_time = time.time()
     logger.debug(f"Attempting to get core financials for {ticker_symbol}")
@@ -323,20 +353,25 @@ def get_core_financials(ticker_symbol: str) -> dict | None:
         }
         return data
     
-    try:
-        # --- Primary Fetching Strategy (yfinance library) ---
-        # Prioritize fetching with the yfinance helper function.
-        extended_financials_data = _fetch_financials_with_yfinance(ticker_symbol)
-        if extended_financials_data:
-            duration = time.time() - start_time
-            logger.debug(f"yfinance library call for {ticker_symbol} took {duration:.2f} seconds.")
-            return extended_financials_data
-    except Exception as e:
-        logger.warning(f"Primary yfinance fetch for {ticker_symbol} failed with error: {e}. Attempting fallback.")
-
-    # --- Fallback Fetching Strategy (Direct API Call) ---
-    logger.debug(f"Primary yfinance fetch failed for {ticker_symbol} (likely delisted or no summary data). Falling back to direct API.")
-    return _fetch_financials_with_fallback(ticker_symbol, start_time)
+    # --- Snapshot Delta Refresh ---
+    snapshot = snapshot_store.get(ticker_symbol)
+    status = get_reporting_status(ticker_symbol) if snapshot else None
+    if snapshot and not statements_due(snapshot, status, dt.date.today()):
+        FINANCIALS_REFRESHES.labels("quote" if status else "snapshot").inc()
+        logger.debug(f"Statements for {ticker_symbol} are current (quarter {snapshot.get('last_fiscal_quarter')}); refreshed quote fields only.")
+        return snapshot_store.save_quote(ticker_symbol, snapshot, status)
+
+    data = _fetch_core_financials(ticker_symbol, start_time)
+    if data:
+        FINANCIALS_REFRESHES.labels("full").inc()
+        snapshot_store.save_statements(ticker_symbol, data, status)
+        return data
+    if snapshot:
+        # Stale statements beat no statements when the full fetch fails
+        FINANCIALS_REFRESHES.labels("snapshot").inc()
+        logger.warning(f"Full financials fetch failed for {ticker_symbol}; serving the stored snapshot.")
+        return snapshot_store.save_quote(ticker_symbol, snapshot, status)
+    return None
         
 def get_batch_core_financials(tickers: list[str], executor: ThreadPoolExecutor) -> dict:
     """
@@ -14,6 +14,7 @@ import os
 import re
 
 from . import yahoo_client, price_provider # Use relative import
+from breadth_engine import high_low_ratio
 
 #DEBUG
 import logging
@@ -569,12 +570,4 @@ class MarketBreadthFetcher:
         highs = self._get_total("high", self.region)
         lows = self._get_total("low", self.region)
 
-        # ratio semantics expected by tests
-        if highs > 0 and lows == 0:
-            ratio = float("inf")
-        elif highs == 0:
-            ratio = 0.0
-        else:
-            ratio = round(highs / lows, 3)
-
-        return {"new_highs": highs, "new_lows": lows, "high_low_ratio": ratio}
\ No newline at end of file
+        return {"new_highs": highs, "new_lows": lows, "high_low_ratio": high_low_ratio(highs, lows)}
\ No newline at end of file
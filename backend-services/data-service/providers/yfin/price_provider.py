@@ -121,7 +121,7 @@ def _get_single_ticker_data(ticker: str, start_date: dt.date = None, period: str
     # This section determines the appropriate Yahoo Finance API URL based on whether
     # a `start_date` for an incremental fetch or a period (e.g., "1y") is provided. This supports incremental data fetching.
 
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{sanitized_ticker}"
+    url = f"{yahoo_client.YAHOO_BASE_URL}/v8/finance/chart/{sanitized_ticker}"
     params = _build_chart_params(period, start_date, interval=interval)
     try:
         resp_json = yahoo_client.execute_request(url, params=params)
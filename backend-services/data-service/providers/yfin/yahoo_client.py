@@ -4,9 +4,10 @@ import logging
 from functools import wraps
 from curl_cffi import requests as cffi_requests
 from curl_cffi.requests import errors as cffi_errors
-import os, time, json, random, threading
+import os, time, json, random, threading, copy, weakref
 from typing import Optional, Dict, Any, List, Tuple
 import time
+from prometheus_client import Counter
 
 from . import webshare_proxies # Use relative import
 
@@ -17,6 +18,11 @@ logger = logging.getLogger(__name__)
 _POOL_SIZE = int(os.getenv("YF_POOL_SIZE", "12"))
 _TIMEOUT = int(os.getenv("YF_REQUEST_TIMEOUT", "12"))
 _CRUMB_TTL_SECONDS = int(os.getenv("YF_CRUMB_TTL_SECONDS", "600"))
+# Yahoo API origin for crumb, chart and quoteSummary calls (overridden by the offline benchmark stub)
+YAHOO_BASE_URL = os.getenv("YF_BASE_URL", "https://query1.finance.yahoo.com").rstrip("/")
+
+# Outcome of every Yahoo data call per pool identity; status is the HTTP code, or "error" when no response arrived
+YAHOO_REQUESTS = Counter("yahoo_requests_total", "Yahoo API calls by pool identity and HTTP status.", ["identity", "status"])
 
 # simple health tracking and weighted pick
 _ID_HEALTH = {}  # identity_id -> {'fail': int, 'cooldown_until': ts}
@@ -93,7 +99,8 @@ def _get_random_proxy() -> dict | None:
 
 # identity structure and pool
 class _Identity:
-    def __init__(self):
+    def __init__(self, label: str = "adhoc"):
+        self.label = label  # pool slot, stable across rotations (metrics label)
         self.lock = threading.RLock()
         self.session = None
         self.crumb: Optional[str] = None
@@ -128,8 +135,10 @@ class _Identity:
     def _refresh_crumb_locked(self, reason: str = "initial") -> Optional[str]:
         headers = {"User-Agent": _get_random_user_agent()}
         try:
+            # Crumb fetches hit Yahoo too; they take tokens like any data call
+            _GOVERNOR.acquire(self)
             resp = self.session.get(
-                "https://query1.finance.yahoo.com/v1/test/getcrumb",
+                f"{YAHOO_BASE_URL}/v1/test/getcrumb",
                 headers=headers,
                 proxies=self.proxy,
                 impersonate=self.profile,
@@ -174,7 +183,7 @@ def init_pool(size: int = _POOL_SIZE):
                         break
                     time.sleep(0.1)
             # build a fresh local pool first
-            local_pool = [_Identity() for _ in range(max(1, size))]
+            local_pool = [_Identity(label=str(slot)) for slot in range(max(1, size))]
             # opportunistic crumb prime; failures are tolerated
             for ident in local_pool:
                 try:
@@ -188,12 +197,112 @@ def init_pool(size: int = _POOL_SIZE):
         except Exception as e:
             logger.warning(f"Yahoo client pool init failed: {e}")
 
+# --- Rate governor ---
+# Paces requests before they are sent instead of reacting to 429s after the fact.
+# A global bucket caps the process-wide request rate, per-identity buckets spread load
+# across the pool, and 429s halve the effective rate (recovering gradually on success).
+# Crumb fetches are paced like data calls. The global cap defaults to what the pool's
+# identity buckets allow together, so it only binds when set explicitly lower.
+_IDENTITY_RPS = float(os.getenv("YF_IDENTITY_RPS", "2"))
+_IDENTITY_BURST = float(os.getenv("YF_IDENTITY_BURST", "4"))
+_GLOBAL_RPS = float(os.getenv("YF_GLOBAL_RPS", str(_POOL_SIZE * _IDENTITY_RPS)))
+_GLOBAL_BURST = float(os.getenv("YF_GLOBAL_BURST", str(_POOL_SIZE * _IDENTITY_BURST)))
+_MIN_RATE_FACTOR = float(os.getenv("YF_MIN_RATE_FACTOR", "0.0625"))
+_RATE_RECOVERY_STEP = float(os.getenv("YF_RATE_RECOVERY_STEP", "0.05"))
+
+class _TokenBucket:
+    """Token bucket whose refill rate is scaled by the governor's current rate factor. rate <= 0 means unlimited."""
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def wait_time(self, now: float, factor: float) -> float:
+        """Refills up to `now` and returns seconds until one token is available (0.0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        effective_rate = self.rate * factor
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * effective_rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / effective_rate
+
+    def take(self):
+        if self.rate > 0:
+            self.tokens -= 1.0
+
+class _RateGovernor:
+    """
+    Process-wide pacing for Yahoo requests.
+    - acquire(ident) blocks until both the global bucket and the identity's bucket have a token.
+    - on_throttled() halves the rate factor (down to _MIN_RATE_FACTOR) after a 429.
+    - on_success() restores it additively, so throughput climbs back once Yahoo stops pushing back.
+    clock/sleep are injectable for deterministic tests.
+    """
+    def __init__(self, global_rps: float = _GLOBAL_RPS, global_burst: float = _GLOBAL_BURST,
+                 identity_rps: float = _IDENTITY_RPS, identity_burst: float = _IDENTITY_BURST,
+                 clock=time.monotonic, sleep=time.sleep):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self._identity_rps = identity_rps
+        self._identity_burst = identity_burst
+        self._global = _TokenBucket(global_rps, global_burst, clock())
+        self._identities: "weakref.WeakKeyDictionary[_Identity, _TokenBucket]" = weakref.WeakKeyDictionary()
+        self.rate_factor = 1.0
+
+    def _bucket_for(self, ident: _Identity, now: float) -> _TokenBucket:
+        bucket = self._identities.get(ident)
+        if bucket is None:
+            bucket = self._identities[ident] = _TokenBucket(self._identity_rps, self._identity_burst, now)
+        return bucket
+
+    def acquire(self, ident: _Identity) -> float:
+        """Blocks until a request may be sent through `ident`. Returns the total time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                bucket = self._bucket_for(ident, now)
+                wait = max(self._global.wait_time(now, self.rate_factor), bucket.wait_time(now, self.rate_factor))
+                if wait <= 0:
+                    self._global.take()
+                    bucket.take()
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def identity_ready(self, ident: _Identity) -> bool:
+        """True when `ident` could send immediately as far as its own bucket is concerned."""
+        with self._lock:
+            now = self._clock()
+            return self._bucket_for(ident, now).wait_time(now, self.rate_factor) <= 0
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate_factor = max(_MIN_RATE_FACTOR, self.rate_factor / 2)
+        logger.warning(f"[yf] rate limited; pacing reduced to {self.rate_factor:.3f}x")
+
+    def on_success(self):
+        if self.rate_factor >= 1.0:
+            return
+        with self._lock:
+            self.rate_factor = min(1.0, self.rate_factor + _RATE_RECOVERY_STEP)
+
+_GOVERNOR = _RateGovernor()
+
 def _identity_weight(ident: _Identity) -> float:
     h = _ID_HEALTH.get(id(ident), {})
     if h and time.time() < h.get('cooldown_until', 0):
         return 0.01
     fail = h.get('fail', 0)
-    return 1.0 / (1 + fail)
+    weight = 1.0 / (1 + fail)
+    # Prefer identities that can send now over ones whose bucket is drained
+    if not _GOVERNOR.identity_ready(ident):
+        weight *= 0.1
+    return weight
 
 def _choose_identity() -> _Identity:
     # Per-request random identity
@@ -206,11 +315,13 @@ def _choose_identity() -> _Identity:
         probs = [w / s for w in weights]
         return random.choices(_ID_POOL, weights=probs, k=1)[0]
 
-def _mark_failure(ident: _Identity):
+def _mark_failure(ident: _Identity, status_code: Optional[int] = None):
     rec = _ID_HEALTH.setdefault(id(ident), {'fail': 0, 'cooldown_until': 0})
     rec['fail'] += 1
     # cooldown grows with failures
     rec['cooldown_until'] = time.time() + min(60, 2 ** rec['fail'])
+    if status_code == 429:
+        _GOVERNOR.on_throttled()
 
 # rotate-aware retry decorator
 # the functions wrapped by it must accept or ignore _chosen_identity
@@ -272,6 +383,8 @@ def _execute_json_once(url: str, *, method: str = "GET", params: dict | None = N
 
     headers = {"User-Agent": _get_random_user_agent()}
     func = ident.session.post if method.upper() == "POST" else ident.session.get
+    _GOVERNOR.acquire(ident)
+    status = "error"
     try:
         resp = func(
             url,
@@ -282,6 +395,7 @@ def _execute_json_once(url: str, *, method: str = "GET", params: dict | None = N
             impersonate=ident.profile,
             timeout=_TIMEOUT,
         )
+        status = str(resp.status_code)
         body_preview = (resp.text or "")[:256]
         if not (200 <= resp.status_code < 300):
             # include proxy string on all non-2xx, and highlight 407 specifically
@@ -294,18 +408,87 @@ def _execute_json_once(url: str, *, method: str = "GET", params: dict | None = N
                     f"[yf] proxy auth required (407) — proxy={_proxy_str(ident.proxy)} profile={ident.profile}"
                 )
             resp.raise_for_status()
+        _GOVERNOR.on_success()
         return resp.json()
     except Exception as e:
-        _mark_failure(ident)
+        # A 429 also slows the governor down for every identity, not just this one
+        _mark_failure(ident, status_code=getattr(getattr(e, "response", None), "status_code", None))
         logger.debug(f"execute_json failure for {url}: {e}")
         raise
+    finally:
+        YAHOO_REQUESTS.labels(ident.label, status).inc()
     
 @retry_on_failure(attempts=3, delay=3, backoff=2)
-def execute_request(url: str, *, method: str = "GET", params: dict | None = None,
+def _execute_request_with_retry(url: str, *, method: str = "GET", params: dict | None = None,
                  json_payload: dict | None = None, _chosen_identity: _Identity | None = None) -> dict:
+    return _execute_json_once(url, method=method, params=params, json_payload=json_payload, _chosen_identity=_chosen_identity)
+
+# --- Single-flight request coalescing ---
+# Identical requests that overlap in time (e.g. ^GSPC charts asked for by several
+# batch workers at once) share one upstream call instead of each spending identity quota.
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+def _fresh_error(error: BaseException) -> BaseException:
+    """Per-waiter copy of the leader's exception, so concurrent raises do not share one traceback."""
+    try:
+        clone = copy.copy(error)
+    except Exception:
+        clone = RuntimeError(f"Coalesced request failed: {error!r}")
+    return clone.with_traceback(None)
+
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT: Dict[Tuple[str, str, str, str], _InFlightCall] = {}
+
+def _request_key(url: str, method: str, params: dict | None, json_payload: dict | None) -> Tuple[str, str, str, str]:
+    return (
+        method.upper(),
+        url,
+        json.dumps(params or {}, sort_keys=True, default=str),
+        json.dumps(json_payload, sort_keys=True, default=str) if json_payload is not None else "",
+    )
+
+def execute_request(url: str, *, method: str = "GET", params: dict | None = None,
+                 json_payload: dict | None = None) -> dict:
     """
     Unified JSON transport API.
     Perform a GET to Yahoo endpoints with active rotation and return parsed JSON.
     On 401/403/429 or phrases like 'Too Many Requests', rotates identity and retries once.
+    Concurrent calls for the same method/url/params/payload are coalesced: the first
+    caller goes upstream and every waiter receives a copy of its result (or its error).
     """
-    return _execute_json_once(url, method=method, params=params, json_payload=json_payload, _chosen_identity=_chosen_identity)
+    key = _request_key(url, method, params, json_payload)
+    with _INFLIGHT_LOCK:
+        call = _INFLIGHT.get(key)
+        leader = call is None
+        if leader:
+            call = _INFLIGHT[key] = _InFlightCall()
+        else:
+            call.waiters += 1
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise _fresh_error(call.error) from call.error
+        # Copy so a caller mutating its payload cannot affect the other waiters
+        return copy.deepcopy(call.result)
+
+    result = None
+    try:
+        result = _execute_request_with_retry(url, method=method, params=params, json_payload=json_payload)
+        return result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        # Unregister before waking waiters so later callers start a fresh request
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+        # Waiters copy from a snapshot taken before they wake, never from the leader's own payload
+        if call.waiters and call.error is None:
+            call.result = copy.deepcopy(result)
+        call.done.set()
@@ -32,6 +32,8 @@ class BaseDataServiceTest(unittest.TestCase):
         self.mock_cache = self.cache_patcher.start()
         # The app uses `cache.cache._write_client`, so we must mock that specific path.
         self.mock_redis_client = self.mock_cache.cache._write_client = MagicMock()
+        # Batch endpoints read through cache.get_many; route it to cache.get so tests can keep arranging hits/misses there.
+        self.mock_cache.get_many.side_effect = lambda *keys: [self.mock_cache.get(key) for key in keys]
     
     def tearDown(self):
         self.db_patcher.stop()
@@ -1,7 +1,8 @@
 # backend-services/data-service/tests/test_fixtures.py
 # Centralized payload builders for provider tests.
 
-from typing import Any, Dict, Optional
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
 
 
 def make_quote_summary_payload(
@@ -62,3 +63,28 @@ def make_chart_payload(*, include_timestamp: bool = True) -> Dict[str, Any]:
         result["timestamp"] = [1672531200, 1672617600]
 
     return {"chart": {"result": [result]}}
+
+
+def make_price_rows(closes: List[float], last_date: date) -> List[Dict[str, Any]]:
+    """
+    PriceDataItem rows for `closes`, one per weekday ending on `last_date`
+    (highs/lows 1% around the close), for offline breadth fixtures.
+    """
+    dates = []
+    day = last_date
+    while len(dates) < len(closes):
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= timedelta(days=1)
+    return [
+        {
+            "formatted_date": d.isoformat(),
+            "open": close,
+            "high": round(close * 1.01, 4),
+            "low": round(close * 0.99, 4),
+            "close": close,
+            "volume": 100000,
+            "adjclose": close,
+        }
+        for d, close in zip(reversed(dates), closes)
+    ]
@@ -8,16 +8,21 @@ import pandas as pd
 from pydantic import ValidationError, TypeAdapter
 from typing import List
 # Make sure the shared models are importable for testing
-from shared.contracts import CoreFinancials, PriceDataItem
-from helper_functions import cache_covers_request
+from shared.contracts import CoreFinancials, PriceDataItem, PriceColumns, PriceBatchStreamRecord
+from shared.trading_calendar import TradingCalendar
+from helper_functions import cache_covers_request, cache_get_many, compute_watchlist_metrics_from_prices
 from typing import Dict, List
 import pandas as pd
 import yfinance as yf
 import json
+import threading
+import fakeredis
+from flask_caching import Cache
 
 # Reuse the same base test setup patterns as existing tests
 # to maintain consistency in mocking cache and db.
 from tests.common import base_test_case
+from tests.common.test_fixtures import make_price_rows
 
 class BaseIntegrationTest(unittest.TestCase):
     """Base class for integration tests with Flask app context."""
@@ -256,6 +261,40 @@ class TestPriceEndpoints(base_test_case.BaseDataServiceTest):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json, {"success": {}, "failed": []})
 
+    def test_batch_price_columnar_format(self):
+        """POST /price/batch: 'format': 'columnar' returns one index-aligned array per field."""
+        rows = [
+            self._create_valid_price_data({"close": 100.0, "volume": 10}, day_offset=2),
+            self._create_valid_price_data({"close": 101.0, "volume": 20, "open": None}, day_offset=1),
+        ]
+        self.mock_cache.get.return_value = rows
+        with patch('app.plan_incremental_price_fetch', return_value={'action': 'return_cache', 'cached': rows}):
+            response = self.client.post('/price/batch', json={'tickers': ['AAPL'], 'source': 'yfinance', 'format': 'columnar'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json
+        self.assertEqual(data['format'], 'columnar')
+        self.assertEqual(data['failed'], [])
+        columns = data['success']['AAPL']
+        self.assertEqual(columns['dates'], [r['formatted_date'] for r in rows])
+        self.assertEqual(columns['close'], [100.0, 101.0])
+        self.assertEqual(columns['volume'], [10, 20])
+        self.assertEqual(columns['open'], [150.0, None])
+        # The payload round-trips through the shared contract back to the row shape
+        self.assertEqual(PriceColumns.model_validate(columns).to_rows(), rows)
+
+    def test_batch_price_columnar_format_empty_ticker_list(self):
+        """POST /price/batch: empty columnar requests still carry the format marker."""
+        response = self.client.post('/price/batch', json={'tickers': [], 'source': 'yfinance', 'format': 'columnar'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {"format": "columnar", "success": {}, "failed": []})
+
+    def test_batch_price_rejects_unknown_format(self):
+        """POST /price/batch: an unknown 'format' is rejected with 400."""
+        response = self.client.post('/price/batch', json={'tickers': ['AAPL'], 'source': 'yfinance', 'format': 'parquet'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json)
+
     def test_batch_price_invalid_payload(self):
         """POST /price/batch: Tests rejection of invalid request bodies."""
         for payload in [{}, {'tickers': 'not-a-list'}, {'source': 'yfinance'}]:
@@ -264,6 +303,207 @@ class TestPriceEndpoints(base_test_case.BaseDataServiceTest):
                 self.assertEqual(response.status_code, 400)
                 self.assertIn('error', response.json)
 
+    @patch('app.yf_price_provider.get_stock_data')
+    def test_batch_price_stream_emits_each_ticker_as_it_resolves(self, mock_get_stock_data):
+        """POST /price/batch 'stream': true writes NDJSON records without waiting for the slowest ticker."""
+        cached_rows = [self._create_valid_price_data({"close": 100.0}, day_offset=1)]
+        fast_rows = [self._create_valid_price_data({"close": 200.0})]
+        slow_rows = [self._create_valid_price_data({"close": 300.0})]
+        self.mock_cache.get.side_effect = lambda key: cached_rows if key == 'price_yfinance_CACHED' else None
+        release_slow = threading.Event()
+
+        def provider_side_effect(ticker, executor, start_date=None, period=None):
+            if ticker == 'SLOW':
+                release_slow.wait(timeout=5)
+                return slow_rows
+            return fast_rows if ticker == 'FAST' else None
+        mock_get_stock_data.side_effect = provider_side_effect
+
+        response = self.client.post('/price/batch', json={
+            'tickers': ['SLOW', 'CACHED', 'FAST', 'MISSING'], 'source': 'yfinance', 'stream': True,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+
+        records = {}
+        for line in response.response:
+            record = json.loads(line)
+            records[record['ticker']] = record
+            if not release_slow.is_set() and set(records) >= {'CACHED', 'FAST', 'MISSING'}:
+                # Everything but SLOW has been delivered while SLOW is still fetching
+                self.assertNotIn('SLOW', records)
+                release_slow.set()
+        self.assertTrue(release_slow.is_set())
+
+        self.assertEqual(records['CACHED'], {"ticker": "CACHED", "status": "success", "format": "rows", "data": cached_rows})
+        self.assertEqual(records['FAST']['data'], fast_rows)
+        self.assertEqual(records['MISSING'], {"ticker": "MISSING", "status": "failed", "format": "rows", "data": None})
+        self.assertEqual(records['SLOW']['data'], slow_rows)
+        # Each provider call is per ticker, and fetched series are still written back to the cache
+        self.assertEqual(sorted(c.args[0] for c in mock_get_stock_data.call_args_list), ['FAST', 'MISSING', 'SLOW'])
+        self.mock_cache.set.assert_any_call('price_yfinance_SLOW', slow_rows, timeout=ANY)
+
+    def test_batch_price_stream_columnar_records(self):
+        """POST /price/batch: streamed records honour 'format': 'columnar' and validate against the shared contract."""
+        rows = [self._create_valid_price_data({"close": 101.0}, day_offset=1)]
+        self.mock_cache.get.return_value = rows
+        with patch('app.plan_incremental_price_fetch', return_value={'action': 'return_cache', 'cached': rows}):
+            response = self.client.post('/price/batch', json={
+                'tickers': ['AAPL', 'AAPL'], 'source': 'yfinance', 'format': 'columnar', 'stream': True,
+            })
+            lines = response.get_data(as_text=True).splitlines()
+
+        self.assertEqual(len(lines), 1)  # duplicate tickers are streamed once
+        record = PriceBatchStreamRecord.model_validate_json(lines[0])
+        self.assertEqual(record.format, 'columnar')
+        self.assertEqual(PriceColumns.model_validate(record.data).to_rows(), rows)
+
+    def test_batch_price_stream_empty_ticker_list(self):
+        """POST /price/batch: an empty streamed batch is an empty body."""
+        response = self.client.post('/price/batch', json={'tickers': [], 'source': 'yfinance', 'stream': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True), "")
+
+
+# =====================================================================
+# ==                  BATCH CACHE ROUND TRIPS (fakeredis)            ==
+# =====================================================================
+
+class TestWatchlistMetricsEndpoint(base_test_case.BaseDataServiceTest):
+    """POST /data/watchlist-metrics/batch computes from the shared price_yfinance_{ticker} cache."""
+
+    def _series(self, days, end_offset=0):
+        # Oldest first; distinct closes/volumes so every metric depends on the exact tail
+        return [
+            self._create_valid_price_data({"close": 100.0 + i, "volume": 1000 + 10 * i}, day_offset=end_offset + days - 1 - i)
+            for i in range(days)
+        ]
+
+    @patch('app.yf_price_provider.get_stock_data')
+    def test_metrics_served_from_warm_cache_without_provider_call(self, mock_get_stock_data):
+        series = self._series(80)
+        self.mock_cache.get.side_effect = lambda key: series if key == 'price_yfinance_HG' else None
+
+        response = self.client.post('/data/watchlist-metrics/batch', json={'tickers': ['hg']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['metrics']['HG'], compute_watchlist_metrics_from_prices(series))
+        mock_get_stock_data.assert_not_called()
+
+    @patch('app.yf_price_provider.get_stock_data')
+    def test_stale_cache_is_topped_up_incrementally(self, mock_get_stock_data):
+        stale = self._series(80, end_offset=10)
+        fresh_tail = [self._create_valid_price_data({"close": 250.0, "volume": 5000}, day_offset=0)]
+        self.mock_cache.get.side_effect = lambda key: stale if key == 'price_yfinance_HG' else None
+        mock_get_stock_data.return_value = fresh_tail
+
+        response = self.client.post('/data/watchlist-metrics/batch', json={'tickers': ['HG']})
+
+        self.assertEqual(response.status_code, 200)
+        # Incremental fetch from the session after the last cached bar, never a full 3mo refetch
+        mock_get_stock_data.assert_called_once_with('HG', ANY, start_date=ANY, period=None)
+        self.assertEqual(response.json['metrics']['HG'], compute_watchlist_metrics_from_prices(stale + fresh_tail))
+        self.mock_cache.set.assert_called_once_with('price_yfinance_HG', ANY, timeout=ANY)
+
+    @patch('app.yf_price_provider.get_stock_data')
+    def test_cache_miss_fetches_three_months_and_failures_return_empty_metrics(self, mock_get_stock_data):
+        series = self._series(70)
+        self.mock_cache.get.return_value = None
+        mock_get_stock_data.return_value = {"HG": series, "BAD": None}
+
+        response = self.client.post('/data/watchlist-metrics/batch', json={'tickers': ['HG', 'BAD']})
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_stock_data.assert_called_once_with(['HG', 'BAD'], ANY, start_date=None, period='3mo')
+        metrics = response.json['metrics']
+        self.assertEqual(metrics['HG'], compute_watchlist_metrics_from_prices(series))
+        self.assertEqual(set(metrics['BAD'].values()), {None})
+
+class _CountingFakeRedis(fakeredis.FakeStrictRedis):
+    """FakeStrictRedis that records every command sent, i.e. every network round trip."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+
+    def execute_command(self, *args, **options):
+        self.commands.append(args[0])
+        return super().execute_command(*args, **options)
+
+
+class _FakeRedisCacheTest(base_test_case.BaseDataServiceTest):
+    """Runs the app against a real Flask-Caching RedisCache backed by fakeredis, with the 'datasvc:' prefix."""
+
+    def setUp(self):
+        super().setUp()
+        # Swap the MagicMock cache for a real Flask-Caching RedisCache backed by fakeredis
+        self.cache_patcher.stop()
+        self.real_cache = Cache()
+        self.real_cache.init_app(app, config={
+            "CACHE_TYPE": "flask_caching.backends.rediscache.RedisCache",
+            "CACHE_KEY_PREFIX": "datasvc:",
+        })
+        self.redis = _CountingFakeRedis()
+        self.real_cache.cache._read_client = self.real_cache.cache._write_client = self.redis
+        self.cache_patcher = patch('app.cache', self.real_cache)
+        self.cache_patcher.start()
+
+    def tearDown(self):
+        super().tearDown()
+        app.extensions["cache"].pop(self.real_cache, None)
+
+
+class TestBatchCacheRoundTrips(_FakeRedisCacheTest):
+    """Batch endpoints resolve all cache keys with one MGET against a real (fake) Redis using the 'datasvc:' prefix."""
+
+    def setUp(self):
+        super().setUp()
+        self.tickers = [f"T{i:03d}" for i in range(75)]
+
+    def test_batch_price_reads_all_keys_in_one_round_trip(self):
+        rows = [self._create_valid_price_data()]
+        for ticker in self.tickers:
+            self.real_cache.set(f"price_yfinance_{ticker}", rows, timeout=60)
+        # Keys land under the Flask-Caching prefix
+        self.assertTrue(self.redis.exists("datasvc:price_yfinance_T000"))
+        self.redis.commands.clear()
+
+        with patch('app.plan_incremental_price_fetch', side_effect=lambda cached, *_: {'action': 'return_cache', 'cached': cached}):
+            response = self.client.post('/price/batch', json={'tickers': self.tickers, 'source': 'yfinance'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json['success']), set(self.tickers))
+        self.assertEqual(response.json['success']['T042'], rows)
+        # One MGET replaces 75 sequential GETs
+        self.assertEqual(self.redis.commands, ['MGET'])
+
+    @patch('app.yf_financials_provider.get_batch_core_financials')
+    def test_batch_financials_reads_all_keys_in_one_round_trip(self, mock_provider):
+        for ticker in self.tickers[:-1]:
+            self.real_cache.set(f"financials_{ticker}", self._create_valid_financials_data(ticker), timeout=60)
+        uncached = self.tickers[-1]
+        mock_provider.return_value = {uncached: self._create_valid_financials_data(uncached)}
+        self.redis.commands.clear()
+
+        response = self.client.post('/financials/core/batch', json={'tickers': self.tickers})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json['success']), set(self.tickers))
+        mock_provider.assert_called_once_with([uncached], ANY)
+        # One MGET for all reads; the single miss is written back with one SETEX
+        self.assertEqual(self.redis.commands.count('MGET'), 1)
+        self.assertNotIn('GET', self.redis.commands)
+
+    def test_cache_get_many_chunks_large_requests(self):
+        for ticker in self.tickers:
+            self.real_cache.set(f"financials_{ticker}", {"ticker": ticker}, timeout=60)
+        self.redis.commands.clear()
+
+        values = cache_get_many(self.real_cache, [f"financials_{t}" for t in self.tickers] + ["financials_MISSING"], chunk_size=50)
+
+        self.assertEqual(self.redis.commands, ['MGET', 'MGET'])
+        self.assertEqual(values["financials_T070"], {"ticker": "T070"})
+        self.assertIsNone(values["financials_MISSING"])
+
 
 # =====================================================================
 # ==                  INDUSTRY & PEERS ENDPOINTS                     ==
@@ -366,14 +606,12 @@ class TestMarketTrendEndpoints(base_test_case.BaseDataServiceTest):
         return data
 
     @patch('app.yf_price_provider.get_stock_data')
-    @patch('pandas_market_calendars.get_calendar')
+    @patch('app.get_shared_trading_calendar')
     def test_calculate_market_trend_success(self, mock_get_calendar, mock_get_stock_data):
         """POST /market-trend/calculate: Tests successful calculation and storage."""
         # --- Arrange ---
         calc_date = "2025-08-25"
-        mock_nyse = MagicMock()
-        mock_nyse.schedule.return_value.index = pd.to_datetime([calc_date])
-        mock_get_calendar.return_value = mock_nyse
+        mock_get_calendar.return_value = TradingCalendar([calc_date])
         
         mock_history = self._generate_mock_price_data(calc_date, 300, trend='up')
         mock_get_stock_data.return_value = {'^GSPC': mock_history, '^DJI': mock_history, '^IXIC': mock_history}
@@ -389,13 +627,11 @@ class TestMarketTrendEndpoints(base_test_case.BaseDataServiceTest):
 
     
     @patch('app.yf_price_provider.get_stock_data')
-    @patch('pandas_market_calendars.get_calendar')
+    @patch('app.get_shared_trading_calendar')
     def test_calculate_market_trend_bearish_scenario(self, mock_get_calendar, mock_get_stock_data):
         """POST /market-trend/calculate: Tests a bearish market scenario."""
         calc_date = "2025-08-25"
-        mock_nyse = MagicMock()
-        mock_nyse.schedule.return_value.index = pd.to_datetime([calc_date])
-        mock_get_calendar.return_value = mock_nyse
+        mock_get_calendar.return_value = TradingCalendar([calc_date])
         
         mock_history = self._generate_mock_price_data(calc_date, 300, trend='down')
         mock_get_stock_data.return_value = {'^GSPC': mock_history, '^DJI': mock_history, '^IXIC': mock_history}
@@ -406,13 +642,11 @@ class TestMarketTrendEndpoints(base_test_case.BaseDataServiceTest):
         self.assertEqual(response.json['trends'][0]['trend'], 'Bearish')
 
     
-    @patch('pandas_market_calendars.get_calendar')
+    @patch('app.get_shared_trading_calendar')
     def test_calculate_market_trend_handles_non_trading_day(self, mock_get_calendar):
         """POST /market-trend/calculate: Tests that non-trading days are handled."""
         non_trading_date = "2025-08-24" # A Sunday
-        mock_nyse = MagicMock()
-        mock_nyse.schedule.return_value.index = pd.to_datetime([]) # No valid days
-        mock_get_calendar.return_value = mock_nyse
+        mock_get_calendar.return_value = TradingCalendar(["2025-08-22", "2025-08-25"]) # Weekend has no sessions
         
         response = self.client.post('/market-trend/calculate', json={'dates': [non_trading_date]})
         
@@ -448,6 +682,55 @@ class TestMarketTrendEndpoints(base_test_case.BaseDataServiceTest):
 # ==                MarketBreadth Integration Tests                  ==
 # =====================================================================
 
+class TestLocalMarketBreadth(_FakeRedisCacheTest):
+    """/market/breadth counts highs/lows from cached price_yfinance_* series and falls back to the screener when coverage is thin."""
+
+    def setUp(self):
+        super().setUp()
+        as_of = date(2025, 6, 13)
+        self.calendar_patcher = patch('app.previous_trading_day', return_value=as_of)
+        self.calendar_patcher.start()
+        rising = [50.0 + 0.1 * i for i in range(270)]
+        falling = [80.0 - 0.1 * i for i in range(270)]
+        for i in range(4):
+            self.real_cache.set(f"price_yfinance_UP{i}", make_price_rows([c + i for c in rising], as_of), timeout=60)
+        for i in range(2):
+            self.real_cache.set(f"price_yfinance_DN{i}", make_price_rows([c + i for c in falling], as_of), timeout=60)
+        # Not part of the price universe
+        self.real_cache.set("financials_UP0", {"ticker": "UP0"}, timeout=60)
+
+    def tearDown(self):
+        self.calendar_patcher.stop()
+        super().tearDown()
+
+    @patch('providers.yfin.market_data_provider.yahoo_client.execute_request')
+    def test_breadth_from_cached_universe_skips_screener(self, mock_exec):
+        with patch('breadth_engine.BREADTH_LOCAL_MIN_TICKERS', 6):
+            response = self.client.get('/market/breadth?region=US')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"newhighs": 4, "newlows": 2, "ratio": 2.0})
+        mock_exec.assert_not_called()
+
+    @patch('providers.yfin.market_data_provider.yahoo_client.execute_request')
+    def test_thin_coverage_falls_back_to_screener(self, mock_exec):
+        mock_exec.return_value = {'finance': {'result': [{'total': 42}]}}
+        with patch('breadth_engine.BREADTH_LOCAL_MIN_TICKERS', 7):
+            response = self.client.get('/market/breadth?region=US')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["newhighs"], 42)
+        self.assertGreater(mock_exec.call_count, 0)
+
+    @patch('providers.yfin.market_data_provider.yahoo_client.execute_request')
+    def test_other_regions_use_screener(self, mock_exec):
+        mock_exec.return_value = {'finance': {'result': [{'total': 9}]}}
+        with patch('breadth_engine.BREADTH_LOCAL_MIN_TICKERS', 1):
+            response = self.client.get('/market/breadth?region=EU')
+
+        self.assertEqual(response.get_json()["newhighs"], 9)
+
+
 # Route-level integration test for caching behavior
 class TestMarketBreadthRouteCaching(base_test_case.BaseDataServiceTest):
     """
@@ -9,6 +9,7 @@ from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
 from providers.yfin import price_provider
+from shared.trading_calendar import TradingCalendar
 from tests.common.test_fixtures import make_chart_payload
 
 class TestYFinancePriceProvider(unittest.TestCase):
@@ -239,18 +240,11 @@ class TestYFinancePriceProvider(unittest.TestCase):
 
     @patch("helper_functions.get_trading_calendar")
     def test_plan_incremental_holiday_aware_returns_cache_when_last_bar_is_previous_session(self, mock_get_cal):
-        import helper_functions
         from datetime import date
         from helper_functions import plan_incremental_price_fetch
 
-        # Ensure helper_functions internal calendar cache does not leak across tests
-        helper_functions._TRADING_CAL = None
-
         # Mock NYSE calendar: for Tue 2026-01-20, the previous trading day is Fri 2026-01-16
-        mock_calendar = MagicMock()
-        # Add columns to dataframe to ensure .empty is False (pandas checks size=rows*cols)
-        mock_calendar.schedule.return_value = pd.DataFrame(index=pd.to_datetime(["2026-01-16"]), columns=["market_open"])
-        mock_get_cal.return_value = mock_calendar
+        mock_get_cal.return_value = TradingCalendar(["2026-01-15", "2026-01-16", "2026-01-20"])
 
         cached = [{
             "formatted_date": "2026-01-16",
@@ -277,14 +271,7 @@ class TestYFinancePriceProvider(unittest.TestCase):
     @patch("providers.yfin.price_provider.yahoo_client.execute_request")
     @patch("helper_functions.get_trading_calendar")
     def test_get_single_ticker_data_incremental_period2_uses_previous_trading_day(self, mock_get_cal, mock_execute_request):
-        import helper_functions
-
-        helper_functions._TRADING_CAL = None
-
-        mock_calendar = MagicMock()
-        # Add columns to dataframe to ensure .empty is False
-        mock_calendar.schedule.return_value = pd.DataFrame(index=pd.to_datetime(["2026-01-23"]), columns=["market_open"])
-        mock_get_cal.return_value = mock_calendar
+        mock_get_cal.return_value = TradingCalendar(["2026-01-22", "2026-01-23"])
 
         mock_execute_request.return_value = make_chart_payload(include_timestamp=False)
 
@@ -307,14 +294,7 @@ class TestYFinancePriceProvider(unittest.TestCase):
     @patch("providers.yfin.price_provider.yahoo_client.execute_request")
     @patch("helper_functions.get_trading_calendar")
     def test_get_single_ticker_data_weekend_window_clamps_to_previous_trading_day(self, mock_get_cal, mock_execute_request):
-        import helper_functions
-
-        helper_functions._TRADING_CAL = None
-
-        mock_calendar = MagicMock()
-        # Add columns to dataframe to ensure .empty is False
-        mock_calendar.schedule.return_value = pd.DataFrame(index=pd.to_datetime(["2026-01-23"]), columns=["market_open"])
-        mock_get_cal.return_value = mock_calendar
+        mock_get_cal.return_value = TradingCalendar(["2026-01-22", "2026-01-23"])
 
         mock_execute_request.return_value = make_chart_payload(include_timestamp=False)
 
@@ -335,7 +315,7 @@ class TestYFinancePriceProvider(unittest.TestCase):
         self.assertEqual(p1, "2026-01-23")
         self.assertEqual(p2, "2026-01-23")
 
-    @patch("pandas_market_calendars.get_calendar")
+    @patch("helper_functions.get_trading_calendar")
     @patch("helper_functions.previous_trading_day")
     def test_cache_covers_request_uses_previous_trading_day_as_anchor_end(self, mock_prev_trading_day, mock_get_calendar):
         from datetime import date
@@ -344,33 +324,25 @@ class TestYFinancePriceProvider(unittest.TestCase):
         # Force anchor_end to be previous_trading_day(today), not calendar yesterday
         mock_prev_trading_day.return_value = date(2026, 1, 16)
 
-        mock_nyse = MagicMock()
-
-        # Must not be "empty" in pandas; include a column to avoid rows*cols == 0
-        mock_nyse.schedule.return_value = pd.DataFrame(
-            index=pd.to_datetime(["2025-01-01"]),
-            columns=["market_open"]
-        )
-
-        mock_get_calendar.return_value = mock_nyse
+        # Weekday sessions; wrapped so the lookup arguments can be asserted
+        sessions = pd.bdate_range("2024-06-03", "2026-01-30").date
+        calendar = TradingCalendar(sessions)
+        mock_get_calendar.return_value = MagicMock(wraps=calendar)
 
         # Use <252 unique dates so we do NOT take the row-count fast path.
         # Also make cache_end_dt later than 2026-01-16 so anchor_end should be 2026-01-16.
+        required_start = calendar.sessions_back(date(2026, 1, 16), 252)
         cached_data = [
-            {"formatted_date": "2025-01-01"},
+            {"formatted_date": required_start.isoformat()},
             {"formatted_date": "2026-01-20"},
         ]
 
-        result = cache_covers_request(cached_data, "1y", None)
-
-        # Assert that calendar schedule was built using anchor_end = previous trading day
-        self.assertTrue(mock_get_calendar.called)
-
-        _, kwargs = mock_nyse.schedule.call_args
-        self.assertEqual(kwargs["end_date"], date(2026, 1, 16))
+        self.assertTrue(cache_covers_request(cached_data, "1y", None))
+        mock_get_calendar.return_value.sessions_back.assert_called_once_with(date(2026, 1, 16), 252)
 
-        # Optional: keep assertion on return value stable (with our mock schedule, should be True)
-        self.assertTrue(result)
+        # One session short of the 252 needed before the anchor → not covered
+        cached_data[0]["formatted_date"] = calendar.next_session(required_start).isoformat()
+        self.assertFalse(cache_covers_request(cached_data, "1y", None))
 
     def test_transform_yahoo_response_timestamp_exists_but_values_contain_none(self):
         """
@@ -0,0 +1,111 @@
+# backend-services/data-service/tests/unit/test_breadth_engine.py
+import unittest
+from datetime import date, timedelta
+
+from breadth_engine import compute_breadth, series_signals, high_low_ratio
+from tests.common.test_fixtures import make_price_rows
+
+AS_OF = date(2025, 6, 13)  # a Friday
+SESSIONS = 270  # a little over a year of weekdays
+
+
+def _rising(sessions=SESSIONS):
+    return [50.0 + 0.1 * i for i in range(sessions)]
+
+
+def _falling(sessions=SESSIONS):
+    return [80.0 - 0.1 * i for i in range(sessions)]
+
+
+def _range_bound(sessions=SESSIONS):
+    # Oscillates inside the 52-week range and ends mid-range
+    return [60.0 + (5.0 if (i // 20) % 2 else -5.0) for i in range(sessions - 1)] + [60.0]
+
+
+def _universe():
+    return {
+        "UP1": make_price_rows(_rising(), AS_OF),
+        "UP2": make_price_rows([c * 2 for c in _rising()], AS_OF),
+        "UP3": make_price_rows([c + 7 for c in _rising()], AS_OF),
+        "DOWN1": make_price_rows(_falling(), AS_OF),
+        "DOWN2": make_price_rows([c * 3 for c in _falling()], AS_OF),
+        "FLAT": make_price_rows(_range_bound(), AS_OF),
+    }
+
+
+class TestSeriesSignals(unittest.TestCase):
+    def test_rising_series_signals_a_high_on_its_last_session(self):
+        signals = series_signals(make_price_rows(_rising(), AS_OF))
+        self.assertEqual(signals.last_date, AS_OF)
+        self.assertEqual(signals.last_high_signal, AS_OF)
+        self.assertIsNone(signals.last_low_signal)
+
+    def test_range_bound_series_has_no_signal(self):
+        signals = series_signals(make_price_rows(_range_bound(), AS_OF))
+        self.assertIsNone(signals.last_high_signal)
+        self.assertIsNone(signals.last_low_signal)
+
+    def test_peak_older_than_52_weeks_is_out_of_the_window(self):
+        # Spike ~60 weeks ago, then a gentle rise that stays below it
+        closes = [50.0] * 400
+        closes[100] = 500.0
+        closes[-1] = 60.0
+        signals = series_signals(make_price_rows(closes, AS_OF))
+        self.assertEqual(signals.last_high_signal, AS_OF)
+
+    def test_input_order_and_missing_highs_do_not_matter(self):
+        rows = make_price_rows(_rising(), AS_OF)
+        for row in rows:
+            row["high"] = None
+        signals = series_signals(list(reversed(rows)))
+        self.assertEqual(signals.first_date.isoformat(), rows[0]["formatted_date"])
+        self.assertEqual(signals.last_high_signal, AS_OF)
+
+    def test_empty_series(self):
+        self.assertIsNone(series_signals([]))
+        self.assertIsNone(series_signals([{"formatted_date": "2025-06-13", "close": None}]))
+
+
+class TestComputeBreadth(unittest.TestCase):
+    def test_counts_fixture_universe(self):
+        breadth = compute_breadth(_universe(), min_tickers=1)
+        self.assertEqual(breadth["new_highs"], 3)
+        self.assertEqual(breadth["new_lows"], 2)
+        self.assertEqual(breadth["high_low_ratio"], 1.5)
+        self.assertEqual(breadth["covered_tickers"], 6)
+        self.assertEqual(breadth["as_of"], AS_OF.isoformat())
+
+    def test_signal_older_than_a_week_is_not_counted(self):
+        # New high two weeks ago, then drifting lower inside the range
+        closes = _rising(SESSIONS - 10) + [70.0] * 10
+        universe = {"OLD": make_price_rows(closes, AS_OF), "FLAT": make_price_rows(_range_bound(), AS_OF)}
+        self.assertEqual(compute_breadth(universe, min_tickers=1)["new_highs"], 0)
+
+    def test_uncovered_series_are_excluded(self):
+        universe = _universe()
+        # Less than a year of history, and a series that stopped before the latest session
+        universe["SHORT"] = make_price_rows(_rising(120), AS_OF)
+        universe["STALE"] = make_price_rows(_rising(), AS_OF - timedelta(days=7))
+        breadth = compute_breadth(universe, min_tickers=1)
+        self.assertEqual(breadth["covered_tickers"], 6)
+        self.assertEqual(breadth["new_highs"], 3)
+
+    def test_thin_or_stale_coverage_returns_none(self):
+        self.assertIsNone(compute_breadth(_universe(), min_tickers=7))
+        self.assertIsNone(compute_breadth(_universe(), min_as_of=AS_OF + timedelta(days=3), min_tickers=1))
+        self.assertIsNone(compute_breadth({}, min_tickers=0))
+
+    def test_counts_are_reproducible(self):
+        self.assertEqual(compute_breadth(_universe(), min_tickers=1), compute_breadth(_universe(), min_tickers=1))
+
+
+class TestHighLowRatio(unittest.TestCase):
+    def test_edges(self):
+        self.assertEqual(high_low_ratio(5, 0), float("inf"))
+        self.assertEqual(high_low_ratio(0, 5), 0.0)
+        self.assertEqual(high_low_ratio(0, 0), 0.0)
+        self.assertEqual(high_low_ratio(2, 3), 0.667)
+
+
+if __name__ == "__main__":
+    unittest.main()
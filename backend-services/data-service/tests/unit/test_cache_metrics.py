@@ -0,0 +1,68 @@
+# backend-services/data-service/tests/unit/test_cache_metrics.py
+import unittest
+
+import fakeredis
+from flask import Flask
+from flask_caching import Cache
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+from cache_metrics import keyspace_of
+
+
+def _cache_count(keyspace, result):
+    return REGISTRY.get_sample_value("cache_requests_total", {"keyspace": keyspace, "result": result}) or 0.0
+
+
+class TestKeyspace(unittest.TestCase):
+    def test_ticker_and_path_suffixes_are_stripped(self):
+        self.assertEqual(keyspace_of("price_yfinance_AAPL"), "price_yfinance")
+        self.assertEqual(keyspace_of("financials_MSFT"), "financials")
+        self.assertEqual(keyspace_of("industry_candidates_US"), "industry_candidates")
+        # @cache.cached(key_prefix='peers_%s') keys embed the request path
+        self.assertEqual(keyspace_of("peers_/industry/peers/AAPL"), "peers")
+        self.assertEqual(keyspace_of(""), "other")
+
+
+class TestInstrumentedRedisCache(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(self.app, config={
+            "CACHE_TYPE": "cache_metrics.InstrumentedRedisCache",
+            "CACHE_KEY_PREFIX": "datasvc:",
+        })
+        self.cache.cache._read_client = self.cache.cache._write_client = fakeredis.FakeStrictRedis()
+
+    def test_get_and_get_many_count_hits_and_misses(self):
+        self.cache.set("financials_AAPL", {"eps": 1}, timeout=60)
+        hits, misses = _cache_count("financials", "hit"), _cache_count("financials", "miss")
+
+        self.assertEqual(self.cache.get("financials_AAPL"), {"eps": 1})
+        self.assertIsNone(self.cache.get("financials_NVDA"))
+        self.cache.get_many("financials_AAPL", "financials_MSFT", "financials_AMD")
+
+        self.assertEqual(_cache_count("financials", "hit") - hits, 2)
+        self.assertEqual(_cache_count("financials", "miss") - misses, 3)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_exposition_covers_routes_and_executor(self):
+        from app import app
+
+        client = app.test_client()
+        client.get("/price/AAPL?source=unknown")
+        resp = client.get("/metrics")
+
+        self.assertEqual(resp.status_code, 200)
+        families = {f.name: f for f in text_string_to_metric_families(resp.get_data(as_text=True))}
+        routes = {s.labels["route"] for s in families["http_request_duration_seconds"].samples}
+        self.assertIn("/price/<path:ticker>", routes)
+        depth = [s for s in families["executor_queue_depth"].samples if s.labels["executor"] == "data_service_batch"]
+        self.assertEqual(depth[0].value, 0.0)
+        self.assertIn("cache_requests", families)
+        self.assertIn("yahoo_requests", families)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# backend-services/data-service/tests/unit/test_delisted_status.py
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+import mongomock
+from pymongo import errors
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import through the provider first, matching the app's import order (helper_functions <-> providers are mutually dependent)
+from providers.yfin import price_provider  # noqa: F401
+import helper_functions
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDelistedTickerStatus(unittest.TestCase):
+    """is_ticker_delisted / mark_ticker_as_delisted backed by one pooled client and an in-memory set."""
+
+    def setUp(self):
+        self.client = mongomock.MongoClient()
+        self.collection = self.client.stock_analysis.ticker_status
+        self.collection.insert_one({"ticker": "OLD", "status": "delisted", "reason": "seed"})
+
+        self.clock = _FakeClock()
+        client_patcher = patch('helper_functions._get_mongo_client', return_value=self.client)
+        set_patcher = patch('helper_functions._DELISTED_TICKERS', helper_functions._DelistedTickerSet(refresh_seconds=300, clock=self.clock))
+        client_patcher.start()
+        set_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        self.addCleanup(set_patcher.stop)
+
+    def test_lookups_are_served_from_memory_after_startup_load(self):
+        self.assertTrue(helper_functions.load_delisted_tickers())
+
+        with patch.object(self.collection, 'find', wraps=self.collection.find) as mock_find, \
+             patch.object(self.collection, 'count_documents') as mock_count:
+            for _ in range(100):
+                self.assertTrue(helper_functions.is_ticker_delisted("OLD"))
+                self.assertFalse(helper_functions.is_ticker_delisted("AAPL"))
+            mock_find.assert_not_called()
+            mock_count.assert_not_called()
+
+    def test_first_lookup_loads_without_explicit_startup(self):
+        self.assertTrue(helper_functions.is_ticker_delisted("OLD"))
+
+    def test_mark_writes_through_and_updates_memory(self):
+        helper_functions.load_delisted_tickers()
+
+        helper_functions.mark_ticker_as_delisted("GONE", "404 from chart API")
+
+        doc = self.collection.find_one({"ticker": "GONE"})
+        self.assertEqual(doc["status"], "delisted")
+        self.assertEqual(doc["reason"], "404 from chart API")
+        # Visible immediately, without waiting for the next refresh
+        self.assertTrue(helper_functions.is_ticker_delisted("GONE"))
+
+    def test_periodic_refresh_picks_up_other_writers(self):
+        helper_functions.load_delisted_tickers()
+        # Another data-service replica marks a ticker
+        self.collection.insert_one({"ticker": "ELSEWHERE", "status": "delisted"})
+
+        self.clock.now = 299
+        self.assertFalse(helper_functions.is_ticker_delisted("ELSEWHERE"))
+        self.clock.now = 301
+        self.assertTrue(helper_functions.is_ticker_delisted("ELSEWHERE"))
+
+    def test_db_outage_keeps_last_known_set(self):
+        helper_functions.load_delisted_tickers()
+        self.clock.now = 301
+
+        with patch.object(self.collection, 'find', side_effect=errors.ServerSelectionTimeoutError("down")) as mock_find:
+            self.assertTrue(helper_functions.is_ticker_delisted("OLD"))
+            self.assertFalse(helper_functions.is_ticker_delisted("AAPL"))
+            # The failed reload is not retried on every lookup
+            self.assertEqual(mock_find.call_count, 1)
+
+    def test_write_failure_still_skips_ticker_in_process(self):
+        with patch.object(self.collection, 'update_one', side_effect=errors.PyMongoError("write failed")):
+            helper_functions.mark_ticker_as_delisted("FLAKY", "404")
+        self.assertTrue(helper_functions.is_ticker_delisted("FLAKY"))
+
+    def test_local_marks_expire_on_the_next_successful_refresh(self):
+        helper_functions.load_delisted_tickers()
+        with patch.object(self.collection, 'update_one', side_effect=errors.PyMongoError("write failed")):
+            helper_functions.mark_ticker_as_delisted("FLAKY", "404")
+        helper_functions.mark_ticker_as_delisted("GONE", "404")
+        # An operator re-lists GONE in the meantime
+        self.collection.delete_one({"ticker": "GONE"})
+
+        self.clock.now = 301
+        with patch.object(self.collection, 'find', side_effect=errors.ServerSelectionTimeoutError("down")):
+            self.assertTrue(helper_functions.is_ticker_delisted("FLAKY"))
+        self.clock.now = 602
+        self.assertFalse(helper_functions.is_ticker_delisted("FLAKY"))
+        self.assertFalse(helper_functions.is_ticker_delisted("GONE"))
+        self.assertEqual(helper_functions._DELISTED_TICKERS._marked_here, {})
+
+
+class TestPooledMongoClient(unittest.TestCase):
+    @patch('helper_functions._MONGO_CLIENT', None)
+    @patch('helper_functions.MongoClient', side_effect=lambda *a, **kw: mongomock.MongoClient())
+    def test_client_is_created_once_and_reused(self, mock_client_cls):
+        first = helper_functions._get_mongo_client()
+        second = helper_functions._get_mongo_client()
+
+        self.assertIs(first, second)
+        mock_client_cls.assert_called_once()
+        self.assertEqual(mock_client_cls.call_args.kwargs['serverSelectionTimeoutMS'], 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# backend-services/data-service/tests/unit/test_fetch_archive.py
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import pandas as pd
+from prometheus_client import REGISTRY
+
+from providers.yfin.fetch_archive import ACTIVE_SEGMENT, FetchArchiveWriter
+
+
+def _archive_count(result):
+    return REGISTRY.get_sample_value("financials_archive_records_total", {"result": result}) or 0.0
+
+
+def _read_records(directory):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestFetchArchiveWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_unsampled_fetches_are_not_queued(self):
+        writer = FetchArchiveWriter(self.directory, sample_rate=0.0)
+        self.assertFalse(writer.submit("AAPL", {"ticker": "AAPL"}))
+        writer.close()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_close_drains_queue_and_serializes_timestamps(self):
+        writer = FetchArchiveWriter(self.directory, sample_rate=1.0)
+        self.assertTrue(writer.submit("AAPL", {"ipoDate": pd.Timestamp("1980-12-12"), "marketCap": 3e12}))
+        self.assertTrue(writer.submit("MSFT", {"marketCap": 2.9e12}))
+        writer.close()
+
+        records = _read_records(self.directory)
+        self.assertEqual([r["ticker"] for r in records], ["AAPL", "MSFT"])
+        self.assertEqual(records[0]["data"]["ipoDate"], "1980-12-12T00:00:00")
+
+    def test_payload_changes_after_submit_are_not_archived(self):
+        writer = FetchArchiveWriter(self.directory, sample_rate=1.0)
+        payload = {"marketCap": 3e12, "raw_info": {"sector": "Technology"}, "quarterly_earnings": [{"Revenue": 1}]}
+        self.assertTrue(writer.submit("AAPL", payload))
+        del payload["raw_info"]
+        payload["quarterly_earnings"][0]["Revenue"] = 2
+        writer.close()
+
+        record = _read_records(self.directory)[0]
+        self.assertEqual(record["data"]["raw_info"], {"sector": "Technology"})
+        self.assertEqual(record["data"]["quarterly_earnings"], [{"Revenue": 1}])
+
+    def test_rotation_caps_disk_usage_under_concurrent_load(self):
+        writer = FetchArchiveWriter(self.directory, sample_rate=1.0, max_bytes=2048, backup_count=3, queue_size=10000)
+        payload = {"summary": "x" * 200}
+
+        def producer(prefix):
+            for i in range(100):
+                writer.submit(f"{prefix}{i}", payload)
+
+        threads = [threading.Thread(target=producer, args=(p,)) for p in "ABCD"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+
+        names = os.listdir(self.directory)
+        segments = [n for n in names if n.endswith(".jsonl.gz")]
+        self.assertEqual(len(segments), 3)
+        self.assertTrue(set(names) <= set(segments) | {ACTIVE_SEGMENT})
+        for name in segments:
+            self.assertLess(os.path.getsize(os.path.join(self.directory, name)), 2048)
+        # Every surviving line is intact JSON
+        self.assertTrue(all(r["data"] == payload for r in _read_records(self.directory)))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        writer = FetchArchiveWriter(self.directory, sample_rate=1.0, queue_size=2)
+        # Hold the writer thread back so the queue fills up
+        gate = threading.Event()
+        original_write = writer._write
+        writer._write = lambda record: (gate.wait(5), original_write(record))
+        dropped = _archive_count("dropped")
+
+        accepted = [writer.submit(f"T{i}", {}) for i in range(10)]
+        gate.set()
+        writer.close()
+
+        self.assertGreater(accepted.count(False), 0)
+        self.assertEqual(_archive_count("dropped") - dropped, accepted.count(False))
+        self.assertEqual(len(_read_records(self.directory)), accepted.count(True))
+
+
+if __name__ == "__main__":
+    unittest.main()
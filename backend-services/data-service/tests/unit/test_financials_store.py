@@ -0,0 +1,181 @@
+# backend-services/data-service/tests/unit/test_financials_store.py
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+import mongomock
+from pymongo import errors
+
+from providers.yfin import financials_provider
+from financials_store import FinancialsSnapshotStore, statements_due, STATEMENTS_MAX_AGE_DAYS
+
+TODAY = date.today()
+
+
+def _days_ago(days):
+    return (TODAY - timedelta(days=days)).isoformat()
+
+
+def _financials(ticker, market_cap=1e9, quarter=None):
+    return {
+        "ticker": ticker,
+        "marketCap": market_cap,
+        "sharesOutstanding": 1e7,
+        "floatShares": 9e6,
+        "industry": "Semiconductors",
+        "ipoDate": "2001-01-02",
+        "annual_earnings": [{"Earnings": 2.0, "Revenue": 1e8, "Net Income": 2e7}],
+        "quarterly_earnings": [{"Earnings": 0.5, "Revenue": 2.5e7, "Net Income": 5e6}],
+        "quarterly_financials": [{"Net Income": 5e6, "Total Revenue": 2.5e7}],
+        "lastFiscalQuarter": quarter,
+    }
+
+
+def _status(market_cap=2e9, quarter=None, next_earnings=None):
+    return {"marketCap": market_cap, "sharesOutstanding": 1.1e7, "floatShares": 1e7,
+            "mostRecentQuarter": quarter, "nextEarningsDate": next_earnings}
+
+
+class TestStatementsDue(unittest.TestCase):
+    def _snapshot(self, quarter=None, next_earnings=None, fetched_days_ago=1):
+        return {"last_fiscal_quarter": quarter, "next_earnings_date": next_earnings,
+                "statements_fetched_at": datetime.now(timezone.utc) - timedelta(days=fetched_days_ago)}
+
+    def test_no_snapshot_is_due(self):
+        self.assertTrue(statements_due(None, None, TODAY))
+
+    def test_new_fiscal_quarter_is_due(self):
+        snapshot = self._snapshot(quarter="2025-03-31")
+        self.assertTrue(statements_due(snapshot, _status(quarter="2025-06-30"), TODAY))
+        self.assertFalse(statements_due(snapshot, _status(quarter="2025-03-31"), TODAY))
+
+    def test_passed_earnings_date_is_due_once(self):
+        self.assertTrue(statements_due(self._snapshot(next_earnings=_days_ago(2), fetched_days_ago=10), None, TODAY))
+        # Already refetched after that earnings date
+        self.assertFalse(statements_due(self._snapshot(next_earnings=_days_ago(2), fetched_days_ago=1), None, TODAY))
+        self.assertFalse(statements_due(self._snapshot(next_earnings=_days_ago(-5), fetched_days_ago=10), None, TODAY))
+
+    def test_max_age_is_due(self):
+        self.assertTrue(statements_due(self._snapshot(fetched_days_ago=STATEMENTS_MAX_AGE_DAYS + 1), None, TODAY))
+        self.assertFalse(statements_due(self._snapshot(fetched_days_ago=STATEMENTS_MAX_AGE_DAYS - 1), None, TODAY))
+
+
+class TestDeltaRefresh(unittest.TestCase):
+    """get_batch_core_financials through the snapshot store, with stubbed Yahoo fetchers."""
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().stock_analysis.financials_snapshots
+        self.store = FinancialsSnapshotStore(collection_getter=lambda: self.collection)
+        self.statuses = {}
+        self.full_fetch = {}
+        self.fetched = []
+
+        def fetch_full(ticker):
+            self.fetched.append(ticker)
+            return self.full_fetch.get(ticker)
+
+        for patcher in (
+            patch.object(financials_provider, "snapshot_store", self.store),
+            patch.object(financials_provider, "is_ticker_delisted", return_value=False),
+            patch.object(financials_provider, "_fetch_financials_with_yfinance", side_effect=fetch_full),
+            patch.object(financials_provider, "_fetch_financials_with_fallback", return_value=None),
+            patch.object(financials_provider, "get_reporting_status", side_effect=lambda t: self.statuses.get(t)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def _seed(self, ticker, quarter, next_earnings=None, fetched_days_ago=5):
+        self.store.save_statements(ticker, _financials(ticker, quarter=quarter), _status(next_earnings=next_earnings))
+        self.collection.update_one({"ticker": ticker}, {"$set": {
+            "statements_fetched_at": datetime.now(timezone.utc) - timedelta(days=fetched_days_ago)}})
+
+    def test_only_tickers_with_a_likely_new_period_are_refetched(self):
+        self._seed("CURRENT", "2025-06-30", next_earnings=_days_ago(-30))
+        self._seed("REPORTED", "2025-03-31")
+        self._seed("EARNINGS_PASSED", "2025-06-30", next_earnings=_days_ago(3), fetched_days_ago=20)
+        self._seed("STALE", "2025-06-30", fetched_days_ago=STATEMENTS_MAX_AGE_DAYS + 5)
+        self.statuses = {
+            "CURRENT": _status(market_cap=3e9, quarter="2025-06-30"),
+            "REPORTED": _status(quarter="2025-06-30"),
+            "EARNINGS_PASSED": _status(quarter="2025-06-30"),
+            "STALE": _status(quarter="2025-06-30"),
+        }
+        self.full_fetch = {t: _financials(t, quarter="2025-06-30") for t in ("NEW", "REPORTED", "EARNINGS_PASSED", "STALE")}
+
+        results = financials_provider.get_batch_core_financials(
+            ["NEW", "CURRENT", "REPORTED", "EARNINGS_PASSED", "STALE"], self.executor
+        )
+
+        self.assertEqual(sorted(self.fetched), ["EARNINGS_PASSED", "NEW", "REPORTED", "STALE"])
+        # Delta refresh: stored statements, fresh quote fields
+        self.assertEqual(results["CURRENT"]["marketCap"], 3e9)
+        self.assertEqual(results["CURRENT"]["annual_earnings"], _financials("CURRENT")["annual_earnings"])
+        self.assertEqual(self.collection.find_one({"ticker": "REPORTED"})["last_fiscal_quarter"], "2025-06-30")
+        self.assertEqual(self.collection.find_one({"ticker": "NEW"})["last_fiscal_quarter"], "2025-06-30")
+
+        # A second pass refetches nothing
+        self.fetched.clear()
+        financials_provider.get_batch_core_financials(["NEW", "CURRENT", "REPORTED", "STALE"], self.executor)
+        self.assertEqual(self.fetched, [])
+
+    def test_snapshot_is_served_when_the_full_fetch_fails(self):
+        self._seed("FLAKY", "2025-03-31")
+        self.statuses = {"FLAKY": _status(market_cap=5e9, quarter="2025-06-30")}
+
+        result = financials_provider.get_core_financials("FLAKY")
+
+        self.assertEqual(self.fetched, ["FLAKY"])
+        self.assertEqual(result["marketCap"], 5e9)
+        self.assertEqual(result["quarterly_earnings"], _financials("FLAKY")["quarterly_earnings"])
+
+    def test_invalid_fetch_is_not_stored(self):
+        self.full_fetch = {"BROKEN": {"ticker": "BROKEN", "marketCap": 1e9}}
+        self.assertIsNotNone(financials_provider.get_core_financials("BROKEN"))
+        self.assertIsNone(self.collection.find_one({"ticker": "BROKEN"}))
+
+
+class TestReportingStatus(unittest.TestCase):
+    @patch("providers.yfin.financials_provider.yahoo_client.execute_request")
+    def test_parses_quote_fields_and_reporting_signals(self, mock_execute_request):
+        mock_execute_request.return_value = {"quoteSummary": {"result": [{
+            "summaryDetail": {"marketCap": {"raw": 2e12}},
+            "defaultKeyStatistics": {"sharesOutstanding": {"raw": 1.5e10}, "mostRecentQuarter": {"raw": 1719705600, "fmt": "2024-06-30"}},
+            "calendarEvents": {"earnings": {"earningsDate": [{"fmt": "2024-08-01"}, {"fmt": "2024-07-30"}]}},
+        }]}}
+
+        status = financials_provider.get_reporting_status("AAPL")
+
+        self.assertEqual(status, {"marketCap": 2e12, "sharesOutstanding": 1.5e10, "floatShares": None,
+                                  "mostRecentQuarter": "2024-06-30", "nextEarningsDate": "2024-07-30"})
+        self.assertNotIn("incomeStatementHistory", mock_execute_request.call_args.kwargs["params"]["modules"])
+
+    @patch("providers.yfin.financials_provider.yahoo_client.execute_request", side_effect=RuntimeError("429"))
+    def test_failure_returns_none(self, _):
+        self.assertIsNone(financials_provider.get_reporting_status("AAPL"))
+
+
+class TestStoreAvailability(unittest.TestCase):
+    def test_database_errors_bypass_the_store_for_a_while(self):
+        now = [0.0]
+        calls = []
+
+        def unavailable():
+            calls.append(1)
+            raise errors.ServerSelectionTimeoutError("mongodb:27017: timed out")
+
+        store = FinancialsSnapshotStore(collection_getter=unavailable, clock=lambda: now[0])
+        self.assertIsNone(store.get("AAPL"))
+        self.assertIsNone(store.get("MSFT"))
+        store.save_statements("AAPL", _financials("AAPL"), None)
+        self.assertEqual(len(calls), 1)
+
+        now[0] += 3600
+        self.assertIsNone(store.get("AAPL"))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# backend-services/data-service/tests/unit/test_trading_calendar.py
+
+import unittest
+from unittest.mock import patch
+from datetime import date, timedelta
+import os
+import random
+import sys
+
+import pandas_market_calendars as mcal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared import trading_calendar
+from shared.trading_calendar import TradingCalendar
+
+
+class TestTradingCalendarParity(unittest.TestCase):
+    """The precomputed index answers exactly what per-call NYSE schedules used to."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.nyse = mcal.get_calendar("NYSE")
+        cls.cal = TradingCalendar.build(date(2015, 1, 1), date(2027, 12, 31))
+        rng = random.Random(7)
+        cls.sample_days = [date(2016, 1, 1) + timedelta(days=rng.randrange(0, 365 * 10)) for _ in range(60)]
+        # Known holidays and weekends
+        cls.sample_days += [date(2026, 1, 19), date(2025, 12, 25), date(2025, 7, 4), date(2025, 8, 24), date(2024, 11, 29)]
+
+    def _schedule_dates(self, start, end):
+        return [ts.date() for ts in self.nyse.schedule(start_date=start, end_date=end).index]
+
+    def test_previous_and_next_session(self):
+        for d in self.sample_days:
+            with self.subTest(day=d):
+                prior = [s for s in self._schedule_dates(d - timedelta(days=10), d) if s < d]
+                self.assertEqual(self.cal.previous_session(d), prior[-1])
+                self.assertEqual(self.cal.next_session(d), self._schedule_dates(d + timedelta(days=1), d + timedelta(days=10))[0])
+
+    def test_sessions_back_matches_schedule_index(self):
+        for d in self.sample_days[:15]:
+            for count in (1, 21, 252):
+                with self.subTest(day=d, count=count):
+                    idx = self._schedule_dates(d - timedelta(days=max(365, count * 3)), d)
+                    self.assertEqual(self.cal.sessions_back(d, count), idx[-count])
+
+    def test_session_membership_and_ranges(self):
+        self.assertFalse(self.cal.is_session(date(2026, 1, 19)))  # MLK Day
+        self.assertTrue(self.cal.is_session(date(2026, 1, 20)))
+        self.assertEqual(
+            self.cal.sessions_between(date(2026, 1, 15), date(2026, 1, 21)),
+            [date(2026, 1, 15), date(2026, 1, 16), date(2026, 1, 20), date(2026, 1, 21)],
+        )
+        self.assertEqual(
+            self.cal.last_n_sessions(date(2026, 1, 19), 3),
+            [date(2026, 1, 14), date(2026, 1, 15), date(2026, 1, 16)],
+        )
+
+
+class TestTradingCalendarBounds(unittest.TestCase):
+    def test_out_of_range_queries_return_none(self):
+        cal = TradingCalendar(["2026-01-22", "2026-01-23"])
+        self.assertIsNone(cal.previous_session(date(2026, 1, 22)))
+        self.assertIsNone(cal.next_session(date(2026, 1, 23)))
+        self.assertIsNone(cal.sessions_back(date(2026, 1, 23), 3))
+        self.assertEqual(cal.sessions_back(date(2026, 1, 25), 2), date(2026, 1, 22))
+
+    def test_empty_calendar(self):
+        cal = TradingCalendar([])
+        self.assertIsNone(cal.first_session)
+        self.assertFalse(cal.covers(date(2026, 1, 22), date(2026, 1, 22)))
+        self.assertIsNone(cal.previous_session(date(2026, 1, 22)))
+        self.assertEqual(cal.last_n_sessions(date(2026, 1, 22), 5), [])
+
+    @patch('shared.trading_calendar._DEFAULT_CALENDAR', None)
+    def test_default_calendar_is_built_once_and_widened_on_demand(self):
+        built = []
+        real_build = TradingCalendar.build.__func__
+
+        def counting_build(cls, start, end, name="NYSE"):
+            built.append((start, end))
+            return real_build(cls, start, end, name)
+
+        with patch.object(TradingCalendar, 'build', classmethod(counting_build)):
+            first = trading_calendar.get_trading_calendar()
+            self.assertIs(trading_calendar.get_trading_calendar(), first)
+            self.assertIs(trading_calendar.get_trading_calendar(date(2020, 1, 2), date(2020, 3, 1)), first)
+            self.assertEqual(len(built), 1)
+
+            wider = trading_calendar.get_trading_calendar(date(1980, 1, 2), date(1980, 1, 31))
+            self.assertEqual(len(built), 2)
+            self.assertTrue(wider.covers(date(1980, 1, 2), first.last_session))
+
+    @patch('shared.trading_calendar._DEFAULT_CALENDAR', None)
+    def test_non_session_bounds_do_not_trigger_rebuilds(self):
+        built = []
+        real_build = TradingCalendar.build.__func__
+
+        def counting_build(cls, start, end, name="NYSE"):
+            built.append((start, end))
+            return real_build(cls, start, end, name)
+
+        with patch.object(TradingCalendar, 'build', classmethod(counting_build)):
+            # New Year's Day is never a session, so the index's first session falls after it
+            cal = trading_calendar.get_trading_calendar(date(1990, 1, 1), None)
+            self.assertGreater(cal.first_session, date(1990, 1, 1))
+            self.assertTrue(cal.covers(date(1990, 1, 1), cal.range_end))
+            for _ in range(3):
+                self.assertIs(trading_calendar.get_trading_calendar(date(1990, 1, 1), None), cal)
+            self.assertEqual(len(built), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
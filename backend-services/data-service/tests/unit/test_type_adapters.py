@@ -0,0 +1,59 @@
+# backend-services/data-service/tests/unit/test_type_adapters.py
+import unittest
+from datetime import date
+from typing import Dict, List
+
+from pydantic import ValidationError
+
+# Provider first: helper_functions and the yfin providers import each other
+import providers.yfin.price_provider  # noqa: F401
+from helper_functions import validate_cached_price_data, validate_and_prepare_price_data, plan_incremental_price_fetch
+from shared.contracts import PriceDataItem, TickerList, get_type_adapter, validate_trusted
+from tests.common.test_fixtures import make_price_rows
+
+
+class TestTypeAdapterRegistry(unittest.TestCase):
+    def test_adapter_is_built_once_per_type(self):
+        self.assertIs(get_type_adapter(List[PriceDataItem]), get_type_adapter(List[PriceDataItem]))
+        self.assertIs(get_type_adapter(TickerList), get_type_adapter(TickerList))
+        self.assertIsNot(get_type_adapter(List[PriceDataItem]), get_type_adapter(Dict[str, List[PriceDataItem]]))
+
+
+class TestValidateTrusted(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_price_rows([100.0 + i for i in range(30)], date(2025, 6, 13))
+
+    def test_returns_data_unchanged(self):
+        self.assertIs(validate_trusted(List[PriceDataItem], self.rows), self.rows)
+        by_ticker = {"AAPL": self.rows, "MSFT": self.rows[:5]}
+        self.assertIs(validate_trusted(Dict[str, List[PriceDataItem]], by_ticker), by_ticker)
+
+    def test_bad_first_or_last_row_is_rejected(self):
+        for index in (0, -1):
+            rows = [dict(row) for row in self.rows]
+            del rows[index]["formatted_date"]
+            with self.assertRaises(ValidationError):
+                validate_trusted(List[PriceDataItem], rows)
+            with self.assertRaises(ValidationError):
+                validate_trusted(Dict[str, List[PriceDataItem]], {"AAPL": self.rows, "MSFT": rows})
+
+    def test_non_container_types_are_validated_fully(self):
+        with self.assertRaises(ValidationError):
+            validate_trusted(PriceDataItem, {"close": 1.0})
+
+
+class TestCachedPriceValidation(unittest.TestCase):
+    def test_cache_rows_pass_through_without_rebuilding(self):
+        rows = validate_and_prepare_price_data(make_price_rows([10.0, 11.0, 12.0], date(2025, 6, 13)), "AAPL")
+        self.assertIs(validate_cached_price_data(rows, "AAPL"), rows)
+        self.assertIsNone(validate_cached_price_data([], "AAPL"))
+        self.assertIsNone(validate_cached_price_data([{"close": 1.0}], "AAPL"))
+
+    def test_plan_uses_trusted_cache_check(self):
+        rows = make_price_rows([10.0, 11.0, 12.0], date(2025, 6, 13))
+        plan = plan_incremental_price_fetch(rows, None, "2025-01-01")
+        self.assertIs(plan["cached"], rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,11 @@ import unittest
 from unittest.mock import patch, MagicMock, call
 import threading
 import time
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from curl_cffi.requests import errors as cffi_errors
+from curl_cffi.requests import exceptions as cffi_exceptions
+from prometheus_client import REGISTRY
 
 # Since yahoo_client is in a sibling directory, we adjust the path
 import sys
@@ -102,5 +106,296 @@ class TestYahooClient(unittest.TestCase):
         self.assertFalse(yahoo_client._should_rotate(500, "Internal Server Error"))
         self.assertFalse(yahoo_client._should_rotate(200, ""))
 
+class _FakeClock:
+    """Deterministic clock: sleeping just advances time."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class TestRateGovernor(unittest.TestCase):
+    """Token-bucket pacing above the identity pool, driven by a fake clock."""
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        with yahoo_client._POOL_LOCK:
+            yahoo_client._ID_POOL = []
+            yahoo_client._ID_HEALTH.clear()
+
+    def _governor(self, **kwargs):
+        params = dict(global_rps=0, global_burst=1, identity_rps=0, identity_burst=1)
+        params.update(kwargs)
+        return yahoo_client._RateGovernor(clock=self.clock, sleep=self.clock.sleep, **params)
+
+    def test_global_bucket_paces_after_burst(self):
+        governor = self._governor(global_rps=2, global_burst=2)
+        idents = [MagicMock() for _ in range(6)]
+
+        for ident in idents:
+            governor.acquire(ident)
+
+        # 2 requests ride the burst, the remaining 4 are spaced at 2/s
+        self.assertAlmostEqual(self.clock.now, 2.0)
+        self.assertEqual(len(self.clock.sleeps), 4)
+
+    def test_identity_buckets_are_independent(self):
+        governor = self._governor(identity_rps=1, identity_burst=1)
+        busy, idle = MagicMock(), MagicMock()
+
+        governor.acquire(busy)
+        governor.acquire(busy)
+        self.assertAlmostEqual(self.clock.now, 1.0)
+        self.assertFalse(governor.identity_ready(busy))
+
+        # Another identity still has its own token
+        self.assertEqual(governor.acquire(idle), 0.0)
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    def test_throttle_halves_rate_and_success_recovers(self):
+        governor = self._governor(global_rps=4, global_burst=1)
+        ident = MagicMock()
+        governor.acquire(ident)
+
+        governor.on_throttled()
+        self.assertEqual(governor.rate_factor, 0.5)
+        # Next token now takes 1 / (4 * 0.5) seconds
+        self.assertAlmostEqual(governor.acquire(ident), 0.5)
+
+        for _ in range(5):
+            governor.on_throttled()
+        self.assertEqual(governor.rate_factor, yahoo_client._MIN_RATE_FACTOR)
+
+        for _ in range(100):
+            governor.on_success()
+        self.assertEqual(governor.rate_factor, 1.0)
+
+    @patch('providers.yfin.yahoo_client.cffi_requests.Session.get')
+    def test_crumb_refresh_is_paced(self, mock_get):
+        mock_get.return_value = MagicMock(text="crumb")
+        governor = self._governor(identity_rps=1, identity_burst=1)
+        with patch.object(yahoo_client, '_GOVERNOR', governor):
+            ident = yahoo_client._Identity()
+            ident.ensure_crumb()
+            ident.rotate_and_refresh("test")
+
+        # The second crumb fetch waited for the identity's next token
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    @unittest.skipIf("YF_GLOBAL_RPS" in os.environ, "global rate set explicitly")
+    def test_global_default_matches_pool_capacity(self):
+        self.assertEqual(yahoo_client._GLOBAL_RPS, yahoo_client._POOL_SIZE * yahoo_client._IDENTITY_RPS)
+
+    def test_choose_identity_prefers_identities_with_tokens(self):
+        governor = self._governor(identity_rps=0.001, identity_burst=1)
+        drained, fresh = MagicMock(), MagicMock()
+        governor.acquire(drained)
+        with patch.object(yahoo_client, '_GOVERNOR', governor):
+            yahoo_client._ID_POOL = [drained, fresh]
+            weights = [yahoo_client._identity_weight(i) for i in yahoo_client._ID_POOL]
+        self.assertLess(weights[0], weights[1])
+
+    @patch('providers.yfin.yahoo_client._Identity.ensure_crumb', return_value="test_crumb")
+    @patch('providers.yfin.yahoo_client.cffi_requests.Session.get')
+    def test_transport_429_slows_governor(self, mock_get, mock_ensure_crumb):
+        governor = self._governor(global_rps=10, global_burst=1)
+        throttled = MagicMock(status_code=429, text="Too Many Requests", url="https://query1.finance.yahoo.com/v8")
+        throttled.raise_for_status.side_effect = cffi_exceptions.HTTPError("HTTP Error 429", 0, throttled)
+        mock_get.side_effect = [throttled, MagicMock(status_code=200, json=lambda: {"ok": True})]
+        ident = yahoo_client._Identity()
+
+        with patch.object(yahoo_client, '_GOVERNOR', governor):
+            with self.assertRaises(cffi_exceptions.HTTPError):
+                yahoo_client._execute_json_once("http://test.url", _chosen_identity=ident)
+            self.assertEqual(governor.rate_factor, 0.5)
+
+            # The retry waits for the slowed bucket, then success starts recovery
+            self.assertEqual(yahoo_client._execute_json_once("http://test.url", _chosen_identity=ident), {"ok": True})
+        self.assertAlmostEqual(self.clock.sleeps[-1], 0.2)
+        self.assertAlmostEqual(governor.rate_factor, 0.5 + yahoo_client._RATE_RECOVERY_STEP)
+
+    @patch('providers.yfin.yahoo_client._Identity.ensure_crumb', return_value="test_crumb")
+    @patch('providers.yfin.yahoo_client.cffi_requests.Session.get')
+    def test_requests_are_counted_per_identity_and_status(self, mock_get, mock_ensure_crumb):
+        throttled = MagicMock(status_code=429, text="Too Many Requests", url="https://query1.finance.yahoo.com/v8")
+        throttled.raise_for_status.side_effect = cffi_exceptions.HTTPError("HTTP Error 429", 0, throttled)
+        mock_get.side_effect = [
+            throttled,
+            MagicMock(status_code=200, json=lambda: {"ok": True}),
+            cffi_errors.RequestsError("connection reset"),
+        ]
+        ident = yahoo_client._Identity(label="7")
+
+        def count(status):
+            return REGISTRY.get_sample_value("yahoo_requests_total", {"identity": "7", "status": status}) or 0.0
+
+        before = {status: count(status) for status in ("429", "200", "error")}
+        with patch.object(yahoo_client, '_GOVERNOR', self._governor()):
+            for _ in range(3):
+                try:
+                    yahoo_client._execute_json_once("http://test.url", _chosen_identity=ident)
+                except Exception:
+                    pass
+
+        self.assertEqual({status: count(status) - before[status] for status in before}, {"429": 1, "200": 1, "error": 1})
+
+class _CountingChartHandler(BaseHTTPRequestHandler):
+    """Stub Yahoo chart endpoint: counts hits and responds slowly so concurrent callers overlap."""
+    hits = 0
+    hits_lock = threading.Lock()
+
+    def do_GET(self):
+        with _CountingChartHandler.hits_lock:
+            _CountingChartHandler.hits += 1
+        time.sleep(0.3)
+        body = json.dumps({"chart": {"result": [{"meta": {"symbol": "^GSPC"}, "path": self.path}]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestRequestCoalescing(unittest.TestCase):
+    """Concurrent identical execute_request calls share one upstream request."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _CountingChartHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/v8/finance/chart/%5EGSPC"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _CountingChartHandler.hits = 0
+        with yahoo_client._POOL_LOCK:
+            yahoo_client._ID_POOL = []
+            yahoo_client._ID_HEALTH.clear()
+        patcher = patch('providers.yfin.yahoo_client._Identity.ensure_crumb', return_value="test_crumb")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run_concurrently(self, n, params_for):
+        barrier = threading.Barrier(n)
+        results, errors = [None] * n, []
+
+        def worker(i):
+            barrier.wait()
+            try:
+                results[i] = yahoo_client.execute_request(self.url, params=params_for(i))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+        return results, errors
+
+    def test_identical_concurrent_requests_go_upstream_once(self):
+        results, errors = self._run_concurrently(8, lambda i: {"range": "1y", "interval": "1d"})
+
+        self.assertEqual(errors, [])
+        self.assertEqual(_CountingChartHandler.hits, 1)
+        self.assertTrue(all(r == results[0] for r in results))
+        # Waiters get their own copy of the shared payload
+        self.assertEqual(len({id(r) for r in results}), 8)
+        self.assertEqual(yahoo_client._INFLIGHT, {})
+
+    def test_distinct_requests_are_not_coalesced(self):
+        results, errors = self._run_concurrently(4, lambda i: {"range": "1y", "interval": "1d", "n": i})
+
+        self.assertEqual(errors, [])
+        self.assertEqual(_CountingChartHandler.hits, 4)
+
+    def test_sequential_requests_are_not_cached(self):
+        yahoo_client.execute_request(self.url, params={"range": "1y"})
+        yahoo_client.execute_request(self.url, params={"range": "1y"})
+        self.assertEqual(_CountingChartHandler.hits, 2)
+
+    def test_waiters_receive_the_leaders_error(self):
+        started, release = threading.Event(), threading.Event()
+        upstream_calls = []
+
+        def failing_upstream(url, **kwargs):
+            upstream_calls.append(url)
+            started.set()
+            release.wait(timeout=5)
+            raise cffi_errors.RequestsError("upstream down")
+
+        with patch('providers.yfin.yahoo_client._execute_request_with_retry', side_effect=failing_upstream):
+            errors = []
+
+            def worker():
+                try:
+                    yahoo_client.execute_request(self.url, params={"range": "1y"})
+                except cffi_errors.RequestsError as e:
+                    errors.append(e)
+
+            leader = threading.Thread(target=worker)
+            leader.start()
+            started.wait(timeout=5)
+            followers = [threading.Thread(target=worker) for _ in range(3)]
+            for t in followers:
+                t.start()
+            time.sleep(0.1)
+            release.set()
+            for t in [leader] + followers:
+                t.join(timeout=5)
+
+        self.assertEqual(len(upstream_calls), 1)
+        self.assertEqual(len(errors), 4)
+        # Each waiter raises its own exception object chained to the leader's
+        self.assertEqual(len({id(e) for e in errors}), 4)
+        self.assertTrue(all(str(e) == "upstream down" for e in errors))
+        self.assertEqual(yahoo_client._INFLIGHT, {})
+
+    def test_leader_mutation_does_not_reach_waiters(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_upstream(url, **kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return {"chart": {"result": [{"meta": {"symbol": "^GSPC"}}]}}
+
+        with patch('providers.yfin.yahoo_client._execute_request_with_retry', side_effect=slow_upstream):
+            results = []
+
+            def leader_worker():
+                payload = yahoo_client.execute_request(self.url, params={"range": "1y"})
+                payload["chart"]["result"].clear()
+                results.append(payload)
+
+            def waiter_worker():
+                results.append(yahoo_client.execute_request(self.url, params={"range": "1y"}))
+
+            leader = threading.Thread(target=leader_worker)
+            leader.start()
+            started.wait(timeout=5)
+            waiters = [threading.Thread(target=waiter_worker) for _ in range(3)]
+            for t in waiters:
+                t.start()
+            time.sleep(0.1)
+            release.set()
+            for t in [leader] + waiters:
+                t.join(timeout=5)
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(sum(1 for r in results if r["chart"]["result"] == [{"meta": {"symbol": "^GSPC"}}]), 3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
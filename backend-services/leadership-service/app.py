@@ -10,14 +10,16 @@ from logging.handlers import RotatingFileHandler
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
 from checks import industry_peer_checks
-from pydantic import ValidationError, TypeAdapter
+from pydantic import ValidationError
 from typing import List
-from shared.contracts import CoreFinancials, PriceDataItem, LeadershipProfileSingle, LeadershipProfileBatch, LeadershipProfileForBatch
+from shared.contracts import get_type_adapter, CoreFinancials, PriceDataItem, LeadershipProfileSingle, LeadershipProfileBatch, LeadershipProfileForBatch
+from shared.metrics import instrument_app
 from data_fetcher import (
     fetch_financial_data,
     fetch_price_data,
     fetch_batch_financials,
     fetch_batch_price_data,
+    unpack_price_batch,
     fetch_peer_data,
 )
 from helper_functions import (
@@ -26,6 +28,7 @@ from helper_functions import (
     analyze_ticker_leadership,
 )
 app = Flask(__name__)
+instrument_app(app)
 
 # Configuration
 DATA_SERVICE_URL = os.getenv("DATA_SERVICE_URL", "http://data-service:3001")
@@ -155,7 +158,7 @@ def leadership_analysis(ticker):
             return jsonify({'error': fin_error[0]}), fin_error[1]
 
         # Validate incoming data against contracts using the centralized helper
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
         financial_data = validate_data_contract(financial_data_raw, CoreFinancials, ticker, "CoreFinancials")
         stock_data = validate_data_contract(stock_data_raw, PriceDataValidator, ticker, "PriceData")
 
@@ -258,18 +261,23 @@ def leadership_batch_analysis():
     # --- 4. Validate All Fetched Data ---
 
     # Validate all successfully fetched data using the centralized helper
-    PriceDataValidator = TypeAdapter(List[PriceDataItem])
+    PriceDataValidator = get_type_adapter(List[PriceDataItem])
     successful_financials = {}
     for ticker, data in all_financial_data_raw.get('success', {}).items():
         validated_data = validate_data_contract(data, CoreFinancials, ticker, "CoreFinancials")
         if validated_data:
             successful_financials[ticker] = validated_data
 
-    successful_prices = {}
-    for ticker, data in all_price_data.get('success', {}).items():
-        validated_data = validate_data_contract(data, PriceDataValidator, ticker, "PriceData")
-        if validated_data:
-            successful_prices[ticker] = validated_data
+    # Columnar responses are validated per ticker while unpacking; rows still go through the TypeAdapter
+    price_rows, prices_prevalidated = unpack_price_batch(all_price_data)
+    if prices_prevalidated:
+        successful_prices = price_rows
+    else:
+        successful_prices = {}
+        for ticker, data in price_rows.items():
+            validated_data = validate_data_contract(data, PriceDataValidator, ticker, "PriceData")
+            if validated_data:
+                successful_prices[ticker] = validated_data
 
     # --- 5. Prepare Analysis Tasks (CPU-Bound) ---
     analysis_tasks = []
@@ -4,6 +4,7 @@
 import logging
 import pandas as pd
 from datetime import datetime
+from shared.contracts import PriceColumns
 from .utils import failed_check
 
 # Get a logger that's a child of the app.logger, so it inherits the file handler
@@ -14,6 +15,21 @@ DATA_SERVICE_URL = "http://data-service:3001"
 # Functions for financial statements (like check_yoy_eps_growth) expect newest-to-oldest data, 
 # while functions for price history expect oldest-to-newest, due to the data properties.
 
+# Price history arrives either as PriceDataItem rows or, from columnar /price/batch, as PriceColumns
+def _price_column(stock_data, field, last_n=None):
+    """Values of one price field (oldest to newest), limited to the last `last_n` sessions when given."""
+    if isinstance(stock_data, PriceColumns):
+        values = getattr(stock_data, field)
+        return values[-last_n:] if last_n else values
+    rows = stock_data[-last_n:] if last_n else stock_data
+    return [row.get(field) if row else None for row in rows]
+
+def _price_frame(stock_data):
+    """DataFrame with formatted_date and high columns, built straight from the arrays for PriceColumns."""
+    if isinstance(stock_data, PriceColumns):
+        return pd.DataFrame({"formatted_date": stock_data.dates, "high": stock_data.high})
+    return pd.DataFrame(stock_data)
+
 # Helper functions
 def _find_market_turning_point(market_trends_data):
     """
@@ -100,7 +116,7 @@ def _check_new_high_in_window(stock_data, window_days, start_date_str=None):
         logger.warning(f"Insufficient data: Found {len(stock_data)} days, need at least {window_days + 1}. Returning False.")
         return False
 
-    df = pd.DataFrame(stock_data)
+    df = _price_frame(stock_data)
     df['date'] = pd.to_datetime(df['formatted_date'])
     logger.info(f"DataFrame created with {len(df)} rows. Date range: {df['date'].min().strftime('%Y-%m-%d')} to {df['date'].max().strftime('%Y-%m-%d')}")
 
@@ -188,15 +204,13 @@ def _calculate_drawdown(price_history: list, days: int = 240):
     if not price_history or len(price_history) < days:
         return None, None, None
 
-    relevant_period = price_history[-days:]
-    
     # Ensure highs are valid numbers before calculating max
-    valid_highs = [p['high'] for p in relevant_period if p.get('high') is not None]
+    valid_highs = [high for high in _price_column(price_history, 'high', days) if high is not None]
     if not valid_highs:
         return None, None, None
 
     high_price = max(valid_highs)
-    current_price = relevant_period[-1].get('close')
+    current_price = _price_column(price_history, 'close', 1)[-1]
 
     if high_price is None or current_price is None or high_price == 0:
         return high_price, current_price, None
@@ -238,9 +252,8 @@ def _check_recent_breakout(stock_data, sub_results):
         return False
 
     # Use last 20 trading days
-    recent_data = stock_data[-20:]
-    recent_prices = [day['close'] for day in recent_data if day and day.get('close') is not None]
-    recent_volumes = [day['volume'] for day in recent_data if day and day.get('volume') is not None]
+    recent_prices = [price for price in _price_column(stock_data, 'close', 20) if price is not None]
+    recent_volumes = [volume for volume in _price_column(stock_data, 'volume', 20) if volume is not None]
 
     # Need at least two data points to calculate an average and compare
     if len(recent_prices) < 2 or len(recent_volumes) < 2:
@@ -6,7 +6,8 @@ from urllib3.util.retry import Retry
 import logging
 import pandas as pd 
 from datetime import datetime, timedelta
-import pandas_market_calendars as mcal
+from shared.contracts import unpack_price_batch as shared_unpack_price_batch
+from shared.trading_calendar import get_trading_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +79,8 @@ def fetch_batch_price_data(tickers):
     try:
         batch_url = f"{DATA_SERVICE_URL}/price/batch"
         # The source is hardcoded to yfinance as it's the default and required provider for this service
-        payload = {"tickers": tickers, "source": "yfinance"}
+        # Columnar payloads are several times smaller than per-day row objects for long histories
+        payload = {"tickers": tickers, "source": "yfinance", "format": "columnar"}
         response = session.post(batch_url, json=payload, timeout=40) # Increased timeout for potentially large batches
         response.raise_for_status()
         return response.json(), None
@@ -86,6 +88,17 @@ def fetch_batch_price_data(tickers):
         status_code = getattr(e.response, 'status_code', 503)
         return None, (f"Could not fetch batch price data", status_code)
 
+def unpack_price_batch(batch_data):
+    """
+    shared.contracts.unpack_price_batch, logging the columnar tickers dropped for a
+    contract violation. Columnar series come back as PriceColumns; row payloads unchanged.
+    Returns (series_by_ticker, prevalidated).
+    """
+    series_by_ticker, prevalidated, invalid = shared_unpack_price_batch(batch_data)
+    for ticker, e in invalid.items():
+        logger.error(f"Contract violation for PriceColumns for {ticker}: {e}")
+    return series_by_ticker, prevalidated
+
 def fetch_index_data():
     """Fetch major index data from data service"""
     # Fetch data for all three major indices for market trend context
@@ -94,7 +107,8 @@ def fetch_index_data():
     if error:
         logger.error(f"Failed to fetch index data: {error[0]}")
         return None  # Return only the 'success' dictionary from the batch response.
-    return index_data.get('success', {})  # Return only the data dictionary on success.
+    index_rows, _ = unpack_price_batch(index_data)
+    return index_rows  # Return only the data dictionary on success.
 
 def fetch_peer_data(ticker):
     """Fetches industry and peer list from the data-service."""
@@ -109,21 +123,12 @@ def fetch_peer_data(ticker):
     
 def get_last_n_workdays(n_days=8):
     """Calculates the last N US business days, starting with the oldest date and ending with the most recent one."""
-    nyse = mcal.get_calendar('NYSE')
     # Anchor the calculation to yesterday to ensure the trading day has completed.
     end_date = datetime.now().date() - timedelta(days=1)
-    
-    # Go back far enough to ensure we capture n_days even with holidays. A 10-day buffer is safe.
-    start_date = end_date - timedelta(days=n_days + 10) 
-    
-    # Get the schedule of valid trading days up to and including yesterday.
-    schedule = nyse.schedule(start_date=start_date, end_date=end_date)
-    
-    # The schedule's index contains the datetime objects of valid market days.
-    # We format them and take the last n_days from the list.
-    trading_days = schedule.index.strftime('%Y-%m-%d').tolist()
-    
-    return trading_days[-n_days:]
+
+    # Binary search in the shared, precomputed NYSE session index (no per-call schedule build).
+    sessions = get_trading_calendar().last_n_sessions(end_date, n_days)
+    return [d.strftime('%Y-%m-%d') for d in sessions]
 
 def fetch_market_trends(n_days=8):
     """
@@ -5,6 +5,7 @@ import logging
 
 from checks import financial_health_checks, market_relative_checks, industry_peer_checks
 from data_fetcher import fetch_index_data, fetch_market_trends
+from market_context import MarketContextCache
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,7 @@ def validate_data_contract(data, validator, ticker_for_log, contract_name):
         logger.error(f"Contract violation for {contract_name} for {ticker_for_log}: {e}")
         return None
 
-def fetch_general_data_for_analysis():   
+def _load_general_data_for_analysis():
     # Fetch historical price data
     index_data = fetch_index_data()
     if not index_data:
@@ -59,6 +60,16 @@ def fetch_general_data_for_analysis():
 
     return index_data, market_trends_data
 
+# Index series and market trends are the same for every ticker; load them once per trading session
+_MARKET_CONTEXT = MarketContextCache(_load_general_data_for_analysis)
+
+def fetch_general_data_for_analysis():
+    """
+    Returns (index_data, market_trends_data) from the shared market-context cache,
+    or an {'error', 'status'} dict if they could not be loaded.
+    """
+    return _MARKET_CONTEXT.get()
+
 # helper function to perform leadership analysis
 def analyze_ticker_leadership(ticker, index_data, market_trends_data, financial_data, stock_data, peers_data, all_financial_data):
     """
@@ -0,0 +1,89 @@
+# backend-services/leadership-service/market_context.py
+"""
+Process-wide cache for the market context every leadership analysis needs:
+the major index price series and the last 365 sessions of market trends.
+
+Both depend only on the market, not on the ticker being analysed, so they are
+loaded once per trading session instead of once per request. Within a session
+the entry is refreshed in the background after REFRESH_SECONDS (the index
+series carry the current day's bar); requests keep being served the previous
+value meanwhile. A new session invalidates the entry, and the first request
+after that reloads it synchronously.
+"""
+
+import os
+import time
+import threading
+import logging
+from datetime import datetime, timedelta
+
+from shared.trading_calendar import get_trading_calendar
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = int(os.getenv("LEADERSHIP_MARKET_CONTEXT_REFRESH_SECONDS", "300"))
+
+
+def last_completed_session():
+    """The most recent NYSE session on or before yesterday (same anchor as get_last_n_workdays)."""
+    return get_trading_calendar().sessions_back(datetime.now().date() - timedelta(days=1), 1)
+
+
+class MarketContextCache:
+    """
+    Holds one loader result keyed by trading session.
+    `loader` returns the value to cache, or a dict with an 'error' key, which
+    is passed through to the caller and never cached.
+    """
+
+    def __init__(self, loader, session_key=last_completed_session, refresh_seconds=REFRESH_SECONDS, clock=time.monotonic):
+        self._loader = loader
+        self._session_key = session_key
+        self._refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._entry = None  # (session, value, loaded_at)
+        self._load_lock = threading.Lock()
+        self._refresh_flag_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        session = self._session_key()
+        entry = self._entry
+        if entry is not None and entry[0] == session:
+            if self._clock() - entry[2] >= self._refresh_seconds:
+                self._refresh_in_background(session)
+            return entry[1]
+
+        # Miss or new session: one caller loads, concurrent callers wait for its result
+        with self._load_lock:
+            entry = self._entry
+            if entry is not None and entry[0] == session:
+                return entry[1]
+            return self._load(session)
+
+    def clear(self):
+        self._entry = None
+
+    def _load(self, session):
+        value = self._loader()
+        if isinstance(value, dict) and 'error' in value:
+            return value
+        self._entry = (session, value, self._clock())
+        return value
+
+    def _refresh_in_background(self, session):
+        with self._refresh_flag_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._load_lock:
+                    self._load(session)
+            except Exception as e:
+                logger.warning(f"Background market context refresh failed, keeping previous value: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="market-context-refresh", daemon=True).start()
@@ -8,6 +8,7 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app import app
 import data_fetcher
+from shared.contracts import PriceColumns
 
 # --- Mock Data Generation ---
 # Using helpers from the logic test file for consistency
@@ -140,6 +141,38 @@ class TestLeadershipScreeningIntegration(unittest.TestCase):
         sent_payload = mock_session_post.call_args[1]['json']
         self.assertEqual(sent_payload, {'dates': ['2025-08-25', '2025-08-26', '2025-08-27']})
 
+    @patch('data_fetcher.datetime')
+    def test_get_last_n_workdays_skips_weekends_and_holidays(self, mock_datetime):
+        from datetime import datetime as real_datetime
+        # Wednesday 2026-01-21 → anchored to Tuesday; Monday 2026-01-19 is MLK Day
+        mock_datetime.now.return_value = real_datetime(2026, 1, 21, 9, 0)
+
+        self.assertEqual(data_fetcher.get_last_n_workdays(3), ['2026-01-15', '2026-01-16', '2026-01-20'])
+
+    # Integration test for the columnar /price/batch round trip
+    @patch('data_fetcher.session.post')
+    def test_fetch_index_data_unpacks_columnar_batch(self, mock_session_post):
+        columns = {
+            "dates": ["2025-08-25", "2025-08-26"], "open": [1.0, 2.0], "high": [1.5, 2.5],
+            "low": [0.5, 1.5], "close": [1.2, 2.2], "volume": [100, 200], "adjclose": [1.2, 2.2],
+        }
+        mock_session_post.return_value = MagicMock(status_code=200, json=lambda: {
+            "format": "columnar",
+            "success": {"^GSPC": columns, "^DJI": dict(columns, close=[1.2])},  # ^DJI columns are misaligned
+            "failed": ["^IXIC"],
+        })
+
+        index_data = data_fetcher.fetch_index_data()
+
+        self.assertEqual(mock_session_post.call_args[1]['json']['format'], 'columnar')
+        self.assertEqual(list(index_data), ['^GSPC'])
+        # Kept columnar: the checks read the arrays directly
+        self.assertIsInstance(index_data['^GSPC'], PriceColumns)
+        self.assertEqual(index_data['^GSPC'].to_rows([1]), [{
+            "formatted_date": "2025-08-26", "open": 2.0, "high": 2.5, "low": 1.5,
+            "close": 2.2, "volume": 200, "adjclose": 2.2,
+        }])
+
     @patch('app.fetch_peer_data')
     @patch('app.fetch_batch_price_data')
     @patch('app.fetch_batch_financials')
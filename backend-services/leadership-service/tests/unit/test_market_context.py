@@ -0,0 +1,121 @@
+# backend-services/leadership-service/tests/unit/test_market_context.py
+import unittest
+import sys
+import os
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import helper_functions
+from market_context import MarketContextCache
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMarketContextCache(unittest.TestCase):
+    """Index series and market trends are fetched once per session, not once per request."""
+
+    def setUp(self):
+        self.session = date(2026, 1, 22)
+        self.clock = _FakeClock()
+        self.index_calls = 0
+        self.trend_calls = 0
+        self.release_index = threading.Event()
+        self.release_index.set()
+
+        def fake_fetch_index_data():
+            self.index_calls += 1
+            self.release_index.wait(timeout=5)
+            return {'^GSPC': [{'close': 100.0 + self.index_calls}]}
+
+        def fake_fetch_market_trends(n_days):
+            self.trend_calls += 1
+            return [{'date': '2026-01-22', 'trend': 'Bullish'}] * n_days, None
+
+        cache = MarketContextCache(
+            helper_functions._load_general_data_for_analysis,
+            session_key=lambda: self.session,
+            refresh_seconds=300,
+            clock=self.clock,
+        )
+        patchers = [
+            patch('helper_functions._MARKET_CONTEXT', cache),
+            patch('helper_functions.fetch_index_data', side_effect=fake_fetch_index_data),
+            patch('helper_functions.fetch_market_trends', side_effect=fake_fetch_market_trends),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_repeated_requests_hit_upstream_once(self):
+        results = [helper_functions.fetch_general_data_for_analysis() for _ in range(20)]
+
+        self.assertEqual((self.index_calls, self.trend_calls), (1, 1))
+        index_data, market_trends = results[0]
+        self.assertEqual(index_data, {'^GSPC': [{'close': 101.0}]})
+        self.assertEqual(len(market_trends), 365)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_concurrent_cold_requests_share_one_load(self):
+        self.release_index.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(helper_functions.fetch_general_data_for_analysis())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        self._wait_for(lambda: self.index_calls == 1)
+        self.release_index.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual((self.index_calls, self.trend_calls), (1, 1))
+
+    def test_new_session_reloads(self):
+        helper_functions.fetch_general_data_for_analysis()
+        self.session = date(2026, 1, 23)
+
+        index_data, _ = helper_functions.fetch_general_data_for_analysis()
+
+        self.assertEqual((self.index_calls, self.trend_calls), (2, 2))
+        self.assertEqual(index_data['^GSPC'][0]['close'], 102.0)
+
+    def test_stale_entry_is_served_while_refreshing_in_background(self):
+        first = helper_functions.fetch_general_data_for_analysis()
+        self.clock.now = 301
+        self.release_index.clear()
+
+        # The refresh is blocked upstream, yet the request returns the previous value immediately
+        self.assertIs(helper_functions.fetch_general_data_for_analysis(), first)
+        self.assertIs(helper_functions.fetch_general_data_for_analysis(), first)
+        self.release_index.set()
+        self._wait_for(lambda: helper_functions.fetch_general_data_for_analysis() is not first)
+
+        index_data, _ = helper_functions.fetch_general_data_for_analysis()
+        self.assertEqual(index_data['^GSPC'][0]['close'], 102.0)
+        self.assertEqual(self.index_calls, 2)  # one background refresh, not one per stale request
+
+    def test_errors_are_returned_and_not_cached(self):
+        with patch('helper_functions.fetch_market_trends', return_value=(None, ("Could not fetch market trends data", 503))):
+            result = helper_functions.fetch_general_data_for_analysis()
+        self.assertEqual(result, {'error': "Could not fetch market trends data", 'status': 503})
+
+        index_data, _ = helper_functions.fetch_general_data_for_analysis()
+        self.assertIn('^GSPC', index_data)
+        self.assertEqual(self.trend_calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
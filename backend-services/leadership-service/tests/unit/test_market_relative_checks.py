@@ -7,6 +7,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from checks.market_relative_checks import *
+from shared.contracts import PriceColumns
 from tests.mock_data_helpers import create_mock_price_data, create_mock_index_data
 
 def create_mock_market_trends(pattern):
@@ -94,6 +95,24 @@ class TestMarketRelativeChecks(unittest.TestCase):
         result = details['market_trend_impact']
         self.assertFalse(result['pass'])
         self.assertIn("Market trends data is insufficient (requires >= 8 days).", result['message'])
+    def test_columnar_price_history_matches_rows(self):
+        """PriceColumns from a columnar /price/batch give the same results as the row form."""
+        stock_data, _ = create_mock_price_data(1.5, length=365)
+        stock_data[-1]['high'] = max(d['high'] for d in stock_data) + 1
+        stock_data[-1]['volume'] *= 3
+        patterns = {
+            'Recovery': (['Bearish'] * 20) + (['Neutral'] * 5) + (['Bullish'] * 5),
+            'Bullish': (['Neutral'] * 20) + (['Bullish'] * 10),
+            'Bearish': (['Bullish'] * 20) + (['Neutral'] * 5) + (['Bearish'] * 5),
+        }
+        for context, pattern in patterns.items():
+            with self.subTest(context=context):
+                market_trends = create_mock_market_trends(pattern)
+                from_rows, from_columns = {}, {}
+                evaluate_market_trend_impact(stock_data, create_mock_index_data(), market_trends, from_rows)
+                evaluate_market_trend_impact(PriceColumns.from_rows(stock_data), create_mock_index_data(), market_trends, from_columns)
+                self.assertEqual(from_rows['market_trend_impact']['market_trend_context'], context)
+                self.assertEqual(from_columns, from_rows)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -19,9 +19,11 @@ from shared.contracts import (
     InternalBatchAddResponse, 
     WatchlistRefreshStatusResponse,
 )
+from shared.metrics import instrument_app
 from pydantic import ValidationError
 # --- 1. Initialize Flask App and Basic Config ---
 app = Flask(__name__)
+instrument_app(app)
 PORT = int(os.getenv("PORT", 3006))
 MONITORING_SERVICE_URL = os.getenv("MONITORING_SERVICE_URL", "http://monitoring-service:3006")
 # Allowed ticker characters: letters, digits, dot, hyphen
@@ -140,9 +142,10 @@ def get_aggregated_market_health():
         # 3. Fetch VCP analysis for Major Indices
         indices_map = {}
         try:
-            # We want FULL analysis to render charts, so we pass mode="full"
+            # We want FULL analysis to render charts, so we pass mode="full";
+            # the overview charts only need a downsampled series (contraction points are kept exactly)
             indices_tickers = ["^GSPC", "^IXIC", "^DJI"]
-            indices_resp = downstream_clients.analyze_batch(indices_tickers, mode="full")
+            indices_resp = downstream_clients.analyze_batch(indices_tickers, mode="full", chart="downsampled")
             
             # Convert list response to Dict[ticker, AnalysisObject]
             app.logger.info(f"Indices analysis response type: {type(indices_resp)}")
@@ -6,8 +6,9 @@ import os
 from urllib.parse import unquote
 import re
 from typing import List, Any, Dict, Type
-from pydantic import ValidationError, TypeAdapter
+from pydantic import ValidationError
 from shared.contracts import (
+    get_type_adapter,
     PriceDataItem, 
     CoreFinancials,
     MarketOverview,
@@ -41,7 +42,7 @@ def validate_and_prepare_price_data(data: list, ticker: str) -> list | None:
     if not data:
         return None
     try:
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
+        PriceDataValidator = get_type_adapter(List[PriceDataItem])
         validated_items = PriceDataValidator.validate_python(data)
         # Convert back to a list of dicts for JSON serialization
         return [item.model_dump() for item in validated_items]
@@ -15,7 +15,7 @@ Each function:
 
 import os
 import requests
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 DEFAULT_SCREENING_URL = os.getenv("SCREENING_SERVICE_URL", "http://screening-service:3002")
 DEFAULT_ANALYSIS_URL = os.getenv("ANALYSIS_SERVICE_URL", "http://analysis-service:3003")
@@ -23,19 +23,20 @@ DEFAULT_DATA_URL = os.getenv("DATA_SERVICE_URL", "http://data-service:3001")
 
 _TIMEOUT = float(os.getenv("DOWNSTREAM_HTTP_TIMEOUT_SECONDS", "600.0"))
 
-def _post_json(url: str, payload: Dict[str, Any], params: Dict[str, Any] = None) -> Any:
+def _post_json(url: str, payload: Dict[str, Any], params: Dict[str, Any] = None, timeout: Optional[float] = None) -> Any:
     """
     Helper to send POST requests with JSON payloads and optional query params.
+    `timeout` (e.g. what is left of a caller's deadline) can only shorten the default HTTP timeout.
     """
     try:
         # Pass 'params' to requests.post so they are encoded into the URL (e.g. ?mode=fast)
-        resp = requests.post(url, json=payload, params=params, timeout=_TIMEOUT)
+        resp = requests.post(url, json=payload, params=params, timeout=min(_TIMEOUT, timeout or _TIMEOUT))
         resp.raise_for_status()
         return resp.json()
     except Exception as exc:
         raise RuntimeError(f"Downstream call failed for {url}: {exc}") from exc
     
-def screen_batch(tickers: List[str]) -> Any:
+def screen_batch(tickers: List[str], timeout: Optional[float] = None) -> Any:
     """
     Call screening-service to evaluate screening pass/fail per ticker.
 
@@ -47,13 +48,15 @@ def screen_batch(tickers: List[str]) -> Any:
       * ["AAPL", ...] (implicit pass list)
     """
     url = f"{DEFAULT_SCREENING_URL}/screen/batch"
-    return _post_json(url, {"tickers": list(tickers)})
+    return _post_json(url, {"tickers": list(tickers)}, timeout=timeout)
 
-def analyze_batch(tickers: List[str], mode: str = "fast") -> Any:
+def analyze_batch(tickers: List[str], mode: str = "fast", chart: Optional[str] = None, timeout: Optional[float] = None) -> Any:
     """
     Call analysis-service for VCP metrics per ticker.
     - mode='fast' (default): Returns VCPAnalysisBatchItem (lean, no chart data).
     - mode='full': Returns VCPAnalysisSingle (rich, includes chart_data).
+    - chart: chart_data payload shape for mode='full' (shared.contracts.ChartPayloadMode);
+      analysis-service defaults to 'full' (every session).
     
     Expected response items contain fields like:
     - ticker, vcp_pass, is_pivot_good, has_pivot, is_at_pivot, has_pullback_setup,
@@ -61,9 +64,12 @@ def analyze_batch(tickers: List[str], mode: str = "fast") -> Any:
     """
     url = f"{DEFAULT_ANALYSIS_URL}/analyze/batch"
     # Pass mode in payload to match analysis-service expectation and ensure 'full' mode is respected.
-    return _post_json(url, {"tickers": list(tickers), "mode": mode})
+    payload = {"tickers": list(tickers), "mode": mode}
+    if chart:
+        payload["chart"] = chart
+    return _post_json(url, payload, timeout=timeout)
 
-def analyze_freshness_batch(tickers: List[str]) -> Any:
+def analyze_freshness_batch(tickers: List[str], timeout: Optional[float] = None) -> Any:
     """
     Call analysis-service to compute freshness / health results per ticker.
 
@@ -85,7 +91,7 @@ def analyze_freshness_batch(tickers: List[str]) -> Any:
         does not set those fields directly.
     """
     url = f"{DEFAULT_ANALYSIS_URL}/analyze/freshness/batch"
-    return _post_json(url, {"tickers": list(tickers)})
+    return _post_json(url, {"tickers": list(tickers)}, timeout=timeout)
 
 def data_return_batch(tickers: List[str]) -> Any:
     """
@@ -97,7 +103,7 @@ def data_return_batch(tickers: List[str]) -> Any:
     url = f"{DEFAULT_DATA_URL}/data/return/batch"
     return _post_json(url, {"tickers": list(tickers)})
 
-def watchlist_metrics_batch(tickers: List[str]) -> Any:
+def watchlist_metrics_batch(tickers: List[str], timeout: Optional[float] = None) -> Any:
     """
     Call data-service to compute compact watchlist metrics per ticker.
 
@@ -113,7 +119,7 @@ def watchlist_metrics_batch(tickers: List[str]) -> Any:
     update_orchestrator._index_by_ticker can consume it directly.
     """
     url = f"{DEFAULT_DATA_URL}/data/watchlist-metrics/batch"
-    raw = _post_json(url, {"tickers": list(tickers)})
+    raw = _post_json(url, {"tickers": list(tickers)}, timeout=timeout)
 
     if isinstance(raw, dict) and isinstance(raw.get("metrics"), dict):
         return raw["metrics"]
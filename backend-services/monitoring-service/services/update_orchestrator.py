@@ -4,7 +4,8 @@ Watchlist refresh orchestrator.
 
 Coordinates the refresh of watchlist item statuses by:
 - Loading current watchlist documents from MongoDB.
-- Collecting cross-service signals (Screen, VCP, Freshness, Data).
+- Collecting cross-service signals (Screen, VCP, Freshness, Data) concurrently,
+  each stage bounded by its own deadline.
 - Enriching items and delegating status derivation & partitioning to watchlist_status_service.
 - Persisting updated statuses and archiving failed items via mongo_client.
 
@@ -12,9 +13,13 @@ This module:
 - Owns no HTTP routing.
 - Talks to mongo_client, downstream clients, and the pure status engine.
 """
+import os
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime  
-from typing import Any, Dict, List, Tuple, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 from database import mongo_client
 from services import watchlist_status_service
 from services import downstream_clients 
@@ -23,6 +28,16 @@ from shared.contracts import LastRefreshStatus
 
 logger = logging.getLogger(__name__)
 
+# Wall-clock budget per downstream stage, counted from the moment the stage starts running.
+# It is also the stage's HTTP timeout, so a stage that misses it is treated like a failed call and
+# its request gives up shortly after instead of holding a worker for the full downstream timeout.
+STAGE_DEADLINE_SEC = float(os.getenv("WATCHLIST_REFRESH_STAGE_DEADLINE_SEC", "600"))
+
+# One worker per stage (screen, VCP, freshness, metrics), in a pool owned by each refresh, so a
+# refresh never waits behind another refresh's stages. Screen -> VCP is a dependent chain;
+# freshness and metrics only need the ticker list and overlap with it.
+STAGE_WORKERS = 4
+
 # helper functions
 def _normalize_passed_from_screen(response: Any) -> Set[str]:
     """
@@ -76,6 +91,32 @@ def _safe_ratio(n: Any, d: Any) -> float | None:
     except Exception:
         return None
 
+class _Stage:
+    """A downstream call dispatched on the refresh's stage pool; its deadline starts when the call starts."""
+
+    def __init__(self, executor: ThreadPoolExecutor, fn: Callable[..., Any], tickers: List[str], name: str):
+        self.name = name
+        self.started_at: Optional[float] = None
+        self._started = threading.Event()
+        self.future = executor.submit(self._run, fn, tickers)
+
+    def _run(self, fn: Callable[..., Any], tickers: List[str]) -> Any:
+        self.started_at = time.monotonic()
+        self._started.set()
+        return fn(tickers, timeout=STAGE_DEADLINE_SEC)
+
+    def result(self) -> Any:
+        """
+        Wait for the stage until its deadline.
+        Raises RuntimeError on timeout; re-raises the downstream exception otherwise.
+        """
+        # The pool has a worker per stage, so a dispatched stage starts right away
+        self._started.wait()
+        try:
+            return self.future.result(timeout=max(0.0, self.started_at + STAGE_DEADLINE_SEC - time.monotonic()))
+        except FutureTimeoutError as exc:
+            raise RuntimeError(f"{self.name} exceeded its {STAGE_DEADLINE_SEC:.0f}s deadline") from exc
+
 # main functions
 def refresh_watchlist_status() -> Dict[str, Any]:
     """
@@ -109,9 +150,16 @@ def refresh_watchlist_status() -> Dict[str, Any]:
     failed_downstream_tickers: Set[str] = set()
 
     # 2. Collect signals (The Funnel)
+    # Freshness and metrics run for ALL tickers alongside the screen -> VCP chain;
+    # the funnel below only consults freshness for VCP survivors.
+    stage_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="watchlist-refresh")
+    fresh_stage = _Stage(stage_executor, downstream_clients.analyze_freshness_batch, tickers, "analyze/freshness/batch")
+    metrics_stage = _Stage(stage_executor, downstream_clients.watchlist_metrics_batch, tickers, "watchlist-metrics/batch")
+    screen_stage = _Stage(stage_executor, downstream_clients.screen_batch, tickers, "screen/batch")
+
     # A) Screening
     try:
-        screen_resp = downstream_clients.screen_batch(tickers)
+        screen_resp = screen_stage.result()
         passed_screen = _normalize_passed_from_screen(screen_resp)
     except Exception as exc:
         logger.error("refresh-watchlist-status: screening failed: %s", exc, exc_info=True)
@@ -120,7 +168,9 @@ def refresh_watchlist_status() -> Dict[str, Any]:
 
     # B) VCP analysis (Optimization: only screen survivors)
     try:
-        analyze_resp = downstream_clients.analyze_batch(sorted(list(passed_screen)))
+        analyze_resp = _Stage(
+            stage_executor, downstream_clients.analyze_batch, sorted(list(passed_screen)), "analyze/batch"
+        ).result()
         vcp_idx = _index_by_ticker(analyze_resp)
     except Exception as exc:
         logger.error("refresh-watchlist-status: analyze/batch failed: %s", exc, exc_info=True)
@@ -133,10 +183,11 @@ def refresh_watchlist_status() -> Dict[str, Any]:
         if isinstance(payload, dict) and payload.get("vcp_pass") is True
     )
 
-    # C) Freshness analysis (Optimization: only VCP survivors)
+    # C) Freshness analysis (joined per ticker; only VCP survivors depend on it)
     try:
-        fresh_resp = downstream_clients.analyze_freshness_batch(sorted(list(vcp_passed)))
-        fresh_idx = _index_by_ticker(fresh_resp)
+        fresh_resp = fresh_stage.result()
+        # Keep the enrichment identical to the sequential funnel: freshness only for VCP survivors
+        fresh_idx = {t: v for t, v in _index_by_ticker(fresh_resp).items() if t in vcp_passed}
     except Exception as exc:
         logger.error("refresh-watchlist-status: analyze/freshness/batch failed: %s", exc, exc_info=True)
         fresh_idx = {}
@@ -144,7 +195,7 @@ def refresh_watchlist_status() -> Dict[str, Any]:
 
     # D) Data return (Fetch for ALL tickers to ensure UI data availability)
     try:
-        metrics_resp = downstream_clients.watchlist_metrics_batch(tickers)
+        metrics_resp = metrics_stage.result()
         # metrics_resp is already {ticker: {metrics...}}, compatible with _index_by_ticker
         data_idx = _index_by_ticker(metrics_resp)
     except Exception as exc:
@@ -152,6 +203,9 @@ def refresh_watchlist_status() -> Dict[str, Any]:
         data_idx = {}
         failed_downstream_tickers.update(tickers)
 
+    # Every stage has returned or missed its deadline; a late one is ended by its HTTP timeout
+    stage_executor.shutdown(wait=False)
+
     # 3. Compute status & Enrich items
     enriched_items: List[Dict[str, Any]] = []
 
@@ -505,15 +505,15 @@ def stub_downstream_clients_for_unit_tests(request, monkeypatch):
     from services import downstream_clients as dc
 
     # Make the funnel deterministic and network-free
-    monkeypatch.setattr(dc, "screen_batch", lambda tickers: {"passed": list(tickers)})
+    monkeypatch.setattr(dc, "screen_batch", lambda tickers, timeout=None: {"passed": list(tickers)})
     monkeypatch.setattr(
         dc,
         "analyze_batch",
-        lambda tickers, mode="fast": [{"ticker": t, "vcp_pass": True} for t in tickers],
+        lambda tickers, mode="fast", chart=None, timeout=None: [{"ticker": t, "vcp_pass": True} for t in tickers],
     )
     monkeypatch.setattr(
         dc,
         "analyze_freshness_batch",
-        lambda tickers: [{"ticker": t, "passes_freshness_check": True} for t in tickers],
+        lambda tickers, timeout=None: [{"ticker": t, "passes_freshness_check": True} for t in tickers],
     )
-    monkeypatch.setattr(dc, "watchlist_metrics_batch", lambda tickers: {t: {} for t in tickers})
+    monkeypatch.setattr(dc, "watchlist_metrics_batch", lambda tickers, timeout=None: {t: {} for t in tickers})
@@ -1,6 +1,8 @@
 # backend-services/monitoring-service/tests/services/test_update_orchestrator.py
 
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch, MagicMock, call
 
 # import orchestrator entrypoint
@@ -349,3 +351,132 @@ class TestRefreshWatchlistStatusOrchestrator:
         mock_list_watchlist.assert_called_once()
         args, kwargs = mock_list_watchlist.call_args
         assert args[0] is mock_db
+
+
+class TestRefreshWatchlistStageConcurrency:
+    """Stage overlap and per-stage deadlines, using delayed downstream fakes."""
+
+    @staticmethod
+    def _delayed(delay, fn):
+        def _call(tickers, *args, **kwargs):
+            time.sleep(delay)
+            return fn(tickers)
+        return _call
+
+    @patch("services.update_orchestrator.watchlist_status_service.derive_refresh_lists")
+    @patch("services.update_orchestrator.mongo_client.bulk_archive_failed")
+    @patch("services.update_orchestrator.mongo_client.bulk_update_status")
+    @patch("services.update_orchestrator.mongo_client.list_watchlist_excluding")
+    @patch("services.update_orchestrator.mongo_client.connect")
+    def test_freshness_and_metrics_overlap_with_screen_and_vcp(
+        self, mock_connect, mock_list_watchlist, mock_bulk_update, mock_bulk_archive, mock_derive_refresh_lists,
+        monkeypatch,
+    ):
+        mock_connect.return_value = (MagicMock(), MagicMock())
+        mock_list_watchlist.return_value = [{"ticker": "AAA"}, {"ticker": "BBB"}]
+        mock_derive_refresh_lists.return_value = ([], [])
+
+        dc = orchestrator.downstream_clients
+        monkeypatch.setattr(dc, "screen_batch", self._delayed(0.2, lambda t: {"passed": ["AAA"]}))
+        monkeypatch.setattr(dc, "analyze_batch", self._delayed(0.2, lambda t: [{"ticker": x, "vcp_pass": True} for x in t]))
+        monkeypatch.setattr(
+            dc, "analyze_freshness_batch",
+            self._delayed(0.3, lambda t: [{"ticker": x, "passes_freshness_check": True, "message": "fresh"} for x in t]),
+        )
+        monkeypatch.setattr(dc, "watchlist_metrics_batch", self._delayed(0.3, lambda t: {x: {"current_price": 10.0} for x in t}))
+
+        started = time.monotonic()
+        summary = orchestrator.refresh_watchlist_status()
+        elapsed = time.monotonic() - started
+
+        # Sequential would be 0.2 + 0.2 + 0.3 + 0.3 = 1.0s; overlapped it is bounded by the screen -> VCP chain
+        assert elapsed < 0.8
+        assert summary["failed_items"] == 0
+
+        enriched = {item["ticker"]: item for item in mock_derive_refresh_lists.call_args[0][0]}
+        assert enriched["AAA"]["last_refresh_status"] == "PASS"
+        assert enriched["AAA"]["current_price"] == 10.0
+        # Freshness is joined only for VCP survivors, as in the sequential funnel
+        assert enriched["BBB"]["failed_stage"] == "screen"
+        assert enriched["BBB"]["message"] is None
+        assert enriched["BBB"]["current_price"] == 10.0
+
+    @patch("services.update_orchestrator.watchlist_status_service.derive_refresh_lists")
+    @patch("services.update_orchestrator.mongo_client.bulk_archive_failed")
+    @patch("services.update_orchestrator.mongo_client.bulk_update_status")
+    @patch("services.update_orchestrator.mongo_client.list_watchlist_excluding")
+    @patch("services.update_orchestrator.mongo_client.connect")
+    def test_stage_missing_its_deadline_marks_dependent_tickers_unknown(
+        self, mock_connect, mock_list_watchlist, mock_bulk_update, mock_bulk_archive, mock_derive_refresh_lists,
+        monkeypatch,
+    ):
+        mock_connect.return_value = (MagicMock(), MagicMock())
+        mock_list_watchlist.return_value = [{"ticker": "AAA"}, {"ticker": "BBB"}]
+        mock_derive_refresh_lists.return_value = ([], [])
+
+        monkeypatch.setattr(orchestrator, "STAGE_DEADLINE_SEC", 0.1)
+        dc = orchestrator.downstream_clients
+        monkeypatch.setattr(dc, "screen_batch", lambda t, timeout=None: {"passed": ["AAA"]})
+        monkeypatch.setattr(
+            dc, "analyze_freshness_batch",
+            self._delayed(0.5, lambda t: [{"ticker": x, "passes_freshness_check": True} for x in t]),
+        )
+
+        started = time.monotonic()
+        summary = orchestrator.refresh_watchlist_status()
+
+        assert time.monotonic() - started < 0.4
+        enriched = {item["ticker"]: item for item in mock_derive_refresh_lists.call_args[0][0]}
+        # Freshness timed out: only the VCP survivor depends on it
+        assert enriched["AAA"]["last_refresh_status"] == "UNKNOWN"
+        assert enriched["BBB"]["last_refresh_status"] == "FAIL"
+        assert summary["failed_items"] == 1
+
+    def test_stage_deadline_starts_when_the_call_starts(self, monkeypatch):
+        monkeypatch.setattr(orchestrator, "STAGE_DEADLINE_SEC", 0.3)
+        seen_timeouts = []
+
+        def call(tickers, timeout=None):
+            seen_timeouts.append(timeout)
+            time.sleep(0.2)
+            return tickers
+
+        # A single worker queues the second stage behind the first for 0.2s
+        executor = ThreadPoolExecutor(max_workers=1)
+        first = orchestrator._Stage(executor, call, ["A"], "first")
+        second = orchestrator._Stage(executor, call, ["B"], "second")
+        try:
+            assert first.result() == ["A"]
+            # 0.4s after dispatch, but only 0.2s after it started: still within its deadline
+            assert second.result() == ["B"]
+        finally:
+            executor.shutdown()
+        # The deadline is passed on as the downstream HTTP timeout
+        assert seen_timeouts == [0.3, 0.3]
+
+    @patch("services.update_orchestrator.watchlist_status_service.derive_refresh_lists")
+    @patch("services.update_orchestrator.mongo_client.bulk_archive_failed")
+    @patch("services.update_orchestrator.mongo_client.bulk_update_status")
+    @patch("services.update_orchestrator.mongo_client.list_watchlist_excluding")
+    @patch("services.update_orchestrator.mongo_client.connect")
+    def test_concurrent_refreshes_do_not_share_stage_workers(
+        self, mock_connect, mock_list_watchlist, mock_bulk_update, mock_bulk_archive, mock_derive_refresh_lists,
+        monkeypatch,
+    ):
+        mock_connect.return_value = (MagicMock(), MagicMock())
+        mock_list_watchlist.return_value = [{"ticker": "AAA"}]
+        mock_derive_refresh_lists.return_value = ([], [])
+
+        dc = orchestrator.downstream_clients
+        monkeypatch.setattr(dc, "screen_batch", self._delayed(0.2, lambda t: {"passed": list(t)}))
+        monkeypatch.setattr(dc, "analyze_batch", self._delayed(0.2, lambda t: [{"ticker": x, "vcp_pass": True} for x in t]))
+        monkeypatch.setattr(dc, "analyze_freshness_batch", self._delayed(0.2, lambda t: []))
+        monkeypatch.setattr(dc, "watchlist_metrics_batch", self._delayed(0.2, lambda t: {}))
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=3) as callers:
+            summaries = list(callers.map(lambda _: orchestrator.refresh_watchlist_status(), range(3)))
+
+        # Three refreshes on one shared 3-worker pool would queue 12 stages; each owns its pool instead
+        assert time.monotonic() - started < 0.7
+        assert all(summary["failed_items"] == 0 for summary in summaries)
@@ -7,12 +7,14 @@ import json
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, Generator
 
+import redis
 from flask import Flask, jsonify, request, Response, stream_with_context
 from pydantic import BaseModel, ConfigDict, ValidationError, StrictBool
 from kombu.exceptions import OperationalError
 
 # Import services and tasks
 import services.job_service as job_service
+from services import progress_bus
 from tasks import enqueue_full_pipeline, refresh_watchlist_task
 from shared.contracts import (
     JobType, 
@@ -22,6 +24,7 @@ from shared.contracts import (
     JobErrorEvent,
     ScreeningJobRunRecord
 )
+from shared.metrics import instrument_app
 
 # Setup Logging
 logging.basicConfig(
@@ -32,6 +35,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+instrument_app(app)
 PORT = int(os.getenv("PORT", 3004))
 
 
@@ -52,142 +56,237 @@ class ScreeningRunOptions(BaseModel):
 
 # --- Helper: SSE Generator ---
 
+# With a progress channel, MongoDB is re-read only on terminal events or after this much silence
+SSE_RECONCILE_INTERVAL_SEC = float(os.getenv("SSE_RECONCILE_INTERVAL_SEC", 15.0))
+SSE_HEARTBEAT_INTERVAL_SEC = 15.0
+
+
+def _snapshot_key(updated_at: Any) -> str:
+    """
+    Normalizes a snapshot timestamp for deduplication, so the same update read back from
+    MongoDB (naive UTC datetime) and received over pub/sub (ISO string) compare equal.
+    """
+    if isinstance(updated_at, str):
+        try:
+            updated_at = datetime.fromisoformat(updated_at)
+        except ValueError:
+            return updated_at
+    if isinstance(updated_at, datetime):
+        if updated_at.tzinfo is not None:
+            updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return updated_at.isoformat()
+    return str(updated_at)
+
+
+def _progress_event_frame(job_id: str, job_type: Any, status: Any, snapshot: Dict[str, Any]) -> Optional[str]:
+    """Maps a progress snapshot to a JobProgressEvent SSE frame, or None if the snapshot is invalid."""
+    try:
+        progress_event = JobProgressEvent(
+            job_id=job_id,
+            job_type=job_type,
+            status=status,
+            step_current=snapshot.get('step_current', 0),
+            step_total=snapshot.get('step_total', 0),
+            step_name=snapshot.get('step_name', 'unknown'),
+            message=snapshot.get('message', ''),
+            updated_at=snapshot.get('updated_at')
+        )
+        return f"event: progress\ndata: {progress_event.model_dump_json()}\n\n"
+    except ValidationError as ve:
+        logger.error(f"Invalid progress snapshot for {job_id}: {ve}")
+    except Exception as e:
+        logger.warning(f"Error processing snapshot for {job_id}: {e}")
+    return None
+
+
+def _terminal_event_frame(job: ScreeningJobRunRecord) -> Optional[str]:
+    """
+    Builds the closing SSE frame for a job in a terminal state (SUCCESS/FAILED), or None if it is still active.
+    Handles polymorphic summary extraction for Screening vs. Watchlist jobs.
+    """
+    if job.status == JobStatus.SUCCESS.value:
+        # Polymorphic Extraction based on JobType
+        # We must extract specific keys based on the job type to satisfy the test expectations
+        # and avoid Pydantic validation errors from complex objects.
+
+        full_summary = job.result_summary if job.result_summary else {}
+        summary_counts = {}
+
+        # CASE A: Watchlist Refresh Job
+        if job.job_type == JobType.WATCHLIST_REFRESH or job.job_type == JobType.WATCHLIST_REFRESH.value:
+            summary_counts = {
+                "updated_items": int(full_summary.get("updated_items", 0)),
+                "archived_items": int(full_summary.get("archived_items", 0)),
+                "failed_items": int(full_summary.get("failed_items", 0))
+            }
+
+        # CASE B: Screening Job (Default)
+        else:
+            summary_counts = {
+                "total_tickers_fetched": int(full_summary.get("total_tickers_fetched", 0)),
+                "trend_screen_survivors_count": int(full_summary.get("trend_screen_survivors_count", 0)),
+                "vcp_survivors_count": int(full_summary.get("vcp_survivors_count", 0)),
+                "final_candidates_count": int(full_summary.get("final_candidates_count", 0))
+            }
+            # Handle nested industry diversity if present
+            industry_diversity = full_summary.get("industry_diversity", {})
+            if isinstance(industry_diversity, dict):
+                summary_counts["unique_industries_count"] = int(industry_diversity.get("unique_industries_count", 0))
+
+        complete_event = JobCompleteEvent(
+            job_id=job.job_id,
+            job_type=job.job_type,
+            status="SUCCESS",
+            completed_at=job.completed_at or datetime.now(timezone.utc),
+            summary_counts=summary_counts
+        )
+        return f"event: complete\ndata: {complete_event.model_dump_json()}\n\n"
+
+    if job.status == JobStatus.FAILED.value:
+        error_event = JobErrorEvent(
+            job_id=job.job_id,
+            job_type=job.job_type,
+            status="FAILED",
+            error_message=job.error_message or "Unknown error",
+            completed_at=job.completed_at or datetime.now(timezone.utc)
+        )
+        return f"event: error\ndata: {error_event.model_dump_json()}\n\n"
+
+    return None
+
+
 def _sse_generator(job_id: str) -> Generator[str, None, None]:
     """
-    Polls the database for job updates and yields SSE-compliant events.
+    Streams job updates as SSE-compliant events.
     Strictly follows Week 10 SDD requirements:
     - Deduplicates events based on timestamps.
     - Emits heartbeats every 15s.
     - Maps DB state to canonical Pydantic events (JobProgressEvent, etc.).
     - Prioritizes progress emission over terminal state to handle fast jobs.
     - Handles polymorphic summary extraction for Screening vs. Watchlist jobs.
+
+    Progress is pushed over the job's Redis channel (services.progress_bus). The job document
+    is read on connect (replay for late subscribers), on terminal events, and after quiet
+    periods to reconcile lost messages. Without Redis, or after losing it mid-stream, falls back
+    to polling MongoDB every second.
     """
     last_updated_at = None
     last_heartbeat = time.time()
-    
+
+    # Subscribe before the first read so no update can slip between replay and live events
+    pubsub = progress_bus.subscribe(job_id)
+
     # Yield immediate event to flush headers and prevent Gateway/Client timeouts
     yield ": connected\n\n"
-    
-    # Loop indefinitely; relying on client disconnect or terminal state to break
-    while True:
-        try:
-            job: Optional[ScreeningJobRunRecord] = job_service.get_job_detail(job_id)
-            
-            # 1. Handle Job Not Found
-            if not job:
-                error_event = JobErrorEvent(
-                    job_id=job_id,
-                    job_type="SCREENING", # Default/fallback
-                    status="FAILED",
-                    error_message=f"Job {job_id} not found",
-                    completed_at=datetime.now(timezone.utc)
-                )
-                yield f"event: error\ndata: {error_event.model_dump_json()}\n\n"
-                break
 
-            status = job.status
-            now = time.time()
-
-            # --- Process Progress Snapshot FIRST (Race Condition Fix) ---
-            snapshot = job.progress_snapshot
-            if snapshot:
-                # Deduplication logic: Check if timestamp has changed
-                current_updated_at = str(snapshot.get('updated_at'))
-                
-                if current_updated_at != last_updated_at:
+    try:
+        # Loop indefinitely; relying on client disconnect or terminal state to break
+        while True:
+            try:
+                job: Optional[ScreeningJobRunRecord] = job_service.get_job_detail(job_id)
+
+                # 1. Handle Job Not Found
+                if not job:
+                    error_event = JobErrorEvent(
+                        job_id=job_id,
+                        job_type="SCREENING", # Default/fallback
+                        status="FAILED",
+                        error_message=f"Job {job_id} not found",
+                        completed_at=datetime.now(timezone.utc)
+                    )
+                    yield f"event: error\ndata: {error_event.model_dump_json()}\n\n"
+                    break
+
+                # --- Process Progress Snapshot FIRST (Race Condition Fix) ---
+                snapshot = job.progress_snapshot
+                if snapshot:
+                    # Deduplication logic: Check if timestamp has changed
+                    current_updated_at = _snapshot_key(snapshot.get('updated_at'))
+
+                    if current_updated_at != last_updated_at:
+                        frame = _progress_event_frame(job.job_id, job.job_type, job.status, snapshot)
+                        if frame:
+                            yield frame
+                            last_updated_at = current_updated_at
+
+                # --- Handle Terminal States (SUCCESS/FAILED) ---
+                terminal_frame = _terminal_event_frame(job)
+                if terminal_frame:
+                    yield terminal_frame
+                    break
+
+                # Heartbeat (Every 15s)
+                now = time.time()
+                if now - last_heartbeat >= SSE_HEARTBEAT_INTERVAL_SEC:
+                    yield ": ping\n\n"
+                    last_heartbeat = now
+
+                if pubsub is None:
+                    # Polling interval
+                    time.sleep(1.0)
+                    continue
+
+                # --- Push Mode: relay channel messages until the job document needs a re-read ---
+                reconcile_at = time.time() + SSE_RECONCILE_INTERVAL_SEC
+                while time.time() < reconcile_at:
                     try:
-                        # Map snapshot to strict contract
-                        progress_event = JobProgressEvent(
-                            job_id=job.job_id,
-                            job_type=job.job_type,
-                            status=job.status,
-                            step_current=snapshot.get('step_current', 0),
-                            step_total=snapshot.get('step_total', 0),
-                            step_name=snapshot.get('step_name', 'unknown'),
-                            message=snapshot.get('message', ''),
-                            updated_at=snapshot.get('updated_at')
+                        message = pubsub.get_message(timeout=1.0)
+                    except redis.RedisError as e:
+                        # Lost Redis mid-stream: the job is unaffected, keep streaming by polling MongoDB
+                        logger.warning(f"SSE progress channel for {job_id} lost, polling MongoDB: {e}")
+                        try:
+                            pubsub.close()
+                        except Exception:
+                            pass
+                        pubsub = None
+                        break
+
+                    now = time.time()
+                    if now - last_heartbeat >= SSE_HEARTBEAT_INTERVAL_SEC:
+                        yield ": ping\n\n"
+                        last_heartbeat = now
+
+                    if not message or message.get("type") != "message":
+                        continue
+
+                    payload = json.loads(message["data"])
+                    if payload.get("type") != progress_bus.MESSAGE_PROGRESS:
+                        # complete/failed: the terminal event is built from the job document
+                        break
+
+                    current_updated_at = _snapshot_key(payload.get('updated_at'))
+                    if current_updated_at != last_updated_at:
+                        frame = _progress_event_frame(
+                            job.job_id, job.job_type, payload.get("status", job.status), payload
                         )
-                        yield f"event: progress\ndata: {progress_event.model_dump_json()}\n\n"
-                        last_updated_at = current_updated_at
-                    except ValidationError as ve:
-                        logger.error(f"Invalid progress snapshot for {job_id}: {ve}")
-                    except Exception as e:
-                        logger.warning(f"Error processing snapshot for {job_id}: {e}")
-
-            # --- Handle Terminal States (SUCCESS/FAILED) ---
-            if status == JobStatus.SUCCESS.value:
-                # Polymorphic Extraction based on JobType
-                # We must extract specific keys based on the job type to satisfy the test expectations
-                # and avoid Pydantic validation errors from complex objects.
-                
-                full_summary = job.result_summary if job.result_summary else {}
-                summary_counts = {}
-
-                # CASE A: Watchlist Refresh Job
-                if job.job_type == JobType.WATCHLIST_REFRESH or job.job_type == JobType.WATCHLIST_REFRESH.value:
-                    summary_counts = {
-                        "updated_items": int(full_summary.get("updated_items", 0)),
-                        "archived_items": int(full_summary.get("archived_items", 0)),
-                        "failed_items": int(full_summary.get("failed_items", 0))
-                    }
-
-                # CASE B: Screening Job (Default)
-                else:
-                    summary_counts = {
-                        "total_tickers_fetched": int(full_summary.get("total_tickers_fetched", 0)),
-                        "trend_screen_survivors_count": int(full_summary.get("trend_screen_survivors_count", 0)),
-                        "vcp_survivors_count": int(full_summary.get("vcp_survivors_count", 0)),
-                        "final_candidates_count": int(full_summary.get("final_candidates_count", 0))
-                    }
-                    # Handle nested industry diversity if present
-                    industry_diversity = full_summary.get("industry_diversity", {})
-                    if isinstance(industry_diversity, dict):
-                        summary_counts["unique_industries_count"] = int(industry_diversity.get("unique_industries_count", 0))
-
-                complete_event = JobCompleteEvent(
-                    job_id=job.job_id,
-                    job_type=job.job_type,
-                    status="SUCCESS",
-                    completed_at=job.completed_at or datetime.now(timezone.utc),
-                    summary_counts=summary_counts
-                )
-                yield f"event: complete\ndata: {complete_event.model_dump_json()}\n\n"
-                break
-            
-            elif status == JobStatus.FAILED.value:
-                error_event = JobErrorEvent(
-                    job_id=job.job_id,
-                    job_type=job.job_type,
-                    status="FAILED",
-                    error_message=job.error_message or "Unknown error",
-                    completed_at=job.completed_at or datetime.now(timezone.utc)
-                )
-                yield f"event: error\ndata: {error_event.model_dump_json()}\n\n"
+                        if frame:
+                            yield frame
+                            last_updated_at = current_updated_at
+
+                    if payload.get("status") in (JobStatus.SUCCESS.value, JobStatus.FAILED.value):
+                        break
+
+            except Exception as e:
+                logger.error(f"SSE Stream Error for {job_id}: {e}")
+                # Try to emit an error event before closing if possible
+                try:
+                    err = JobErrorEvent(
+                        job_id=job_id,
+                        job_type="UNKNOWN",
+                        status="FAILED",
+                        error_message=f"Internal Stream Error: {str(e)}",
+                        completed_at=datetime.now(timezone.utc)
+                    )
+                    yield f"event: error\ndata: {err.model_dump_json()}\n\n"
+                except:
+                    pass
                 break
-
-            # Heartbeat (Every 15s)
-            if now - last_heartbeat >= 15.0:
-                yield ": ping\n\n"
-                last_heartbeat = now
-
-            # Polling interval
-            time.sleep(1.0)
-
-        except Exception as e:
-            logger.error(f"SSE Stream Error for {job_id}: {e}")
-            # Try to emit an error event before closing if possible
+    finally:
+        if pubsub is not None:
             try:
-                err = JobErrorEvent(
-                    job_id=job_id,
-                    job_type="UNKNOWN",
-                    status="FAILED",
-                    error_message=f"Internal Stream Error: {str(e)}",
-                    completed_at=datetime.now(timezone.utc)
-                )
-                yield f"event: error\ndata: {err.model_dump_json()}\n\n"
-            except:
+                pubsub.close()
+            except Exception:
                 pass
-            break
 
 # --- Routes ---
 
@@ -3,6 +3,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_shutdown
 
 def _get_celery_urls():
     """
@@ -35,6 +36,14 @@ celery.conf.update(
     # This protects against zombie processes in standard tasks like watchlist refresh.
     task_soft_time_limit=600, 
     task_time_limit=900,
+    # [Routing]
+    # Pipeline shard tasks get their own queue, consumed only by the dedicated shard worker
+    # (SCHEDULER_MODE=shard_worker). run_full_pipeline blocks its slot while it waits on its
+    # shards, so shards must never queue behind pipeline runs on the same worker.
+    task_routes={
+        "scheduler.trend_screening_shard": {"queue": "pipeline_shards"},
+        "scheduler.vcp_analysis_shard": {"queue": "pipeline_shards"},
+    },
     beat_schedule={
         "scheduler.refresh_watchlist_task": {
             "task": "scheduler.refresh_watchlist_task",
@@ -46,5 +55,20 @@ celery.conf.update(
     },
 )
 
+# [Metrics]
+# Workers have no Flask app; with WORKER_METRICS_PORT set, the parent process serves /metrics
+# for all prefork children (PROMETHEUS_MULTIPROC_DIR must be set so their samples are shared).
+@worker_init.connect
+def _serve_worker_metrics(**_):
+    port = os.getenv("WORKER_METRICS_PORT")
+    if port:
+        from shared.metrics import start_metrics_server
+        start_metrics_server(int(port))
+
+@worker_process_shutdown.connect
+def _drop_worker_metrics(pid=None, **_):
+    from shared.metrics import mark_worker_exited
+    mark_worker_exited(pid or os.getpid())
+
 if __name__ == "__main__":
     celery.start()
\ No newline at end of file
@@ -48,6 +48,7 @@ class DatabaseManager:
             "vcp_survivors": None,
             "leadership_survivors": None,
             "ticker_status": None,
+            "pipeline_checkpoints": None,
         }
 
     def _ensure_indexes(self):
@@ -77,6 +78,14 @@ class DatabaseManager:
             )
             logger.info("Ensured indexes for screening_results.")
 
+        if self.collections["pipeline_checkpoints"] is not None:
+            # One checkpoint document per pipeline job
+            self.collections["pipeline_checkpoints"].create_index(
+                [("job_id", ASCENDING)],
+                unique=True,
+                background=True
+            )
+
     def connect(self) -> bool:
         if self.client is not None and all(coll is not None for coll in self.collections.values()):
             return True
@@ -96,6 +105,7 @@ class DatabaseManager:
                 self.collections["vcp_survivors"] = self.db["vcp_survivors"]
                 self.collections["leadership_survivors"] = self.db["leadership_survivors"]
                 self.collections["ticker_status"] = self.db["ticker_status"]
+                self.collections["pipeline_checkpoints"] = self.db["pipeline_checkpoints"]
 
                 logger.info("MongoDB connection successful.")
                 self._ensure_indexes()
@@ -133,3 +143,15 @@ class DatabaseManager:
 def get_db_collections():
     db_manager = DatabaseManager()
     return db_manager.get_collections()
+
+
+def get_checkpoint_collection():
+    """
+    Returns the pipeline_checkpoints collection (stage outputs of run_full_pipeline),
+    or None if MongoDB is unavailable. Kept out of get_db_collections() so the
+    existing six-collection tuple stays stable for its callers.
+    """
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        return None
+    return db_manager.collections["pipeline_checkpoints"]
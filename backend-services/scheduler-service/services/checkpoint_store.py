@@ -0,0 +1,75 @@
+# backend-services/scheduler-service/services/checkpoint_store.py
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from db import get_checkpoint_collection
+
+logger = logging.getLogger(__name__)
+
+# Stages of run_full_pipeline whose outputs are checkpointed, in execution order
+STAGE_TICKERS = "fetch_tickers"
+STAGE_TREND = "trend_screening"
+STAGE_VCP = "vcp_analysis"
+STAGE_LEADERSHIP = "leadership_screening"
+PIPELINE_STAGES = (STAGE_TICKERS, STAGE_TREND, STAGE_VCP, STAGE_LEADERSHIP)
+
+
+def save_stage(job_id: str, stage: str, payload: Dict[str, Any]) -> None:
+    """
+    Persists the output of a completed pipeline stage for a job (upsert, one document per job).
+    A checkpoint write failure is logged and swallowed: it only costs resumability, not the run.
+    """
+    collection = get_checkpoint_collection()
+    if collection is None:
+        logger.warning(f"Job {job_id}: checkpoint store unavailable; stage '{stage}' not persisted.")
+        return
+
+    try:
+        collection.update_one(
+            {"job_id": job_id},
+            {
+                "$set": {
+                    f"stages.{stage}": payload,
+                    "last_completed_stage": stage,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+    except PyMongoError as e:
+        logger.warning(f"Job {job_id}: failed to checkpoint stage '{stage}': {e}")
+
+
+def load_stages(job_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns {stage: payload} for every stage already completed by this job.
+    Empty when the job has no checkpoints or the store cannot be read (the run starts from scratch).
+    """
+    collection = get_checkpoint_collection()
+    if collection is None:
+        return {}
+
+    try:
+        doc: Optional[Dict[str, Any]] = collection.find_one({"job_id": job_id}, {"stages": 1, "_id": 0})
+    except PyMongoError as e:
+        logger.warning(f"Job {job_id}: failed to read checkpoints, starting from the first stage: {e}")
+        return {}
+
+    stages = (doc or {}).get("stages") or {}
+    return {stage: stages[stage] for stage in PIPELINE_STAGES if stage in stages}
+
+
+def clear(job_id: str) -> None:
+    """Drops a job's checkpoints once its results are persisted."""
+    collection = get_checkpoint_collection()
+    if collection is None:
+        return
+
+    try:
+        collection.delete_one({"job_id": job_id})
+    except PyMongoError as e:
+        logger.warning(f"Job {job_id}: failed to clear checkpoints: {e}")
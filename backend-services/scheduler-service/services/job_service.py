@@ -11,6 +11,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 from db import get_db_collections
+from services import progress_bus
 from shared.contracts import JobStatus, JobType, ScreeningJobRunRecord
 
 def create_job(
@@ -127,6 +128,7 @@ def update_job_progress(
             }
         }
     )
+    progress_bus.publish(job_id, progress_bus.MESSAGE_PROGRESS, {**snapshot, "updated_at": now_utc.isoformat()})
 
 def complete_job(
     job_id: str, 
@@ -191,6 +193,7 @@ def complete_job(
         {"job_id": job_id},
         {"$set": update_fields}
     )
+    progress_bus.publish(job_id, progress_bus.MESSAGE_COMPLETE)
 
 def fail_job(job_id: str, error_message: str, error_step: Optional[str] = None) -> None:
     """
@@ -209,6 +212,7 @@ def fail_job(job_id: str, error_message: str, error_step: Optional[str] = None)
             }
         }
     )
+    progress_bus.publish(job_id, progress_bus.MESSAGE_FAILED)
 
 def get_job_history(limit: int = 20, skip: int = 0) -> List[ScreeningJobRunRecord]:
     """
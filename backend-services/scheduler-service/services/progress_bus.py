@@ -0,0 +1,83 @@
+# backend-services/scheduler-service/services/progress_bus.py
+
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Job progress is pushed to SSE streams over Redis pub/sub, one channel per job.
+# MongoDB stays the source of truth: streams replay the job document on connect,
+# so a subscriber never depends on having seen every message.
+PROGRESS_REDIS_URL = os.getenv("PROGRESS_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://redis:6379/0"))
+CHANNEL_PREFIX = "jobs:progress:"
+# After a failed connection attempt, Redis is not retried for this long (publishers stay fast)
+RECONNECT_BACKOFF_SEC = 30.0
+
+MESSAGE_PROGRESS = "progress"
+MESSAGE_COMPLETE = "complete"
+MESSAGE_FAILED = "failed"
+
+_client: Optional[redis.Redis] = None
+_unavailable_until = 0.0
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Returns the process-wide Redis client, connecting lazily.
+    None when Redis is unreachable: publishing becomes a no-op and SSE streams poll MongoDB.
+    """
+    global _client, _unavailable_until
+    if _client is not None:
+        return _client
+    if time.monotonic() < _unavailable_until:
+        return None
+
+    try:
+        client = redis.Redis.from_url(PROGRESS_REDIS_URL, socket_connect_timeout=2, decode_responses=True)
+        client.ping()
+        _client = client
+        return _client
+    except redis.RedisError as e:
+        _unavailable_until = time.monotonic() + RECONNECT_BACKOFF_SEC
+        logger.warning(f"Progress bus unavailable, SSE streams will poll MongoDB: {e}")
+        return None
+
+
+def channel_for(job_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{job_id}"
+
+
+def publish(job_id: str, message_type: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Publishes a job event to its channel. Failures are logged and swallowed:
+    streams reconcile from MongoDB, so a lost message only delays an update.
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+
+    message = {"type": message_type, **(payload or {})}
+    try:
+        client.publish(channel_for(job_id), json.dumps(message, default=str))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish {message_type} event for job {job_id}: {e}")
+
+
+def subscribe(job_id: str) -> Optional[redis.client.PubSub]:
+    """Returns a PubSub subscribed to the job's channel, or None if Redis is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel_for(job_id))
+        return pubsub
+    except redis.RedisError as e:
+        logger.warning(f"Failed to subscribe to progress for job {job_id}: {e}")
+        return None
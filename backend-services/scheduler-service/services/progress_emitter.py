@@ -6,6 +6,7 @@ from typing import Optional
 
 from db import get_db_collections
 from shared.contracts import JobStatus
+from services import progress_bus
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ def emit_progress(
     - Capping: Uses $slice to keep only the last 100 log entries to prevent document bloat.
     - Consistency: Always updates 'updated_at' to the current UTC time.
     - Writes to 'progress_snapshot' to align with SSE generator expectations.
+    - Publishes the snapshot to the job's progress channel for live SSE streams.
     """
     _, jobs_col, _, _, _, _ = get_db_collections()
     
@@ -87,4 +89,11 @@ def emit_progress(
         )
     except Exception as e:
         # We log but do not raise, as progress emission failure shouldn't crash the job
-        logger.error(f"Failed to emit progress for job {job_id}: {e}")
\ No newline at end of file
+        logger.error(f"Failed to emit progress for job {job_id}: {e}")
+        return
+
+    progress_bus.publish(job_id, progress_bus.MESSAGE_PROGRESS, {
+        **snapshot_data,
+        "updated_at": now.isoformat(),
+        "status": getattr(set_fields["status"], "value", set_fields["status"]),
+    })
\ No newline at end of file
@@ -4,14 +4,18 @@ import os
 import logging
 import requests
 import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import List, Tuple, Any, Optional, Dict
 
-from celery import chain
-from pydantic import ValidationError, TypeAdapter
+from celery import chain, group
+from celery.exceptions import SoftTimeLimitExceeded
+from pydantic import ValidationError
+from prometheus_client import Histogram
 
 # Import Shared Contracts & Services
 from shared.contracts import (
+    get_type_adapter,
     ScreeningJobResult,
     FinalCandidate,
     IndustryDiversity,
@@ -24,6 +28,7 @@ from services.progress_emitter import emit_progress
 
 # Importing the module allows tests to patch 'tasks.job_service' reliably
 import services.job_service as job_service
+import services.checkpoint_store as checkpoint_store
 from db import get_db_collections
 
 logger = logging.getLogger(__name__)
@@ -34,6 +39,39 @@ SCREENING_SERVICE_URL = os.getenv("SCREENING_SERVICE_URL", "http://screening-ser
 ANALYSIS_SERVICE_URL = os.getenv("ANALYSIS_SERVICE_URL", "http://analysis-service:3003")
 LEADERSHIP_SERVICE_URL = os.getenv("LEADERSHIP_SERVICE_URL", "http://leadership-service:3005")
 MONITORING_SERVICE_URL = os.getenv("MONITORING_SERVICE_URL", "http://monitoring-service:3006")
+# A failed or timed-out pipeline is retried this many times, resuming from its last checkpointed stage
+PIPELINE_MAX_RESUMES = int(os.getenv("PIPELINE_MAX_RESUMES", "2"))
+PIPELINE_RESUME_DELAY_SEC = int(os.getenv("PIPELINE_RESUME_DELAY_SEC", "60"))
+# Trend screening and VCP analysis fan out as Celery shard tasks over ticker slices of these sizes (0 disables sharding)
+PIPELINE_TREND_SHARD_SIZE = int(os.getenv("PIPELINE_TREND_SHARD_SIZE", "500"))
+PIPELINE_VCP_SHARD_SIZE = int(os.getenv("PIPELINE_VCP_SHARD_SIZE", "100"))
+# Deadline for a whole fan-out; shards still running after it are revoked and treated as failed
+PIPELINE_SHARD_TIMEOUT_SEC = int(os.getenv("PIPELINE_SHARD_TIMEOUT_SEC", "1800"))
+# Shard task limits sit above the fan-out deadline (and the shard's HTTP timeout), so the
+# deadline, not the global task_soft_time_limit, decides when a slow shard is given up on
+SHARD_SOFT_TIME_LIMIT = PIPELINE_SHARD_TIMEOUT_SEC + 60
+SHARD_TIME_LIMIT = PIPELINE_SHARD_TIMEOUT_SEC + 120
+
+# --- Metrics ---
+# Stages restored from a checkpoint on resume are not re-observed
+PIPELINE_STAGE_DURATION = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Wall time of each run_full_pipeline stage.",
+    ["stage", "outcome"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+)
+STAGE_WATCHLIST = "add_to_watchlist"
+STAGE_PERSIST = "persist_results"
+
+@contextmanager
+def _timed_stage(stage: str):
+    started = time.monotonic()
+    outcome = "failed"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        PIPELINE_STAGE_DURATION.labels(stage, outcome).observe(time.monotonic() - started)
 
 # --- Helper Functions (Private / Testable) ---
 
@@ -49,38 +87,110 @@ def _get_all_tickers(job_id: str) -> Tuple[List[str], Any]:
         logger.error(f"Job {job_id}: Failed to fetch tickers: {e}")
         return [], str(e)
 
-def _run_trend_screening(job_id: str, tickers: List[str]) -> Tuple[List[str], Any]:
+def _run_trend_screening(job_id: str, tickers: List[str], timeout: int = 5999) -> Tuple[List[str], Any]:
     if not tickers:
         return [], None
     try:
-        resp = requests.post(f"{SCREENING_SERVICE_URL}/screen/batch", json={"tickers": tickers}, timeout=5999)
+        resp = requests.post(f"{SCREENING_SERVICE_URL}/screen/batch", json={"tickers": tickers}, timeout=timeout)
         resp.raise_for_status()
         return resp.json(), None
+    except SoftTimeLimitExceeded:
+        # Not a stage error: the task ran out of time and must fail (and resume) as a whole
+        raise
     except Exception as e:
         logger.error(f"Job {job_id}: Trend screen failed: {e}")
         return [], str(e)
 
-def _run_vcp_analysis(job_id: str, tickers: List[str]) -> List[VCPAnalysisBatchItem]:
+def _run_vcp_analysis(job_id: str, tickers: List[str], timeout: int = 1200) -> Tuple[List[VCPAnalysisBatchItem], Any]:
     if not tickers:
-        return []
+        return [], None
     try:
         # Note: 'mode': 'fast' is hardcoded here for analysis, but this only affects the VCP step,
         # not the number of tickers sent TO this step.
         resp = requests.post(
             f"{ANALYSIS_SERVICE_URL}/analyze/batch",
             json={"tickers": tickers, "mode": "fast"},
-            timeout=1200,
+            timeout=timeout,
         )
-        if resp.status_code == 200:
-            return TypeAdapter(List[VCPAnalysisBatchItem]).validate_python(resp.json())
-        return []
+        if resp.status_code != 200:
+            logger.error(f"Job {job_id}: VCP analysis failed: HTTP {resp.status_code}")
+            return [], f"analysis-service returned HTTP {resp.status_code}"
+        return get_type_adapter(List[VCPAnalysisBatchItem]).validate_python(resp.json()), None
+    except SoftTimeLimitExceeded:
+        raise
     except Exception as e:
         logger.error(f"Job {job_id}: VCP analysis failed: {e}")
-        return []
+        return [], str(e)
 
-def _run_leadership_screening(job_id: str, vcp_survivors: List[VCPAnalysisBatchItem]) -> Tuple[List[FinalCandidate], int]:
+def _run_sharded(job_id: str, shard_task, tickers: List[str], shard_size: int) -> List[Tuple[Any, Any]]:
+    """
+    Fans shard_task out over consecutive ticker slices as a Celery group and gathers
+    (result, error) per shard, in slice order. All shards share one deadline, so a slow
+    shard is revoked and reported as an error instead of stalling the whole stage.
+    """
+    shards = [tickers[i:i + shard_size] for i in range(0, len(tickers), shard_size)]
+    logger.info(f"Job {job_id}: dispatching {len(shards)} {shard_task.name} shards over {len(tickers)} tickers.")
+    group_result = group(shard_task.s(job_id, shard) for shard in shards).apply_async()
+
+    deadline = time.monotonic() + PIPELINE_SHARD_TIMEOUT_SEC
+    outcomes = []
+    for shard, result in zip(shards, group_result.results):
+        try:
+            remaining = max(deadline - time.monotonic(), 1)
+            # The pipeline task waits on its shards; they run on the dedicated pipeline_shards
+            # worker, so they never compete with pipeline runs for the same worker slots
+            outcomes.append((result.get(timeout=remaining, disable_sync_subtasks=False), None))
+        except Exception as e:
+            logger.error(f"Job {job_id}: {shard_task.name} shard ({shard[0]}..{shard[-1]}, {len(shard)} tickers) failed: {e}")
+            # Only a shard still queued or running is revoked; a failed one has already finished
+            if not result.ready():
+                result.revoke(terminate=True)
+            outcomes.append((None, str(e) or type(e).__name__))
+    return outcomes
+
+def _run_trend_screening_sharded(job_id: str, tickers: List[str]) -> Tuple[List[str], Any]:
+    """
+    Trend screening stage. Small universes (or PIPELINE_TREND_SHARD_SIZE=0) use one batch call;
+    otherwise survivors are merged from trend_screening_shard tasks. Any failed shard fails the
+    stage, as a failed monolithic call did.
+    """
+    if PIPELINE_TREND_SHARD_SIZE <= 0 or len(tickers) <= PIPELINE_TREND_SHARD_SIZE:
+        return _run_trend_screening(job_id, tickers)
+
+    survivors: List[str] = []
+    errors = []
+    for result, error in _run_sharded(job_id, trend_screening_shard, tickers, PIPELINE_TREND_SHARD_SIZE):
+        if error:
+            errors.append(error)
+        else:
+            survivors.extend(result)
+    if errors:
+        return [], f"{len(errors)} trend screening shard(s) failed: {errors[0]}"
+    return survivors, None
+
+def _run_vcp_analysis_sharded(job_id: str, tickers: List[str]) -> Tuple[List[VCPAnalysisBatchItem], Any]:
+    """
+    VCP analysis stage. Small inputs (or PIPELINE_VCP_SHARD_SIZE=0) use one batch call; otherwise
+    results are merged from vcp_analysis_shard tasks. Any failed shard fails the stage, as a
+    failed monolithic call does, so a partial result is never checkpointed.
+    """
+    if PIPELINE_VCP_SHARD_SIZE <= 0 or len(tickers) <= PIPELINE_VCP_SHARD_SIZE:
+        return _run_vcp_analysis(job_id, tickers)
+
+    merged = []
+    errors = []
+    for result, error in _run_sharded(job_id, vcp_analysis_shard, tickers, PIPELINE_VCP_SHARD_SIZE):
+        if error:
+            errors.append(error)
+        else:
+            merged.extend(result)
+    if errors:
+        return [], f"{len(errors)} VCP analysis shard(s) failed: {errors[0]}"
+    return get_type_adapter(List[VCPAnalysisBatchItem]).validate_python(merged), None
+
+def _run_leadership_screening(job_id: str, vcp_survivors: List[VCPAnalysisBatchItem]) -> Tuple[List[FinalCandidate], int, Any]:
     if not vcp_survivors:
-        return [], 0
+        return [], 0, None
     
     tickers = [c.ticker for c in vcp_survivors]
     try:
@@ -105,10 +215,12 @@ def _run_leadership_screening(job_id: str, vcp_survivors: List[VCPAnalysisBatchI
                 )
                 final_candidates.append(final)
                 
-        return final_candidates, batch_result.unique_industries_count
+        return final_candidates, batch_result.unique_industries_count, None
+    except SoftTimeLimitExceeded:
+        raise
     except Exception as e:
         logger.error(f"Job {job_id}: Leadership screen failed: {e}")
-        return [], 0
+        return [], 0, str(e)
 
 def _batch_add_to_watchlist(job_id: str, tickers: List[str]) -> None:
     """
@@ -178,6 +290,32 @@ def refresh_watchlist_task(self, job_id: Optional[str] = None, parent_job_id: Op
         emit_progress(job_id, f"Watchlist refresh failed: {e}", 1, 1, "error", status=JobStatus.FAILED)
         raise e
 
+@celery.task(
+    bind=True,
+    name="scheduler.trend_screening_shard",
+    soft_time_limit=SHARD_SOFT_TIME_LIMIT,
+    time_limit=SHARD_TIME_LIMIT
+)
+def trend_screening_shard(self, job_id: str, tickers: List[str]) -> List[str]:
+    """Screens one ticker slice of a pipeline run; returns the passing tickers."""
+    survivors, error = _run_trend_screening(job_id, tickers, timeout=PIPELINE_SHARD_TIMEOUT_SEC)
+    if error:
+        raise RuntimeError(f"Trend screening shard failed: {error}")
+    return [t['ticker'] if isinstance(t, dict) else t for t in survivors]
+
+@celery.task(
+    bind=True,
+    name="scheduler.vcp_analysis_shard",
+    soft_time_limit=SHARD_SOFT_TIME_LIMIT,
+    time_limit=SHARD_TIME_LIMIT
+)
+def vcp_analysis_shard(self, job_id: str, tickers: List[str]) -> List[Dict[str, Any]]:
+    """Runs VCP analysis for one ticker slice of a pipeline run (JSON-serializable batch items)."""
+    results, error = _run_vcp_analysis(job_id, tickers, timeout=PIPELINE_SHARD_TIMEOUT_SEC)
+    if error:
+        raise RuntimeError(f"VCP analysis shard failed: {error}")
+    return [item.model_dump(mode="json") for item in results]
+
 @celery.task(
     bind=True, 
     name="scheduler.run_full_pipeline",
@@ -190,98 +328,149 @@ def run_full_pipeline(self, job_id: Optional[str] = None, options: Optional[Dict
     """
     The main screening pipeline.
     Respects options['mode']='fast' to enable rapid E2E testing.
+    Each stage's output is checkpointed per job; a failed or timed-out run is retried
+    (up to PIPELINE_MAX_RESUMES times) and skips every stage that already completed.
     """
     job_id = job_id or self.request.id
     start_time = time.time()
     options = options or {}
+    checkpoints = checkpoint_store.load_stages(job_id)
+    if checkpoints:
+        last_stage = [stage for stage in checkpoint_store.PIPELINE_STAGES if stage in checkpoints][-1]
+        logger.info(f"Job {job_id}: resuming after checkpointed stage '{last_stage}'.")
+        emit_progress(job_id, f"Resuming pipeline after completed stage '{last_stage}'...", 5, 100, "resume")
     
     try:
         # 1. Fetch Tickers
-        emit_progress(job_id, "Fetching tickers from Ticker Service...", 5, 100, "fetch_tickers")
-        all_tickers, error = _get_all_tickers(job_id)
-        if error:
-            raise Exception(f"Failed to fetch tickers: {error}")
-            
-        # 1b. Filter Delisted
-        _, _, _, _, _, ticker_status_coll = get_db_collections()
-        active_tickers = all_tickers
-        if ticker_status_coll is not None:
-            try:
-                delisted_docs = ticker_status_coll.find({"status": "delisted"}, {"ticker": 1, "_id": 0})
-                delisted_set = {doc['ticker'] for doc in delisted_docs}
-                if delisted_set:
-                    active_set = set(all_tickers) - delisted_set
-                    active_tickers = list(active_set)
-                    logger.info(f"Job {job_id}: Filtered {len(delisted_set)} delisted tickers. {len(active_tickers)} remaining.")
-            except Exception as db_e:
-                logger.warning(f"Job {job_id}: Failed to filter delisted tickers: {db_e}")
-
-        # --- Fast Mode Implementation ---
-        # If mode is 'fast', slice the list to the first 50 tickers.
-        if options.get("mode") == "fast":
-            logger.info(f"Job {job_id}: FAST MODE enabled. Limiting analysis to first 50 tickers.")
-            active_tickers = active_tickers[:50]
-        # -------------------------------------
-
-        emit_progress(job_id, f"Fetched {len(all_tickers)} tickers ({len(active_tickers)} active).", 10, 100, "fetch_tickers")
+        tickers_checkpoint = checkpoints.get(checkpoint_store.STAGE_TICKERS)
+        if tickers_checkpoint:
+            total_tickers_fetched = tickers_checkpoint["total_tickers_fetched"]
+            active_tickers = tickers_checkpoint["active_tickers"]
+        else:
+            with _timed_stage(checkpoint_store.STAGE_TICKERS):
+                emit_progress(job_id, "Fetching tickers from Ticker Service...", 5, 100, "fetch_tickers")
+                all_tickers, error = _get_all_tickers(job_id)
+                if error:
+                    raise Exception(f"Failed to fetch tickers: {error}")
+                total_tickers_fetched = len(all_tickers)
+                
+                # 1b. Filter Delisted
+                _, _, _, _, _, ticker_status_coll = get_db_collections()
+                active_tickers = all_tickers
+                if ticker_status_coll is not None:
+                    try:
+                        delisted_docs = ticker_status_coll.find({"status": "delisted"}, {"ticker": 1, "_id": 0})
+                        delisted_set = {doc['ticker'] for doc in delisted_docs}
+                        if delisted_set:
+                            active_set = set(all_tickers) - delisted_set
+                            active_tickers = list(active_set)
+                            logger.info(f"Job {job_id}: Filtered {len(delisted_set)} delisted tickers. {len(active_tickers)} remaining.")
+                    except Exception as db_e:
+                        logger.warning(f"Job {job_id}: Failed to filter delisted tickers: {db_e}")
+
+                # --- Fast Mode Implementation ---
+                # If mode is 'fast', slice the list to the first 50 tickers.
+                if options.get("mode") == "fast":
+                    logger.info(f"Job {job_id}: FAST MODE enabled. Limiting analysis to first 50 tickers.")
+                    active_tickers = active_tickers[:50]
+                # -------------------------------------
+
+                checkpoint_store.save_stage(job_id, checkpoint_store.STAGE_TICKERS, {
+                    "total_tickers_fetched": total_tickers_fetched,
+                    "active_tickers": active_tickers,
+                })
+
+        emit_progress(job_id, f"Fetched {total_tickers_fetched} tickers ({len(active_tickers)} active).", 10, 100, "fetch_tickers")
 
         # 2. Trend Screening
-        emit_progress(job_id, "Running Trend Screening...", 20, 100, "trend_screening")
-        trend_survivors_raw, error = _run_trend_screening(job_id, active_tickers)
-        if error:
-             raise Exception(f"Trend screening failed: {error}")
-        
-        trend_survivors = []
-        if trend_survivors_raw:
-            trend_survivors = [t['ticker'] if isinstance(t, dict) else t for t in trend_survivors_raw]
+        trend_checkpoint = checkpoints.get(checkpoint_store.STAGE_TREND)
+        if trend_checkpoint:
+            trend_survivors = trend_checkpoint["trend_survivors"]
+        else:
+            with _timed_stage(checkpoint_store.STAGE_TREND):
+                emit_progress(job_id, "Running Trend Screening...", 20, 100, "trend_screening")
+                trend_survivors_raw, error = _run_trend_screening_sharded(job_id, active_tickers)
+                if error:
+                     raise Exception(f"Trend screening failed: {error}")
+            
+                trend_survivors = []
+                if trend_survivors_raw:
+                    trend_survivors = [t['ticker'] if isinstance(t, dict) else t for t in trend_survivors_raw]
+                checkpoint_store.save_stage(job_id, checkpoint_store.STAGE_TREND, {"trend_survivors": trend_survivors})
 
         # 3. VCP Analysis
-        emit_progress(job_id, f"Running VCP Analysis on {len(trend_survivors)} survivors...", 40, 100, "vcp_analysis")
-        
-        # Filter results to only include PASSING items
-        vcp_analysis_results = _run_vcp_analysis(job_id, trend_survivors)
-        vcp_survivors_objs = [item for item in vcp_analysis_results if item.vcp_pass]
+        vcp_checkpoint = checkpoints.get(checkpoint_store.STAGE_VCP)
+        if vcp_checkpoint:
+            vcp_survivors_objs = get_type_adapter(List[VCPAnalysisBatchItem]).validate_python(vcp_checkpoint["vcp_survivors"])
+        else:
+            with _timed_stage(checkpoint_store.STAGE_VCP):
+                emit_progress(job_id, f"Running VCP Analysis on {len(trend_survivors)} survivors...", 40, 100, "vcp_analysis")
+            
+                vcp_analysis_results, error = _run_vcp_analysis_sharded(job_id, trend_survivors)
+                if error:
+                    raise Exception(f"VCP analysis failed: {error}")
+
+                # Filter results to only include PASSING items
+                vcp_survivors_objs = [item for item in vcp_analysis_results if item.vcp_pass]
+                checkpoint_store.save_stage(job_id, checkpoint_store.STAGE_VCP, {
+                    "vcp_survivors": [item.model_dump() for item in vcp_survivors_objs],
+                })
         vcp_survivors = [item.ticker for item in vcp_survivors_objs]
 
         # 4. Leadership Screening
-        emit_progress(job_id, f"Running Leadership Screening on {len(vcp_survivors)} candidates...", 70, 100, "leadership_screening")
-        final_candidates_objs, unique_industries = _run_leadership_screening(job_id, vcp_survivors_objs)
+        leadership_checkpoint = checkpoints.get(checkpoint_store.STAGE_LEADERSHIP)
+        if leadership_checkpoint:
+            final_candidates_objs = get_type_adapter(List[FinalCandidate]).validate_python(leadership_checkpoint["final_candidates"])
+            unique_industries = leadership_checkpoint["unique_industries"]
+        else:
+            with _timed_stage(checkpoint_store.STAGE_LEADERSHIP):
+                emit_progress(job_id, f"Running Leadership Screening on {len(vcp_survivors)} candidates...", 70, 100, "leadership_screening")
+                final_candidates_objs, unique_industries, error = _run_leadership_screening(job_id, vcp_survivors_objs)
+                if error:
+                    raise Exception(f"Leadership screening failed: {error}")
+                checkpoint_store.save_stage(job_id, checkpoint_store.STAGE_LEADERSHIP, {
+                    "final_candidates": [item.model_dump() for item in final_candidates_objs],
+                    "unique_industries": unique_industries,
+                })
         final_candidates = [item.ticker for item in final_candidates_objs]
 
         # 5. Batch Add to Watchlist (Monitoring Service Integration)
-        emit_progress(job_id, f"Adding {len(final_candidates)} survivors to watchlist...", 80, 100, "persist_results")
-        _batch_add_to_watchlist(job_id, final_candidates)
+        with _timed_stage(STAGE_WATCHLIST):
+            emit_progress(job_id, f"Adding {len(final_candidates)} survivors to watchlist...", 80, 100, "persist_results")
+            _batch_add_to_watchlist(job_id, final_candidates)
 
         # 6. Persist Results
-        emit_progress(job_id, "Finalizing results...", 90, 100, "persist_results")
+        with _timed_stage(STAGE_PERSIST):
+            emit_progress(job_id, "Finalizing results...", 90, 100, "persist_results")
         
-        total_time = round(time.time() - start_time, 2)
+            total_time = round(time.time() - start_time, 2)
         
-        summary = ScreeningJobResult(
-            job_id=job_id,
-            processed_at=datetime.now(timezone.utc),
-            total_process_time=total_time,
-            total_tickers_fetched=len(all_tickers),
-            trend_screen_survivors_count=len(trend_survivors),
-            vcp_survivors_count=len(vcp_survivors),
-            final_candidates_count=len(final_candidates),
-            industry_diversity=IndustryDiversity(unique_industries_count=unique_industries),
-            final_candidates=final_candidates_objs
-        )
+            summary = ScreeningJobResult(
+                job_id=job_id,
+                processed_at=datetime.now(timezone.utc),
+                total_process_time=total_time,
+                total_tickers_fetched=total_tickers_fetched,
+                trend_screen_survivors_count=len(trend_survivors),
+                vcp_survivors_count=len(vcp_survivors),
+                final_candidates_count=len(final_candidates),
+                industry_diversity=IndustryDiversity(unique_industries_count=unique_industries),
+                final_candidates=final_candidates_objs
+            )
         
-        results_payload = {
-            "trend_survivors": trend_survivors,
-            "vcp_survivors": vcp_survivors,
-            "final_candidates": final_candidates,
-            "leadership_survivors": final_candidates
-        }
+            results_payload = {
+                "trend_survivors": trend_survivors,
+                "vcp_survivors": vcp_survivors,
+                "final_candidates": final_candidates,
+                "leadership_survivors": final_candidates
+            }
 
-        job_service.complete_job(
-            job_id=job_id,
-            results=results_payload,       # Lightweight lists for Job History UI
-            summary=summary.model_dump(),  # Stats
-            final_candidates_objs=final_candidates_objs # Full data for screening_results collection
-        )
+            job_service.complete_job(
+                job_id=job_id,
+                results=results_payload,       # Lightweight lists for Job History UI
+                summary=summary.model_dump(),  # Stats
+                final_candidates_objs=final_candidates_objs # Full data for screening_results collection
+            )
+        checkpoint_store.clear(job_id)
         
         emit_progress(
             job_id, 
@@ -294,6 +483,15 @@ def run_full_pipeline(self, job_id: Optional[str] = None, options: Optional[Dict
 
     except Exception as e:
         logger.error(f"Job {job_id}: Pipeline failed: {e}", exc_info=True)
+        # Worker-executed runs (not direct calls) are retried and resume from the last checkpoint.
+        # SoftTimeLimitExceeded lands here too, so a timed-out run gets a fresh time budget.
+        if not self.request.called_directly and self.request.retries < PIPELINE_MAX_RESUMES:
+            emit_progress(
+                job_id,
+                f"Pipeline attempt {self.request.retries + 1} failed ({e}); resuming from the last completed stage...",
+                0, 100, "resume",
+            )
+            raise self.retry(exc=e, countdown=PIPELINE_RESUME_DELAY_SEC, max_retries=PIPELINE_MAX_RESUMES)
         job_service.fail_job(
             job_id=job_id,
             error_message=str(e),
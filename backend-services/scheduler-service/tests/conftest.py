@@ -8,6 +8,7 @@ import json
 from unittest.mock import MagicMock, patch
 from bson import ObjectId
 import requests
+import mongomock
 
 # Ensure the app and shared modules are in the python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
@@ -175,6 +176,28 @@ def mock_clock():
          patch("time.sleep", side_effect=clock.sleep):
         yield clock
 
+# --- Progress Bus (Redis pub/sub) ---
+
+@pytest.fixture(autouse=True)
+def progress_bus_disabled(request):
+    """
+    Keeps unit/integration tests off the network: with no Redis client, publishing is a
+    no-op and SSE streams fall back to polling. Tests opt in via `fake_progress_bus`.
+    """
+    if f"{os.sep}e2e{os.sep}" in str(request.fspath) or "fake_progress_bus" in request.fixturenames:
+        yield
+        return
+    with patch("services.progress_bus.get_redis_client", return_value=None):
+        yield
+
+@pytest.fixture
+def fake_progress_bus():
+    """Backs services.progress_bus with an in-memory fakeredis server; yields the client."""
+    import fakeredis
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with patch("services.progress_bus.get_redis_client", return_value=client):
+        yield client
+
 # --- Database & Service Mocks (Required for Task/Unit Tests) ---
 
 @pytest.fixture
@@ -210,9 +233,12 @@ def mock_jobs_collection(mock_db_collections):
 def mock_db_session():
     """
     Patches tasks.get_db_collections globally for integration tests (test_celery_tasks.py).
+    The pipeline checkpoint store is backed by an in-memory mongomock collection.
     Returns a dictionary for easy access to specific collection mocks.
     """
-    with patch("tasks.get_db_collections") as mock_get_db:
+    checkpoints_col = mongomock.MongoClient().db.pipeline_checkpoints
+    with patch("tasks.get_db_collections") as mock_get_db, \
+         patch("services.checkpoint_store.get_checkpoint_collection", return_value=checkpoints_col):
         # Create mocks
         results_col = MagicMock(name="results_col")
         jobs_col = MagicMock(name="jobs_col")
@@ -242,9 +268,25 @@ def mock_db_session():
             "vcp": vcp_col,
             "leadership": leadership_col,
             "ticker_status": status_col,
+            "checkpoints": checkpoints_col,
             "get_db_mock": mock_get_db 
         }
 
+@pytest.fixture
+def celery_eager(monkeypatch):
+    """
+    Executes tasks dispatched with apply_async/group in-process (Celery eager mode),
+    backed by Celery's in-memory result backend. Task failures are captured in their
+    results instead of being raised at dispatch, as with a real worker.
+    """
+    from celery.backends.cache import CacheBackend
+    from celery_app import celery
+
+    monkeypatch.setitem(celery.conf, "task_always_eager", True)
+    monkeypatch.setitem(celery.conf, "task_eager_propagates", False)
+    monkeypatch.setattr(celery, "_backend_cache", CacheBackend(app=celery, backend="memory"))
+    return celery
+
 @pytest.fixture
 def mock_requests():
     """
@@ -0,0 +1,67 @@
+# backend-services/scheduler-service/tests/integration/test_metrics.py
+
+import pytest
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+from requests import HTTPError
+
+import services.checkpoint_store as checkpoint_store
+from test_pipeline_checkpoints import _configure_pipeline_responses
+
+STAGE_METRIC = "pipeline_stage_duration_seconds"
+
+
+def _stage_count(stage, outcome):
+    return REGISTRY.get_sample_value(f"{STAGE_METRIC}_count", {"stage": stage, "outcome": outcome}) or 0.0
+
+
+def _scrape(client):
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain")
+    return {family.name: family for family in text_string_to_metric_families(resp.get_data(as_text=True))}
+
+
+def test_pipeline_stages_record_durations_and_skip_checkpointed_stages_on_resume(
+    mock_requests, mock_db_session, mock_job_service, mock_emit_progress
+):
+    from tasks import run_full_pipeline, STAGE_WATCHLIST, STAGE_PERSIST
+    _configure_pipeline_responses(mock_requests, batch_add_failures=1)
+    before = {
+        (stage, outcome): _stage_count(stage, outcome)
+        for stage in (*checkpoint_store.PIPELINE_STAGES, STAGE_WATCHLIST, STAGE_PERSIST)
+        for outcome in ("success", "failed")
+    }
+
+    with pytest.raises(HTTPError):
+        run_full_pipeline(job_id="job-metrics", options={})
+    run_full_pipeline(job_id="job-metrics", options={})
+
+    delta = {key: _stage_count(*key) - value for key, value in before.items()}
+    # Checkpointed stages ran once; the watchlist add failed once, then succeeded on resume
+    for stage in checkpoint_store.PIPELINE_STAGES:
+        assert delta[(stage, "success")] == 1
+        assert delta[(stage, "failed")] == 0
+    assert delta[(STAGE_WATCHLIST, "failed")] == 1
+    assert delta[(STAGE_WATCHLIST, "success")] == 1
+    assert delta[(STAGE_PERSIST, "success")] == 1
+
+
+def test_metrics_endpoint_exposes_route_latency(client):
+    with patch("services.job_service.get_job_detail", return_value=None):
+        assert client.get("/jobs/screening/history/job-a").status_code == 404
+        assert client.get("/jobs/screening/history/job-b").status_code == 404
+    families = _scrape(client)
+
+    latency = families["http_request_duration_seconds"]
+    counts = {
+        (s.labels["route"], s.labels["status"]): s.value
+        for s in latency.samples if s.name.endswith("_count")
+    }
+    # Labelled by route template, so per-job paths share one series
+    assert counts[("/jobs/screening/history/<job_id>", "404")] >= 2
+    assert not any(route.endswith("job-a") for route, _ in counts)
+    # Scrapes are not timed themselves
+    assert not any(route == "/metrics" for route, _ in counts)
+    assert STAGE_METRIC in families
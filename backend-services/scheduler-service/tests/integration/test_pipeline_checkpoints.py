@@ -0,0 +1,197 @@
+# backend-services/scheduler-service/tests/integration/test_pipeline_checkpoints.py
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from requests import HTTPError, Timeout
+
+import services.checkpoint_store as checkpoint_store
+
+# --- Local Helpers ---
+
+LEADERSHIP_PAYLOAD = {
+    "passing_candidates": [{
+        "ticker": "A",
+        "passes": True,
+        "leadership_summary": {"qualified_profiles": ["X"], "message": "Y"},
+        "profile_details": {"explosive_grower": {"pass": True, "passed_checks": 1, "total_checks": 1}},
+        "industry": "Tech"
+    }],
+    "unique_industries_count": 1,
+    "metadata": {"total_processed": 1, "total_passed": 1, "execution_time": 0.1}
+}
+
+
+def _configure_pipeline_responses(mock_requests, batch_add_failures=0, timeouts=None):
+    """
+    Wires every downstream service for a one-survivor pipeline ("A").
+    The watchlist batch add fails `batch_add_failures` times before succeeding, and each
+    service named in `timeouts` ({"analysis": 1, ...}) times out that many times first.
+    Returns a dict counting the calls made to each service.
+    """
+    counts = {"tickers": 0, "screening": 0, "analysis": 0, "leadership": 0, "batch_add": 0}
+    remaining_failures = {"n": batch_add_failures}
+    remaining_timeouts = dict(timeouts or {})
+
+    def maybe_time_out(service):
+        if remaining_timeouts.get(service, 0) > 0:
+            remaining_timeouts[service] -= 1
+            raise Timeout(f"{service} read timed out")
+
+    def get_side_effect(url, **kwargs):
+        counts["tickers"] += 1
+        resp = MagicMock(status_code=200)
+        resp.json.return_value = ["A", "B"]
+        return resp
+
+    def post_side_effect(url, **kwargs):
+        resp = MagicMock(status_code=200)
+        if "screening" in url:
+            counts["screening"] += 1
+            resp.json.return_value = ["A"]
+        elif "analysis" in url:
+            counts["analysis"] += 1
+            maybe_time_out("analysis")
+            resp.json.return_value = [{"ticker": "A", "vcp_pass": True, "vcpFootprint": "Ok"}]
+        elif "leadership" in url:
+            counts["leadership"] += 1
+            maybe_time_out("leadership")
+            resp.json.return_value = LEADERSHIP_PAYLOAD
+            resp.content = json.dumps(LEADERSHIP_PAYLOAD).encode('utf-8')
+        elif "batch/add" in url:
+            counts["batch_add"] += 1
+            if remaining_failures["n"] > 0:
+                remaining_failures["n"] -= 1
+                resp.raise_for_status.side_effect = HTTPError("503 Service Unavailable")
+            else:
+                resp.status_code = 201
+                resp.json.return_value = {}
+        else:
+            raise ValueError(f"Test encountered unmocked URL: {url}")
+        return resp
+
+    mock_requests.get.side_effect = get_side_effect
+    mock_requests.post.side_effect = post_side_effect
+    return counts
+
+# --- Tests ---
+
+def test_failed_run_checkpoints_completed_stages(mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    from tasks import run_full_pipeline
+    job_id = "job-checkpoint-fail"
+    _configure_pipeline_responses(mock_requests, batch_add_failures=1)
+
+    with pytest.raises(HTTPError):
+        run_full_pipeline(job_id=job_id, options={})
+
+    mock_job_service.fail_job.assert_called_once()
+    stages = checkpoint_store.load_stages(job_id)
+    assert list(stages) == list(checkpoint_store.PIPELINE_STAGES)
+    assert sorted(stages[checkpoint_store.STAGE_TICKERS]["active_tickers"]) == ["A", "B"]
+    assert stages[checkpoint_store.STAGE_TREND]["trend_survivors"] == ["A"]
+    assert stages[checkpoint_store.STAGE_VCP]["vcp_survivors"][0]["ticker"] == "A"
+    assert stages[checkpoint_store.STAGE_LEADERSHIP]["unique_industries"] == 1
+
+
+def test_rerun_resumes_from_last_completed_stage(mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    """A second run of the same job skips every checkpointed stage and only redoes the failed step."""
+    from tasks import run_full_pipeline
+    job_id = "job-checkpoint-resume"
+    counts = _configure_pipeline_responses(mock_requests, batch_add_failures=1)
+
+    with pytest.raises(HTTPError):
+        run_full_pipeline(job_id=job_id, options={})
+    summary = run_full_pipeline(job_id=job_id, options={})
+
+    assert counts == {"tickers": 1, "screening": 1, "analysis": 1, "leadership": 1, "batch_add": 2}
+    assert summary["total_tickers_fetched"] == 2
+    assert summary["final_candidates_count"] == 1
+    assert summary["industry_diversity"]["unique_industries_count"] == 1
+
+    complete_kwargs = mock_job_service.complete_job.call_args.kwargs
+    assert complete_kwargs["results"]["trend_survivors"] == ["A"]
+    assert complete_kwargs["results"]["vcp_survivors"] == ["A"]
+    assert complete_kwargs["final_candidates_objs"][0].ticker == "A"
+    # Checkpoints are dropped once the results are persisted
+    assert checkpoint_store.load_stages(job_id) == {}
+
+
+def test_worker_run_retries_and_resumes_automatically(celery_eager, mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    """Executed as a task (eager), a failure is retried via Celery and resumes from the checkpoint."""
+    import tasks
+    job_id = "job-checkpoint-retry"
+    counts = _configure_pipeline_responses(mock_requests, batch_add_failures=1)
+
+    with patch.object(tasks, "PIPELINE_RESUME_DELAY_SEC", 0):
+        result = tasks.run_full_pipeline.apply(kwargs={"job_id": job_id, "options": {}})
+
+    assert result.successful()
+    assert result.result["final_candidates_count"] == 1
+    assert counts == {"tickers": 1, "screening": 1, "analysis": 1, "leadership": 1, "batch_add": 2}
+    mock_job_service.fail_job.assert_not_called()
+    mock_job_service.complete_job.assert_called_once()
+    assert any(c.args[4] == "resume" for c in mock_emit_progress.call_args_list)
+
+
+@pytest.mark.parametrize("service, failed_stage", [
+    ("analysis", checkpoint_store.STAGE_VCP),
+    ("leadership", checkpoint_store.STAGE_LEADERSHIP),
+])
+def test_failed_stage_is_not_checkpointed_and_resumes(service, failed_stage, celery_eager, mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    """A timed-out VCP or leadership call fails the attempt; the retry re-runs only that stage."""
+    import tasks
+    job_id = f"job-{service}-timeout"
+    counts = _configure_pipeline_responses(mock_requests, timeouts={service: 1})
+    stages_at_retry = []
+    real_retry = tasks.run_full_pipeline.retry
+
+    def recording_retry(*args, **kwargs):
+        stages_at_retry.append(list(checkpoint_store.load_stages(job_id)))
+        return real_retry(*args, **kwargs)
+
+    with patch.object(tasks, "PIPELINE_RESUME_DELAY_SEC", 0), \
+         patch.object(tasks.run_full_pipeline, "retry", side_effect=recording_retry) as mock_retry:
+        result = tasks.run_full_pipeline.apply(kwargs={"job_id": job_id, "options": {}})
+
+    mock_retry.assert_called_once()
+    # The failed stage was not checkpointed; everything before it was
+    stages = checkpoint_store.PIPELINE_STAGES
+    assert stages_at_retry == [list(stages[:stages.index(failed_stage)])]
+    assert result.successful()
+    assert result.result["final_candidates_count"] == 1
+    # The resumed attempt re-ran only the failed stage
+    expected = {"tickers": 1, "screening": 1, "analysis": 1, "leadership": 1, "batch_add": 1}
+    expected[service] = 2
+    assert counts == expected
+    mock_job_service.fail_job.assert_not_called()
+
+
+def test_soft_time_limit_is_not_swallowed_by_a_stage(mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    from celery.exceptions import SoftTimeLimitExceeded
+    from tasks import run_full_pipeline
+    job_id = "job-soft-limit"
+    _configure_pipeline_responses(mock_requests)
+    post = mock_requests.post.side_effect
+
+    def out_of_time(url, **kwargs):
+        if "leadership" in url:
+            raise SoftTimeLimitExceeded()
+        return post(url, **kwargs)
+
+    mock_requests.post.side_effect = out_of_time
+    with pytest.raises(SoftTimeLimitExceeded):
+        run_full_pipeline(job_id=job_id, options={})
+
+    assert checkpoint_store.STAGE_LEADERSHIP not in checkpoint_store.load_stages(job_id)
+    mock_job_service.complete_job.assert_not_called()
+
+
+def test_checkpoint_store_unavailable_runs_without_resume(mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    from tasks import run_full_pipeline
+    _configure_pipeline_responses(mock_requests)
+
+    with patch("services.checkpoint_store.get_checkpoint_collection", return_value=None):
+        summary = run_full_pipeline(job_id="job-no-store", options={})
+
+    assert summary["final_candidates_count"] == 1
+    mock_job_service.complete_job.assert_called_once()
@@ -0,0 +1,167 @@
+# backend-services/scheduler-service/tests/integration/test_pipeline_sharding.py
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from requests import HTTPError
+
+import tasks
+
+# --- Local Helpers ---
+
+TICKERS = ["A", "B", "C", "D", "E"]
+
+
+@pytest.fixture
+def small_shards():
+    """Forces the trend and VCP stages to fan out over 2-ticker shards."""
+    with patch.object(tasks, "PIPELINE_TREND_SHARD_SIZE", 2), \
+         patch.object(tasks, "PIPELINE_VCP_SHARD_SIZE", 2):
+        yield
+
+
+def _configure_services(mock_requests, failing_screen_batch=None, failing_analysis_batch=None):
+    """
+    Stubs every downstream service: all tickers pass trend screening except "E",
+    every analyzed ticker passes VCP, and leadership passes what it receives.
+    Returns the list of ticker batches sent to each endpoint.
+    """
+    sent = {"screening": [], "analysis": []}
+
+    def get_side_effect(url, **kwargs):
+        resp = MagicMock(status_code=200)
+        resp.json.return_value = TICKERS
+        return resp
+
+    def post_side_effect(url, **kwargs):
+        resp = MagicMock(status_code=200)
+        tickers = kwargs["json"]["tickers"]
+        if "screening" in url:
+            sent["screening"].append(tickers)
+            if tickers == failing_screen_batch:
+                resp.raise_for_status.side_effect = HTTPError("502 Bad Gateway")
+            resp.json.return_value = [t for t in tickers if t != "E"]
+        elif "analysis" in url:
+            sent["analysis"].append(tickers)
+            if tickers == failing_analysis_batch:
+                resp.status_code = 500
+            resp.json.return_value = [{"ticker": t, "vcp_pass": True, "vcpFootprint": "Ok"} for t in tickers]
+        elif "leadership" in url:
+            payload = {
+                "passing_candidates": [{
+                    "ticker": t,
+                    "passes": True,
+                    "leadership_summary": {"qualified_profiles": ["X"], "message": "Y"},
+                    "profile_details": {},
+                    "industry": "Tech"
+                } for t in tickers],
+                "unique_industries_count": 1,
+                "metadata": {"total_processed": len(tickers), "total_passed": len(tickers), "execution_time": 0.1}
+            }
+            resp.json.return_value = payload
+            resp.content = json.dumps(payload).encode('utf-8')
+        elif "batch/add" in url:
+            resp.status_code = 201
+            resp.json.return_value = {}
+        else:
+            raise ValueError(f"Test encountered unmocked URL: {url}")
+        return resp
+
+    mock_requests.get.side_effect = get_side_effect
+    mock_requests.post.side_effect = post_side_effect
+    return sent
+
+# --- Tests ---
+
+def test_trend_stage_fans_out_and_merges_in_order(celery_eager, small_shards, mock_requests, assert_requests_have_timeouts):
+    sent = _configure_services(mock_requests)
+
+    survivors, error = tasks._run_trend_screening_sharded("job-shard", TICKERS)
+
+    assert error is None
+    assert sent["screening"] == [["A", "B"], ["C", "D"], ["E"]]
+    assert survivors == ["A", "B", "C", "D"]
+    assert_requests_have_timeouts(mock_requests.post)
+
+
+def test_small_universe_uses_single_batch_call(celery_eager, mock_requests):
+    sent = _configure_services(mock_requests)
+
+    with patch.object(tasks, "group") as mock_group:
+        survivors, error = tasks._run_trend_screening_sharded("job-shard", TICKERS)
+
+    mock_group.assert_not_called()
+    assert sent["screening"] == [TICKERS]
+    assert (survivors, error) == (["A", "B", "C", "D"], None)
+
+
+def test_failed_trend_shard_fails_the_stage(celery_eager, small_shards, mock_requests):
+    sent = _configure_services(mock_requests, failing_screen_batch=["C", "D"])
+
+    survivors, error = tasks._run_trend_screening_sharded("job-shard", TICKERS)
+
+    assert len(sent["screening"]) == 3  # the other shards still ran
+    assert survivors == []
+    assert "1 trend screening shard(s) failed" in error
+
+
+def test_only_unfinished_shards_are_revoked(celery_eager, small_shards, mock_requests):
+    _configure_services(mock_requests, failing_screen_batch=["C", "D"])
+    pending = MagicMock()
+    pending.ready.return_value = False
+    pending.get.side_effect = TimeoutError("shard deadline passed")
+    real_apply = tasks.group.apply_async
+
+    def apply_with_pending_last(group_self, *args, **kwargs):
+        result = real_apply(group_self, *args, **kwargs)
+        result.results[-1] = pending
+        return result
+
+    with patch.object(tasks.group, "apply_async", apply_with_pending_last), \
+         patch("celery.result.EagerResult.revoke") as finished_revoke:
+        outcomes = tasks._run_sharded("job-shard", tasks.trend_screening_shard, TICKERS, 2)
+
+    assert [error is None for _, error in outcomes] == [True, False, False]
+    finished_revoke.assert_not_called()  # the failed shard had already finished
+    pending.revoke.assert_called_once_with(terminate=True)
+
+
+def test_shard_time_limits_cover_the_fan_out_deadline():
+    for shard_task in (tasks.trend_screening_shard, tasks.vcp_analysis_shard):
+        assert tasks.PIPELINE_SHARD_TIMEOUT_SEC < shard_task.soft_time_limit < shard_task.time_limit
+
+
+def test_failed_vcp_shard_fails_the_stage(celery_eager, small_shards, mock_requests):
+    sent = _configure_services(mock_requests, failing_analysis_batch=["A", "B"])
+
+    results, error = tasks._run_vcp_analysis_sharded("job-shard", ["A", "B", "C", "D"])
+
+    assert sent["analysis"] == [["A", "B"], ["C", "D"]]  # the other shard still ran
+    assert results == []
+    assert "1 VCP analysis shard(s) failed" in error
+
+
+def test_failed_vcp_shard_is_not_checkpointed(celery_eager, small_shards, mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    _configure_services(mock_requests, failing_analysis_batch=["C", "D"])
+
+    with pytest.raises(Exception, match="VCP analysis failed"):
+        tasks.run_full_pipeline(job_id="job-vcp-shard-fail", options={})
+
+    stages = tasks.checkpoint_store.load_stages("job-vcp-shard-fail")
+    assert list(stages) == [tasks.checkpoint_store.STAGE_TICKERS, tasks.checkpoint_store.STAGE_TREND]
+    mock_job_service.complete_job.assert_not_called()
+    mock_job_service.fail_job.assert_called_once()
+
+
+def test_full_pipeline_with_sharded_stages(celery_eager, small_shards, mock_requests, mock_db_session, mock_job_service, mock_emit_progress):
+    sent = _configure_services(mock_requests)
+
+    summary = tasks.run_full_pipeline(job_id="job-sharded-pipeline", options={})
+
+    assert len(sent["screening"]) == 3
+    assert len(sent["analysis"]) == 2
+    assert summary["trend_screen_survivors_count"] == 4
+    assert summary["vcp_survivors_count"] == 4
+    assert summary["final_candidates_count"] == 4
+    results = mock_job_service.complete_job.call_args.kwargs["results"]
+    assert sorted(results["final_candidates"]) == ["A", "B", "C", "D"]
@@ -409,4 +409,103 @@ def test_fast_job_race_condition(client, mock_job_service_get_detail, sse_parser
     # Verify order: Progress MUST come before Complete
     progress_idx = event_types.index('progress')
     complete_idx = event_types.index('complete')
-    assert progress_idx < complete_idx, "Progress event appeared after completion"
\ No newline at end of file
+    assert progress_idx < complete_idx, "Progress event appeared after completion"
+def test_push_mode_relays_channel_messages_without_polling(
+    client, mock_job_service_get_detail, sse_parser, fake_progress_bus
+):
+    """
+    With the progress bus available, the stream replays the job document once on connect,
+    then relays pub/sub progress directly. MongoDB is only re-read for the terminal event.
+    """
+    from services import progress_bus
+
+    job_id = "push-job"
+    job_type = JobType.SCREENING.value
+    step_1_at = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc)
+    step_2_at = step_1_at + timedelta(seconds=5)
+
+    # Late subscriber: step 1 already happened and is replayed from the document
+    state_step_1 = MagicMock(
+        job_id=job_id, job_type=job_type, status=JobStatus.RUNNING.value,
+        progress_snapshot={
+            "step_current": 1, "step_total": 5, "step_name": "init",
+            "message": "Init", "updated_at": step_1_at.replace(tzinfo=None)  # Mongo returns naive UTC
+        }
+    )
+    state_success = MagicMock(
+        job_id=job_id, job_type=job_type, status=JobStatus.SUCCESS.value,
+        completed_at=step_2_at, result_summary={"final_candidates_count": 3},
+        progress_snapshot=None
+    )
+    mock_job_service_get_detail.side_effect = [state_step_1, state_success]
+
+    response = client.get(f"/jobs/screening/stream/{job_id}")
+    iterator = sse_parser(response.response)
+
+    e1 = next_named_event(iterator)
+    assert e1['event'] == 'progress'
+    assert e1['data']['step_current'] == 1
+
+    # Duplicate of the replayed snapshot (ISO form) must be deduplicated
+    progress_bus.publish(job_id, progress_bus.MESSAGE_PROGRESS, {
+        "step_current": 1, "step_total": 5, "step_name": "init",
+        "message": "Init", "updated_at": step_1_at.isoformat(), "status": "RUNNING"
+    })
+    progress_bus.publish(job_id, progress_bus.MESSAGE_PROGRESS, {
+        "step_current": 2, "step_total": 5, "step_name": "trend",
+        "message": "Trend", "updated_at": step_2_at.isoformat(), "status": "RUNNING"
+    })
+    progress_bus.publish(job_id, progress_bus.MESSAGE_COMPLETE)
+
+    e2 = next_named_event(iterator)
+    assert e2['event'] == 'progress'
+    assert e2['data']['step_current'] == 2
+    JobProgressEvent.model_validate(e2['data'])
+
+    e3 = next_named_event(iterator)
+    assert e3['event'] == 'complete'
+    assert e3['data']['summary_counts']['final_candidates_count'] == 3
+
+    with pytest.raises(StopIteration):
+        next(iterator)
+
+    # One replay read on connect + one read for the terminal event
+    assert mock_job_service_get_detail.call_count == 2
+
+
+def test_push_mode_falls_back_to_polling_when_redis_drops(
+    client, mock_job_service_get_detail, mock_clock, sse_parser
+):
+    """
+    Losing Redis mid-stream is not a job failure: the stream closes the subscription and
+    keeps polling MongoDB until the job's real terminal state.
+    """
+    import redis
+
+    job_id = "redis-drop-job"
+    job_type = JobType.SCREENING.value
+    started_at = datetime(2026, 1, 5, 14, 30, tzinfo=timezone.utc)
+    state_running = MagicMock(
+        job_id=job_id, job_type=job_type, status=JobStatus.RUNNING.value,
+        progress_snapshot={
+            "step_current": 1, "step_total": 5, "step_name": "init",
+            "message": "Init", "updated_at": started_at
+        }
+    )
+    state_success = MagicMock(
+        job_id=job_id, job_type=job_type, status=JobStatus.SUCCESS.value,
+        completed_at=started_at + timedelta(minutes=1), result_summary={"final_candidates_count": 1},
+        progress_snapshot=None
+    )
+    mock_job_service_get_detail.side_effect = [state_running, state_running, state_success]
+    pubsub = MagicMock()
+    pubsub.get_message.side_effect = redis.ConnectionError("Connection reset by peer")
+
+    with patch("services.progress_bus.subscribe", return_value=pubsub):
+        response = client.get(f"/jobs/screening/stream/{job_id}")
+        events = [e for e in sse_parser(response.response) if 'event' in e]
+
+    assert [e['event'] for e in events] == ['progress', 'complete']
+    assert pubsub.get_message.call_count == 1
+    pubsub.close.assert_called_once()
+    assert mock_job_service_get_detail.call_count == 3
@@ -260,6 +260,24 @@ class TestJobService:
         assert isinstance(set_doc["completed_at"], datetime)
         assert set_doc["completed_at"].tzinfo == timezone.utc
 
+    def test_terminal_transitions_publish_to_job_progress_channel(
+        self, mock_db_collections, mock_jobs_collection
+    ):
+        """
+        SSE streams wake on terminal events: complete_job/fail_job publish after the Mongo write.
+        """
+        mock_jobs_collection.find_one.return_value = {"job_id": "job-ok", "started_at": None}
+
+        with patch("services.job_service.get_db_collections", return_value=mock_db_collections), \
+             patch("services.job_service.progress_bus.publish") as mock_publish:
+            complete_job(job_id="job-ok", results={}, summary={})
+            fail_job(job_id="job-bad", error_message="boom")
+
+        assert [c.args for c in mock_publish.call_args_list] == [
+            ("job-ok", "complete"),
+            ("job-bad", "failed"),
+        ]
+
     def test_get_job_history_defaults_and_sorting(self, mock_db_collections, mock_jobs_collection):
         """
         Week 10 requirement:
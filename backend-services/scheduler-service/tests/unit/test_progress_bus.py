@@ -0,0 +1,62 @@
+# backend-services/scheduler-service/tests/unit/test_progress_bus.py
+
+import json
+import pytest
+from unittest.mock import patch
+
+import redis
+
+from services import progress_bus
+
+# Captured at import: the autouse conftest fixture patches the module attribute per test
+_real_get_redis_client = progress_bus.get_redis_client
+
+
+def _next_message(pubsub, attempts=5):
+    # get_message returns None for the (ignored) subscribe confirmation, so poll a few times
+    for _ in range(attempts):
+        message = pubsub.get_message(timeout=0.1)
+        if message:
+            return message
+    return None
+
+
+@pytest.mark.unit
+class TestProgressBus:
+
+    def test_publish_round_trips_to_subscriber(self, fake_progress_bus):
+        pubsub = progress_bus.subscribe("job-1")
+        assert pubsub is not None
+
+        progress_bus.publish("job-1", progress_bus.MESSAGE_PROGRESS, {"step_current": 2})
+
+        message = _next_message(pubsub)
+        assert message["channel"] == "jobs:progress:job-1"
+        assert json.loads(message["data"]) == {"type": "progress", "step_current": 2}
+
+    def test_channels_are_isolated_per_job(self, fake_progress_bus):
+        pubsub = progress_bus.subscribe("job-a")
+
+        progress_bus.publish("job-b", progress_bus.MESSAGE_COMPLETE)
+
+        assert _next_message(pubsub) is None
+
+    def test_publish_and_subscribe_are_noops_without_redis(self):
+        # conftest's autouse fixture leaves the bus without a client
+        progress_bus.publish("job-1", progress_bus.MESSAGE_FAILED)
+        assert progress_bus.subscribe("job-1") is None
+
+    def test_publish_swallows_redis_errors(self, fake_progress_bus):
+        with patch.object(fake_progress_bus, "publish", side_effect=redis.ConnectionError("gone")):
+            progress_bus.publish("job-1", progress_bus.MESSAGE_COMPLETE)
+
+    def test_unreachable_redis_is_not_retried_during_backoff(self, monkeypatch):
+        monkeypatch.setattr(progress_bus, "_client", None)
+        monkeypatch.setattr(progress_bus, "_unavailable_until", 0.0)
+
+        with patch("services.progress_bus.redis.Redis.from_url") as mock_from_url:
+            mock_from_url.return_value.ping.side_effect = redis.ConnectionError("refused")
+            assert _real_get_redis_client() is None
+            assert _real_get_redis_client() is None
+
+        mock_from_url.assert_called_once()
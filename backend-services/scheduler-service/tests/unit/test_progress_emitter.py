@@ -1,5 +1,6 @@
 # backend-services/scheduler-service/tests/unit/test_progress_emitter.py
 
+import json
 import pytest
 from unittest.mock import patch, ANY
 from datetime import datetime, timezone
@@ -101,4 +102,49 @@ class TestProgressEmitter:
             
             update_op = mock_jobs_collection.update_one.call_args[0][1]
             assert update_op["$set"]["status"] == JobStatus.SUCCESS
-            assert "completed_at" in update_op["$set"] # Should optionally set completion time
\ No newline at end of file
+            assert "completed_at" in update_op["$set"] # Should optionally set completion time
+
+    def test_emit_progress_publishes_snapshot_to_job_channel(
+        self, mock_db_collections, mock_jobs_collection, fake_progress_bus
+    ):
+        """
+        Requirement: After the Mongo write, the snapshot is pushed to the job's progress channel
+        so SSE streams relay it without polling.
+        """
+        from services import progress_bus
+
+        pubsub = fake_progress_bus.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(progress_bus.channel_for("job-pub"))
+
+        with patch("services.progress_emitter.get_db_collections", return_value=mock_db_collections):
+            emit_progress(
+                job_id="job-pub",
+                message="Screening",
+                step_current=3,
+                step_total=5,
+                step_name="trend"
+            )
+
+        # The first read consumes the ignored subscribe confirmation
+        message = pubsub.get_message(timeout=1.0) or pubsub.get_message(timeout=1.0)
+        assert message is not None
+        payload = json.loads(message["data"])
+        assert payload["type"] == progress_bus.MESSAGE_PROGRESS
+        assert payload["step_current"] == 3
+        assert payload["step_name"] == "trend"
+        assert payload["status"] == JobStatus.RUNNING.value
+        assert datetime.fromisoformat(payload["updated_at"]).tzinfo is not None
+
+    def test_emit_progress_does_not_publish_when_db_write_fails(
+        self, mock_db_collections, mock_jobs_collection
+    ):
+        """
+        Requirement: Streams must never announce progress that the job document does not hold.
+        """
+        mock_jobs_collection.update_one.side_effect = Exception("DB down")
+
+        with patch("services.progress_emitter.get_db_collections", return_value=mock_db_collections), \
+             patch("services.progress_emitter.progress_bus.publish") as mock_publish:
+            emit_progress(job_id="job-x", message="m", step_current=1, step_total=2, step_name="s")
+
+        mock_publish.assert_not_called()
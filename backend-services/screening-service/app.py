@@ -6,17 +6,26 @@ import requests
 import numpy as np
 import json
 from flask.json.provider import JSONProvider
-from screening_logic import apply_screening_criteria
+from screening_logic import apply_screening_criteria, apply_screening_criteria_batch
 import traceback 
-from pydantic import BaseModel, ValidationError, TypeAdapter
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, ValidationError
 from typing import List, Dict
-from shared.contracts import PriceDataItem
+from shared.contracts import get_type_adapter, PriceDataItem, ColumnarPriceBatchResponse, PriceColumns, PriceBatchStreamRecord, PRICE_BATCH_STREAM_MIMETYPE
+from shared.metrics import instrument_app, track_executor
 
 app = Flask(__name__)
+instrument_app(app)
 
 DATA_SERVICE_URL = os.getenv("DATA_SERVICE_URL", "http://data-service:3001")
 PORT = int(os.getenv("PORT", 3002))
 CHUNK_SIZE = 75 # Number of tickers to process at once for batch processing
+# Max chunks in flight to data-service at once (shared across requests so concurrent batches cannot flood it)
+MAX_INFLIGHT_CHUNKS = int(os.getenv("SCREENING_MAX_INFLIGHT_CHUNKS", "4"))
+
+# --- Centralized Executor ---
+# Dispatches /screen/batch chunks to data-service concurrently
+chunk_executor = track_executor("screening_chunks", ThreadPoolExecutor(max_workers=max(1, MAX_INFLIGHT_CHUNKS)))
 
 class BatchResponse(BaseModel):
     success: Dict[str, List[PriceDataItem]]
@@ -78,7 +87,7 @@ def screen_ticker_endpoint(ticker):
             }), 502 # Return 502 Bad Gateway for other data-service errors
 
         try:
-            PriceDataValidator = TypeAdapter(List[PriceDataItem])
+            PriceDataValidator = get_type_adapter(List[PriceDataItem])
             PriceDataValidator.validate_json(hist_resp.content)
             historical_data = hist_resp.json()
         except ValidationError as e:
@@ -106,6 +115,74 @@ def screen_ticker_endpoint(ticker):
         # This catches other unexpected errors within the screening-service
         return jsonify({"error": "An internal error occurred in the screening-service.", "details": str(e)}), 500
 
+def _read_price_batch_stream(resp):
+    """
+    Consumes a streamed (NDJSON) /price/batch response record by record as it
+    arrives. Each ticker's columns are validated on arrival and only the close
+    series is kept, so the full OHLCV payload is never held for the whole chunk.
+    Returns (close_series_by_ticker, failed_tickers).
+    """
+    close_by_ticker = {}
+    failed_tickers = []
+    for line in resp.iter_lines():
+        if not line:
+            continue
+        try:
+            record = PriceBatchStreamRecord.model_validate_json(line)
+            if record.status != "success":
+                failed_tickers.append(record.ticker)
+                continue
+            if record.format == "columnar":
+                close_by_ticker[record.ticker] = {"close": PriceColumns.model_validate(record.data).close}
+            else:
+                rows = get_type_adapter(List[PriceDataItem]).validate_python(record.data)
+                close_by_ticker[record.ticker] = {"close": [row.close for row in rows]}
+        except ValidationError as e:
+            # One malformed record only costs its own ticker
+            print(f"Warning: Streamed batch record violates the data contract. Skipping. Error: {e}")
+    return close_by_ticker, failed_tickers
+
+def _read_price_batch_body(resp):
+    """
+    Parses a whole-body /price/batch response (columnar or row-shaped).
+    Returns (validated_success_data, failed_tickers), or None if the payload
+    violates the batch contract as a whole.
+    """
+    try:
+        raw_batch = json.loads(resp.content)
+        if isinstance(raw_batch, dict) and raw_batch.get('format') == 'columnar':
+            # Columnar arrays are validated as a whole; no per-row model construction needed
+            ColumnarPriceBatchResponse.model_validate(raw_batch)
+            batch_data = raw_batch
+        else:
+            # Row-shaped payload (e.g. a data-service that ignores the 'format' flag)
+            validated_response = BatchResponse.model_validate(raw_batch)
+            batch_data = validated_response.model_dump() # Convert to dict for existing logic
+    except (ValidationError, json.JSONDecodeError) as e:
+        # If the data structure from the data-service is invalid, log the error and fail the chunk.
+        print(f"Warning: Batch data contract violation from data-service. Error: {e}. Response: {resp.text[:500]}")
+        return None
+
+    successful_data = batch_data.get('success', {})
+    failed_tickers = batch_data.get('failed', [])
+
+    if batch_data.get('format') == 'columnar':
+        return successful_data, failed_tickers
+
+    # Manual validation for nested data to catch contract violations 
+    # that the top-level BatchResponse validation might miss. This ensures each
+    # item in the successful list conforms to the PriceDataItem contract.
+    PriceDataValidator = get_type_adapter(List[PriceDataItem])
+    validated_success_data = {}
+    for ticker, historical_data in successful_data.items():
+        try:
+            PriceDataValidator.validate_python(historical_data)
+            validated_success_data[ticker] = historical_data
+        except ValidationError as e:
+            # This is a contract violation. Log it and exclude the ticker from processing.
+            print(f"Warning: Batch data contract violation for ticker {ticker}. Skipping. Error: {e}")
+    return validated_success_data, failed_tickers
+
 # Endpoint to screen a batch of tickers
 def _process_chunk(chunk):
     """
@@ -116,44 +193,36 @@ def _process_chunk(chunk):
     try:
         # 1. Fetch data for the entire chunk from the data-service's batch endpoint
         data_service_url = f"{DATA_SERVICE_URL}/price/batch"
-        resp = requests.post(data_service_url, json={"tickers": chunk, "source": "yfinance"}, timeout=150)
+        # Ask for the columnar shape (one array per field instead of ~500 row dicts per ticker),
+        # streamed as one NDJSON record per ticker so parsing overlaps the slowest fetches
+        resp = requests.post(
+            data_service_url,
+            json={"tickers": chunk, "source": "yfinance", "format": "columnar", "stream": True},
+            timeout=150,
+            stream=True,
+        )
         
         if resp.status_code != 200:
             print(f"Warning: Chunk failed with status {resp.status_code}. Details: {resp.text}")
             return []
 
-        try:
-            # This is the idiomatic way for a BaseModel, avoiding the TypeAdapter error.
-            validated_response = BatchResponse.model_validate_json(resp.content)
-            batch_data = validated_response.model_dump() # Convert to dict for existing logic
-        except (ValidationError, json.JSONDecodeError) as e:
-            # If the data structure from the data-service is invalid, log the error and fail the chunk.
-            print(f"Warning: Batch data contract violation from data-service. Error: {e}. Response: {resp.text[:500]}")
-            return []
-        
-        successful_data = batch_data.get('success', {})
-        failed_tickers = batch_data.get('failed', [])
+        if resp.headers.get('Content-Type') == PRICE_BATCH_STREAM_MIMETYPE:
+            validated_success_data, failed_tickers = _read_price_batch_stream(resp)
+        else:
+            # Whole-body JSON (e.g. a data-service that ignores the 'stream' flag)
+            parsed = _read_price_batch_body(resp)
+            if parsed is None:
+                return []
+            validated_success_data, failed_tickers = parsed
 
         if failed_tickers:
             print(f"Warning: Data could not be fetched for the following tickers: {failed_tickers}")
 
-        # Manual validation for nested data to catch contract violations 
-        # that the top-level BatchResponse validation might miss. This ensures each
-        # item in the successful list conforms to the PriceDataItem contract.
-        PriceDataValidator = TypeAdapter(List[PriceDataItem])
-        validated_success_data = {}
-        for ticker, historical_data in successful_data.items():
-            try:
-                PriceDataValidator.validate_python(historical_data)
-                validated_success_data[ticker] = historical_data
-            except ValidationError as e:
-                # This is a contract violation. Log it and exclude the ticker from processing.
-                print(f"Warning: Batch data contract violation for ticker {ticker}. Skipping. Error: {e}")
-
         # 2. Apply screening logic to the successfully fetched data
-        # The data is already fetched, so this part is just CPU-bound.
-        for ticker, historical_data in validated_success_data.items():
-            result = apply_screening_criteria(ticker, historical_data)
+        # The data is already fetched, so this part is just CPU-bound: the whole chunk
+        # is screened as one close-price matrix instead of ticker by ticker.
+        chunk_results = apply_screening_criteria_batch(validated_success_data)
+        for ticker, result in chunk_results.items():
             if result.get("passes", False):
                 passing_in_chunk.append(ticker)
                 
@@ -171,9 +240,10 @@ def _process_chunk(chunk):
 @app.route('/screen/batch', methods=['POST'])
 def screen_batch_endpoint():
     """
-    Receives a list of tickers, splits them into chunks, processes each
-    chunk against the data-service's batch endpoint, and returns a final
-    list of tickers that pass all screening criteria.
+    Receives a list of tickers, splits them into chunks, processes the
+    chunks concurrently (at most MAX_INFLIGHT_CHUNKS in flight) against the
+    data-service's batch endpoint, and returns a final list of tickers that
+    pass all screening criteria, in input order.
     """
     try:
         data = request.get_json()
@@ -186,11 +256,11 @@ def screen_batch_endpoint():
         # Split the incoming tickers into chunks of CHUNK_SIZE
         ticker_chunks = [incoming_tickers[i:i + CHUNK_SIZE] for i in range(0, len(incoming_tickers), CHUNK_SIZE)]
 
-        for chunk in ticker_chunks:
-            # The _process_chunk function now blocks until the data-service is done.
-            # This is fine because the data-service is now highly concurrent, 
-            # screening calculation is already efficient as it's just CPU-bound
-            passing_tickers.extend(_process_chunk(chunk))
+        # Chunks overlap their data-service latency instead of paying it one after another.
+        # executor.map yields results in submission order, so output order matches input order;
+        # _process_chunk never raises and reports its own per-ticker/chunk failures.
+        for passing_in_chunk in chunk_executor.map(_process_chunk, ticker_chunks):
+            passing_tickers.extend(passing_in_chunk)
 
         return jsonify(passing_tickers), 200
 
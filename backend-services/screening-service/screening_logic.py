@@ -1,10 +1,12 @@
 # backend-services/screening-service/screening_logic.py
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 def extract_close_prices(historical_data):
     """
-    Extracts a list of closing prices, handling both Finnhub's dictionary-of-lists
-    format and yfinance's list-of-dictionaries format.
+    Extracts a list of closing prices, handling Finnhub's dictionary-of-lists
+    format, yfinance's list-of-dictionaries format and the columnar
+    PriceColumns format returned by data-service /price/batch.
     """
     if not historical_data:
         return []
@@ -12,6 +14,10 @@ def extract_close_prices(historical_data):
     # Handle yfinance format (list of dicts)
     if isinstance(historical_data, list):
         return [item['close'] for item in historical_data if 'close' in item and item['close'] is not None]
+
+    # Handle columnar format (PriceColumns: one array per field)
+    if isinstance(historical_data, dict) and historical_data.get('close') is not None:
+        return [price for price in historical_data['close'] if price is not None]
         
     # Handle Finnhub format (dict of lists)
     if isinstance(historical_data, dict) and 'c' in historical_data and historical_data['c'] is not None:
@@ -108,3 +114,177 @@ def apply_screening_criteria(ticker, historical_data):
         "details": details,
         "values": values
     }
+
+# --- Cross-sectional (matrix) screening ---
+# Windows used by the trend template, in trading days
+_MA_PERIODS = (50, 150, 200)
+_MA200_SLOPE_LOOKBACK = 20
+
+def _nan_to_none(value):
+    return None if np.isnan(value) else value
+
+def _stack_close_matrix(close_series):
+    """
+    Right-aligns each ticker's close series on its latest bar into one
+    (n_tickers, max_len) float64 matrix, NaN-padded on the left. Because every
+    row ends in the last column, "the last N closes" is the same column slice
+    for every ticker; rows shorter than N simply contain NaN in that slice.
+    """
+    lengths = np.array([len(s) for s in close_series], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.full((len(close_series), width), np.nan, dtype=np.float64)
+    for row, series in enumerate(close_series):
+        if len(series):
+            matrix[row, width - len(series):] = series
+    return matrix, lengths
+
+def _window_mean(matrix, stop, period):
+    """Row-wise mean of the `period` columns ending `stop` columns before the last; NaN where a row is too short."""
+    width = matrix.shape[1]
+    end = width - stop
+    if end < period:
+        return np.full(matrix.shape[0], np.nan)
+    # Contiguous copy so each row is reduced exactly like the 1-D np.mean in calculate_sma
+    return np.ascontiguousarray(matrix[:, end - period:end]).mean(axis=1)
+
+def apply_screening_criteria_batch(historical_by_ticker):
+    """
+    Matrix version of apply_screening_criteria for a whole chunk of tickers.
+    Stacks every ticker's close series into one 2-D array and evaluates the 7
+    SEPA criteria for all rows with a single set of NumPy operations.
+    Returns {ticker: result} with the same passes/details/values as the
+    per-ticker function.
+    """
+    results = {}
+    tickers, close_series = [], []
+    for ticker, historical_data in historical_by_ticker.items():
+        close_prices = extract_close_prices(historical_data)
+        if not close_prices:
+            results[ticker] = {"passes": False, "details": {}, "values": {}, "reason": "Insufficient historical price data."}
+            continue
+        tickers.append(ticker)
+        close_series.append(close_prices)
+
+    if not tickers:
+        return results
+
+    matrix, lengths = _stack_close_matrix(close_series)
+    current = matrix[:, -1]
+
+    ma_50, ma_150, ma_200 = (_window_mean(matrix, 0, period) for period in _MA_PERIODS)
+    ma_200_start_month = _window_mean(matrix, _MA200_SLOPE_LOOKBACK, 200)
+    low_52_week = np.nanmin(matrix, axis=1)
+    high_52_week = np.nanmax(matrix, axis=1)
+
+    # NaN compares False, which mirrors the `ma is not None and ...` guards of the scalar version
+    crit = {
+        'current_price_above_ma150_ma200': (current > ma_150) & (current > ma_200),
+        'ma150_above_ma200': ma_150 > ma_200,
+        'ma200_trending_up': (lengths >= 200 + _MA200_SLOPE_LOOKBACK) & (ma_200 > ma_200_start_month),
+        'ma50_above_ma150_ma200': (ma_50 > ma_150) & (ma_50 > ma_200),
+        'current_price_above_ma50': current > ma_50,
+        'price_30_percent_above_52_week_low': current >= low_52_week * 1.30,
+        'price_within_25_percent_of_52_week_high': current >= high_52_week * 0.75,
+    }
+    passes = np.logical_and.reduce(list(crit.values()))
+
+    for row, ticker in enumerate(tickers):
+        results[ticker] = {
+            "passes": bool(passes[row]),
+            "details": {name: bool(flags[row]) for name, flags in crit.items()},
+            "values": {
+                'current_price': close_series[row][-1],
+                'ma_50': _nan_to_none(ma_50[row]),
+                'ma_150': _nan_to_none(ma_150[row]),
+                'ma_200': _nan_to_none(ma_200[row]),
+                'low_52_week': low_52_week[row],
+                'high_52_week': high_52_week[row],
+            },
+        }
+    return results
+
+# --- Historical replay ---
+def _window_means(closes, period):
+    """
+    Mean of every `period`-long run of closes (entry j covers closes[j:j + period]).
+    Each window is reduced exactly like the 1-D np.mean in calculate_sma, so
+    flat stretches compare equal instead of flipping the strict criteria.
+    """
+    if len(closes) < period:
+        return np.empty(0)
+    # Contiguous copy so the reduction runs along each window, as in _window_mean
+    return np.ascontiguousarray(sliding_window_view(closes, period)).mean(axis=1)
+
+def _trailing_means(window_means, period, offset, window_lengths):
+    """
+    Mean of the `period` closes ending `offset` sessions before each session;
+    NaN where the session's window holds fewer than period + offset closes.
+    """
+    sessions = np.flatnonzero(window_lengths >= period + offset)
+    means = np.full(len(window_lengths), np.nan)
+    means[sessions] = window_means[sessions - offset - period + 1]
+    return means
+
+def _trailing_extreme(closes, window_lengths, lookback, reduce):
+    """Running min/max over each session's window (the whole prefix when lookback is None)."""
+    if lookback is None or lookback >= len(closes):
+        return reduce.accumulate(closes)
+    fill = np.inf if reduce is np.minimum else -np.inf
+    padded = np.concatenate([np.full(lookback - 1, fill), closes])
+    return reduce.reduce(sliding_window_view(padded, lookback), axis=1)
+
+def replay_screening_criteria(close_prices, lookback=None, start=0):
+    """
+    Evaluates apply_screening_criteria as of every session from `start` to the
+    last close in one pass, for threshold studies and backtests.
+
+    The verdict for session i is the one apply_screening_criteria returns for
+    close_prices[max(0, i - lookback + 1):i + 1], i.e. the trailing `lookback`
+    closes the data-service would have served that day (all closes up to i
+    when lookback is None). Moving averages are computed once per window with
+    np.mean and the 52-week range comes from a rolling min/max, so the whole
+    history costs a few array passes instead of one full recomputation per
+    session, and the criteria see the same values as the single-date function.
+
+    Returns a list with one result dict per session, starting at `start`.
+    """
+    closes = np.asarray(close_prices, dtype=np.float64)
+    n = len(closes)
+    if n == 0 or start >= n:
+        return []
+
+    sessions = np.arange(n)
+    window_lengths = sessions + 1 if lookback is None else np.minimum(sessions + 1, lookback)
+    window_means = {period: _window_means(closes, period) for period in _MA_PERIODS}
+
+    ma_50, ma_150, ma_200 = (_trailing_means(window_means[period], period, 0, window_lengths) for period in _MA_PERIODS)
+    ma_200_start_month = _trailing_means(window_means[200], 200, _MA200_SLOPE_LOOKBACK, window_lengths)
+    low_52_week = _trailing_extreme(closes, window_lengths, lookback, np.minimum)
+    high_52_week = _trailing_extreme(closes, window_lengths, lookback, np.maximum)
+
+    crit = {
+        'current_price_above_ma150_ma200': (closes > ma_150) & (closes > ma_200),
+        'ma150_above_ma200': ma_150 > ma_200,
+        'ma200_trending_up': ma_200 > ma_200_start_month,
+        'ma50_above_ma150_ma200': (ma_50 > ma_150) & (ma_50 > ma_200),
+        'current_price_above_ma50': closes > ma_50,
+        'price_30_percent_above_52_week_low': closes >= low_52_week * 1.30,
+        'price_within_25_percent_of_52_week_high': closes >= high_52_week * 0.75,
+    }
+    passes = np.logical_and.reduce(list(crit.values()))
+
+    return [
+        {
+            "passes": bool(passes[i]),
+            "details": {name: bool(flags[i]) for name, flags in crit.items()},
+            "values": {
+                'current_price': close_prices[i],
+                'ma_50': _nan_to_none(ma_50[i]),
+                'ma_150': _nan_to_none(ma_150[i]),
+                'ma_200': _nan_to_none(ma_200[i]),
+                'low_52_week': low_52_week[i],
+                'high_52_week': high_52_week[i],
+            },
+        }
+        for i in range(start, n)
+    ]
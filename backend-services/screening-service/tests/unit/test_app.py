@@ -2,6 +2,9 @@
 import unittest
 from unittest.mock import patch, Mock
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from app import app, _process_chunk
 
 class TestScreeningServiceDataContracts(unittest.TestCase):
@@ -110,7 +113,7 @@ class TestScreeningServiceDataContracts(unittest.TestCase):
         # 3. Assert
         self.assertEqual(result, [])
 
-    @patch('app.apply_screening_criteria')
+    @patch('app.apply_screening_criteria_batch')
     @patch('app.requests.post')
     def test_process_chunk_happy_path(self, mock_post, mock_apply_screening):
         """
@@ -134,10 +137,8 @@ class TestScreeningServiceDataContracts(unittest.TestCase):
 
         # Mock the screening logic to control the outcome
         # Let's say AAPL passes and GOOD fails the screening criteria
-        def screening_side_effect(ticker, data):
-            if ticker == "AAPL":
-                return {"passes": True}
-            return {"passes": False}
+        def screening_side_effect(data_by_ticker):
+            return {ticker: {"passes": ticker == "AAPL"} for ticker in data_by_ticker}
         mock_apply_screening.side_effect = screening_side_effect
 
         # 2. Act: Call the helper function
@@ -145,7 +146,116 @@ class TestScreeningServiceDataContracts(unittest.TestCase):
 
         # 3. Assert: Verify the outcome
         self.assertEqual(result, ["AAPL"]) # Only AAPL should be in the final list
-        self.assertEqual(mock_apply_screening.call_count, 2) # Ensures logic was run for both successful tickers
+        mock_apply_screening.assert_called_once() # The whole chunk is screened in one matrix pass
+        self.assertEqual(set(mock_apply_screening.call_args.args[0]), {"AAPL", "GOOD"}) # Ensures logic was run for both successful tickers
+
+class TestConcurrentChunkDispatch(unittest.TestCase):
+    """/screen/batch dispatches chunks concurrently, bounded and in input order."""
+
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def test_chunks_run_concurrently_within_limit_and_keep_order(self):
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def slow_chunk(chunk):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            # Earlier chunks finish last, so completion order is the reverse of input order
+            time.sleep(0.05 * (10 - int(chunk[0][1:]) // 2))
+            with lock:
+                state["in_flight"] -= 1
+            return [t for t in chunk if int(t[1:]) % 3 == 0]
+
+        tickers = [f"T{i}" for i in range(20)]
+        with patch('app._process_chunk', side_effect=slow_chunk), \
+             patch('app.CHUNK_SIZE', 2), \
+             patch('app.chunk_executor', ThreadPoolExecutor(max_workers=3)) as executor:
+            started = time.monotonic()
+            response = self.app.post('/screen/batch', json={"tickers": tickers})
+            elapsed = time.monotonic() - started
+            executor.shutdown()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), ["T0", "T3", "T6", "T9", "T12", "T15", "T18"])
+        self.assertEqual(state["peak"], 3)
+        # Ten chunks sleeping 0.05-0.5s each take ~2.75s serially
+        self.assertLess(elapsed, 2.0)
+
+    @patch('app.print')
+    @patch('app.requests.post')
+    def test_failed_chunk_does_not_drop_other_chunks(self, mock_post, mock_print):
+        ok_payload = {"success": {}, "failed": ["B1"]}
+
+        def post_side_effect(url, **kwargs):
+            if "A1" in kwargs["json"]["tickers"]:
+                return Mock(status_code=503, text="upstream busy")
+            return Mock(status_code=200, content=json.dumps(ok_payload).encode('utf-8'))
+        mock_post.side_effect = post_side_effect
+
+        with patch('app.CHUNK_SIZE', 1):
+            response = self.app.post('/screen/batch', json={"tickers": ["A1", "B1"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+        printed = " ".join(str(c.args[0]) for c in mock_print.call_args_list)
+        # Both the failed chunk and the per-ticker data failure are still reported
+        self.assertIn("Chunk failed with status 503", printed)
+        self.assertIn("['B1']", printed)
+
+class TestStreamedPriceBatch(unittest.TestCase):
+    """_process_chunk consumes the NDJSON /price/batch stream record by record."""
+
+    @staticmethod
+    def _columns(closes):
+        n = len(closes)
+        return {
+            "dates": [f"2025-01-{i % 28 + 1:02d}" for i in range(n)],
+            "open": list(closes), "high": list(closes), "low": list(closes),
+            "close": list(closes), "volume": [1000] * n, "adjclose": list(closes),
+        }
+
+    def _stream_response(self, records):
+        lines = [json.dumps(r).encode('utf-8') if isinstance(r, dict) else r for r in records]
+        return Mock(status_code=200, headers={'Content-Type': 'application/x-ndjson'}, iter_lines=Mock(return_value=iter(lines)))
+
+    @patch('app.print')
+    @patch('app.requests.post')
+    def test_stream_records_are_screened_and_failures_reported(self, mock_post, mock_print):
+        rising = [80 + 70 * i / 299 for i in range(300)]
+        falling = list(reversed(rising))
+        mock_post.return_value = self._stream_response([
+            {"ticker": "UP", "status": "success", "format": "columnar", "data": self._columns(rising)},
+            {"ticker": "GONE", "status": "failed", "format": "columnar", "data": None},
+            b"",  # keep-alive blank line
+            {"ticker": "BROKEN", "status": "success", "format": "columnar", "data": dict(self._columns(rising), close=[1.0])},
+            {"ticker": "DOWN", "status": "success", "format": "columnar", "data": self._columns(falling)},
+        ])
+
+        result = _process_chunk(["UP", "GONE", "BROKEN", "DOWN"])
+
+        self.assertEqual(result, ["UP"])
+        self.assertTrue(mock_post.call_args.kwargs['stream'])
+        self.assertTrue(mock_post.call_args.kwargs['json']['stream'])
+        printed = " ".join(str(c.args[0]) for c in mock_print.call_args_list)
+        self.assertIn("['GONE']", printed)
+        self.assertIn("Skipping", printed)
+
+    @patch('app.apply_screening_criteria_batch', return_value={})
+    @patch('app.requests.post')
+    def test_stream_keeps_only_close_series(self, mock_post, mock_apply):
+        rows = [{"formatted_date": "2025-01-02", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10, "adjclose": 1.5}]
+        mock_post.return_value = self._stream_response([
+            {"ticker": "COL", "status": "success", "format": "columnar", "data": self._columns([1.0, 2.0])},
+            {"ticker": "ROW", "status": "success", "format": "rows", "data": rows},
+        ])
+
+        _process_chunk(["COL", "ROW"])
+
+        mock_apply.assert_called_once_with({"COL": {"close": [1.0, 2.0]}, "ROW": {"close": [1.5]}})
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
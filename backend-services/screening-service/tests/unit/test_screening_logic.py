@@ -5,7 +5,7 @@ import os
 import sys
 from unittest.mock import patch
 from app import app, DATA_SERVICE_URL
-from screening_logic import apply_screening_criteria, calculate_sma
+from screening_logic import apply_screening_criteria, apply_screening_criteria_batch, calculate_sma, replay_screening_criteria
 import requests
 import json
 
@@ -142,6 +142,67 @@ class TestScreeningLogic(unittest.TestCase):
         """
         self.assertTrue(True)
         
+    def test_columnar_input_matches_row_input(self):
+        """Columnar (PriceColumns) input yields the same verdict and details as row input."""
+        for rows in (create_ideal_passing_data(), create_failing_low_price_data(), create_failing_high_price_data()):
+            columns = {"dates": [r["formatted_date"] for r in rows], "close": [r["close"] for r in rows]}
+            self.assertEqual(
+                apply_screening_criteria("COL", columns),
+                apply_screening_criteria("COL", rows),
+            )
+
+    def test_batch_matches_single_ticker_results(self):
+        """The matrix screener returns exactly the per-ticker passes/details/values, whatever the series lengths."""
+        rng = np.random.default_rng(42)
+        chunk = {
+            "PASS": create_ideal_passing_data(),
+            "FAIL_LOW": create_failing_low_price_data(),
+            "FAIL_HIGH": create_failing_high_price_data(),
+            "PASS_250": create_data_with_250_days(),
+            "SHORT": {'c': [100] * 150},
+            "EMPTY": {'c': []},
+            "GAPS": {"close": [None, 10.0, None] + np.linspace(10, 30, 230).tolist()},
+        }
+        for i, length in enumerate([1, 49, 50, 199, 200, 219, 220, 221, 260, 300]):
+            walk = 100 * np.exp(np.cumsum(rng.normal(0.002, 0.02, length)))
+            chunk[f"RAND{i}"] = {"dates": ["2025-01-01"] * length, "close": walk.tolist()}
+
+        batch = apply_screening_criteria_batch(chunk)
+
+        self.assertEqual(set(batch), set(chunk))
+        for ticker, data in chunk.items():
+            with self.subTest(ticker=ticker):
+                self.assertEqual(batch[ticker], apply_screening_criteria(ticker, data))
+
+    def test_batch_empty_chunk(self):
+        self.assertEqual(apply_screening_criteria_batch({}), {})
+
+    def test_replay_matches_single_date_results(self):
+        """Every replayed session agrees with apply_screening_criteria on the series as of that session."""
+        rng = np.random.default_rng(11)
+        walk = (100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, 400)))).tolist()
+        # Flat stretches put close == MA, where any rounding drift flips the strict criteria
+        flat = [33.1] * 150 + np.linspace(33.1, 50.0, 100).tolist() + [50.0] * 250
+        for series, lookback in [(walk, None), (walk, 252), (walk, 120), (flat, None), (flat, 252)]:
+            replayed = replay_screening_criteria(series, lookback=lookback)
+            self.assertEqual(len(replayed), len(series))
+            for session, result in enumerate(replayed):
+                window = series[:session + 1] if lookback is None else series[max(0, session - lookback + 1):session + 1]
+                expected = apply_screening_criteria("REPLAY", {"close": window})
+                with self.subTest(lookback=lookback, session=session):
+                    self.assertEqual(result["passes"], expected["passes"])
+                    self.assertEqual(result["details"], expected["details"])
+                    for name, value in expected["values"].items():
+                        if value is None:
+                            self.assertIsNone(result["values"][name])
+                        else:
+                            self.assertAlmostEqual(result["values"][name], value, places=9)
+
+    def test_replay_start_and_empty_input(self):
+        prices = np.linspace(80, 150, 300).tolist()
+        self.assertEqual(replay_screening_criteria(prices, start=290), replay_screening_criteria(prices)[290:])
+        self.assertEqual(replay_screening_criteria([]), [])
+
     def test_sma_calculation(self):
         """Maintains the original valid test for the SMA helper function."""
         prices = [i for i in range(1, 11)]  # [1, 2, ..., 10]
@@ -239,9 +300,9 @@ class TestScreeningEndpoint(unittest.TestCase):
         # 25 tickers with a chunk size of 10 should result in 3 calls (10, 10, 5).
         self.assertEqual(mock_post.call_count, 3)
 
-        # Optional: verify the content of the last call's payload
-        last_call_payload = mock_post.call_args.kwargs['json']
-        self.assertEqual(len(last_call_payload['tickers']), 5)
+        # Chunks are dispatched concurrently, so compare the chunk sizes irrespective of call order
+        chunk_sizes = sorted(len(c.kwargs['json']['tickers']) for c in mock_post.call_args_list)
+        self.assertEqual(chunk_sizes, [5, 10, 10])
 
     @patch('app.requests.post')
     def test_batch_screen_endpoint(self, mock_post):
@@ -275,6 +336,38 @@ class TestScreeningEndpoint(unittest.TestCase):
         # Ensure the data-service was called via POST
         mock_post.assert_called_once()
 
+    @patch('app.requests.post')
+    def test_batch_screen_endpoint_columnar_payload(self, mock_post):
+        """
+        The batch endpoint requests the columnar /price/batch shape and screens
+        PriceColumns payloads with the same verdicts as the row payloads.
+        """
+        def to_columns(rows):
+            return {
+                "dates": [r["formatted_date"] for r in rows],
+                **{field: [r[field] for r in rows] for field in ("open", "high", "low", "close", "volume", "adjclose")},
+            }
+
+        batch_data = {
+            "format": "columnar",
+            "success": {
+                "PASS_TICKER": to_columns(create_ideal_passing_data()),
+                "FAIL_TICKER": to_columns(create_failing_high_price_data()),
+            },
+            "failed": ["DATA_UNAVAILABLE_TICKER"],
+        }
+        mock_post.return_value = unittest.mock.MagicMock(
+            status_code=200,
+            content=json.dumps(batch_data).encode('utf-8'),
+        )
+
+        response = self.app.post('/screen/batch',
+                                 json={"tickers": ["PASS_TICKER", "FAIL_TICKER", "DATA_UNAVAILABLE_TICKER"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), ["PASS_TICKER"])
+        self.assertEqual(mock_post.call_args.kwargs['json']['format'], 'columnar')
+
     @patch('app.requests.get')
     def test_single_ticker_success_case(self, mock_get):
         """
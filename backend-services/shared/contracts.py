@@ -7,9 +7,10 @@ These models ensure data consistency, provide automatic validation, and act as
 living documentation for the data structures exchanged between microservices.
 """
 
+import functools
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, TypeAlias, Literal, Annotated
-from pydantic import BaseModel, ConfigDict, Field, StringConstraints, StrictBool, StrictInt, field_serializer
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeAlias, Literal, Annotated, get_args, get_origin
+from pydantic import TypeAdapter, ValidationError, BaseModel, ConfigDict, Field, StringConstraints, StrictBool, StrictInt, field_serializer, model_validator
 from enum import Enum
 
 # --- Enums: Watchlist/Archive/Freshness ---
@@ -94,6 +95,127 @@ class PriceDataItem(BaseModel):
     volume: Optional[int] = None
     adjclose: Optional[float] = None
 
+PriceBatchFormat: TypeAlias = Literal["rows", "columnar"]
+"""Response shape for POST /price/batch: "rows" (List[PriceDataItem], default) or "columnar" (PriceColumns)."""
+
+class PriceColumns(BaseModel):
+    """
+    Columnar form of List[PriceDataItem] for one ticker: one array per field.
+
+    Returned by data-service /price/batch when the request sets "format": "columnar".
+    All arrays are index-aligned with `dates`, so receivers can build NumPy arrays
+    directly (e.g. np.asarray(columns.close, dtype=float)) without looping over rows.
+    """
+    dates: List[str]
+    open: List[Optional[float]]
+    high: List[Optional[float]]
+    low: List[Optional[float]]
+    close: List[Optional[float]]
+    volume: List[Optional[int]]
+    adjclose: List[Optional[float]]
+
+    @model_validator(mode="after")
+    def _check_aligned(self):
+        n = len(self.dates)
+        for field in ("open", "high", "low", "close", "volume", "adjclose"):
+            if len(getattr(self, field)) != n:
+                raise ValueError(f"column '{field}' has {len(getattr(self, field))} values, expected {n}")
+        return self
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "PriceColumns":
+        """
+        Builds columns from rows already validated as PriceDataItem (no re-validation).
+        """
+        return cls.model_construct(
+            dates=[row.get("formatted_date") for row in rows],
+            open=[row.get("open") for row in rows],
+            high=[row.get("high") for row in rows],
+            low=[row.get("low") for row in rows],
+            close=[row.get("close") for row in rows],
+            volume=[row.get("volume") for row in rows],
+            adjclose=[row.get("adjclose") for row in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def sessions(self) -> "PriceColumns":
+        """
+        Chronological columns without the sessions whose close is missing (the same
+        filtering as row-based receivers apply). Returns self when nothing changes.
+        """
+        keep = [i for i, close in enumerate(self.close) if close is not None]
+        ordered = all(self.dates[i] <= self.dates[j] for i, j in zip(keep, keep[1:]))
+        if ordered and len(keep) == len(self.dates):
+            return self
+        if not ordered:
+            keep.sort(key=self.dates.__getitem__)
+        return self.model_construct(**{
+            field: [getattr(self, field)[i] for i in keep]
+            for field in ("dates", "open", "high", "low", "close", "volume", "adjclose")
+        })
+
+    def to_rows(self, indices: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Expands the columns back into PriceDataItem-shaped dicts for row-based consumers
+        (only the sessions at `indices` when given).
+        """
+        if indices is None:
+            indices = range(len(self.dates))
+        return [
+            {
+                "formatted_date": self.dates[i], "open": self.open[i], "high": self.high[i], "low": self.low[i],
+                "close": self.close[i], "volume": self.volume[i], "adjclose": self.adjclose[i],
+            }
+            for i in indices
+        ]
+
+class ColumnarPriceBatchResponse(BaseModel):
+    """Response for POST /price/batch with "format": "columnar"."""
+    format: Literal["columnar"] = "columnar"
+    success: Dict[str, PriceColumns]
+    failed: List[str]
+
+def unpack_price_batch(batch_data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool, Dict[str, ValidationError]]:
+    """
+    Normalizes a /price/batch response body for receivers.
+
+    Columnar payloads are validated once per ticker and returned as PriceColumns, so
+    receivers read the arrays directly instead of rebuilding per-session dicts. Row
+    payloads are returned unchanged for the caller to validate.
+    Returns (series_by_ticker, prevalidated, invalid), where `invalid` maps each
+    columnar ticker dropped for violating the contract to its ValidationError.
+    """
+    batch_data = batch_data or {}
+    success = batch_data.get('success', {}) or {}
+    if batch_data.get('format') != 'columnar':
+        return success, False, {}
+
+    series_by_ticker, invalid = {}, {}
+    for ticker, columns in success.items():
+        try:
+            series_by_ticker[ticker] = PriceColumns.model_validate(columns)
+        except ValidationError as e:
+            invalid[ticker] = e
+    return series_by_ticker, True, invalid
+
+PRICE_BATCH_STREAM_MIMETYPE = "application/x-ndjson"
+
+class PriceBatchStreamRecord(BaseModel):
+    """
+    One line of POST /price/batch with "stream": true (NDJSON, PRICE_BATCH_STREAM_MIMETYPE).
+
+    data-service writes one record per requested ticker as soon as it resolves.
+    `data` holds List[PriceDataItem] rows or PriceColumns according to `format`,
+    and is null when status is "failed". Receivers validate `data` themselves so
+    each ticker can be checked (and acted on) the moment its line arrives.
+    """
+    ticker: str
+    status: Literal["success", "failed"]
+    format: Literal["rows", "columnar"] = "rows"
+    data: Optional[Any] = None
+
 
 # --- Contract 3: CoreFinancials ---
 class EarningItem(BaseModel):
@@ -167,6 +289,39 @@ class VCPContractionItem(BaseModel):
     end_price: float = Field(..., description="Price at the contraction trough")
     depth_percent: float = Field(..., description="Percentage depth of this contraction (0.0 to 1.0)")
 
+ChartPayloadMode: TypeAlias = Literal["full", "downsampled", "columnar"]
+"""
+Chart payload shape for analysis-service /analyze ("chart" parameter): every session as
+row dicts ("full", default), a shape-preserving subset of sessions in the same row shape
+("downsampled"), or delta-encoded columns in VCPChartData.columns ("columnar").
+"""
+
+class DeltaColumn(BaseModel):
+    """
+    Fixed-point, delta-encoded numeric column aligned with the ChartColumns sessions.
+    Decode with a running sum over `values` divided by 10**decimals: the first entry
+    is absolute, later ones are changes. None marks a missing value and does not move
+    the running sum. The column starts at session `offset` (moving averages begin once
+    their window is full).
+    """
+    decimals: int
+    offset: int = 0
+    values: List[Optional[int]]
+
+class ChartColumns(BaseModel):
+    """Every session of a VCP chart as compact columns; session i falls on start_date + sum(day_deltas[:i]) days."""
+    start_date: str
+    day_deltas: List[int]
+    open: DeltaColumn
+    high: DeltaColumn
+    low: DeltaColumn
+    close: DeltaColumn
+    volume: DeltaColumn
+    ma20: DeltaColumn
+    ma50: DeltaColumn
+    ma150: DeltaColumn
+    ma200: DeltaColumn
+
 class VCPChartData(BaseModel):
     """Data required for visualizing the VCP chart."""
     detected: bool
@@ -187,6 +342,8 @@ class VCPChartData(BaseModel):
     ma150: List[Dict[str, Any]]
     ma200: List[Dict[str, Any]] 
     historicalData: List[Dict[str, Any]]
+    # Set instead of historicalData/ma* (left empty) for chart="columnar"
+    columns: Optional[ChartColumns] = None
 
 
 class VCPDetailCheck(BaseModel):
@@ -838,4 +995,40 @@ class JobErrorEvent(BaseModel):
             dt = dt.replace(tzinfo=timezone.utc)
         else:
             dt = dt.astimezone(timezone.utc)
-        return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
\ No newline at end of file
+        return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+# --- TypeAdapter registry ---
+@functools.lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """
+    Process-wide TypeAdapter for a contract type (List[PriceDataItem], TickerList,
+    Dict[str, List[PriceDataItem]], ...), built on first use and shared by all callers
+    and threads instead of being rebuilt on every request.
+    """
+    return TypeAdapter(tp)
+
+
+def validate_trusted(tp: Any, data: Any) -> Any:
+    """
+    Fast-path check for trusted internal payloads: data that was already fully validated
+    against `tp` before it was stored or sent (e.g. data-service price cache entries,
+    written by finalize_price_response). Lists and dicts are spot-checked on their first
+    and last item (recursively) instead of item by item, catching a payload of the wrong shape without
+    paying per-row validation. Returns `data` unchanged (no model instances are built);
+    raises ValidationError when a sample does not match. Other types are validated fully.
+    """
+    origin = get_origin(tp)
+    if origin is list and isinstance(data, list):
+        (item_type,) = get_args(tp)
+        for item in (data[:1] + data[-1:] if len(data) > 1 else data):
+            validate_trusted(item_type, item)
+        return data
+    if origin is dict and isinstance(data, dict):
+        key_type, value_type = get_args(tp)
+        for key in ({next(iter(data)), next(reversed(data))} if data else ()):
+            get_type_adapter(key_type).validate_python(key)
+            validate_trusted(value_type, data[key])
+        return data
+    get_type_adapter(tp).validate_python(data)
+    return data
@@ -0,0 +1,113 @@
+# backend-services/shared/metrics.py
+"""
+Prometheus instrumentation shared by the Flask services.
+
+instrument_app() adds a per-route request latency histogram and a /metrics
+endpoint in the Prometheus text exposition format. Services define their own
+domain metrics (cache hits, Yahoo requests, pipeline stages) next to the code
+that updates them; everything lands in the default registry.
+
+Processes that fork workers (Celery prefork) set PROMETHEUS_MULTIPROC_DIR so
+samples from every child are aggregated when scraped.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# Upper buckets are wide on purpose: batch endpoints routinely take tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response (headers, for streamed bodies), by Flask route.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "executor_queue_depth",
+    "Work items submitted to a thread pool and not yet picked up by a worker.",
+    ["executor"],
+)
+
+EXECUTOR_MAX_WORKERS = Gauge(
+    "executor_max_workers",
+    "Configured worker threads of a thread pool.",
+    ["executor"],
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def instrument_app(app: Flask) -> Flask:
+    """Times every request by its route template (not the raw path, to keep label cardinality bounded)."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request_latency(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None and request.endpoint != "metrics":
+            route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(request.method, route, str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_response, methods=["GET"])
+    return app
+
+
+def track_executor(name: str, executor: ThreadPoolExecutor) -> ThreadPoolExecutor:
+    """Exports the executor's backlog, read at scrape time; a growing value means the pool is saturated."""
+    EXECUTOR_QUEUE_DEPTH.labels(name).set_function(executor._work_queue.qsize)
+    EXECUTOR_MAX_WORKERS.labels(name).set(executor._max_workers)
+    return executor
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Serves /metrics on its own port, for processes without a Flask app (Celery workers).
+    Call it in the parent before workers fork; in multiprocess mode the sample files
+    left by a previous run are cleared first.
+    """
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+    start_http_server(port, registry=_registry())
+
+
+def mark_worker_exited(pid: int) -> None:
+    """Drops a forked worker's live gauges from the aggregate (multiprocess mode only)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,133 @@
+# backend-services/shared/trading_calendar.py
+"""
+Precomputed NYSE trading-session index shared by the backend services.
+
+Building a pandas_market_calendars schedule costs milliseconds per call; the
+services used to do it on every cache check and every trend lookup. This module
+builds the session list once for a wide date range and answers session queries
+with binary searches over a sorted datetime64 array.
+"""
+
+import os
+import threading
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+CALENDAR_NAME = "NYSE"
+HISTORY_YEARS = int(os.getenv("TRADING_CALENDAR_HISTORY_YEARS", "30"))
+FUTURE_YEARS = int(os.getenv("TRADING_CALENDAR_FUTURE_YEARS", "2"))
+
+
+def _to_day(d: date) -> np.datetime64:
+    return np.datetime64(d, "D")
+
+
+def _to_date(d: np.datetime64) -> date:
+    return d.astype("datetime64[D]").astype(date)
+
+
+class TradingCalendar:
+    """
+    Immutable, sorted list of trading sessions with O(log n) lookups.
+    Every query answers only from the precomputed range; callers that may step
+    outside it should go through get_trading_calendar(start, end).
+    """
+
+    def __init__(self, sessions, start: Optional[date] = None, end: Optional[date] = None):
+        arr = np.asarray(sessions, dtype="datetime64[D]")
+        self._sessions = np.unique(arr)  # sorted and de-duplicated
+        # The range the index was built for; it may start or end on a non-session day
+        self.range_start = start if start is not None else self.first_session
+        self.range_end = end if end is not None else self.last_session
+
+    @classmethod
+    def build(cls, start: date, end: date, name: str = CALENDAR_NAME) -> "TradingCalendar":
+        """Builds the session index for [start, end] from pandas_market_calendars (one schedule call)."""
+        import pandas_market_calendars as mcal
+
+        valid_days = mcal.get_calendar(name).valid_days(start_date=start, end_date=end)
+        return cls(valid_days.tz_localize(None).values.astype("datetime64[D]"), start=start, end=end)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def first_session(self) -> Optional[date]:
+        return _to_date(self._sessions[0]) if len(self._sessions) else None
+
+    @property
+    def last_session(self) -> Optional[date]:
+        return _to_date(self._sessions[-1]) if len(self._sessions) else None
+
+    def covers(self, start: date, end: date) -> bool:
+        """True if [start, end] lies inside the range the index was built for."""
+        if self.range_start is None or self.range_end is None:
+            return False
+        return self.range_start <= start and end <= self.range_end
+
+    def is_session(self, d: date) -> bool:
+        i = np.searchsorted(self._sessions, _to_day(d))
+        return bool(i < len(self._sessions) and self._sessions[i] == _to_day(d))
+
+    def previous_session(self, d: date) -> Optional[date]:
+        """Most recent session strictly before d, or None if outside the index."""
+        i = np.searchsorted(self._sessions, _to_day(d), side="left") - 1
+        return _to_date(self._sessions[i]) if i >= 0 else None
+
+    def next_session(self, d: date) -> Optional[date]:
+        """First session strictly after d, or None if outside the index."""
+        i = np.searchsorted(self._sessions, _to_day(d), side="right")
+        return _to_date(self._sessions[i]) if i < len(self._sessions) else None
+
+    def sessions_back(self, end: date, n: int) -> Optional[date]:
+        """
+        The n-th most recent session on or before `end` (n=1 is the last session <= end).
+        Equivalent to schedule(..., end_date=end).index[-n]; None if the index does not reach back that far.
+        """
+        i = np.searchsorted(self._sessions, _to_day(end), side="right") - n
+        return _to_date(self._sessions[i]) if n > 0 and i >= 0 else None
+
+    def last_n_sessions(self, end: date, n: int) -> List[date]:
+        """The last n sessions on or before `end`, oldest first."""
+        stop = np.searchsorted(self._sessions, _to_day(end), side="right")
+        return [_to_date(s) for s in self._sessions[max(0, stop - n):stop]] if n > 0 else []
+
+    def sessions_between(self, start: date, end: date) -> List[date]:
+        """All sessions in [start, end], oldest first."""
+        lo = np.searchsorted(self._sessions, _to_day(start), side="left")
+        hi = np.searchsorted(self._sessions, _to_day(end), side="right")
+        return [_to_date(s) for s in self._sessions[lo:hi]]
+
+
+# --- Process-wide default calendar ---
+_DEFAULT_CALENDAR: Optional[TradingCalendar] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_trading_calendar(start: Optional[date] = None, end: Optional[date] = None) -> TradingCalendar:
+    """
+    Returns the shared NYSE session index, building it on first use for
+    [today - HISTORY_YEARS, today + FUTURE_YEARS]. If [start, end] (or today) falls
+    outside the current index, it is rebuilt once over the widened range.
+    """
+    global _DEFAULT_CALENDAR
+    today = date.today()
+    need_start = min(start or today, today)
+    need_end = max(end or today, today)
+    cal = _DEFAULT_CALENDAR
+    if cal is not None and cal.covers(need_start, need_end):
+        return cal
+
+    with _DEFAULT_LOCK:
+        cal = _DEFAULT_CALENDAR
+        if cal is not None and cal.covers(need_start, need_end):
+            return cal
+        build_start = min(need_start, today - timedelta(days=365 * HISTORY_YEARS))
+        build_end = max(need_end, today + timedelta(days=365 * FUTURE_YEARS))
+        if cal is not None:
+            build_start = min(build_start, cal.range_start)
+            build_end = max(build_end, cal.range_end)
+        _DEFAULT_CALENDAR = TradingCalendar.build(build_start, build_end)
+        return _DEFAULT_CALENDAR
@@ -3,11 +3,13 @@ import pandas as pd
 import requests
 import os
 import logging
-from pydantic import TypeAdapter, ValidationError
-from shared.contracts import TickerList
+from pydantic import ValidationError
+from shared.contracts import TickerList, get_type_adapter
+from shared.metrics import instrument_app
 from pymongo import MongoClient, errors
 
 app = Flask(__name__)
+instrument_app(app)
 PORT = int(os.getenv("PORT", 5001))
 
 # --- Logging Setup ---
@@ -110,7 +112,7 @@ def get_tickers_endpoint():
              return jsonify({"error": "Failed to retrieve any tickers from the source."}), 500
         # Validate the output against the TickerList contract before returning.
         try:
-            ta = TypeAdapter(TickerList)
+            ta = get_type_adapter(TickerList)
             ta.validate_python(ticker_list)
         except ValidationError as e:
             logger.error(f"Internal data validation error in ticker-service: {e}")